@@ -0,0 +1,362 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the batched nearest store search over many already geocoded origins."""
+
+import heapq
+from math import pi, cos, sin, asin, sqrt, atan2, radians
+from array import array
+from typing import Dict, List, Tuple, Union, Callable, Iterable, Optional
+
+from .index import GridIndex
+from .models import GeoLocation
+from .catalog import StoreCatalog
+from .snapshot import CatalogSnapshot
+
+# the compact results of a batched search, as parallel arrays of origin indexes, store
+# ids and distances (each origin gets consecutive rows ordered by distance)
+PointResults = Tuple[array, array, array]
+
+# a candidate store of a cell as its store id, its catalog index (or its location if
+# it is not a row of the catalog), and its latitude, longitude and latitude cosine
+Candidate = Tuple[int, Union[int, GeoLocation], float, float, float]
+
+# the relative padding added to the distance limit of the candidates of a cell
+LIMIT_SLACK = 1e-9
+
+
+def central_angle(
+    phi: float,
+    lambda_: float,
+    cos_phi: float,
+    target_phi: float,
+    target_lambda: float,
+    target_cos_phi: float,
+) -> float:
+    """Calculate the central angle between two locations given in radians.
+
+    :param float phi: The latitude of the first location in radians
+    :param float lambda_: The longitude of the first location in radians
+    :param float cos_phi: The cosine of the latitude of the first location
+    :param float target_phi: The latitude of the second location in radians
+    :param float target_lambda: The longitude of the second location in radians
+    :param float target_cos_phi: The cosine of the latitude of the second location
+    :return: The central angle in radians
+    :rtype: float
+    """
+
+    a = (
+        sin((target_phi - phi) / 2.0) ** 2
+        + cos_phi * target_cos_phi * sin((target_lambda - lambda_) / 2.0) ** 2
+    )
+    return 2.0 * asin(sqrt(min(a, 1.0)))
+
+
+def delta_candidates(snapshot: CatalogSnapshot) -> List[Candidate]:
+    """Get the added and updated stores of a snapshot as candidates.
+
+    :param CatalogSnapshot snapshot: The snapshot to get the stores of
+    :return: A list of candidates of the stores of the ``delta`` of the snapshot
+    :rtype: List[Candidate]
+    """
+
+    candidates = []
+    for (store_id, store) in snapshot.delta.items():
+        location = store.geolocation
+        phi = radians(location.latitude)
+        candidates.append(
+            (store_id, location, phi, radians(location.longitude), cos(phi))
+        )
+    return candidates
+
+
+def cell_candidates(
+    snapshot: CatalogSnapshot,
+    spatial_index: GridIndex,
+    south: float,
+    west: float,
+    height: float,
+    width: float,
+    count: int = 1,
+    widening: float = 1.0,
+    delta: Optional[List[Candidate]] = None,
+) -> List[Candidate]:
+    """Find every store that can be among the closest stores to a location in a cell.
+
+    The ``count``-th closest store to the center of the cell bounds how far the
+    closest stores of any location within the cell can be (the triangle inequality
+    adds at most the distance from the center to a corner of the cell, twice).
+
+    :param CatalogSnapshot snapshot: The snapshot to search
+    :param GridIndex spatial_index: An index of the catalog rows of the snapshot
+    :param float south: The southern latitude of the cell in degrees
+    :param float west: The western longitude of the cell in degrees
+    :param float height: The height of the cell in degrees
+    :param float width: The width of the cell in degrees
+    :param int count: The number of closest stores to find candidates for,
+        optional, defaults to 1
+    :param float widening: The factor spherical distances are widened by to bound
+        exact distances, optional, defaults to 1.0
+    :param List[Candidate] delta: The candidates of the added and updated stores,
+        optional, defaults to the result of ``delta_candidates``
+    :raises ValueError: When the catalog is a SQLite database
+    :return: A list of candidates ordered by store id
+    :rtype: List[Candidate]
+    """
+
+    catalog = snapshot.catalog
+    if not isinstance(catalog, StoreCatalog):
+        raise ValueError("cell candidates require a store locations file")
+    if delta is None:
+        delta = delta_candidates(snapshot)
+    center = GeoLocation(
+        latitude=south + height / 2.0,
+        longitude=west + width / 2.0,
+    )
+    center_phi = radians(center.latitude)
+    center_lambda = radians(center.longitude)
+    center_cos = cos(center_phi)
+    # NOTE: the farthest location of a small latitude/longitude cell from its
+    # center is always one of its corners
+    reach = max(
+        central_angle(
+            center_phi,
+            center_lambda,
+            center_cos,
+            radians(latitude),
+            radians(longitude),
+            cos(radians(latitude)),
+        )
+        for latitude in (south, south + height)
+        for longitude in (west, west + width)
+    )
+
+    def _angle(index: int) -> float:
+        return central_angle(
+            center_phi,
+            center_lambda,
+            center_cos,
+            catalog.phis[index],
+            catalog.lambdas[index],
+            catalog.cos_phis[index],
+        )
+
+    delta_angles = [
+        central_angle(center_phi, center_lambda, center_cos, phi, lambda_, cos_phi)
+        for (_, _, phi, lambda_, cos_phi) in delta
+    ]
+    closest = heapq.nsmallest(
+        count,
+        [
+            angle
+            for (angle, _) in spatial_index.nearest(
+                center,
+                _angle,
+                radius=1.0,
+                results=count,
+                excluded=snapshot.tombstones,
+            )
+        ]
+        + delta_angles,
+    )
+    # NOTE: the limit is padded so rounding never drops a candidate on its edge
+    limit = ((closest[-1] + reach) * widening + reach) * (1.0 + LIMIT_SLACK)
+
+    # candidates are ordered by store id so ties are broken like other searches
+    candidates: List[Candidate] = sorted(
+        [
+            (
+                snapshot.ids[index],
+                index,
+                catalog.phis[index],
+                catalog.lambdas[index],
+                catalog.cos_phis[index],
+            )
+            for (_, index) in spatial_index.within(
+                center,
+                _angle,
+                radius=1.0,
+                limit=limit,
+                excluded=snapshot.tombstones,
+            )
+        ]
+        + [
+            candidate
+            for (candidate, angle) in zip(delta, delta_angles)
+            if angle <= limit
+        ]
+    )
+    return candidates
+
+
+def nearest_for_points(
+    snapshot: CatalogSnapshot,
+    spatial_index: GridIndex,
+    origins: Iterable[Tuple[float, float]],
+    results: int = 1,
+    radius: float = 1.0,
+    cell_size: float = 0.5,
+    exact: Optional[Callable[[GeoLocation, GeoLocation], float]] = None,
+    tolerance: float = 0.0,
+) -> PointResults:
+    """Find the closest stores of a snapshot to every one of many origins.
+
+    Origins are grouped into cells of ``cell_size`` degrees. For each cell the
+    ``results``-th closest store to the center of the cell bounds how far the closest
+    stores of any origin within the cell can be (the triangle inequality adds at most
+    the distance from the center to a corner of the cell, twice), so the candidates of
+    a cell are looked up in the ``spatial_index`` only once. Each origin then only
+    ranks the few candidates of its cell using haversines rebuilt from precomputed
+    half-angle sines and cosines (nothing but multiply-adds per candidate).
+
+    :param CatalogSnapshot snapshot: The snapshot to search
+    :param GridIndex spatial_index: An index of the catalog rows of the snapshot
+    :param Iterable[Tuple[float, float]] origins: The latitudes and longitudes (in
+        degrees) of the origins
+    :param int results: The number of closest stores to find per origin,
+        optional, defaults to 1
+    :param float radius: The radius of the earth in the units of the returned
+        distances, optional, defaults to 1.0 (central angles)
+    :param float cell_size: The size (in degrees) of the cells origins are grouped
+        into, optional, defaults to 0.5
+    :param Callable[[GeoLocation, GeoLocation], float] exact: A callable returning the
+        exact distance between two locations used instead of the haversine distance
+        (in the units of ``radius``), optional, defaults to None
+    :param float tolerance: The relative difference allowed between the values of
+        ``exact`` and spherical distances, optional, defaults to 0.0
+    :raises ValueError: When the catalog is a SQLite database
+    :return: A tuple of arrays of origin indexes, store ids and distances
+    :rtype: Tuple[array, array, array]
+    """
+
+    catalog = snapshot.catalog
+    if not isinstance(catalog, StoreCatalog):
+        raise ValueError("batched searches require a store locations file")
+    locations: List[Tuple[float, float]] = [
+        (float(latitude), float(longitude)) for (latitude, longitude) in origins
+    ]
+    # every origin gets the same amount of results as long as there are enough stores
+    count = min(results, len(catalog) - len(snapshot.tombstones) + len(snapshot.delta))
+    if count < 1:
+        return (array("q"), array("q"), array("d"))
+    origin_indexes = array("q", [0]) * (len(locations) * count)
+    store_ids = array("q", [0]) * (len(locations) * count)
+    distances = array("d", [0.0]) * (len(locations) * count)
+
+    # the widening of spherical distances needed to bound the exact distances
+    widening = (1.0 + tolerance) / (1.0 - tolerance)
+    cells = GridIndex(resolution=cell_size)
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for (origin_index, (latitude, longitude)) in enumerate(locations):
+        groups.setdefault(cells.cell(latitude, longitude), []).append(origin_index)
+
+    # added and updated stores are few enough to be measured from every cell
+    delta = delta_candidates(snapshot)
+
+    for ((row, column), group) in groups.items():
+        candidates = cell_candidates(
+            snapshot,
+            spatial_index,
+            -90.0 + row * cells.row_height,
+            -180.0 + column * cells.column_width,
+            cells.row_height,
+            cells.column_width,
+            count=count,
+            widening=widening,
+            delta=delta,
+        )
+        candidate_ids = [candidate[0] for candidate in candidates]
+        candidate_locations = (
+            [
+                (
+                    GeoLocation(
+                        latitude=catalog.latitudes[location],
+                        longitude=catalog.longitudes[location],
+                    )
+                    if isinstance(location, int)
+                    else location
+                )
+                for (_, location, _, _, _) in candidates
+            ]
+            if exact is not None
+            else []
+        )
+        # the half-angle sines and cosines of the candidates let the haversine of an
+        # origin be rebuilt with the angle difference identities
+        sin_half_phis = [sin(candidate[2] / 2.0) for candidate in candidates]
+        cos_half_phis = [cos(candidate[2] / 2.0) for candidate in candidates]
+        cos_phis = [candidate[4] for candidate in candidates]
+        sin_half_lambdas = [sin(candidate[3] / 2.0) for candidate in candidates]
+        cos_half_lambdas = [cos(candidate[3] / 2.0) for candidate in candidates]
+        positions = range(len(candidates))
+
+        for origin_index in group:
+            (latitude, longitude) = locations[origin_index]
+            phi = radians(latitude)
+            lambda_ = radians(longitude)
+            (sin_phi, cos_phi) = (sin(phi / 2.0), cos(phi / 2.0))
+            (sin_lambda, cos_lambda) = (sin(lambda_ / 2.0), cos(lambda_ / 2.0))
+            origin_cos = cos(phi)
+
+            haversines = [
+                (sin_half_phi * cos_phi - cos_half_phi * sin_phi) ** 2
+                + origin_cos
+                * cos_candidate
+                * (sin_half_lambda * cos_lambda - cos_half_lambda * sin_lambda) ** 2
+                for (
+                    sin_half_phi,
+                    cos_half_phi,
+                    cos_candidate,
+                    sin_half_lambda,
+                    cos_half_lambda,
+                ) in zip(
+                    sin_half_phis,
+                    cos_half_phis,
+                    cos_phis,
+                    sin_half_lambdas,
+                    cos_half_lambdas,
+                )
+            ]
+
+            if exact is None:
+                ranked = [
+                    (
+                        radius
+                        * 2.0
+                        * atan2(
+                            sqrt(min(haversines[position], 1.0)),
+                            sqrt(max(1.0 - haversines[position], 0.0)),
+                        ),
+                        position,
+                    )
+                    for position in heapq.nsmallest(
+                        count, positions, key=haversines.__getitem__
+                    )
+                ]
+            else:
+                # only candidates whose spherical distance is within the tolerance of
+                # the ``count``-th smallest spherical distance are measured exactly
+                threshold = heapq.nsmallest(count, haversines)[-1]
+                angle = 2.0 * atan2(
+                    sqrt(min(threshold, 1.0)), sqrt(max(1.0 - threshold, 0.0))
+                )
+                angle *= widening
+                threshold = 1.0 if angle >= pi else sin(angle / 2.0) ** 2
+                origin = GeoLocation(latitude=latitude, longitude=longitude)
+                ranked = heapq.nsmallest(
+                    count,
+                    (
+                        (exact(origin, candidate_locations[position]), position)
+                        for position in positions
+                        if haversines[position] <= threshold
+                    ),
+                )
+
+            offset = origin_index * count
+            for (rank, (distance, position)) in enumerate(ranked):
+                origin_indexes[offset + rank] = origin_index
+                store_ids[offset + rank] = candidate_ids[position]
+                distances[offset + rank] = distance
+
+    return (origin_indexes, store_ids, distances)
@@ -0,0 +1,608 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains helpers for measuring the speed and accuracy of the distance methods."""
+
+import gc
+import csv
+import time
+import random
+import pathlib
+import tempfile
+import tracemalloc
+from array import array
+from typing import Dict, List, Tuple, Callable, Optional, Sequence, Generator
+
+import attr
+
+from . import constants
+from .finder import StoreFinder
+from .ingest import ingest_catalog
+from .models import Store, GeoLocation
+from .catalog import CSV_HEADERS, STORE_COLUMNS, COMPRESSION_OPENERS, StoreCatalog
+
+
+@attr.s
+class DistanceMethodReport(object):
+    """Describes the speed and accuracy of a distance method against a reference.
+
+    Distance errors are reported in the same units as the compared distances (miles
+    unless the comparison was run with ``metric`` enabled). The ``rank_disagreement``
+    is the fraction of origins whose ordered top-k stores differ from the top-k
+    stores of the reference method.
+    """
+
+    method = attr.ib(type=str)
+    reference = attr.ib(type=str)
+    pairs = attr.ib(type=int)
+    seconds = attr.ib(type=float)
+    max_error = attr.ib(type=float)
+    mean_error = attr.ib(type=float)
+    max_relative_error = attr.ib(type=float)
+    rank_disagreement = attr.ib(type=float)
+
+    @property
+    def throughput(self) -> float:
+        """The amount of distance calculations done per second.
+
+        :return: The amount of origin/store pairs measured per second
+        :rtype: float
+        """
+
+        if self.seconds <= 0.0:
+            return float("inf")
+        return self.pairs / self.seconds
+
+    def to_text(self) -> str:
+        """Build a human readable representation of the report.
+
+        :return: A human readable representation of the report
+        :rtype: str
+        """
+
+        return (
+            f"{self.method:<16} {self.throughput:>12.0f} pairs/s  "
+            f"max err {self.max_error:.4f} ({self.max_relative_error:.3%})  "
+            f"mean err {self.mean_error:.4f}  "
+            f"rank disagreement {self.rank_disagreement:.2%} vs {self.reference}"
+        )
+
+
+@attr.s
+class SearchReport(object):
+    """Describes the speed and correctness of a nearest store search strategy.
+
+    The ``mismatches`` are the amount of queries whose result distances differ from
+    the exhaustive search over every store.
+    """
+
+    name = attr.ib(type=str)
+    queries = attr.ib(type=int)
+    seconds = attr.ib(type=float)
+    mismatches = attr.ib(type=int)
+
+    @property
+    def throughput(self) -> float:
+        """The amount of queries answered per second.
+
+        :return: The amount of queries answered per second
+        :rtype: float
+        """
+
+        if self.seconds <= 0.0:
+            return float("inf")
+        return self.queries / self.seconds
+
+    def to_text(self) -> str:
+        """Build a human readable representation of the report.
+
+        :return: A human readable representation of the report
+        :rtype: str
+        """
+
+        return (
+            f"{self.name:<16} {self.throughput:>10.1f} queries/s  "
+            f"{self.mismatches} mismatches in {self.queries} queries"
+        )
+
+
+@attr.s
+class MemoryReport(object):
+    """Describes the memory retained by a layout of a catalog of stores.
+
+    The ``max_error`` is the largest difference (in degrees) between the coordinates
+    kept by the layout and the coordinates it was built from.
+    """
+
+    layout = attr.ib(type=str)
+    stores = attr.ib(type=int)
+    size = attr.ib(type=int)
+    max_error = attr.ib(type=float, default=0.0)
+
+    @property
+    def bytes_per_store(self) -> float:
+        """The amount of bytes retained per store.
+
+        :return: The retained bytes divided by the amount of stores
+        :rtype: float
+        """
+
+        if self.stores < 1:
+            return 0.0
+        return self.size / self.stores
+
+    def to_text(self) -> str:
+        """Build a human readable representation of the report.
+
+        :return: A human readable representation of the report
+        :rtype: str
+        """
+
+        return (
+            f"{self.layout:<16} {self.bytes_per_store:>8.1f} bytes/store  "
+            f"{self.size / 2 ** 20:>9.1f} MiB for {self.stores} stores  "
+            f"max coordinate err {self.max_error:.2e}deg"
+        )
+
+
+@attr.s
+class LoadReport(object):
+    """Describes the time and memory taken to load a (compressed) store locations file.
+
+    The ``peak`` is the largest amount of memory allocated at once while loading the
+    file, which includes the catalog being built.
+    """
+
+    compression = attr.ib(type=str)
+    stores = attr.ib(type=int)
+    size = attr.ib(type=int)
+    seconds = attr.ib(type=float)
+    peak = attr.ib(type=int)
+
+    @property
+    def throughput(self) -> float:
+        """The amount of stores loaded per second.
+
+        :return: The amount of stores loaded per second
+        :rtype: float
+        """
+
+        if self.seconds <= 0.0:
+            return float("inf")
+        return self.stores / self.seconds
+
+    def to_text(self) -> str:
+        """Build a human readable representation of the report.
+
+        :return: A human readable representation of the report
+        :rtype: str
+        """
+
+        return (
+            f"{self.compression:<16} {self.size / 2 ** 20:>8.1f} MiB file  "
+            f"{self.throughput:>10.0f} stores/s  "
+            f"{self.peak / 2 ** 20:>8.1f} MiB peak for {self.stores} stores"
+        )
+
+
+def random_origins(
+    stores: Sequence[Store], count: int, seed: int = 0, margin: float = 1.0
+) -> List[GeoLocation]:
+    """Build random origins within the bounding box of the given stores.
+
+    :param Sequence[Store] stores: The stores whose bounding box origins are placed in
+    :param int count: The amount of origins to build
+    :param int seed: The seed of the random generator, optional, defaults to 0
+    :param float margin: The amount of degrees to extend the bounding box by,
+        optional, defaults to 1.0
+    :return: A list of random origins
+    :rtype: List[GeoLocation]
+    """
+
+    latitudes = [store.geolocation.latitude for store in stores]
+    longitudes = [store.geolocation.longitude for store in stores]
+    south = max(min(latitudes) - margin, -90.0)
+    north = min(max(latitudes) + margin, 90.0)
+    west = max(min(longitudes) - margin, -180.0)
+    east = min(max(longitudes) + margin, 180.0)
+
+    generator = random.Random(seed)
+    return [
+        GeoLocation(
+            latitude=generator.uniform(south, north),
+            longitude=generator.uniform(west, east),
+        )
+        for _ in range(count)
+    ]
+
+
+def _measure_method(
+    finder: StoreFinder,
+    method: str,
+    stores: Sequence[Store],
+    origins: Sequence[GeoLocation],
+    metric: bool,
+) -> Tuple[float, List[List[float]]]:
+    """Calculate the distances from every origin to every store with a method.
+
+    :param StoreFinder finder: The finder providing the distance method
+    :param str method: The name of the distance method
+    :param Sequence[Store] stores: The stores to measure distances to
+    :param Sequence[GeoLocation] origins: The origins to measure distances from
+    :param bool metric: Measure distances in kilometers rather than miles
+    :return: A tuple of the elapsed seconds and the distance matrix (origin-major)
+    :rtype: Tuple[float, List[List[float]]]
+    """
+
+    targets = [store.geolocation for store in stores]
+    started = time.perf_counter()
+    distances = [
+        [
+            finder.get_distance(origin, target, metric=metric, method=method)
+            for target in targets
+        ]
+        for origin in origins
+    ]
+    return (time.perf_counter() - started, distances)
+
+
+def _top_stores(distances: Sequence[float], results: int) -> List[int]:
+    """Get the indexes of the closest stores for a row of distances.
+
+    :param Sequence[float] distances: The distances to each store
+    :param int results: The number of closest stores to get
+    :return: The store indexes ordered by distance (ties are broken by index)
+    :rtype: List[int]
+    """
+
+    return sorted(range(len(distances)), key=lambda index: distances[index])[:results]
+
+
+def compare_distance_methods(
+    finder: StoreFinder,
+    stores: Sequence[Store],
+    origins: Sequence[GeoLocation],
+    methods: Optional[Sequence[str]] = None,
+    reference: str = "vincenty",
+    results: int = 5,
+    metric: bool = False,
+) -> List[DistanceMethodReport]:
+    """Compare the speed and accuracy of distance methods against a reference method.
+
+    .. note:: Every method (including the reference) is run over every origin and
+        store pair, so the cost of this comparison grows with
+        ``len(origins) * len(stores)``.
+
+    :param StoreFinder finder: The finder providing the distance methods
+    :param Sequence[Store] stores: The stores to measure distances to
+    :param Sequence[GeoLocation] origins: The origins to measure distances from
+    :param Sequence[str] methods: The names of the methods to compare,
+        optional, defaults to all of ``constants.DISTANCE_METHODS``
+    :param str reference: The name of the method considered to be correct,
+        optional, defaults to "vincenty"
+    :param int results: The number of closest stores compared for rank disagreement,
+        optional, defaults to 5
+    :param bool metric: Compare distances in kilometers rather than miles,
+        optional, defaults to False
+    :return: A report for each compared method (including the reference)
+    :rtype: List[DistanceMethodReport]
+    """
+
+    if methods is None:
+        methods = constants.DISTANCE_METHODS
+    if reference not in methods:
+        methods = [reference, *methods]
+
+    measurements = {
+        method: _measure_method(finder, method, stores, origins, metric)
+        for method in methods
+    }
+    reference_distances = measurements[reference][1]
+    reference_ranks = [
+        _top_stores(distances, results) for distances in reference_distances
+    ]
+
+    reports = []
+    for method in methods:
+        (seconds, method_distances) = measurements[method]
+        errors: List[float] = []
+        relative_errors: List[float] = []
+        disagreements = 0
+        for (origin_index, distances) in enumerate(method_distances):
+            expected_distances = reference_distances[origin_index]
+            for (distance, expected) in zip(distances, expected_distances):
+                error = abs(distance - expected)
+                errors.append(error)
+                if expected > 0.0:
+                    relative_errors.append(error / expected)
+            if _top_stores(distances, results) != reference_ranks[origin_index]:
+                disagreements += 1
+
+        reports.append(
+            DistanceMethodReport(
+                method=method,
+                reference=reference,
+                pairs=len(errors),
+                seconds=seconds,
+                max_error=max(errors, default=0.0),
+                mean_error=(sum(errors) / len(errors)) if errors else 0.0,
+                max_relative_error=max(relative_errors, default=0.0),
+                rank_disagreement=(
+                    (disagreements / len(method_distances)) if method_distances else 0.0
+                ),
+            )
+        )
+
+    return reports
+
+
+def compare_search_strategies(
+    filepath: pathlib.Path,
+    origins: Sequence[GeoLocation],
+    results: int = 5,
+    resolutions: Sequence[float] = (0.5, 1.0, 2.0, 5.0),
+    metric: bool = False,
+    actual: bool = False,
+) -> List[SearchReport]:
+    """Compare the speed of the nearest store search strategies.
+
+    The exhaustive search (calculating the distance to every store) is used as the
+    baseline that the results of every other strategy are checked against. Catalogs
+    and indexes are built before any queries are timed.
+
+    :param pathlib.Path filepath: The path to the store locations file
+    :param Sequence[GeoLocation] origins: The origins to search from
+    :param int results: The number of closest stores to search for,
+        optional, defaults to 5
+    :param Sequence[float] resolutions: The grid index resolutions (in degrees) to
+        compare, optional, defaults to (0.5, 1.0, 2.0, 5.0)
+    :param bool metric: Search with distances in kilometers rather than miles,
+        optional, defaults to False
+    :param bool actual: Search with Vincenty distance rather than Haversine distance,
+        optional, defaults to False
+    :return: A report for each compared strategy (starting with the baseline)
+    :rtype: List[SearchReport]
+    """
+
+    strategies = [
+        ("exhaustive", StoreFinder(filepath), {}),
+        ("planar", StoreFinder(filepath), {"planar": True}),
+        ("streaming", StoreFinder(filepath), {"streaming": True}),
+    ] + [
+        (
+            f"grid ({resolution}deg)",
+            StoreFinder(filepath, index="grid", resolution=resolution),
+            {},
+        )
+        for resolution in resolutions
+    ]
+
+    expected: List[List[float]] = []
+    reports = []
+    for (name, finder, options) in strategies:
+        # NOTE: accessing the spatial index also loads the catalog it is built on,
+        # streaming scans never load the catalog so they are timed reading the file
+        if not options.get("streaming", False):
+            finder.spatial_index
+        started = time.perf_counter()
+        distances = [
+            [
+                store_result.distance
+                for store_result in finder.find_nearest(
+                    origin, metric=metric, actual=actual, results=results, **options
+                )
+            ]
+            for origin in origins
+        ]
+        seconds = time.perf_counter() - started
+
+        if len(expected) < 1:
+            expected = distances
+        reports.append(
+            SearchReport(
+                name=name,
+                queries=len(origins),
+                seconds=seconds,
+                mismatches=sum(
+                    found != baseline for (found, baseline) in zip(distances, expected)
+                ),
+            )
+        )
+
+    return reports
+
+
+def synthetic_rows(
+    stores: Sequence[Store], count: int, seed: int = 0
+) -> Generator[Tuple[float, float, Tuple[str, ...]], None, None]:
+    """Generate rows of a synthetic catalog modeled after the given stores.
+
+    Every row copies the city, state, zip code and county of a random store (so they
+    repeat like in real catalogs) while the name, location and address are made
+    unique. Every string is a new object like the strings parsed from a file.
+
+    :param Sequence[Store] stores: The stores the rows are modeled after
+    :param int count: The amount of rows to generate
+    :param int seed: The seed of the random generator, optional, defaults to 0
+    :return: Yields tuples of latitudes, longitudes and values ordered as
+        ``STORE_COLUMNS``
+    :rtype: Generator[Tuple[float, float, Tuple[str, ...]], None, None]
+    """
+
+    generator = random.Random(seed)
+    for row in range(count):
+        store = generator.choice(stores)
+        yield (
+            store.geolocation.latitude + generator.uniform(-0.5, 0.5),
+            store.geolocation.longitude + generator.uniform(-0.5, 0.5),
+            (
+                f"{store.name} #{row}",
+                f"{store.location} #{row}",
+                f"{row} {store.address}",
+                # NOTE: joining copies the strings so they are not shared with stores
+                "".join([store.city]),
+                "".join([store.state]),
+                "".join([store.zipcode]),
+                "".join([store.county]),
+            ),
+        )
+
+
+def compare_catalog_memory(
+    stores: Sequence[Store], count: int, seed: int = 0
+) -> List[MemoryReport]:
+    """Compare the memory retained by the layouts of a synthetic catalog.
+
+    The same synthetic rows (see ``synthetic_rows``) are held as a list of ``Store``
+    objects, as a ``StoreCatalog`` and as a compact ``StoreCatalog``. Only the memory
+    still allocated once each layout is built is counted (using ``tracemalloc``), so
+    the reports include the strings and floats the layouts keep alive.
+
+    :param Sequence[Store] stores: The stores the rows are modeled after
+    :param int count: The amount of stores of the synthetic catalog
+    :param int seed: The seed of the random generator, optional, defaults to 0
+    :return: A report for each compared layout
+    :rtype: List[MemoryReport]
+    """
+
+    def _objects() -> List[Store]:
+        return [
+            Store(
+                geolocation=GeoLocation(latitude=latitude, longitude=longitude),
+                **dict(zip(STORE_COLUMNS, columns)),
+            )
+            for (latitude, longitude, columns) in synthetic_rows(stores, count, seed)
+        ]
+
+    def _catalog(compact: bool) -> Callable[[], StoreCatalog]:
+        def _build() -> StoreCatalog:
+            latitudes = array("d")
+            longitudes = array("d")
+            columns: Dict[str, List[str]] = {column: [] for column in STORE_COLUMNS}
+            for (latitude, longitude, values) in synthetic_rows(stores, count, seed):
+                latitudes.append(latitude)
+                longitudes.append(longitude)
+                for (column, value) in zip(STORE_COLUMNS, values):
+                    columns[column].append(value)
+            return StoreCatalog.from_columns(
+                latitudes, longitudes, columns, compact=compact
+            )
+
+        return _build
+
+    expected = [
+        (latitude, longitude)
+        for (latitude, longitude, _) in synthetic_rows(stores, count, seed)
+    ]
+    reports = []
+    for (layout, build) in (
+        ("objects", _objects),
+        ("columns", _catalog(False)),
+        ("compact", _catalog(True)),
+    ):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            built = build()
+            gc.collect()
+            (size, _) = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        locations = (
+            [store.geolocation for store in built]
+            if isinstance(built, list)
+            else [built.location(index) for index in range(len(built))]
+        )
+        reports.append(
+            MemoryReport(
+                layout=layout,
+                stores=count,
+                size=size,
+                max_error=max(
+                    (
+                        max(
+                            abs(location.latitude - latitude),
+                            abs(location.longitude - longitude),
+                        )
+                        for (location, (latitude, longitude)) in zip(
+                            locations, expected
+                        )
+                    ),
+                    default=0.0,
+                ),
+            )
+        )
+        del built, locations
+
+    return reports
+
+
+def compare_compressed_loads(
+    stores: Sequence[Store],
+    count: int,
+    seed: int = 0,
+    compressions: Optional[Sequence[str]] = None,
+) -> List[LoadReport]:
+    """Compare loading a synthetic store locations file with each compression.
+
+    The same synthetic rows (see ``synthetic_rows``) are written to a temporary store
+    locations file for each compression, which is then ingested in the current
+    process so the peak memory (traced by ``tracemalloc``) includes the decoding.
+
+    :param Sequence[Store] stores: The stores the rows are modeled after
+    :param int count: The amount of stores of the synthetic file
+    :param int seed: The seed of the random generator, optional, defaults to 0
+    :param Sequence[str] compressions: The names of the compressions to compare,
+        optional, defaults to all of ``COMPRESSION_OPENERS``
+    :return: A report for each compared compression (starting with "none")
+    :rtype: List[LoadReport]
+    """
+
+    if compressions is None:
+        compressions = list(COMPRESSION_OPENERS.keys())
+
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        for compression in ["none", *compressions]:
+            filepath = pathlib.Path(directory, f"store-locations.{compression}")
+            with (
+                filepath.open("w", newline="")
+                if compression == "none"
+                else COMPRESSION_OPENERS[compression](filepath, "wt", newline="")
+            ) as fp:
+                writer = csv.writer(fp)
+                writer.writerow(
+                    [
+                        CSV_HEADERS[column]
+                        for column in (*STORE_COLUMNS, "latitude", "longitude")
+                    ]
+                )
+                for (latitude, longitude, values) in synthetic_rows(
+                    stores, count, seed
+                ):
+                    writer.writerow([*values, latitude, longitude])
+
+            gc.collect()
+            tracemalloc.start()
+            try:
+                started = time.perf_counter()
+                (catalog, _) = ingest_catalog(filepath, workers=1)
+                seconds = time.perf_counter() - started
+                (_, peak) = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            reports.append(
+                LoadReport(
+                    compression=compression,
+                    stores=len(catalog),
+                    size=filepath.stat().st_size,
+                    seconds=seconds,
+                    peak=peak,
+                )
+            )
+            del catalog
+
+    return reports
@@ -0,0 +1,303 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the caches used to reuse the results and geocodes of repeated searches."""
+
+import time
+import pathlib
+import sqlite3
+import threading
+import collections
+from typing import Any, Dict, Tuple, Hashable, Callable, Optional
+
+import attr
+
+from . import constants
+from .models import GeoLocation
+from .geocoding import query_key
+
+CREATE_GEOCODES_STATEMENT = (
+    "CREATE TABLE IF NOT EXISTS geocodes ("
+    "key TEXT PRIMARY KEY, "
+    "latitude REAL NOT NULL, "
+    "longitude REAL NOT NULL, "
+    "expires REAL)"
+)
+SELECT_GEOCODE_STATEMENT = (
+    "SELECT latitude, longitude, expires FROM geocodes WHERE key = ?"
+)
+INSERT_GEOCODE_STATEMENT = "INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?)"
+
+
+def quantize(origin: GeoLocation, precision: int) -> GeoLocation:
+    """Round the coordinates of a location to a number of decimal places.
+
+    :param GeoLocation origin: The location to round
+    :param int precision: The number of decimal places to keep (4 decimal places of a
+        degree are ~11 meters)
+    :return: The rounded location
+    :rtype: GeoLocation
+    """
+
+    return GeoLocation(
+        latitude=round(origin.latitude, precision),
+        longitude=round(origin.longitude, precision),
+    )
+
+
+@attr.s
+class CacheStats(object):
+    """Counts the lookups and evictions of a ``ResultCache``.
+
+    ``invalidations`` are the amount of times the cache was cleared because the
+    catalog version it was filled for changed.
+    """
+
+    hits = attr.ib(type=int, default=0)
+    misses = attr.ib(type=int, default=0)
+    evictions = attr.ib(type=int, default=0)
+    expirations = attr.ib(type=int, default=0)
+    invalidations = attr.ib(type=int, default=0)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that were answered by the cache.
+
+        :return: The fraction of lookups that were hits (0.0 if nothing was looked up)
+        :rtype: float
+        """
+
+        lookups = self.hits + self.misses
+        if lookups < 1:
+            return 0.0
+        return self.hits / lookups
+
+    def to_dict(self) -> Dict[str, float]:
+        """Build a dictionary of the statistics for exporting.
+
+        :return: A dictionary of the counters along with the ``hit_rate``
+        :rtype: Dict[str, float]
+        """
+
+        return {**attr.asdict(self), "hit_rate": self.hit_rate}
+
+
+@attr.s
+class ResultCache(object):
+    """A thread-safe least recently used cache with expiring entries.
+
+    Entries belong to a catalog version, looking up or storing an entry for a newer
+    version than the entries currently held clears the whole cache. Entries built for
+    older versions (by searches that started before the catalog changed) are never
+    stored.
+    """
+
+    maxsize = attr.ib(type=int, default=1024)
+    ttl = attr.ib(type=Optional[float], default=300.0)
+    clock = attr.ib(type=Callable[[], float], default=time.monotonic, repr=False)
+
+    def __attrs_post_init__(self):
+        self.stats = CacheStats()
+        self._entries: "collections.OrderedDict[Hashable, Tuple[float, Any]]" = (
+            collections.OrderedDict()
+        )
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_version(self, version: int) -> bool:
+        """Clear the cache if the given catalog version is newer than its entries.
+
+        .. note:: Must be called while holding the lock of the cache.
+
+        :param int version: The catalog version of the caller
+        :return: True if the version is current, False if it is outdated
+        :rtype: bool
+        """
+
+        if version > self._version:
+            if len(self._entries) > 0:
+                self.stats.invalidations += 1
+                self._entries.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, key: Hashable, version: int = 0) -> Optional[Any]:
+        """Get the cached value of a key.
+
+        :param Hashable key: The key of the value
+        :param int version: The catalog version of the caller, optional, defaults to 0
+        :return: The cached value or None if the key is not cached (or expired)
+        :rtype: Optional[Any]
+        """
+
+        with self._lock:
+            entry = None
+            if self._check_version(version):
+                entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, version: int = 0):
+        """Cache the value of a key, evicting the least recently used entries.
+
+        :param Hashable key: The key of the value
+        :param Any value: The value to cache
+        :param int version: The catalog version the value was built for,
+            optional, defaults to 0
+        """
+
+        if self.maxsize < 1:
+            return
+
+        expires = float("inf") if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            if not self._check_version(version):
+                return
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self):
+        """Remove every entry from the cache."""
+
+        with self._lock:
+            self._entries.clear()
+
+
+@attr.s
+class WarmReport(object):
+    """Counts the queries handled by warming a ``GeocodeCache``.
+
+    ``added`` queries were geocoded into the cache, ``fresh`` queries were skipped as
+    the cache already held a location that had not expired and ``errors`` counts the
+    queries that failed to geocode by error.
+    """
+
+    added = attr.ib(type=int, default=0)
+    fresh = attr.ib(type=int, default=0)
+    errors = attr.ib(type=dict, factory=dict)
+
+    @property
+    def failed(self) -> int:
+        """The amount of queries that failed to geocode.
+
+        :return: The amount of failed queries
+        :rtype: int
+        """
+
+        return sum(self.errors.values())
+
+
+@attr.s
+class GeocodeCache(object):
+    """A thread-safe cache of geocoded locations kept on disk in a SQLite database.
+
+    Locations are keyed by ``query_key`` (so equivalent queries share an entry) and
+    expire ``ttl`` seconds after they were stored. Unlike the ``ResultCache`` the
+    entries outlive the process, so expiration uses the wall ``clock`` and any
+    process opening the same database starts with every location still fresh.
+
+    .. note:: Lookups and inserts are a single indexed statement each, so the cache
+        keeps one connection shared (under a lock) by every thread.
+    """
+
+    filepath = attr.ib(type=pathlib.Path)
+    ttl = attr.ib(type=Optional[float], default=constants.GEOCODE_CACHE_TTL)
+    clock = attr.ib(type=Callable[[], float], default=time.time, repr=False)
+
+    def __attrs_post_init__(self):
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.filepath.as_posix(), isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute(CREATE_GEOCODES_STATEMENT)
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._connection.execute("SELECT COUNT(*) FROM geocodes").fetchone()
+        return row[0]
+
+    def _lookup(self, query: str) -> Tuple[Optional[GeoLocation], bool]:
+        """Look up the cached location of a query without counting the lookup.
+
+        :param str query: The location query
+        :return: A tuple of the cached location (None if the query is not cached or
+            expired) and whether an expired location was found
+        :rtype: Tuple[Optional[GeoLocation], bool]
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                SELECT_GEOCODE_STATEMENT, (query_key(query),)
+            ).fetchone()
+        if row is None:
+            return (None, False)
+        (latitude, longitude, expires) = row
+        if expires is not None and expires <= self.clock():
+            return (None, True)
+        return (GeoLocation(latitude=latitude, longitude=longitude), False)
+
+    def get(self, query: str) -> Optional[GeoLocation]:
+        """Get the cached location of a query.
+
+        :param str query: The location query
+        :return: The cached location or None if the query is not cached (or expired)
+        :rtype: Optional[GeoLocation]
+        """
+
+        (location, expired) = self._lookup(query)
+        with self._lock:
+            if expired:
+                self.stats.expirations += 1
+            if location is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+        return location
+
+    def is_fresh(self, query: str) -> bool:
+        """Check if the cache holds a location of a query that has not expired.
+
+        :param str query: The location query
+        :return: True if the query has a fresh location, otherwise False
+        :rtype: bool
+        """
+
+        return self._lookup(query)[0] is not None
+
+    def put(self, query: str, location: GeoLocation):
+        """Cache the location of a query (replacing any location it already had).
+
+        :param str query: The location query
+        :param GeoLocation location: The geocoded location of the query
+        """
+
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._connection.execute(
+                INSERT_GEOCODE_STATEMENT,
+                (query_key(query), location.latitude, location.longitude, expires),
+            )
+
+    def close(self):
+        """Close the connection to the database."""
+
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,485 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``StoreCatalog`` used to hold parsed stores in a columnar layout."""
+
+import bz2
+import csv
+import gzip
+import lzma
+import pathlib
+import operator
+import itertools
+from math import cos, radians
+from array import array
+from typing import (
+    IO,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Generator,
+)
+
+import attr
+
+from .models import Store, GeoLocation
+
+# the ``Store`` attributes that are stored as string columns in the catalog
+STORE_COLUMNS = ("name", "location", "address", "city", "state", "zipcode", "county")
+
+# maps the ``Store`` attributes to the headers found in the ``store-locations.csv``
+# XXX: this mapping is tied close to the data format provided by the
+# ``store-location.csv`` file. If this file format is to change in the future, this
+# mapping will need to be revisited.
+CSV_HEADERS = {
+    "name": "Store Name",
+    "location": "Store Location",
+    "address": "Address",
+    "city": "City",
+    "state": "State",
+    "zipcode": "Zip Code",
+    "county": "County",
+    "latitude": "Latitude",
+    "longitude": "Longitude",
+}
+
+# the default amount of rows read at a time by ``read_store_chunks``
+CHUNK_SIZE = 10000
+
+# the string columns of compact catalogs that are dictionary encoded as they repeat
+# across many stores (every other string column is kept in a single UTF-8 blob)
+CATEGORICAL_COLUMNS = ("city", "state", "zipcode", "county")
+
+# the largest error (in degrees) of the coordinates of compact catalogs, which is half
+# of the spacing of single precision floats between 128 and 256 degrees (about 0.85
+# meters of longitude at the equator)
+COMPACT_PRECISION = 2.0**-17
+
+# the magic bytes compressed store locations files start with, mapped to the names of
+# their compressions
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz"}
+
+# the functions opening files of each compression as decompressed streams
+COMPRESSION_OPENERS: Dict[str, Callable[..., IO[Any]]] = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+
+def detect_compression(filepath: pathlib.Path) -> Optional[str]:
+    """Detect the compression of a file from the magic bytes it starts with.
+
+    :param pathlib.Path filepath: The path of the file to check
+    :return: The name of the compression (see ``COMPRESSION_MAGIC``) or None if the
+        file is not compressed
+    :rtype: Optional[str]
+    """
+
+    with filepath.open("rb") as fp:
+        header = fp.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+    for (magic, compression) in COMPRESSION_MAGIC.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def open_store_locations(filepath: pathlib.Path, binary: bool = False) -> IO[Any]:
+    """Open a store locations file, decompressing it while it is read if needed.
+
+    Compressed files are stream-decoded, so they are never decompressed to disk or
+    held in memory as a whole. Files opened for reading text skip any leading
+    byte order mark (as written by spreadsheet applications).
+
+    :param pathlib.Path filepath: The path to the (optionally compressed) store
+        locations file
+    :param bool binary: Open the file for reading bytes rather than text,
+        optional, defaults to False
+    :return: The opened file
+    :rtype: IO[Any]
+    """
+
+    compression = detect_compression(filepath)
+    if binary:
+        if compression is None:
+            return filepath.open("rb")
+        return COMPRESSION_OPENERS[compression](filepath, "rb")
+
+    if compression is None:
+        return filepath.open("r", encoding="utf-8-sig")
+    return COMPRESSION_OPENERS[compression](filepath, "rt", encoding="utf-8-sig")
+
+
+def read_stores(fp: IO[str]) -> Generator[Store, None, None]:
+    """Generate ``Store`` instances from parsing an opened store locations file.
+
+    :param IO[str] fp: The opened store locations file
+    :return: Yields ``Store`` instances
+    :rtype: Generator[Store, None, None]
+    """
+
+    for entry in csv.DictReader(fp):
+        yield Store(
+            geolocation=GeoLocation(
+                latitude=float(entry[CSV_HEADERS["latitude"]]),
+                longitude=float(entry[CSV_HEADERS["longitude"]]),
+            ),
+            **{column: entry[CSV_HEADERS[column]] for column in STORE_COLUMNS},
+        )
+
+
+@attr.s(frozen=True)
+class StoreChunk(object):
+    """A chunk of rows read from a store locations file.
+
+    Only the coordinates of the rows are parsed, the string columns of a row are left
+    in the raw row until they are requested through ``columns``. Malformed rows are
+    left out of the chunk, their (one-based) lines and the reasons they were skipped
+    for are kept in ``malformed``.
+    """
+
+    latitudes = attr.ib(type=array, repr=False)
+    longitudes = attr.ib(type=array, repr=False)
+    rows = attr.ib(type=list, repr=False)
+    getter = attr.ib(type=Callable[[List[str]], Tuple[str, ...]], repr=False)
+    malformed = attr.ib(type=list, factory=list, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def location(self, index: int) -> GeoLocation:
+        """Get the location of the row at the given index.
+
+        :param int index: The index of the row within the chunk
+        :return: The location of the row
+        :rtype: GeoLocation
+        """
+
+        return GeoLocation(
+            latitude=self.latitudes[index], longitude=self.longitudes[index]
+        )
+
+    def columns(self, index: int) -> Tuple[str, ...]:
+        """Get the string columns of the row at the given index.
+
+        :param int index: The index of the row within the chunk
+        :return: The values of the row ordered as ``STORE_COLUMNS``
+        :rtype: Tuple[str, ...]
+        """
+
+        return self.getter(self.rows[index])
+
+
+def build_store(location: GeoLocation, columns: Tuple[str, ...]) -> Store:
+    """Build a ``Store`` from a location and its string columns.
+
+    :param GeoLocation location: The location of the store
+    :param Tuple[str, ...] columns: The values of the store ordered as ``STORE_COLUMNS``
+    :return: The built store
+    :rtype: Store
+    """
+
+    return Store(geolocation=location, **dict(zip(STORE_COLUMNS, columns)))
+
+
+def read_store_chunks(
+    fp: IO[str], chunk_size: int = CHUNK_SIZE
+) -> Generator[StoreChunk, None, None]:
+    """Generate ``StoreChunk`` instances from reading an opened store locations file.
+
+    Only a single chunk of rows is held in memory at a time. Malformed rows are
+    skipped (as done by ``ingest_catalog``) and kept in the ``malformed`` rows of the
+    chunk they were read in.
+
+    :param IO[str] fp: The opened store locations file
+    :param int chunk_size: The amount of rows read for each chunk,
+        optional, defaults to ``CHUNK_SIZE``
+    :raises ValueError: When the file is missing any of the ``CSV_HEADERS``
+    :return: Yields ``StoreChunk`` instances
+    :rtype: Generator[StoreChunk, None, None]
+    """
+
+    reader = csv.reader(fp)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    # NOTE: files opened without ``open_store_locations`` may still start with a BOM
+    if len(header) > 0:
+        header[0] = header[0].lstrip("\ufeff")
+    missing = [name for name in CSV_HEADERS.values() if name not in header]
+    if len(missing) > 0:
+        raise ValueError(f"store locations file is missing {missing!r}")
+
+    positions = {column: header.index(name) for (column, name) in CSV_HEADERS.items()}
+    (latitude_position, longitude_position) = (
+        positions["latitude"],
+        positions["longitude"],
+    )
+    field_count = max(positions.values()) + 1
+    getter = operator.itemgetter(*(positions[column] for column in STORE_COLUMNS))
+    while True:
+        latitudes = array("d")
+        longitudes = array("d")
+        rows: List[List[str]] = []
+        malformed: List[Tuple[int, str]] = []
+        read = 0
+        for (read, row) in enumerate(itertools.islice(reader, chunk_size), 1):
+            if len(row) < 1:
+                # blank lines are skipped (as done by ``csv.DictReader``)
+                continue
+            elif len(row) < field_count:
+                malformed.append((reader.line_num, "missing fields"))
+                continue
+            try:
+                latitude = float(row[latitude_position])
+                longitude = float(row[longitude_position])
+            except ValueError:
+                malformed.append((reader.line_num, "unparsable coordinates"))
+                continue
+            if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+                # NOTE: this comparison also rejects NaN coordinates
+                malformed.append((reader.line_num, "out of range coordinates"))
+                continue
+
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+            rows.append(row)
+
+        if read < 1:
+            return
+        yield StoreChunk(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            rows=rows,
+            getter=getter,
+            malformed=malformed,
+        )
+
+
+def _smallest_typecode(maximum: int) -> str:
+    """Get the smallest unsigned array typecode that can hold a value.
+
+    :param int maximum: The largest value the array must hold
+    :return: The typecode of the array
+    :rtype: str
+    """
+
+    for typecode in ("B", "H", "I"):
+        if maximum < 2 ** (array(typecode).itemsize * 8):
+            return typecode
+    return "Q"
+
+
+@attr.s(frozen=True)
+class DictionaryColumn(object):
+    """A string column encoded as codes indexing the distinct values of the column.
+
+    Codes are kept in the smallest array that can index every distinct value, so a
+    column such as ``state`` takes a single byte per store.
+    """
+
+    codes = attr.ib(type=array, repr=False)
+    values = attr.ib(type=list, repr=False)
+
+    @classmethod
+    def encode(cls, strings: Iterable[str]) -> "DictionaryColumn":
+        """Encode the values of a string column.
+
+        :param Iterable[str] strings: The values of the column
+        :return: A new column instance
+        :rtype: DictionaryColumn
+        """
+
+        lookup: Dict[str, int] = {}
+        codes = array("Q", (lookup.setdefault(value, len(lookup)) for value in strings))
+        return cls(
+            codes=array(_smallest_typecode(len(lookup)), codes), values=list(lookup)
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> str:
+        return self.values[self.codes[index]]
+
+
+@attr.s(frozen=True)
+class TextColumn(object):
+    """A string column encoded as a single UTF-8 blob along with the row offsets.
+
+    The value of the row at ``index`` is the decoded
+    ``blob[offsets[index]:offsets[index + 1]]``, so no string objects are kept until
+    the values are requested.
+    """
+
+    blob = attr.ib(type=bytes, repr=False)
+    offsets = attr.ib(type=array, repr=False)
+
+    @classmethod
+    def encode(cls, strings: Iterable[str]) -> "TextColumn":
+        """Encode the values of a string column.
+
+        :param Iterable[str] strings: The values of the column
+        :return: A new column instance
+        :rtype: TextColumn
+        """
+
+        encoded = [value.encode("utf-8") for value in strings]
+        offsets = array("Q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return cls(
+            blob=b"".join(encoded),
+            offsets=array(_smallest_typecode(offsets[-1]), offsets),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        return self.blob[self.offsets[index] : self.offsets[index + 1]].decode("utf-8")
+
+
+@attr.s(frozen=True)
+class StoreCatalog(object):
+    """A read-only columnar collection of stores.
+
+    Coordinates are kept in flat arrays (both in degrees and as precomputed radians
+    and latitude cosines) so distance calculations never have to touch the ``Store``
+    objects. ``Store`` instances are only built when they are indexed out of the
+    catalog.
+
+    Compact catalogs keep coordinates as single precision floats (within
+    ``COMPACT_PRECISION`` degrees of the given coordinates, distances are measured
+    from the rounded coordinates) and encode the string columns as
+    ``DictionaryColumn`` and ``TextColumn`` instances rather than lists of strings.
+    """
+
+    latitudes = attr.ib(type=array, repr=False)
+    longitudes = attr.ib(type=array, repr=False)
+    columns = attr.ib(type=dict, repr=False)
+    phis = attr.ib(type=array, repr=False)
+    lambdas = attr.ib(type=array, repr=False)
+    cos_phis = attr.ib(type=array, repr=False)
+    compact = attr.ib(type=bool, default=False)
+
+    @classmethod
+    def from_columns(
+        cls,
+        latitudes: Iterable[float],
+        longitudes: Iterable[float],
+        columns: Dict[str, List[str]],
+        compact: bool = False,
+    ) -> "StoreCatalog":
+        """Create a new catalog from columns of store values.
+
+        :param Iterable[float] latitudes: The store latitudes in degrees
+        :param Iterable[float] longitudes: The store longitudes in degrees
+        :param Dict[str, List[str]] columns: The string columns of the stores keyed
+            by ``Store`` attribute names (see ``STORE_COLUMNS``)
+        :param bool compact: Build a compact catalog, optional, defaults to False
+        :raises ValueError: When the given columns are not all of the same length
+        :return: A new catalog instance
+        :rtype: StoreCatalog
+        """
+
+        typecode = "f" if compact else "d"
+        latitudes = array(typecode, latitudes)
+        longitudes = array(typecode, longitudes)
+        if len(latitudes) != len(longitudes) or any(
+            len(columns[column]) != len(latitudes) for column in STORE_COLUMNS
+        ):
+            raise ValueError("all catalog columns must be of the same length")
+
+        phis = array("d", map(radians, latitudes))
+        return cls(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            columns={
+                column: (
+                    (
+                        DictionaryColumn
+                        if column in CATEGORICAL_COLUMNS
+                        else TextColumn
+                    ).encode(columns[column])
+                    if compact
+                    else list(columns[column])
+                )
+                for column in STORE_COLUMNS
+            },
+            phis=phis,
+            lambdas=array("d", map(radians, longitudes)),
+            cos_phis=array("d", map(cos, phis)),
+            compact=compact,
+        )
+
+    @classmethod
+    def from_stores(
+        cls, stores: Iterable[Store], compact: bool = False
+    ) -> "StoreCatalog":
+        """Create a new catalog from ``Store`` instances.
+
+        :param Iterable[Store] stores: The stores to place in the catalog
+        :param bool compact: Build a compact catalog, optional, defaults to False
+        :return: A new catalog instance
+        :rtype: StoreCatalog
+        """
+
+        latitudes: List[float] = []
+        longitudes: List[float] = []
+        columns: Dict[str, List[str]] = {column: [] for column in STORE_COLUMNS}
+        for store in stores:
+            latitudes.append(store.geolocation.latitude)
+            longitudes.append(store.geolocation.longitude)
+            for column in STORE_COLUMNS:
+                columns[column].append(getattr(store, column))
+
+        return cls.from_columns(latitudes, longitudes, columns, compact=compact)
+
+    @classmethod
+    def load(cls, filepath: pathlib.Path, compact: bool = False) -> "StoreCatalog":
+        """Load a catalog from a store locations file.
+
+        :param pathlib.Path filepath: The path to the (optionally compressed) store
+            locations file
+        :param bool compact: Build a compact catalog, optional, defaults to False
+        :return: A new catalog instance
+        :rtype: StoreCatalog
+        """
+
+        with open_store_locations(filepath) as fp:
+            return cls.from_stores(read_stores(fp), compact=compact)
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    def __iter__(self) -> Iterator[Store]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> Store:
+        return Store(
+            geolocation=self.location(index),
+            **{column: values[index] for (column, values) in self.columns.items()},
+        )
+
+    def location(self, index: int) -> GeoLocation:
+        """Get the location of the store at the given index.
+
+        :param int index: The index of the store
+        :return: The location of the store
+        :rtype: GeoLocation
+        """
+
+        return GeoLocation(
+            latitude=self.latitudes[index], longitude=self.longitudes[index]
+        )
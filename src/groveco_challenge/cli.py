@@ -5,18 +5,44 @@
 """The click command function that handles basic logic for command-line usablility."""
 
 import sys
-from typing import Optional
+import json
+import pathlib
+import itertools
+import contextlib
+from typing import Dict, Tuple, TextIO, Optional
 
 import click
 
 from . import constants
+from .graph import graph_path
 from .finder import StoreFinder
+from .ingest import IngestReport
+from .service import StoreService
+from .voronoi import table_path
+from .coverage import read_points, lattice_points
+from .database import StoreDatabase, is_database
+from .deadline import DeadlineExceeded
+from .loadtest import (
+    MockGeocoder,
+    run_load,
+    cli_target,
+    read_queries,
+    local_service,
+    library_target,
+    service_target,
+    synthetic_queries,
+)
+from .profiling import Capture
 
 # contextual settings for the Click comand options
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 
-@click.command("groveco_challenge", context_settings=CONTEXT_SETTINGS)
+@click.group(
+    "groveco_challenge",
+    context_settings=CONTEXT_SETTINGS,
+    invoke_without_command=True,
+)
 @click.option(
     "--zip",
     "zipcode",
@@ -49,8 +75,11 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 @click.option(
     "--max-workers",
     type=int,
-    default=4,
-    help="The amount of thread workers to use for calculating distance.",
+    default=None,
+    help=(
+        "The amount of thread workers to use for calculating distance, "
+        "defaults to the amount of CPUs."
+    ),
 )
 @click.option(
     "--results",
@@ -65,20 +94,159 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
         "Flag to use actual distance calculations rather than the Haversine equation."
     ),
 )
+@click.option(
+    "--planar/--no-planar",
+    default=False,
+    help=(
+        "Flag to rank stores with a planar approximation, only calculating exact "
+        "distances for stores that could be among the results."
+    ),
+)
+@click.option(
+    "--streaming/--no-streaming",
+    default=False,
+    help=(
+        "Flag to scan the store locations file in a single pass, only keeping the "
+        "best matching stores in memory."
+    ),
+)
+@click.option(
+    "--index",
+    type=click.Choice(constants.INDEX_TYPES),
+    default=None,
+    help="Search stores using a spatial index rather than measuring every store.",
+)
+@click.option(
+    "--resolution",
+    type=float,
+    default=1.0,
+    help="The size (in degrees) of the cells used by the 'grid' index.",
+)
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=(
+        "The store locations file (or imported SQLite database) to search, "
+        "defaults to the bundled store-locations.csv."
+    ),
+)
+@click.option(
+    "--shard-by",
+    type=click.Choice(constants.SHARD_TYPES),
+    default=None,
+    help=(
+        "Partition stores into shards (by state or by grid cells) that are indexed "
+        "and searched on their own."
+    ),
+)
+@click.option(
+    "--compact-catalog/--no-compact-catalog",
+    default=False,
+    help=(
+        "Flag to keep the store locations file in a compact layout using single "
+        "precision coordinates and encoded strings."
+    ),
+)
+@click.option(
+    "--voronoi",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=(
+        "A nearest store table (built by voronoi-table) answering searches for a "
+        "single store."
+    ),
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=None,
+    help="The amount of seconds the geocode and search must finish within.",
+)
+@click.option(
+    "--partial/--no-partial",
+    default=False,
+    help=(
+        "Flag to display the best of the stores measured so far when the search "
+        "hits the --timeout rather than failing."
+    ),
+)
+@click.option(
+    "--metrics-out",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default=None,
+    help="Dump the metrics of the search as JSON to this file ('-' for stdout).",
+)
+@click.option(
+    "--geocoder-url",
+    type=str,
+    default=None,
+    help=(
+        "Send geocoding requests to this URL (answering like the Google Geocoding "
+        "API, such as a mock-geocoder) rather than to Google."
+    ),
+)
+@click.option(
+    "--geocode-cache",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        "A SQLite database (created if missing, filled by warm-cache) keeping "
+        "geocoded locations across runs."
+    ),
+)
+@click.option(
+    "--profile-out",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        "Write a cProfile profile (readable by pstats) of finding and displaying "
+        "the stores to this file."
+    ),
+)
+@click.option(
+    "--trace-memory/--no-trace-memory",
+    default=False,
+    help=(
+        "Flag to trace the memory allocated by finding and displaying the stores, "
+        "listing the source lines allocating the most to stderr."
+    ),
+)
+@click.pass_context
 def cli(
+    ctx: click.Context,
     zipcode: Optional[str],
     address: Optional[str],
     units: str,
     output: str,
     results: int,
-    max_workers: int,
+    max_workers: Optional[int],
     actual: bool,
+    planar: bool,
+    streaming: bool,
+    index: Optional[str],
+    resolution: float,
+    catalog: Optional[str],
+    shard_by: Optional[str],
+    compact_catalog: bool,
+    voronoi: Optional[str],
+    timeout: Optional[float],
+    partial: bool,
+    metrics_out: Optional[str],
+    geocoder_url: Optional[str],
+    geocode_cache: Optional[str],
+    profile_out: Optional[str],
+    trace_memory: bool,
 ):
     """Locates the nearest store from store-locations.csv.
 
     Prints the matching store address as well as the distance to that store.
     """
 
+    # the options of the base command are only used for finding stores
+    if ctx.invoked_subcommand is not None:
+        return
+
     is_metric = units == "km"
     is_text_output = output == "text"
 
@@ -102,16 +270,812 @@ def cli(
         click.echo(cli.get_help(click.Context(cli)))
         sys.exit(1)
 
-    finder = StoreFinder(constants.STORE_LOCATIONS_PATH, max_workers=max_workers)
-    for store_result in finder.find_stores(
-        query, metric=is_metric, actual=actual, results=results
-    ):
-        if is_text_output:
-            click.echo(store_result.to_text())
+    filepath = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    if streaming and is_database(filepath):
+        click.echo("Uh Oh! Only store locations files can be scanned (--streaming)")
+        sys.exit(1)
+    if shard_by is not None and is_database(filepath):
+        click.echo("Uh Oh! Only store locations files can be sharded (--shard-by)")
+        sys.exit(1)
+    if compact_catalog and is_database(filepath):
+        click.echo(
+            "Uh Oh! Only store locations files can be kept compact (--compact-catalog)"
+        )
+        sys.exit(1)
+
+    finder = StoreFinder(
+        filepath,
+        max_workers=max_workers,
+        index=index,
+        resolution=resolution,
+        shard_by=shard_by,
+        compact_catalog=compact_catalog,
+        voronoi=(None if voronoi is None else pathlib.Path(voronoi)),
+        geocoder_url=geocoder_url,
+        geocode_cache_path=(
+            None if geocode_cache is None else pathlib.Path(geocode_cache)
+        ),
+    )
+    capture = Capture(profile=(profile_out is not None), trace_memory=trace_memory)
+    try:
+        with finder, capture:
+            store_results = finder.find_stores(
+                query,
+                metric=is_metric,
+                actual=actual,
+                results=results,
+                planar=planar,
+                streaming=streaming,
+                timeout=timeout,
+                partial=partial,
+            )
+            dumped = [
+                (
+                    store_result.to_text()
+                    if is_text_output
+                    else getattr(store_result, f"dumps_{output}")()
+                )
+                for store_result in store_results
+            ]
+    except DeadlineExceeded as exc:
+        click.echo(f"Uh Oh! Finding stores took longer than --timeout ({exc!s})")
+        sys.exit(1)
+    finally:
+        # NOTE: metrics and captures are dumped even if the search failed
+        if metrics_out is not None:
+            with click.open_file(metrics_out, "w") as fp:
+                json.dump(finder.metrics.to_dict(), fp, indent=2)
+                fp.write("\n")
+        if profile_out is not None and capture.stats is not None:
+            capture.dump_stats(pathlib.Path(profile_out))
+        if trace_memory:
+            click.echo(capture.allocations_text(), err=True)
+
+    if store_results.partial:
+        click.echo(
+            "Uh Oh! The search hit --timeout, "
+            "showing the best of the stores measured so far",
+            err=True,
+        )
+    for text in dumped:
+        click.echo(text)
+
+    sys.exit(0)
+
+
+@cli.command("import-catalog", context_settings=CONTEXT_SETTINGS)
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.argument("database", type=click.Path(dir_okay=False))
+def import_catalog(source: str, database: str):
+    """Imports a store locations file into a new SQLite database.
+
+    The created database can be given to --catalog to search catalogs too large to be
+    loaded into memory.
+    """
+
+    database_path = pathlib.Path(database)
+    if database_path.exists():
+        click.echo(f"Uh Oh! The database {database!r} already exists")
+        sys.exit(1)
+
+    report = IngestReport(filepath=pathlib.Path(source))
+    try:
+        store_database = StoreDatabase.create(
+            database_path, pathlib.Path(source), report=report
+        )
+    except ValueError as exc:
+        click.echo(f"Uh Oh! The store locations could not be imported ({exc!s})")
+        sys.exit(1)
+    click.echo(f"Imported {len(store_database)} stores into {database!s}")
+    if len(report.malformed) > 0:
+        click.echo(report.to_text(), err=True)
+    sys.exit(0)
+
+
+@cli.command("store-graph", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--neighbors",
+    type=int,
+    default=constants.GRAPH_NEIGHBORS,
+    help="The number of nearest sibling stores to find for every store.",
+)
+@click.option(
+    "--units",
+    type=click.Choice(["mi", "km"]),
+    default="mi",
+    help="Save distances in miles or kilometers",
+)
+@click.option(
+    "--resolution",
+    type=float,
+    default=1.0,
+    help="The size (in degrees) of the cells of the grid index used to find stores.",
+)
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="The store locations file, defaults to the bundled store-locations.csv.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="The path to save the graph to, defaults to <catalog>.graph in the cwd.",
+)
+def store_graph(
+    neighbors: int,
+    units: str,
+    resolution: float,
+    catalog: Optional[str],
+    output: Optional[str],
+):
+    """Precomputes the nearest sibling stores of every store.
+
+    The graph is saved in a compact adjacency layout that is loaded with
+    StoreGraph.load and maps every store id to its nearest sibling stores.
+    """
+
+    filepath = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    if is_database(filepath):
+        click.echo("Uh Oh! Store graphs can only be built from store locations files")
+        sys.exit(1)
+    if neighbors < 1:
+        click.echo("Uh Oh! You must always ask for at least 1 neighbor (--neighbors)")
+        sys.exit(1)
+
+    # NOTE: graphs are saved to the working directory by default as the bundled
+    # catalog lives in the (possibly read-only) installed package
+    graph_filepath = pathlib.Path(
+        graph_path(filepath).name if output is None else output
+    )
+    finder = StoreFinder(filepath, index="grid", resolution=resolution)
+    graph = finder.build_store_graph(k=neighbors, metric=(units == "km"))
+    graph.save(graph_filepath)
+    click.echo(
+        f"Saved the {neighbors} nearest stores of {len(finder.catalog)} stores "
+        f"to {graph_filepath!s}"
+    )
+    sys.exit(0)
+
+
+@cli.command("voronoi-table", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--resolution",
+    type=float,
+    default=constants.VORONOI_RESOLUTION,
+    help="The size (in degrees) of the cells of the table.",
+)
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="The store locations file, defaults to the bundled store-locations.csv.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="The path to save the table to, defaults to <catalog>.voronoi in the cwd.",
+)
+def voronoi_table(resolution: float, catalog: Optional[str], output: Optional[str]):
+    """Precomputes the stores that can be nearest within every cell of a raster.
+
+    The saved table is memory mapped by --voronoi so searches for a single store only
+    measure the few candidates of the cell of their origin.
+    """
+
+    filepath = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    if is_database(filepath):
+        click.echo(
+            "Uh Oh! Nearest store tables can only be built from store locations files"
+        )
+        sys.exit(1)
+    if resolution <= 0.0:
+        click.echo("Uh Oh! The cells of the table must have a positive --resolution")
+        sys.exit(1)
+
+    # NOTE: tables are saved to the working directory by default as the bundled
+    # catalog lives in the (possibly read-only) installed package
+    table_filepath = pathlib.Path(
+        table_path(filepath).name if output is None else output
+    )
+    finder = StoreFinder(filepath, index="grid")
+    table = finder.build_voronoi_table(resolution=resolution)
+    table.save(table_filepath)
+    click.echo(
+        f"Saved {table.rows}x{table.columns} cells of {len(finder.catalog)} stores "
+        f"to {table_filepath!s}"
+    )
+    sys.exit(0)
+
+
+@cli.command("coverage", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--points",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=(
+        "A CSV file of points (such as ZIP centroids) with latitude and longitude "
+        "columns, the first other column labels the points."
+    ),
+)
+@click.option(
+    "--lattice",
+    type=float,
+    nargs=4,
+    default=None,
+    metavar="SOUTH WEST NORTH EAST",
+    help="Assign the points of a latitude/longitude lattice over a bounding box.",
+)
+@click.option(
+    "--step",
+    type=float,
+    default=0.1,
+    help="The distance (in degrees) between neighboring points of the --lattice.",
+)
+@click.option(
+    "--units",
+    type=click.Choice(["mi", "km"]),
+    default="mi",
+    help="Report distances in miles or kilometers",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="The amount of processes assigning points, defaults to the amount of CPUs.",
+)
+@click.option(
+    "--assignments",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="A CSV file to write the nearest store of every point to.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default="-",
+    help="The CSV file to write the aggregates of every store to, defaults to stdout.",
+)
+@click.option(
+    "--resolution",
+    type=float,
+    default=1.0,
+    help="The size (in degrees) of the cells of the grid index used to find stores.",
+)
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="The store locations file, defaults to the bundled store-locations.csv.",
+)
+def coverage(
+    points: Optional[str],
+    lattice: Optional[Tuple[float, float, float, float]],
+    step: float,
+    units: str,
+    workers: Optional[int],
+    assignments: Optional[str],
+    output: str,
+    resolution: float,
+    catalog: Optional[str],
+):
+    """Assigns many points to their nearest stores to find gaps in coverage.
+
+    Writes the amount of points served by every store along with the mean, median,
+    90th and 99th percentile and maximum distance of those points.
+    """
+
+    if (points is None) == (lattice is None):
+        click.echo("Uh Oh! You must specify exactly one of --points or --lattice")
+        sys.exit(1)
+    filepath = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    if is_database(filepath):
+        click.echo("Uh Oh! Coverage can only be reported for store locations files")
+        sys.exit(1)
+
+    finder = StoreFinder(filepath, index="grid", resolution=resolution)
+    malformed: Dict[str, int] = {}
+    with contextlib.ExitStack() as stack:
+        try:
+            if points is not None:
+                point_iterator = read_points(
+                    stack.enter_context(pathlib.Path(points).open("r")),
+                    malformed=malformed,
+                )
+            elif lattice is not None:
+                point_iterator = lattice_points(*lattice, step=step)
+            report = finder.assign_points(
+                point_iterator,
+                metric=(units == "km"),
+                assignments=(
+                    None
+                    if assignments is None
+                    else stack.enter_context(open(assignments, "w", newline=""))
+                ),
+                workers=workers,
+            )
+        except ValueError as exc:
+            click.echo(f"Uh Oh! The points could not be read ({exc!s})")
+            sys.exit(1)
+
+        with click.open_file(output, "w") as fp:
+            report.write(fp, finder.snapshot)
+
+    click.echo(
+        f"Assigned {report.points} points to {len(report.stores)} stores", err=True
+    )
+    if len(malformed) > 0:
+        reasons = ", ".join(
+            f"{count} {reason}" for (reason, count) in sorted(malformed.items())
+        )
+        click.echo(
+            f"Skipped {sum(malformed.values())} malformed points ({reasons})",
+            err=True,
+        )
+    sys.exit(0)
+
+
+@cli.command("serve", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--host",
+    type=str,
+    default=constants.SERVICE_HOST,
+    help="The address to listen on.",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=constants.SERVICE_PORT,
+    help="The port to listen on.",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=constants.SERVICE_TIMEOUT,
+    help="The amount of seconds every request must finish within.",
+)
+@click.option(
+    "--index",
+    type=click.Choice(constants.INDEX_TYPES),
+    default=None,
+    help="Search stores using a spatial index rather than measuring every store.",
+)
+@click.option(
+    "--resolution",
+    type=float,
+    default=1.0,
+    help="The size (in degrees) of the cells used by the 'grid' index.",
+)
+@click.option(
+    "--cache-size",
+    type=int,
+    default=0,
+    help="The amount of recent search results to cache.",
+)
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=(
+        "The store locations file (or imported SQLite database) to search, "
+        "defaults to the bundled store-locations.csv."
+    ),
+)
+@click.option(
+    "--shard-by",
+    type=click.Choice(constants.SHARD_TYPES),
+    default=None,
+    help=(
+        "Partition stores into shards (by state or by grid cells) that are indexed "
+        "and searched on their own."
+    ),
+)
+@click.option(
+    "--compact-catalog/--no-compact-catalog",
+    default=False,
+    help=(
+        "Flag to keep the store locations file in a compact layout using single "
+        "precision coordinates and encoded strings."
+    ),
+)
+@click.option(
+    "--voronoi",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=(
+        "A nearest store table (built by voronoi-table) answering searches for a "
+        "single store."
+    ),
+)
+@click.option(
+    "--geocoder-url",
+    type=str,
+    default=None,
+    help=(
+        "Send geocoding requests to this URL (answering like the Google Geocoding "
+        "API, such as a mock-geocoder) rather than to Google."
+    ),
+)
+@click.option(
+    "--geocode-cache",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=(
+        "A SQLite database (created if missing, filled by warm-cache) keeping "
+        "geocoded locations across runs."
+    ),
+)
+@click.option(
+    "--allow-profiling/--no-allow-profiling",
+    default=False,
+    help=(
+        "Flag to let searches ask for a profile (profile=1) or for their largest "
+        "allocations (trace_memory=1)."
+    ),
+)
+@click.option(
+    "--watch/--no-watch",
+    default=False,
+    help=(
+        "Flag to reload the store locations file in the background whenever it "
+        "changes."
+    ),
+)
+@click.option(
+    "--reload-interval",
+    type=float,
+    default=constants.RELOAD_INTERVAL,
+    help="The amount of seconds between checks of the watched store locations file.",
+)
+def serve(
+    host: str,
+    port: int,
+    timeout: float,
+    index: Optional[str],
+    resolution: float,
+    cache_size: int,
+    catalog: Optional[str],
+    shard_by: Optional[str],
+    compact_catalog: bool,
+    voronoi: Optional[str],
+    geocoder_url: Optional[str],
+    geocode_cache: Optional[str],
+    allow_profiling: bool,
+    watch: bool,
+    reload_interval: float,
+):
+    """Serves store searches as JSON over HTTP.
+
+    Stores closest to a query are found by requesting /stores?query=<query> along
+    with the optional results, units, actual, planar, timeout and partial parameters.
+    The metrics of the service are exposed for Prometheus at /metrics.
+    With --allow-profiling searches can also ask for their profile or allocations
+    with the profile and trace_memory parameters.
+    With --watch the store locations file is reloaded whenever it changes.
+    """
+
+    filepath = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    if watch and is_database(filepath):
+        click.echo("Uh Oh! Only store locations files can be watched (--watch)")
+        sys.exit(1)
+    if reload_interval <= 0:
+        click.echo("Uh Oh! The reload interval must be positive (--reload-interval)")
+        sys.exit(1)
+
+    finder = StoreFinder(
+        filepath,
+        index=index,
+        resolution=resolution,
+        cache_size=cache_size,
+        shard_by=shard_by,
+        compact_catalog=compact_catalog,
+        voronoi=(None if voronoi is None else pathlib.Path(voronoi)),
+        geocoder_url=geocoder_url,
+        geocode_cache_path=(
+            None if geocode_cache is None else pathlib.Path(geocode_cache)
+        ),
+    )
+    click.echo(f"Serving stores of {filepath.name} on http://{host}:{port}/stores")
+    # NOTE: closing the finder also stops watching the store locations file
+    with finder:
+        if watch:
+            finder.watch(interval=reload_interval)
+        StoreService(finder, timeout=timeout, allow_profiling=allow_profiling).serve(
+            host=host, port=port
+        )
+    sys.exit(0)
+
+
+@cli.command("load-test", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--target",
+    type=click.Choice(constants.LOAD_TARGETS),
+    default="library",
+    help=(
+        "Send queries to a StoreFinder in this process, to the command-line (a new "
+        "process per query) or to a service."
+    ),
+)
+@click.option(
+    "--queries",
+    type=click.File("r"),
+    default=None,
+    help=(
+        "A query log (a query per line) to replay, "
+        "defaults to synthetic zip code and address queries."
+    ),
+)
+@click.option(
+    "--requests",
+    type=int,
+    default=None,
+    help=(
+        "The amount of queries to send (cycling through the query log), "
+        "defaults to the whole query log or 1000 synthetic queries."
+    ),
+)
+@click.option(
+    "--rate",
+    type=float,
+    default=None,
+    help=(
+        "The amount of queries to send per second, "
+        "defaults to sending queries as fast as they are answered."
+    ),
+)
+@click.option(
+    "--concurrency",
+    type=int,
+    default=8,
+    help="The amount of queries in flight at once.",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=0,
+    help="The seed used to generate synthetic queries.",
+)
+@click.option(
+    "--service-url",
+    type=str,
+    default=None,
+    help=(
+        "The base URL of a running service (such as http://127.0.0.1:8080) to send "
+        "queries to, defaults to serving the catalog in this process."
+    ),
+)
+@click.option(
+    "--mock-geocoder/--no-mock-geocoder",
+    default=True,
+    help=(
+        "Flag to answer geocoding requests with a local mock geocoder rather than "
+        "Google (ignored by a --service-url)."
+    ),
+)
+@click.option(
+    "--geocoder-latency",
+    type=float,
+    default=0.0,
+    help="The amount of seconds the mock geocoder delays every response.",
+)
+@click.option(
+    "--catalog",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=(
+        "The store locations file (or imported SQLite database) to search, "
+        "defaults to the bundled store-locations.csv."
+    ),
+)
+@click.option(
+    "--output",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="Output the report in human-readable 'text' or as 'json'.",
+)
+def load_test(
+    target: str,
+    queries: Optional[TextIO],
+    requests: Optional[int],
+    rate: Optional[float],
+    concurrency: int,
+    seed: int,
+    service_url: Optional[str],
+    mock_geocoder: bool,
+    geocoder_latency: float,
+    catalog: Optional[str],
+    output: str,
+):
+    """Replays queries against a target reporting throughput, latency and errors.
+
+    Geocoding requests are answered by a local mock geocoder (returning
+    deterministic locations) so load tests never reach Google's quotas.
+    """
+
+    if requests is not None and requests < 1:
+        click.echo("Uh Oh! You must always send at least 1 query (--requests)")
+        sys.exit(1)
+    if rate is not None and rate <= 0.0:
+        click.echo("Uh Oh! The --rate must be greater than 0")
+        sys.exit(1)
+    if concurrency < 1:
+        click.echo("Uh Oh! The --concurrency must be at least 1")
+        sys.exit(1)
+
+    filepath = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    with contextlib.ExitStack() as stack:
+        geocoder_url = None
+        if mock_geocoder:
+            geocoder = stack.enter_context(MockGeocoder(latency=geocoder_latency))
+            geocoder_url = geocoder.url
+        finder = stack.enter_context(StoreFinder(filepath, geocoder_url=geocoder_url))
+
+        if queries is None:
+            replayed = synthetic_queries(
+                list(finder.stores),
+                constants.LOAD_TEST_REQUESTS if requests is None else requests,
+                seed=seed,
+            )
         else:
-            dump_method = getattr(store_result, f"dumps_{output}")
-            click.echo(dump_method())
+            replayed = read_queries(queries)
+            if len(replayed) < 1:
+                click.echo("Uh Oh! The query log (--queries) has no queries")
+                sys.exit(1)
+            if requests is not None:
+                replayed = list(itertools.islice(itertools.cycle(replayed), requests))
+
+        if target == "library":
+            call = library_target(finder)
+        elif target == "cli":
+            call = cli_target(filepath, geocoder_url=geocoder_url)
+        else:
+            if service_url is None:
+                service_url = stack.enter_context(local_service(finder))
+            call = service_target(service_url)
+
+        report = run_load(target, call, replayed, rate=rate, concurrency=concurrency)
+
+    if output == "json":
+        click.echo(json.dumps(report.to_dict(), indent=2))
+    else:
+        click.echo(report.to_text())
+    sys.exit(0)
+
+
+@cli.command("mock-geocoder", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--host",
+    type=str,
+    default=constants.SERVICE_HOST,
+    help="The address to listen on.",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=constants.MOCK_GEOCODER_PORT,
+    help="The port to listen on.",
+)
+@click.option(
+    "--latency",
+    type=float,
+    default=0.0,
+    help="The amount of seconds to delay every response.",
+)
+def mock_geocoder(host: str, port: int, latency: float):
+    """Serves deterministic locations like the Google Geocoding API.
+
+    Point the --geocoder-url of searches (or a service) at the printed URL to
+    geocode queries without reaching Google.
+    """
+
+    geocoder = MockGeocoder(host=host, port=port, latency=latency)
+    click.echo(f"Serving mock geocoding on {geocoder.url}")
+    geocoder.serve()
+    sys.exit(0)
+
+
+@cli.command("warm-cache", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--queries",
+    type=click.File("r"),
+    default="-",
+    help=(
+        "A list of zip codes or addresses (one per line, such as last week's top "
+        "queries) to geocode, defaults to stdin."
+    ),
+)
+@click.option(
+    "--geocode-cache",
+    type=click.Path(dir_okay=False),
+    required=True,
+    help="The SQLite database (created if missing) to geocode the queries into.",
+)
+@click.option(
+    "--ttl",
+    type=float,
+    default=constants.GEOCODE_CACHE_TTL,
+    help="The amount of seconds added locations stay fresh.",
+)
+@click.option(
+    "--rate",
+    type=float,
+    default=constants.WARM_RATE,
+    help="The amount of geocoding requests to send per second.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=constants.WARM_WORKERS,
+    help="The amount of geocoding requests to send at once.",
+)
+@click.option(
+    "--geocoder-url",
+    type=str,
+    default=None,
+    help=(
+        "Send geocoding requests to this URL (answering like the Google Geocoding "
+        "API, such as a mock-geocoder) rather than to Google."
+    ),
+)
+def warm_cache(
+    queries: TextIO,
+    geocode_cache: str,
+    ttl: float,
+    rate: float,
+    workers: int,
+    geocoder_url: Optional[str],
+):
+    """Geocodes a list of queries into a geocode cache ahead of searches.
+
+    Queries that are still fresh in the cache are skipped, so new instances given
+    the same --geocode-cache start with every listed location already geocoded.
+    """
+
+    if rate <= 0.0:
+        click.echo("Uh Oh! The --rate must be greater than 0")
+        sys.exit(1)
+    if workers < 1:
+        click.echo("Uh Oh! The --workers must be at least 1")
+        sys.exit(1)
+
+    finder = StoreFinder(
+        constants.STORE_LOCATIONS_PATH,
+        geocoder_url=geocoder_url,
+        geocode_cache_path=pathlib.Path(geocode_cache),
+        geocode_cache_ttl=ttl,
+    )
+    with finder:
+        report = finder.warm_geocode_cache(
+            read_queries(queries), rate=rate, workers=workers
+        )
 
+    click.echo(
+        f"Added {report.added} locations to {geocode_cache} "
+        f"({report.fresh} still fresh, {report.failed} failed)"
+    )
+    if report.failed > 0:
+        click.echo(
+            "Uh Oh! Some queries failed to geocode ("
+            + ", ".join(
+                f"{count} {error}" for (error, count) in sorted(report.errors.items())
+            )
+            + ")",
+            err=True,
+        )
     sys.exit(0)
 
 
@@ -12,3 +12,103 @@ DATA_DIR = pathlib.Path(__file__).parent / "data"
 
 # the path to the store-locations file located in the data directory
 STORE_LOCATIONS_PATH = DATA_DIR / "store-locations.csv"
+
+# the names of the distance methods that ``StoreFinder.get_distance`` can dispatch to
+# NOTE: each name maps to a ``StoreFinder._<name>_distance`` method
+DISTANCE_METHODS = ("haversine", "vincenty", "equirectangular")
+
+# the mean radius of the earth in kilometers along with the ratio used to convert
+# kilometers to miles for the spherical distance methods
+EARTH_RADIUS = 6371.0
+IMPERIAL_RATIO = 0.62371
+
+# the relative difference (a 1.5% bound) allowed between spherical distances and the
+# ellipsoidal Vincenty distance when pruning candidates with spherical bounds
+# NOTE: the observed difference for the mean earth radius is within ~0.56% (plus
+# ~0.38% between the ``IMPERIAL_RATIO`` and GeoPy's mile), so a 1% bound would leave
+# almost no margin
+ELLIPSOID_TOLERANCE = 0.015
+
+# the names of the spatial indexes that ``StoreFinder`` can search with
+INDEX_TYPES = ("grid",)
+
+# the amount of seconds between checks for changes of a watched catalog file
+RELOAD_INTERVAL = 5.0
+
+# the amount of pending store mutations (added, updated or removed stores) that are
+# kept aside of a catalog before they are compacted into a new catalog and index
+COMPACTION_THRESHOLD = 1024
+
+# the amount of seconds search results are cached for along with the amount of
+# decimal places origins are rounded to for cache keys (~11 meters)
+CACHE_TTL = 300.0
+CACHE_PRECISION = 4
+
+# the amount of seconds locations stay fresh in the geocode cache (the locations of
+# zip codes and addresses rarely move) along with the amount of geocoding requests
+# sent per second (and at once) while warming it
+GEOCODE_CACHE_TTL = 30 * 24 * 60 * 60.0
+WARM_RATE = 10.0
+WARM_WORKERS = 8
+
+# the amount of threads sending geocoding requests (over pooled connections) for the
+# asyncio API of ``StoreFinder``
+IO_WORKERS = 16
+
+# the address the search service listens on by default along with the amount of
+# seconds every request of the service must finish within unless it asks for less
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_TIMEOUT = 10.0
+
+# the size (in degrees) of the cells origins are grouped into by batched searches,
+# origins within a cell share a single lookup of candidate stores
+BATCH_CELL_SIZE = 1.0
+
+# the amount of nearest sibling stores found for every store of a store graph
+GRAPH_NEIGHBORS = 5
+
+# the size (in degrees) of the cells of nearest store tables along with the distance
+# (in degrees) the tables extend past the outermost stores, searches from outside of
+# a table fall back to the other search strategies
+VORONOI_RESOLUTION = 0.25
+VORONOI_MARGIN = 2.0
+
+# the ways ``StoreFinder`` can partition stores into separately indexed shards, along
+# with the size (in degrees) of the cells of "grid" shards and the amount of pending
+# mutations of a single shard before only that shard is rebuilt
+SHARD_TYPES = ("state", "grid")
+SHARD_RESOLUTION = 10.0
+SHARD_COMPACTION_THRESHOLD = 128
+
+# the upper bounds (in seconds) of the buckets of the latency histograms of the
+# ``MetricsRegistry`` reported into by finders and services
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# the targets the load generator can send queries to (along with the default amount
+# of synthetic queries) and the southern, western, northern and eastern bounds (in
+# degrees) of the locations returned by the ``MockGeocoder`` (roughly the contiguous
+# United States) along with the port it listens on by default
+LOAD_TARGETS = ("library", "cli", "service")
+LOAD_TEST_REQUESTS = 1000
+MOCK_GEOCODER_BOUNDS = (24.5, -124.8, 49.4, -66.9)
+MOCK_GEOCODER_PORT = 8081
+
+# the amount of functions (by cumulative time) and source lines (by allocated
+# memory) reported by captured profiles
+CAPTURE_LIMIT = 20
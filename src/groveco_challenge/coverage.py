@@ -0,0 +1,371 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the coverage report assigning many points to their nearest stores."""
+
+import os
+import csv
+import sys
+import itertools
+import collections
+import concurrent.futures
+from math import log, ceil, floor
+from array import array
+from typing import IO, Dict, List, Deque, Tuple, Iterable, Optional, Generator
+
+import attr
+
+from .batch import nearest_for_points
+from .index import GridIndex
+from .snapshot import CatalogSnapshot
+
+# the default amount of points assigned by each worker task
+COVERAGE_CHUNK_SIZE = 10000
+
+# the relative error of the distance percentiles of the coverage report
+HISTOGRAM_PRECISION = 0.005
+
+# the distance percentiles included in the coverage report of every store
+COVERAGE_PERCENTILES = (50.0, 90.0, 99.0)
+
+# the header names the coordinates of a points file are read from (ignoring case)
+LATITUDE_HEADERS = ("latitude", "lat")
+LONGITUDE_HEADERS = ("longitude", "lon", "lng")
+
+# a labeled point as its label, latitude and longitude
+CoveragePoint = Tuple[str, float, float]
+
+# the snapshot and index searched by the worker processes of ``assign_points``
+_worker_state: Optional[Tuple[CatalogSnapshot, GridIndex]] = None
+
+
+def read_points(
+    fp: IO[str], malformed: Optional[Dict[str, int]] = None
+) -> Generator[CoveragePoint, None, None]:
+    """Generate labeled points from parsing an opened points file.
+
+    Points files are CSV files with a header naming a latitude and longitude column
+    (such as ``Latitude`` or ``lng``), the first of the other columns (such as a ZIP
+    code) is used as the label of the points. Malformed rows are skipped rather than
+    aborting the read and are counted by the reason they were skipped for.
+
+    :param IO[str] fp: The opened points file
+    :param Dict[str, int] malformed: A dictionary the amount of skipped rows is
+        counted in by reason, optional, defaults to None
+    :raises ValueError: When the header is missing a latitude or longitude column
+    :return: Yields tuples of labels, latitudes and longitudes
+    :rtype: Generator[Tuple[str, float, float], None, None]
+    """
+
+    reader = csv.reader(fp)
+    header = [name.strip().lower() for name in next(reader, [])]
+    positions = []
+    for names in (LATITUDE_HEADERS, LONGITUDE_HEADERS):
+        matches = [position for (position, name) in enumerate(header) if name in names]
+        if len(matches) < 1:
+            raise ValueError(f"points file is missing a column named one of {names!r}")
+        positions.append(matches[0])
+    (latitude_position, longitude_position) = positions
+    labels = [position for position in range(len(header)) if position not in positions]
+    field_count = max(positions) + 1
+
+    def _skip(reason: str):
+        if malformed is not None:
+            malformed[reason] = malformed.get(reason, 0) + 1
+
+    for row in reader:
+        if len(row) < 1:
+            continue
+        elif len(row) < field_count:
+            _skip("missing fields")
+            continue
+        try:
+            latitude = float(row[latitude_position])
+            longitude = float(row[longitude_position])
+        except ValueError:
+            _skip("unparsable coordinates")
+            continue
+        if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+            # NOTE: this comparison also rejects NaN coordinates
+            _skip("out of range coordinates")
+            continue
+        label = row[labels[0]] if len(labels) > 0 and labels[0] < len(row) else ""
+        yield (label, latitude, longitude)
+
+
+def lattice_points(
+    south: float, west: float, north: float, east: float, step: float
+) -> Generator[CoveragePoint, None, None]:
+    """Generate the points of a latitude/longitude lattice over a bounding box.
+
+    :param float south: The southern latitude of the box in degrees
+    :param float west: The western longitude of the box in degrees
+    :param float north: The northern latitude of the box in degrees
+    :param float east: The eastern longitude of the box in degrees
+    :param float step: The distance (in degrees) between neighboring points
+    :raises ValueError: When the ``step`` is not positive or the box is empty
+    :return: Yields tuples of (empty) labels, latitudes and longitudes
+    :rtype: Generator[Tuple[str, float, float], None, None]
+    """
+
+    if step <= 0.0:
+        raise ValueError(f"step must be greater than 0, received {step!r}")
+    if south > north or west > east:
+        raise ValueError("the lattice box must not be empty")
+
+    # NOTE: points are placed by multiplying rather than accumulating steps so
+    # rounding errors never add up along the rows
+    rows = floor((north - south) / step + 1e-9) + 1
+    columns = floor((east - west) / step + 1e-9) + 1
+    for row in range(rows):
+        for column in range(columns):
+            yield ("", south + row * step, west + column * step)
+
+
+@attr.s
+class DistanceHistogram(object):
+    """A histogram of distances with logarithmically sized buckets.
+
+    Distances are counted in buckets whose bounds grow by a constant ratio, so the
+    memory used is bounded by the range of distances rather than their amount and
+    percentiles are estimated within a relative error of ``precision``.
+    """
+
+    precision = attr.ib(type=float, default=HISTOGRAM_PRECISION)
+    buckets = attr.ib(type=collections.Counter, factory=collections.Counter)
+    zeros = attr.ib(type=int, default=0)
+    count = attr.ib(type=int, default=0)
+    total = attr.ib(type=float, default=0.0)
+    maximum = attr.ib(type=float, default=0.0)
+
+    def __attrs_post_init__(self):
+        self._base = (1.0 + self.precision) / (1.0 - self.precision)
+        self._log_base = log(self._base)
+
+    def add(self, distance: float):
+        """Count a distance.
+
+        :param float distance: The distance to count
+        """
+
+        self.count += 1
+        self.total += distance
+        self.maximum = max(self.maximum, distance)
+        if distance <= 0.0:
+            self.zeros += 1
+        else:
+            self.buckets[ceil(log(distance) / self._log_base)] += 1
+
+    @property
+    def mean(self) -> float:
+        """The mean of the counted distances.
+
+        :return: The mean distance (0.0 if nothing was counted)
+        :rtype: float
+        """
+
+        return (self.total / self.count) if self.count > 0 else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Estimate a percentile of the counted distances.
+
+        :param float percent: The percentile to estimate (between 0 and 100)
+        :return: The estimated distance (0.0 if nothing was counted)
+        :rtype: float
+        """
+
+        if self.count < 1:
+            return 0.0
+        # NOTE: the nearest-rank percentile of the counted distances
+        rank = max(ceil(self.count * min(max(percent, 0.0), 100.0) / 100.0), 1)
+        if rank <= self.zeros:
+            return 0.0
+        seen = self.zeros
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # the bucket ``(base ** (bucket - 1), base ** bucket]`` is represented
+                # by the value within ``precision`` of both of its bounds
+                estimate = 2.0 * self._base**bucket / (self._base + 1.0)
+                return min(estimate, self.maximum)
+        return self.maximum
+
+
+@attr.s
+class CoverageReport(object):
+    """The nearest store assignments of many points aggregated by store."""
+
+    points = attr.ib(type=int, default=0)
+    stores = attr.ib(type=dict, factory=dict)
+
+    def histogram(self, store_id: int) -> DistanceHistogram:
+        """Get the histogram of the distances of the points assigned to a store.
+
+        :param int store_id: The id of the store
+        :return: The histogram of the store (empty if no points were assigned)
+        :rtype: DistanceHistogram
+        """
+
+        if store_id not in self.stores:
+            self.stores[store_id] = DistanceHistogram()
+        return self.stores[store_id]
+
+    def write(
+        self,
+        fp: IO[str],
+        snapshot: CatalogSnapshot,
+        percentiles: Iterable[float] = COVERAGE_PERCENTILES,
+    ):
+        """Write the aggregates of every store of a snapshot as CSV.
+
+        Stores that were not assigned any points are included with a count of 0.
+
+        :param IO[str] fp: The opened file to write to
+        :param CatalogSnapshot snapshot: The snapshot the points were assigned to
+        :param Iterable[float] percentiles: The distance percentiles to include,
+            optional, defaults to ``COVERAGE_PERCENTILES``
+        """
+
+        percentiles = list(percentiles)
+        writer = csv.writer(fp)
+        writer.writerow(
+            ["store_id", "name", "city", "state", "points", "mean"]
+            + [f"p{percent:g}" for percent in percentiles]
+            + ["max"]
+        )
+        for (store_id, store) in sorted(snapshot.stores(), key=lambda entry: entry[0]):
+            histogram = self.stores.get(store_id, DistanceHistogram())
+            writer.writerow(
+                [store_id, store.name, store.city, store.state, histogram.count]
+                + [
+                    f"{value:.6f}"
+                    for value in [histogram.mean]
+                    + [histogram.percentile(percent) for percent in percentiles]
+                    + [histogram.maximum]
+                ]
+            )
+
+
+def _init_worker(snapshot: CatalogSnapshot, spatial_index: GridIndex):
+    """Keep the searched snapshot and index in the state of a worker process.
+
+    :param CatalogSnapshot snapshot: The snapshot to search
+    :param GridIndex spatial_index: An index of the catalog rows of the snapshot
+    """
+
+    global _worker_state
+    _worker_state = (snapshot, spatial_index)
+
+
+def _assign_chunk(
+    latitudes: array, longitudes: array, radius: float
+) -> Tuple[array, array]:
+    """Find the nearest store to every point of a chunk in a worker process.
+
+    :param array latitudes: The latitudes of the points in degrees
+    :param array longitudes: The longitudes of the points in degrees
+    :param float radius: The radius of the earth in the units of the distances
+    :raises ValueError: When the worker process was not initialized with a snapshot
+    :return: A tuple of the store ids and distances of the points
+    :rtype: Tuple[array, array]
+    """
+
+    if _worker_state is None:
+        raise ValueError("coverage worker was not initialized with a snapshot")
+    (snapshot, spatial_index) = _worker_state
+    (_, store_ids, distances) = nearest_for_points(
+        snapshot, spatial_index, zip(latitudes, longitudes), radius=radius
+    )
+    return (store_ids, distances)
+
+
+def assign_points(
+    snapshot: CatalogSnapshot,
+    spatial_index: GridIndex,
+    points: Iterable[CoveragePoint],
+    radius: float,
+    assignments: Optional[IO[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = COVERAGE_CHUNK_SIZE,
+) -> CoverageReport:
+    """Assign every point to its nearest store and aggregate the distances by store.
+
+    Points are read in chunks of ``chunk_size`` points which are searched (with
+    ``nearest_for_points``) by a pool of processes. Only a couple of chunks per worker
+    are ever in flight and distances are aggregated into histograms, so the memory
+    used does not grow with the amount of points.
+
+    :param CatalogSnapshot snapshot: The snapshot to assign points to
+    :param GridIndex spatial_index: An index of the catalog rows of the snapshot
+    :param Iterable[CoveragePoint] points: The labeled points to assign
+    :param float radius: The radius of the earth in the units of the distances
+    :param IO[str] assignments: An opened file the assignment of every point is
+        written to as CSV, optional, defaults to None
+    :param int workers: The amount of processes searching chunks (points are
+        searched in the current process on Python 3.6),
+        optional, defaults to the amount of CPUs
+    :param int chunk_size: The amount of points searched by each task,
+        optional, defaults to ``COVERAGE_CHUNK_SIZE``
+    :return: The aggregates of the assigned points by store
+    :rtype: CoverageReport
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    writer = None
+    if assignments is not None:
+        writer = csv.writer(assignments)
+        writer.writerow(["label", "latitude", "longitude", "store_id", "distance"])
+
+    report = CoverageReport()
+    iterator = iter(points)
+    chunks = iter(lambda: list(itertools.islice(iterator, max(chunk_size, 1))), [])
+
+    def _collect(chunk: List[CoveragePoint], store_ids: array, distances: array):
+        # NOTE: snapshots without any stores leave every point unassigned
+        for ((label, latitude, longitude), store_id, distance) in zip(
+            chunk, store_ids, distances
+        ):
+            report.histogram(store_id).add(distance)
+            if writer is not None:
+                writer.writerow(
+                    [label, latitude, longitude, store_id, f"{distance:.6f}"]
+                )
+        report.points += len(chunk)
+
+    def _columns(chunk: List[CoveragePoint]) -> Tuple[array, array]:
+        return (
+            array("d", [latitude for (_, latitude, _) in chunk]),
+            array("d", [longitude for (_, _, longitude) in chunk]),
+        )
+
+    # NOTE: the ``initializer`` of process pools requires Python 3.7
+    if workers > 1 and sys.version_info >= (3, 7):
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(snapshot, spatial_index),
+        ) as executor:
+            pending: Deque[Tuple[List[CoveragePoint], concurrent.futures.Future]]
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(
+                    (chunk, executor.submit(_assign_chunk, *_columns(chunk), radius))
+                )
+                # chunks are collected in order once enough of them are in flight
+                while len(pending) >= workers * 2:
+                    (done, future) = pending.popleft()
+                    _collect(done, *future.result())
+            while len(pending) > 0:
+                (done, future) = pending.popleft()
+                _collect(done, *future.result())
+    else:
+        for chunk in chunks:
+            (latitudes, longitudes) = _columns(chunk)
+            (_, store_ids, distances) = nearest_for_points(
+                snapshot, spatial_index, zip(latitudes, longitudes), radius=radius
+            )
+            _collect(chunk, store_ids, distances)
+
+    return report
@@ -0,0 +1,376 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``StoreDatabase`` used to search store catalogs larger than memory."""
+
+import os
+import csv
+import heapq
+import pathlib
+import sqlite3
+import tempfile
+import threading
+from math import cos, radians
+from typing import IO, Set, List, Tuple, Callable, Iterator, Optional, AbstractSet
+
+import attr
+
+from .index import boundary_angle
+from .ingest import IngestReport
+from .models import Store, GeoLocation
+from .catalog import CSV_HEADERS, STORE_COLUMNS, open_store_locations
+
+# the header every SQLite 3 database file starts with
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# the amount of rows inserted into the database at a time while importing
+IMPORT_BATCH_SIZE = 10000
+
+CREATE_STATEMENTS = (
+    (
+        "CREATE TABLE stores ("
+        "id INTEGER PRIMARY KEY, "
+        f"{', '.join(f'{column} TEXT NOT NULL' for column in STORE_COLUMNS)}, "
+        "latitude REAL NOT NULL, "
+        "longitude REAL NOT NULL)"
+    ),
+    (
+        "CREATE VIRTUAL TABLE store_locations USING rtree("
+        "id, min_latitude, max_latitude, min_longitude, max_longitude)"
+    ),
+)
+INSERT_STORE_STATEMENT = (
+    f"INSERT INTO stores (id, {', '.join(STORE_COLUMNS)}, latitude, longitude) "
+    f"VALUES ({', '.join('?' * (len(STORE_COLUMNS) + 3))})"
+)
+INSERT_LOCATION_STATEMENT = "INSERT INTO store_locations VALUES (?, ?, ?, ?, ?)"
+SELECT_STORE_STATEMENT = (
+    f"SELECT {', '.join(STORE_COLUMNS)}, latitude, longitude FROM stores WHERE id = ?"
+)
+SELECT_CANDIDATES_STATEMENT = (
+    "SELECT stores.id, stores.latitude, stores.longitude "
+    "FROM store_locations JOIN stores ON stores.id = store_locations.id "
+    "WHERE store_locations.max_latitude >= ? AND store_locations.min_latitude <= ? "
+    "AND store_locations.max_longitude >= ? AND store_locations.min_longitude <= ?"
+)
+
+
+def is_database(filepath: pathlib.Path) -> bool:
+    """Check if the given file is a SQLite database.
+
+    :param pathlib.Path filepath: The path of the file to check
+    :return: True if the file starts with the SQLite header, otherwise False
+    :rtype: bool
+    """
+
+    with filepath.open("rb") as fp:
+        return fp.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+
+@attr.s
+class StoreDatabase(object):
+    """A store catalog kept on disk in a SQLite database.
+
+    Store coordinates are indexed in a SQLite R*Tree so searches only ever load the
+    stores within an expanding bounding box around the origin. Stores are indexed by
+    the (zero-based) row of the store locations file they were imported from.
+    """
+
+    filepath = attr.ib(type=pathlib.Path)
+    span = attr.ib(type=float, default=0.5)
+
+    def __attrs_post_init__(self):
+        self._local = threading.local()
+
+    @classmethod
+    def create(
+        cls,
+        filepath: pathlib.Path,
+        source: pathlib.Path,
+        span: float = 0.5,
+        report: Optional[IngestReport] = None,
+    ) -> "StoreDatabase":
+        """Create a new database by importing a store locations file.
+
+        Malformed rows are skipped (as done by ``ingest_catalog``) rather than
+        aborting the import. The database is built in a temporary file next to
+        ``filepath`` which is only moved into place once the import succeeds, so a
+        failed import never leaves a partial database behind.
+
+        :param pathlib.Path filepath: The path of the database to create
+        :param pathlib.Path source: The path of the (optionally compressed) store
+            locations file to import
+        :param float span: The half-size (in degrees) of the first bounding box
+            searched around an origin, optional, defaults to 0.5
+        :param IngestReport report: The report the read and malformed rows of the
+            import are counted in, optional, defaults to None
+        :raises FileExistsError: When the given database ``filepath`` already exists
+        :raises ValueError: When the file is missing any of the ``CSV_HEADERS``
+        :return: The created database
+        :rtype: StoreDatabase
+        """
+
+        if filepath.exists():
+            raise FileExistsError(f"database {filepath!s} already exists")
+        if report is None:
+            report = IngestReport(filepath=source)
+
+        (descriptor, temporary) = tempfile.mkstemp(
+            suffix=".tmp", prefix=f".{filepath.name}.", dir=filepath.parent
+        )
+        os.close(descriptor)
+        try:
+            connection = sqlite3.connect(temporary)
+            try:
+                with connection:
+                    for statement in CREATE_STATEMENTS:
+                        connection.execute(statement)
+                    with open_store_locations(source) as fp:
+                        cls._import(connection, fp, source, report)
+            finally:
+                connection.close()
+            os.replace(temporary, filepath.as_posix())
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+        return cls(filepath=filepath, span=span)
+
+    @classmethod
+    def _import(
+        cls,
+        connection: sqlite3.Connection,
+        fp: IO[str],
+        source: pathlib.Path,
+        report: IngestReport,
+    ):
+        """Insert the well-formed rows of an opened store locations file.
+
+        :param sqlite3.Connection connection: The connection to the database
+        :param IO[str] fp: The opened store locations file
+        :param pathlib.Path source: The path of the store locations file
+        :param IngestReport report: The report the read and malformed rows are
+            counted in
+        :raises ValueError: When the file is missing any of the ``CSV_HEADERS``
+        """
+
+        reader = csv.reader(fp)
+        header = next(reader, [])
+        missing = [name for name in CSV_HEADERS.values() if name not in header]
+        if len(missing) > 0:
+            raise ValueError(f"store locations file {source!s} is missing {missing!r}")
+        positions = {
+            column: header.index(name) for (column, name) in CSV_HEADERS.items()
+        }
+        field_count = max(positions.values()) + 1
+
+        batch: List[Tuple] = []
+        store_id = 0
+        for row in reader:
+            if len(row) < 1:
+                # blank lines are skipped (as done by ``csv.DictReader``)
+                continue
+            report.rows += 1
+            if len(row) < field_count:
+                report.add_malformed(reader.line_num, "missing fields")
+                continue
+            try:
+                latitude = float(row[positions["latitude"]])
+                longitude = float(row[positions["longitude"]])
+            except ValueError:
+                report.add_malformed(reader.line_num, "unparsable coordinates")
+                continue
+            if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+                # NOTE: this comparison also rejects NaN coordinates
+                report.add_malformed(reader.line_num, "out of range coordinates")
+                continue
+
+            batch.append(
+                (
+                    store_id,
+                    *(row[positions[column]] for column in STORE_COLUMNS),
+                    latitude,
+                    longitude,
+                )
+            )
+            store_id += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                cls._insert(connection, batch)
+                batch = []
+        cls._insert(connection, batch)
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, batch: List[Tuple]):
+        """Insert a batch of stores into a database.
+
+        :param sqlite3.Connection connection: The connection to the database
+        :param List[Tuple] batch: The rows of the ``stores`` table to insert
+        """
+
+        connection.executemany(INSERT_STORE_STATEMENT, batch)
+        connection.executemany(
+            INSERT_LOCATION_STATEMENT,
+            ((row[0], row[-2], row[-2], row[-1], row[-1]) for row in batch),
+        )
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The read-only connection to the database for the current thread.
+
+        :return: The connection to the database
+        :rtype: sqlite3.Connection
+        """
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                f"{self.filepath.resolve().as_uri()}?mode=ro", uri=True
+            )
+            self._local.connection = connection
+        return connection
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM stores").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Store]:
+        for row in self.connection.execute(
+            f"SELECT {', '.join(STORE_COLUMNS)}, latitude, longitude "
+            "FROM stores ORDER BY id"
+        ):
+            yield self._build_store(row)
+
+    def __getitem__(self, index: int) -> Store:
+        row = self.connection.execute(SELECT_STORE_STATEMENT, (index,)).fetchone()
+        if row is None:
+            raise IndexError(f"no store with index {index!r}")
+        return self._build_store(row)
+
+    def _build_store(self, row: Tuple) -> Store:
+        """Build a ``Store`` from a row of the ``stores`` table.
+
+        :param Tuple row: The store columns followed by the latitude and longitude
+        :return: The built store
+        :rtype: Store
+        """
+
+        return Store(
+            geolocation=GeoLocation(latitude=row[-2], longitude=row[-1]),
+            **dict(zip(STORE_COLUMNS, row)),
+        )
+
+    def location(self, index: int) -> GeoLocation:
+        """Get the location of the store at the given index.
+
+        :param int index: The index of the store
+        :return: The location of the store
+        :rtype: GeoLocation
+        """
+
+        row = self.connection.execute(
+            "SELECT latitude, longitude FROM stores WHERE id = ?", (index,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(f"no store with index {index!r}")
+        return GeoLocation(latitude=row[0], longitude=row[1])
+
+    def _candidates(
+        self, south: float, north: float, west: float, east: float
+    ) -> Iterator[Tuple[int, float, float]]:
+        """Generate the stores within a bounding box.
+
+        Boxes crossing the antimeridian (``west < -180`` or ``east > 180``) are split
+        into two queries.
+
+        :param float south: The southern edge of the box in degrees
+        :param float north: The northern edge of the box in degrees
+        :param float west: The western edge of the box in degrees
+        :param float east: The eastern edge of the box in degrees
+        :return: Yields tuples of store indexes, latitudes and longitudes
+        :rtype: Iterator[Tuple[int, float, float]]
+        """
+
+        if east - west >= 360.0:
+            ranges = [(-180.0, 180.0)]
+        elif west < -180.0:
+            ranges = [(west + 360.0, 180.0), (-180.0, east)]
+        elif east > 180.0:
+            ranges = [(west, 180.0), (-180.0, east - 360.0)]
+        else:
+            ranges = [(west, east)]
+
+        for (range_west, range_east) in ranges:
+            yield from self.connection.execute(
+                SELECT_CANDIDATES_STATEMENT, (south, north, range_west, range_east)
+            )
+
+    def nearest(
+        self,
+        origin: GeoLocation,
+        distance: Callable[[GeoLocation], float],
+        radius: float,
+        results: int = 1,
+        tolerance: float = 0.0,
+        excluded: AbstractSet[int] = frozenset(),
+    ) -> List[Tuple[float, int]]:
+        """Find the closest stores to an origin.
+
+        Bounding boxes around the origin are doubled in size until the worst of the
+        best distances is closer than anything outside of the box could be.
+
+        :param GeoLocation origin: The location to search from
+        :param Callable[[GeoLocation], float] distance: A callable returning the
+            distance from the origin to a given location (unlike ``GridIndex``, store
+            locations are read along with the candidates rather than looked up)
+        :param float radius: The radius of the earth in the units returned by the
+            ``distance`` callable, used to convert box boundaries into distances
+        :param int results: The number of closest stores to find,
+            optional, defaults to 1
+        :param float tolerance: The relative difference allowed between the values of
+            ``distance`` and spherical distances, optional, defaults to 0.0
+        :param AbstractSet[int] excluded: The indexes of stores to skip,
+            optional, defaults to an empty set
+        :return: A list of tuples of distances and store indexes
+        :rtype: List[Tuple[float, int]]
+        """
+
+        # boxes are measured from the origin with a longitude in [-180, 180)
+        origin = GeoLocation(
+            latitude=origin.latitude,
+            longitude=(origin.longitude + 180.0) % 360.0 - 180.0,
+        )
+        seen: Set[int] = set()
+        best: List[Tuple[float, int]] = []
+        span = self.span
+
+        while True:
+            # widen the longitude span so boxes stay roughly square on the ground
+            longitude_span = span / max(cos(radians(origin.latitude)), 1e-6)
+            box = (
+                origin.latitude - span,
+                origin.latitude + span,
+                origin.longitude - longitude_span,
+                origin.longitude + longitude_span,
+            )
+            for (store_index, latitude, longitude) in self._candidates(*box):
+                if store_index not in seen and store_index not in excluded:
+                    seen.add(store_index)
+                    best.append(
+                        (
+                            distance(
+                                GeoLocation(latitude=latitude, longitude=longitude)
+                            ),
+                            store_index,
+                        )
+                    )
+            best = heapq.nsmallest(results, best)
+
+            (south, north, west, east) = box
+            covers_globe = south <= -90.0 and north >= 90.0 and east - west >= 360.0
+            if covers_globe or (
+                len(best) >= results
+                and best[-1][0]
+                <= boundary_angle(origin, *box) * radius * (1.0 - tolerance)
+            ):
+                return best
+            span *= 2.0
@@ -0,0 +1,58 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``Deadline`` used to bound the time spent geocoding and searching."""
+
+import time
+from typing import Callable, Optional
+
+import attr
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a geocode or search does not finish before its deadline."""
+
+
+@attr.s(frozen=True)
+class Deadline(object):
+    """A point in time (of a monotonic ``clock``) some work must finish by."""
+
+    expires = attr.ib(type=float)
+    clock = attr.ib(type=Callable[[], float], default=time.monotonic, repr=False)
+
+    @classmethod
+    def from_timeout(
+        cls, timeout: Optional[float], clock: Callable[[], float] = time.monotonic
+    ) -> Optional["Deadline"]:
+        """Create a new deadline the given amount of seconds from now.
+
+        :param Optional[float] timeout: The amount of seconds until the deadline
+        :param Callable[[], float] clock: The clock the deadline is measured with,
+            optional, defaults to ``time.monotonic``
+        :return: A new deadline or None if no ``timeout`` is given
+        :rtype: Optional[Deadline]
+        """
+
+        if timeout is None:
+            return None
+        return cls(expires=clock() + max(timeout, 0.0), clock=clock)
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed.
+
+        :return: True if the deadline has passed, otherwise False
+        :rtype: bool
+        """
+
+        return self.clock() >= self.expires
+
+    def remaining(self) -> float:
+        """Get the amount of seconds left until the deadline.
+
+        :return: The amount of seconds left (0.0 once the deadline has passed)
+        :rtype: float
+        """
+
+        return max(self.expires - self.clock(), 0.0)
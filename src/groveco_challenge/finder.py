@@ -4,54 +4,798 @@
 
 """Contains the ``StoreFinder`` class used to find stores close to a given location."""
 
-import csv
+import os
+import heapq
+import asyncio
 import pathlib
 import warnings
+import functools
+import threading
 import concurrent.futures
-from math import cos, sin, sqrt, atan2, radians
-from typing import List, Tuple, Generator
+from math import pi, cos, sin, asin, sqrt, atan2, radians
+from array import array
+from typing import (
+    IO,
+    Any,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+)
 
 import attr
-import geocoder
+import requests
 from geopy.distance import distance as geopy_distance
-from cached_property import cached_property
+from cached_property import threaded_cached_property
 from sortedcontainers import SortedSet
 
-from .models import Store, GeoLocation, StoreResult
+from . import constants
+from .batch import PointResults, nearest_for_points
+from .cache import CacheStats, WarmReport, ResultCache, GeocodeCache, quantize
+from .graph import StoreGraph
+from .index import GridIndex
+from .ingest import IngestReport, ingest_catalog
+from .models import Store, GeoLocation, StoreResult, StoreResults
+from .shards import ShardedCatalog
+from .catalog import (
+    CHUNK_SIZE,
+    StoreCatalog,
+    build_store,
+    read_store_chunks,
+    open_store_locations,
+)
+from .metrics import MetricsRegistry, measure
+from .voronoi import VoronoiTable
+from .coverage import CoveragePoint, CoverageReport, assign_points
+from .database import StoreDatabase, is_database
+from .deadline import Deadline, DeadlineExceeded
+from .snapshot import CatalogSnapshot, CatalogFingerprint
+from .geocoding import RateLimiter, geocode, query_key, build_session, normalize_query
+from .singleflight import SingleFlight, AsyncSingleFlight
+
+# the relative floating-point slack added to the planar error bounds
+PLANAR_ROUNDING_SLACK = 1e-12
+
+
+def _wrap_longitude(delta_lambda: float) -> float:
+    """Wrap a difference of longitudes (in radians) into the range [-pi, pi].
+
+    :param float delta_lambda: The difference of longitudes in radians
+    :return: The wrapped difference of longitudes in radians
+    :rtype: float
+    """
+
+    if delta_lambda > pi:
+        return delta_lambda - 2.0 * pi
+    elif delta_lambda < -pi:
+        return delta_lambda + 2.0 * pi
+    return delta_lambda
+
+
+def _planar_haversine(
+    delta_phi: float, delta_lambda: float, cos_product: float
+) -> Tuple[float, float]:
+    """Approximate the haversine of the central angle between two locations.
+
+    The haversine of the central angle is exactly
+    ``hav(delta_phi) + cos(phi_1) * cos(phi_2) * hav(delta_lambda)`` and for
+    ``|x| <= pi`` the haversine is bounded by
+    ``x^2 / 4 - x^4 / 48 <= hav(x) <= x^2 / 4``.
+    Replacing both haversines by ``x^2 / 4`` gives an estimate that never falls below
+    the true value and exceeds it by at most the returned error.
+
+    :param float delta_phi: The difference of latitudes in radians
+    :param float delta_lambda: The wrapped difference of longitudes in radians
+    :param float cos_product: The product of the cosines of both latitudes
+    :return: A tuple of the estimate and the error of the estimate, the true
+        haversine always lies within ``[estimate - error, estimate]``
+    :rtype: Tuple[float, float]
+    """
+
+    phi_squared = delta_phi * delta_phi
+    lambda_squared = delta_lambda * delta_lambda
+    estimate = 0.25 * (phi_squared + cos_product * lambda_squared)
+    error = (
+        phi_squared * phi_squared + cos_product * lambda_squared * lambda_squared
+    ) / 48.0
+    return (estimate, error + (estimate + 1.0) * PLANAR_ROUNDING_SLACK)
 
 
 @attr.s
 class StoreFinder(object):
-    """The class used to discover stores close to a given location."""
+    """The class used to discover stores close to a given location.
+
+    A single finder can be shared by many threads. Searches read the immutable
+    ``snapshot`` of the catalog (and its index) without taking any locks, while the
+    snapshot and the other lazily created resources (caches, sessions and executors)
+    are only ever created once.
+
+    The thread pools and geocoding session of a finder are created when they are
+    first needed and reused by every following search until the finder is closed
+    (with ``close`` or by using the finder as a context manager).
+
+    Query and search latencies, geocoding errors, cache statistics and the size and
+    version of the catalog are reported into the ``metrics`` registry of the finder.
+    Geocoding requests go to the ``geocoder_url`` rather than Google if one is given
+    (such as the URL of a ``MockGeocoder``), and geocoded locations are kept in a
+    persistent ``geocode_cache`` if a ``geocode_cache_path`` is given.
+    """
 
     filepath = attr.ib(type=pathlib.Path)
-    max_workers = attr.ib(type=int, default=4)
-
-    @cached_property
-    def stores(self) -> Generator[Store, None, None]:
-        """Generate ``Store`` instances from parsing the given ``filepath`` attribute.
-
-        :return: Yields ``Store`` instances
-        :rtype: Generator[Store, None, None]
-        """
-        with self.filepath.open("r") as fp:
-            for entry in csv.DictReader(fp):
-                # XXX: this logic is tied close to the data format provided by the
-                # ``store-location.csv`` file. If this file format is to change in the
-                # future, this parsing logic will need to be revisited.
-                yield Store(
-                    name=entry["Store Name"],
-                    location=entry["Store Location"],
-                    address=entry["Address"],
-                    city=entry["City"],
-                    state=entry["State"],
-                    zipcode=entry["Zip Code"],
-                    geolocation=GeoLocation(
-                        latitude=float(entry["Latitude"]),
-                        longitude=float(entry["Longitude"]),
-                    ),
-                    county=entry["County"],
+    max_workers = attr.ib(type=Optional[int], default=None)
+    index = attr.ib(
+        type=Optional[str],
+        default=None,
+        validator=attr.validators.optional(attr.validators.in_(constants.INDEX_TYPES)),
+    )
+    resolution = attr.ib(type=float, default=1.0)
+    chunk_size = attr.ib(type=int, default=CHUNK_SIZE)
+    cache_size = attr.ib(type=int, default=0)
+    cache_ttl = attr.ib(type=Optional[float], default=constants.CACHE_TTL)
+    cache_precision = attr.ib(type=int, default=constants.CACHE_PRECISION)
+    io_workers = attr.ib(type=int, default=constants.IO_WORKERS)
+    cpu_workers = attr.ib(type=Optional[int], default=None)
+    voronoi = attr.ib(type=Optional[pathlib.Path], default=None)
+    compact_catalog = attr.ib(type=bool, default=False)
+    shard_by = attr.ib(
+        type=Optional[str],
+        default=None,
+        validator=attr.validators.optional(attr.validators.in_(constants.SHARD_TYPES)),
+    )
+    geocoder_url = attr.ib(type=Optional[str], default=None)
+    geocode_cache_path = attr.ib(type=Optional[pathlib.Path], default=None)
+    geocode_cache_ttl = attr.ib(
+        type=Optional[float], default=constants.GEOCODE_CACHE_TTL
+    )
+    metrics = attr.ib(
+        type=MetricsRegistry, factory=MetricsRegistry, repr=False, eq=False
+    )
+
+    def __attrs_post_init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        # NOTE: this lock only serializes the building of snapshots, searches read
+        # the current snapshot without ever acquiring it
+        self._snapshot_lock = threading.Lock()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._watch_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._geocode_flight = SingleFlight()
+        self._search_flight = SingleFlight()
+        self._async_geocode_flight = AsyncSingleFlight()
+        self._register_metrics()
+
+    def _register_metrics(self):
+        """Register the metrics of the finder with its ``metrics`` registry."""
+
+        def _snapshot_value(
+            value: Callable[[CatalogSnapshot], Optional[float]]
+        ) -> Callable[[], Optional[float]]:
+            # NOTE: the catalog is never loaded just to report its metrics
+            def _value() -> Optional[float]:
+                snapshot = self._snapshot
+                return None if snapshot is None else value(snapshot)
+
+            return _value
+
+        def _cache_value(cache: str, name: str) -> Callable[[], Optional[float]]:
+            def _value() -> Optional[float]:
+                stats = getattr(self, f"{cache}_stats")
+                return None if stats is None else getattr(stats, name)
+
+            return _value
+
+        metrics = self.metrics
+        self._query_seconds = metrics.histogram(
+            "finder_query_seconds", "Seconds taken to geocode and search a query."
+        )
+        self._query_errors = metrics.counter(
+            "finder_query_errors_total", "Queries that failed by error.", ("error",)
+        )
+        self._search_seconds = metrics.histogram(
+            "finder_search_seconds", "Seconds taken to search the stores of an origin."
+        )
+        self._search_errors = metrics.counter(
+            "finder_search_errors_total", "Searches that failed by error.", ("error",)
+        )
+        self._partial_results = metrics.counter(
+            "finder_partial_results_total", "Searches returning partial results."
+        )
+        self._geocode_seconds = metrics.histogram(
+            "geocode_request_seconds", "Seconds taken by geocoding requests."
+        )
+        self._geocode_errors = metrics.counter(
+            "geocode_errors_total",
+            "Geocoding requests that failed by error.",
+            ("error",),
+        )
+        metrics.counter(
+            "geocode_coalesced_total",
+            "Geocodes shared with an equivalent query in flight.",
+            function=lambda: self._geocode_flight.shared,
+        )
+        metrics.counter(
+            "finder_search_coalesced_total",
+            "Searches shared with an identical search in flight.",
+            function=lambda: self._search_flight.shared,
+        )
+        for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            metrics.counter(
+                f"result_cache_{name}_total",
+                f"The {name} of the result cache.",
+                function=_cache_value("cache", name),
+            )
+        metrics.gauge(
+            "result_cache_entries",
+            "Search results held by the result cache.",
+            function=lambda: (
+                None if self.result_cache is None else len(self.result_cache)
+            ),
+        )
+        for name in ("hits", "misses", "expirations"):
+            metrics.counter(
+                f"geocode_cache_{name}_total",
+                f"The {name} of the geocode cache.",
+                function=_cache_value("geocode_cache", name),
+            )
+        metrics.gauge(
+            "geocode_cache_entries",
+            "Locations held by the geocode cache (including expired locations).",
+            function=lambda: (
+                None if self.geocode_cache is None else len(self.geocode_cache)
+            ),
+        )
+        self._geocode_warmed = metrics.counter(
+            "geocode_cache_warmed_total",
+            "Locations added to the geocode cache by warming it.",
+        )
+        metrics.gauge(
+            "catalog_stores",
+            "Stores of the loaded catalog.",
+            function=_snapshot_value(
+                lambda snapshot: len(snapshot.catalog)
+                - len(snapshot.tombstones)
+                + len(snapshot.delta)
+            ),
+        )
+        metrics.gauge(
+            "catalog_version",
+            "Version of the loaded catalog (bumped by reloads and mutations).",
+            function=_snapshot_value(lambda snapshot: snapshot.version),
+        )
+        metrics.gauge(
+            "catalog_mutations",
+            "Store mutations pending compaction.",
+            function=_snapshot_value(lambda snapshot: snapshot.mutations),
+        )
+        metrics.gauge(
+            "catalog_shards",
+            "Shards of the loaded catalog.",
+            function=_snapshot_value(
+                lambda snapshot: (
+                    None if snapshot.shards is None else len(snapshot.shards)
+                )
+            ),
+        )
+
+    def _build_snapshot(
+        self, fingerprint: CatalogFingerprint, version: int = 0
+    ) -> CatalogSnapshot:
+        """Load the catalog and build the spatial index for the given ``filepath``.
+
+        .. note:: If the ``filepath`` is a SQLite database (as created by
+            ``StoreDatabase.create``) stores are left on disk and searched through
+            their own R*Tree index, otherwise the store locations file is parsed into
+            a columnar ``StoreCatalog`` (in parallel chunks for large files, see
+            ``ingest_catalog``) which is compact if ``compact_catalog`` is enabled.
+            If stores are sharded (by ``shard_by``) every shard gets its own grid
+            index rather than indexing the whole catalog.
+
+        :param CatalogFingerprint fingerprint: The fingerprint of the loaded file
+        :param int version: The version of the snapshot, optional, defaults to 0
+        :return: A new snapshot
+        :rtype: CatalogSnapshot
+        """
+
+        if is_database(self.filepath):
+            database = StoreDatabase(self.filepath)
+            return CatalogSnapshot(
+                catalog=database,
+                spatial_index=database,
+                fingerprint=fingerprint,
+                version=version,
+            )
+
+        (catalog, report) = ingest_catalog(self.filepath, compact=self.compact_catalog)
+        if len(report.malformed) > 0:
+            # NOTE: malformed rows are reported all at once rather than stopping the
+            # ingest of every other store
+            warnings.warn(report.to_text())
+
+        spatial_index = None
+        if self.index == "grid" and self.shard_by is None:
+            spatial_index = GridIndex.from_catalog(catalog, resolution=self.resolution)
+        snapshot = CatalogSnapshot(
+            catalog=catalog,
+            spatial_index=spatial_index,
+            fingerprint=fingerprint,
+            version=version,
+        )
+        if self.shard_by is not None:
+            snapshot = attr.evolve(
+                snapshot,
+                shards=ShardedCatalog.from_snapshot(
+                    snapshot,
+                    shard_by=self.shard_by,
+                    shard_resolution=constants.SHARD_RESOLUTION,
+                    resolution=self.resolution,
+                ),
+            )
+        return snapshot
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """The current snapshot of the catalog for the given ``filepath`` attribute.
+
+        :return: The current snapshot, loaded on first access
+        :rtype: CatalogSnapshot
+        """
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._snapshot_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build_snapshot(
+                        CatalogFingerprint.from_file(self.filepath)
+                    )
+                snapshot = self._snapshot
+        return snapshot
+
+    @property
+    def catalog(self) -> Union[StoreCatalog, StoreDatabase]:
+        """The catalog of stores of the current ``snapshot``.
+
+        :return: The catalog of stores
+        :rtype: Union[StoreCatalog, StoreDatabase]
+        """
+
+        return self.snapshot.catalog
+
+    @property
+    def spatial_index(self) -> Optional[Union[GridIndex, StoreDatabase]]:
+        """The spatial index of the current ``snapshot`` if an ``index`` is requested.
+
+        :return: The spatial index or None if stores should be searched exhaustively
+        :rtype: Optional[Union[GridIndex, StoreDatabase]]
+        """
+
+        return self.snapshot.spatial_index
+
+    def reload(self) -> bool:
+        """Reload the catalog if the content of the given ``filepath`` has changed.
+
+        The new catalog and spatial index are fully built before they are swapped in
+        as the ``snapshot``. Searches already running keep using the snapshot they
+        started with.
+
+        :return: True if a new snapshot was swapped in, otherwise False
+        :rtype: bool
+        """
+
+        with self._snapshot_lock:
+            current = self._snapshot
+            if current is None:
+                self._snapshot = self._build_snapshot(
+                    CatalogFingerprint.from_file(self.filepath)
                 )
+                return True
+
+            fingerprint = CatalogFingerprint.from_file(
+                self.filepath, previous=current.fingerprint
+            )
+            if fingerprint.digest == current.fingerprint.digest:
+                if fingerprint != current.fingerprint:
+                    # the file was touched or rewritten with the same content
+                    self._snapshot = attr.evolve(current, fingerprint=fingerprint)
+                return False
+
+            self._snapshot = self._build_snapshot(
+                fingerprint, version=current.version + 1
+            )
+            return True
+
+    def watch(self, interval: float = constants.RELOAD_INTERVAL):
+        """Start reloading the catalog in a background thread whenever it changes.
+
+        .. important:: Catalog files should be replaced atomically (written to a
+            temporary file and renamed over the watched file), otherwise a half
+            written file may be loaded until the next check.
+
+        :param float interval: The amount of seconds between checks of the file,
+            optional, defaults to ``constants.RELOAD_INTERVAL``
+        """
+
+        def _watch():
+            while not self._watch_stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception as exc:
+                    # NOTE: the current snapshot is kept if the file can't be loaded
+                    warnings.warn(f"failed to reload {self.filepath!s}, {exc!s}")
+
+        with self._watch_lock:
+            if self._watch_thread is not None and self._watch_thread.is_alive():
+                return
+
+            self._watch_stop.clear()
+            self._watch_thread = threading.Thread(
+                target=_watch, name=f"watch-{self.filepath.name}", daemon=True
+            )
+            self._watch_thread.start()
+
+    def unwatch(self):
+        """Stop reloading the catalog in the background."""
+
+        with self._watch_lock:
+            self._watch_stop.set()
+            if self._watch_thread is not None:
+                self._watch_thread.join()
+                self._watch_thread = None
+
+    def close(self):
+        """Stop watching the catalog and release the executors and session.
+
+        .. note:: Closing waits for the work already submitted to the executors to
+            finish. A closed finder can still be used, its executors and session are
+            created again when they are next needed.
+        """
+
+        self.unwatch()
+        for name in ("executor", "io_executor", "cpu_executor", "shard_executor"):
+            executor = self.__dict__.pop(name, None)
+            if executor is not None:
+                executor.shutdown(wait=True)
+        session = self.__dict__.pop("session", None)
+        if session is not None:
+            session.close()
+        table = self.__dict__.pop("voronoi_table", None)
+        if table is not None:
+            table.close()
+        geocode_cache = self.__dict__.pop("geocode_cache", None)
+        if geocode_cache is not None:
+            geocode_cache.close()
+
+    def __enter__(self) -> "StoreFinder":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _compact(self, snapshot: CatalogSnapshot) -> CatalogSnapshot:
+        """Build a snapshot with the pending mutations of a snapshot compacted.
+
+        .. note:: The shards of a sharded snapshot are kept as they are, shards are
+            only rebuilt once they have pending mutations of their own (see
+            ``rebuild_shard``).
+
+        :param CatalogSnapshot snapshot: The snapshot to compact
+        :return: A new snapshot with a rebuilt catalog and spatial index
+        :rtype: CatalogSnapshot
+        """
+
+        stores = sorted(snapshot.stores(), key=lambda item: item[0])
+        catalog = StoreCatalog.from_stores(
+            (store for (_, store) in stores), compact=self.compact_catalog
+        )
+        spatial_index = None
+        if self.index == "grid" and snapshot.shards is None:
+            spatial_index = GridIndex.from_catalog(catalog, resolution=self.resolution)
+        return CatalogSnapshot(
+            catalog=catalog,
+            spatial_index=spatial_index,
+            fingerprint=snapshot.fingerprint,
+            version=snapshot.version,
+            ids=array("q", (store_id for (store_id, _) in stores)),
+            next_id=snapshot.next_id,
+            shards=snapshot.shards,
+        )
+
+    def _mutate(
+        self, mutation: Callable[[CatalogSnapshot], CatalogSnapshot]
+    ) -> CatalogSnapshot:
+        """Apply a mutation to the current snapshot and swap in the result.
+
+        Pending mutations are compacted into a new catalog and spatial index once
+        there are more than ``constants.COMPACTION_THRESHOLD`` of them. Shards are
+        rebuilt on their own once they have more than
+        ``constants.SHARD_COMPACTION_THRESHOLD`` pending mutations.
+
+        :param Callable[[CatalogSnapshot], CatalogSnapshot] mutation: A callable
+            building the mutated snapshot from the current snapshot
+        :raises ValueError: When the catalog is a SQLite database
+        :return: The swapped in snapshot
+        :rtype: CatalogSnapshot
+        """
+
+        # NOTE: reading the current snapshot may need to take the lock itself
+        loaded = self.snapshot
+        with self._snapshot_lock:
+            # the snapshot may have been swapped (but never unset) since it was read
+            snapshot = loaded if self._snapshot is None else self._snapshot
+            if isinstance(snapshot.catalog, StoreDatabase):
+                raise ValueError(
+                    "SQLite catalogs can not be mutated, import a new database instead"
+                )
+
+            snapshot = mutation(snapshot)
+            if snapshot.shards is not None:
+                shards = snapshot.shards.compacted(constants.SHARD_COMPACTION_THRESHOLD)
+                if shards is not snapshot.shards:
+                    snapshot = attr.evolve(snapshot, shards=shards)
+            if snapshot.mutations > constants.COMPACTION_THRESHOLD:
+                snapshot = self._compact(snapshot)
+            self._snapshot = snapshot
+            return snapshot
+
+    def add_store(self, store: Store) -> int:
+        """Add a new store to the catalog.
+
+        .. important:: Mutations are kept in memory and are dropped if a changed
+            catalog file is reloaded. Streaming scans read the catalog file directly
+            and never see mutations.
+
+        :param Store store: The store to add
+        :return: The store id of the added store
+        :rtype: int
+        """
+
+        # NOTE: added stores always take the next unused id
+        snapshot = self._mutate(
+            lambda snapshot: snapshot.with_store(snapshot.next_id, store)
+        )
+        return snapshot.next_id - 1
+
+    def update_store(self, store_id: int, store: Store):
+        """Replace the store with the given store id.
+
+        :param int store_id: The id of the store to replace
+        :param Store store: The new store
+        :raises KeyError: When there is no (or a removed) store with the given id
+        """
+
+        def _update(snapshot: CatalogSnapshot) -> CatalogSnapshot:
+            # NOTE: checks that the store currently exists
+            snapshot.store(store_id)
+            return snapshot.with_store(store_id, store)
+
+        self._mutate(_update)
+
+    def remove_store(self, store_id: int):
+        """Remove (close) the store with the given store id.
+
+        :param int store_id: The id of the store to remove
+        :raises KeyError: When there is no (or an already removed) store with the id
+        """
+
+        self._mutate(lambda snapshot: snapshot.without_store(store_id))
+
+    def compact(self):
+        """Compact any pending mutations into a new catalog and spatial index."""
+
+        self._mutate(
+            lambda snapshot: self._compact(snapshot)
+            if snapshot.mutations > 0
+            else snapshot
+        )
+
+    def rebuild_shard(self, key: str):
+        """Rebuild a single shard, compacting the pending mutations of its stores.
+
+        Every other shard (and the rest of the catalog) is left untouched.
+
+        :param str key: The key of the shard (a state or a grid cell as
+            ``"<row>:<column>"``)
+        :raises ValueError: When the stores are not sharded
+        :raises KeyError: When there is no shard with the given key
+        """
+
+        def _rebuild(snapshot: CatalogSnapshot) -> CatalogSnapshot:
+            if snapshot.shards is None:
+                raise ValueError("shards can only be rebuilt if stores are sharded")
+            return attr.evolve(snapshot, shards=snapshot.shards.rebuild(key))
+
+        self._mutate(_rebuild)
+
+    @threaded_cached_property
+    def result_cache(self) -> Optional[ResultCache]:
+        """The cache of search results if a ``cache_size`` is given.
+
+        .. note:: Results are cached by the origin rounded to ``cache_precision``
+            decimal places along with the search options, and are dropped whenever
+            the catalog is reloaded or mutated. Streaming scans are never cached.
+
+        :return: The cache of search results or None if results are not cached
+        :rtype: Optional[ResultCache]
+        """
+
+        if self.cache_size < 1:
+            return None
+        return ResultCache(maxsize=self.cache_size, ttl=self.cache_ttl)
+
+    @property
+    def cache_stats(self) -> Optional[CacheStats]:
+        """The statistics of the ``result_cache``.
+
+        :return: The statistics of the cache or None if results are not cached
+        :rtype: Optional[CacheStats]
+        """
+
+        cache = self.result_cache
+        return None if cache is None else cache.stats
+
+    @threaded_cached_property
+    def geocode_cache(self) -> Optional[GeocodeCache]:
+        """The persistent cache of geocodes if a ``geocode_cache_path`` is given.
+
+        .. note:: Locations are cached by ``query_key`` for ``geocode_cache_ttl``
+            seconds, the database is shared by every process given the same path.
+
+        :return: The cache of geocoded locations or None if locations are not cached
+        :rtype: Optional[GeocodeCache]
+        """
+
+        if self.geocode_cache_path is None:
+            return None
+        return GeocodeCache(self.geocode_cache_path, ttl=self.geocode_cache_ttl)
+
+    @property
+    def geocode_cache_stats(self) -> Optional[CacheStats]:
+        """The statistics of the ``geocode_cache``.
+
+        :return: The statistics of the cache or None if locations are not cached
+        :rtype: Optional[CacheStats]
+        """
+
+        cache = self.geocode_cache
+        return None if cache is None else cache.stats
+
+    @threaded_cached_property
+    def session(self) -> requests.Session:
+        """The session (and pool of connections) geocoding requests are sent with.
+
+        :return: The session used for geocoding
+        :rtype: requests.Session
+        """
+
+        return build_session(pool_size=self.io_workers)
+
+    @threaded_cached_property
+    def voronoi_table(self) -> Optional[VoronoiTable]:
+        """The memory mapped nearest store table if a ``voronoi`` table is given.
+
+        .. note:: The table answers searches for a single result (that are not
+            planar) as long as it was built for the current content of the catalog
+            file and the catalog has no pending mutations, other searches fall back
+            to the index or an exhaustive search.
+
+        :return: The loaded table or None if no table is used
+        :rtype: Optional[VoronoiTable]
+        """
+
+        if self.voronoi is None:
+            return None
+        table = VoronoiTable.load(self.voronoi)
+        if table.digest != self.snapshot.fingerprint.digest:
+            warnings.warn(
+                f"nearest store table {self.voronoi!s} was built for a different "
+                f"catalog than {self.filepath!s}, it is only used if they match"
+            )
+        return table
+
+    def build_voronoi_table(
+        self, resolution: float = constants.VORONOI_RESOLUTION
+    ) -> VoronoiTable:
+        """Build the nearest store table of the catalog.
+
+        :param float resolution: The size (in degrees) of the cells of the table,
+            optional, defaults to ``constants.VORONOI_RESOLUTION``
+        :raises ValueError: When the catalog is a SQLite database or has pending
+            mutations
+        :return: A new table for the current catalog
+        :rtype: VoronoiTable
+        """
+
+        snapshot = self.snapshot
+        if isinstance(snapshot.catalog, StoreDatabase):
+            raise ValueError("nearest store tables require a store locations file")
+        if snapshot.mutations > 0:
+            raise ValueError("nearest store tables can't be built for mutated catalogs")
+
+        return VoronoiTable.build(
+            snapshot,
+            self._grid_index(snapshot),
+            resolution,
+            margin=constants.VORONOI_MARGIN,
+            tolerance=constants.ELLIPSOID_TOLERANCE,
+        )
+
+    @threaded_cached_property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """The executor calculating distances for exhaustive searches.
+
+        :return: An executor of ``max_workers`` threads (defaults to the amount of
+            CPUs)
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers or os.cpu_count() or 1,
+            thread_name_prefix="distance",
+        )
+
+    @threaded_cached_property
+    def io_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """The executor running blocking geocoding requests for the asyncio API.
+
+        :return: An executor of ``io_workers`` threads
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.io_workers, thread_name_prefix="geocode"
+        )
+
+    @threaded_cached_property
+    def shard_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """The executor searching the shards of sharded catalogs in parallel.
+
+        .. note:: Shards get their own executor as they are searched from within
+            searches that may already be running on the other executors.
+
+        :return: An executor of ``cpu_workers`` threads (defaults to the amount of
+            CPUs)
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.cpu_workers or os.cpu_count() or 1,
+            thread_name_prefix="shard",
+        )
+
+    @threaded_cached_property
+    def cpu_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """The executor running searches for the asyncio API.
+
+        .. note:: Searches are kept off of the event loop in their own executor so a
+            burst of searches never starves geocoding requests (and vice versa).
+
+        :return: An executor of ``cpu_workers`` threads (defaults to the amount of
+            CPUs)
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.cpu_workers or os.cpu_count() or 1,
+            thread_name_prefix="search",
+        )
+
+    @property
+    def stores(self) -> Iterator[Store]:
+        """The stores of the current ``snapshot``.
+
+        .. note:: Every access creates a new iterator over the snapshot at the time
+            of access, so concurrent callers never share (or exhaust) an iterator and
+            always see the whole catalog.
+
+        :return: An iterator of ``Store`` instances
+        :rtype: Iterator[Store]
+        """
+
+        return (store for (_, store) in self.snapshot.stores())
 
     def _vincenty_distance(
         self, origin: GeoLocation, target: GeoLocation, metric: bool = False
@@ -102,8 +846,8 @@ class StoreFinder(object):
         :rtype: float
         """
 
-        earth_radius = 6371.0  # NOTE: radius in kilometers (NOT meters)
-        imperial_ratio = 0.62371
+        earth_radius = constants.EARTH_RADIUS  # NOTE: radius in kilometers
+        imperial_ratio = constants.IMPERIAL_RATIO
 
         phi_origin = radians(origin.latitude)
         phi_target = radians(target.latitude)
@@ -122,70 +866,1398 @@ class StoreFinder(object):
             distance = distance * imperial_ratio
         return distance
 
-    def get_distance(
-        self,
-        origin: GeoLocation,
-        target: GeoLocation,
-        metric: bool = False,
-        actual: bool = False,
+    def _equirectangular_distance(
+        self, origin: GeoLocation, target: GeoLocation, metric: bool = False
     ) -> float:
-        """Get the distance between two locations.
+        """Calculate distance between two locations using a local planar projection.
+
+        This is the equirectangular projection where longitudes are scaled by the
+        (geometric mean of the) cosines of both latitudes. Once those cosines are
+        known the distance only needs multiply-adds and a square root.
+
+        .. important:: This is an approximation of the Haversine distance that is only
+            accurate for short distances. Use ``_equirectangular_bounds`` to get the
+            certified range the Haversine distance is guaranteed to be within.
 
         :param GeoLocation origin: The starting location
         :param GeoLocation target: The ending location
         :param bool metric: Return results in kilometers rather than miles,
             optional, defaults to False
-        :param bool actual: Use Vincenty distance rather than Haversine distance,
-            optional, defaults to False
-        :return: The distance between the given coordinates
+        :return: The equirectangular distance between the given coordinates
         :rtype: float
         """
-        if actual:
-            return self._vincenty_distance(origin, target, metric=metric)
-        return self._haversine_distance(origin, target, metric=metric)
 
-    def find_stores(
-        self, query: str, metric: bool = False, actual: bool = False, results: int = 1
-    ) -> List[StoreResult]:
-        """Get closest stores to a given location ``query``.
+        phi_origin = radians(origin.latitude)
+        phi_target = radians(target.latitude)
+        (estimate, _) = _planar_haversine(
+            phi_target - phi_origin,
+            _wrap_longitude(radians(target.longitude - origin.longitude)),
+            cos(phi_origin) * cos(phi_target),
+        )
 
-        .. note:: The given ``query`` goes through the Google Geocoding API using the
-            Geocoder package. This can handle various types of addresses such as
-            "The White House" and raw zip codes 12345-123.
+        distance = 2.0 * constants.EARTH_RADIUS * sqrt(estimate)
+        if not metric:
+            distance = distance * constants.IMPERIAL_RATIO
+        return distance
 
-        :param str query: The location query
+    def _equirectangular_bounds(
+        self, origin: GeoLocation, target: GeoLocation, metric: bool = False
+    ) -> Tuple[float, float]:
+        """Calculate the certified bounds of the Haversine distance between locations.
+
+        The bounds are derived from the planar estimate used by
+        ``_equirectangular_distance`` and are guaranteed to contain the value of
+        ``_haversine_distance`` for the same locations.
+
+        :param GeoLocation origin: The starting location
+        :param GeoLocation target: The ending location
         :param bool metric: Return results in kilometers rather than miles,
             optional, defaults to False
-        :param bool actual: Use Vincenty distance rather than Haversine distance,
+        :return: A tuple of the lower and upper bound of the Haversine distance
+        :rtype: Tuple[float, float]
+        """
+
+        phi_origin = radians(origin.latitude)
+        phi_target = radians(target.latitude)
+        (estimate, error) = _planar_haversine(
+            phi_target - phi_origin,
+            _wrap_longitude(radians(target.longitude - origin.longitude)),
+            cos(phi_origin) * cos(phi_target),
+        )
+
+        radius = constants.EARTH_RADIUS
+        if not metric:
+            radius = radius * constants.IMPERIAL_RATIO
+        return (
+            2.0 * radius * asin(sqrt(min(max(estimate - error, 0.0), 1.0))),
+            2.0 * radius * asin(sqrt(min(estimate, 1.0))),
+        )
+
+    def _rank_planar(
+        self,
+        origin: GeoLocation,
+        results: int = 1,
+        metric: bool = False,
+        actual: bool = False,
+        snapshot: Optional[CatalogSnapshot] = None,
+    ) -> List[Tuple[float, int]]:
+        """Rank the closest stores using planar bounds and exact distance fallbacks.
+
+        Every store gets a certified interval of its Haversine distance from the
+        planar estimate. Only stores whose lower bound does not exceed the
+        ``results``-th smallest upper bound could be part of the closest stores, so
+        only those candidates are measured with the exact distance method. Ranking by
+        Vincenty distance (``actual``) widens the threshold by the 1.5% bound of
+        ``constants.ELLIPSOID_TOLERANCE`` between spherical and ellipsoidal distances.
+
+        :param GeoLocation origin: The starting location
+        :param int results: The number of closest stores to rank,
+            optional, defaults to 1
+        :param bool metric: Return distances in kilometers rather than miles,
             optional, defaults to False
-        :param int results: The number of discovered results to return,
+        :param bool actual: Use Vincenty distance rather than Haversine distance as the
+            exact distance method, optional, defaults to False
+        :param CatalogSnapshot snapshot: The snapshot to rank the stores of,
+            optional, defaults to the current ``snapshot``
+        :raises ValueError: When the catalog is a SQLite database
+        :return: A list of tuples of exact distances and catalog indexes
+        :rtype: List[Tuple[float, int]]
+        """
+
+        if snapshot is None:
+            snapshot = self.snapshot
+        catalog = snapshot.catalog
+        if not isinstance(catalog, StoreCatalog):
+            raise ValueError("planar ranking requires a store locations file")
+        if len(catalog) < 1:
+            return []
+
+        origin_phi = radians(origin.latitude)
+        origin_lambda = radians(origin.longitude)
+        origin_cos = cos(origin_phi)
+
+        lower_bounds: List[float] = []
+        upper_bounds: List[float] = []
+        for (phi, lambda_, cos_phi) in zip(
+            catalog.phis, catalog.lambdas, catalog.cos_phis
+        ):
+            (estimate, error) = _planar_haversine(
+                phi - origin_phi,
+                _wrap_longitude(lambda_ - origin_lambda),
+                origin_cos * cos_phi,
+            )
+            lower_bounds.append(estimate - error)
+            upper_bounds.append(estimate)
+        # removed (or updated) rows of the catalog can never be ranked
+        for index in snapshot.tombstones:
+            lower_bounds[index] = upper_bounds[index] = float("inf")
+
+        threshold = heapq.nsmallest(results, upper_bounds)[-1]
+        if actual:
+            # widen the threshold (in central angle) by the difference allowed
+            # between spherical and ellipsoidal distances
+            angle = 2.0 * asin(sqrt(min(threshold, 1.0)))
+            angle *= (1.0 + constants.ELLIPSOID_TOLERANCE) / (
+                1.0 - constants.ELLIPSOID_TOLERANCE
+            )
+            threshold = 1.0 if angle >= pi else sin(angle / 2.0) ** 2
+
+        ranked = [
+            (
+                self.get_distance(
+                    origin, catalog.location(index), metric=metric, actual=actual
+                ),
+                index,
+            )
+            for (index, lower_bound) in enumerate(lower_bounds)
+            if lower_bound <= threshold and index not in snapshot.tombstones
+        ]
+        return heapq.nsmallest(results, ranked)
+
+    def _rank_index(
+        self,
+        origin: GeoLocation,
+        results: int = 1,
+        metric: bool = False,
+        actual: bool = False,
+        snapshot: Optional[CatalogSnapshot] = None,
+    ) -> List[Tuple[float, int]]:
+        """Rank the closest stores by searching the ``spatial_index``.
+
+        :param GeoLocation origin: The starting location
+        :param int results: The number of closest stores to rank,
             optional, defaults to 1
-        :return: A list of ``StoreResult`` instances
-        :rtype: List[StoreResult]
+        :param bool metric: Return distances in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param CatalogSnapshot snapshot: The snapshot to search the index of,
+            optional, defaults to the current ``snapshot``
+        :raises ValueError: When the snapshot has no ``spatial_index``
+        :return: A list of tuples of distances and catalog indexes
+        :rtype: List[Tuple[float, int]]
         """
-        origin_location = geocoder.google(query)
-        origin = GeoLocation(*origin_location.latlng)
 
-        # initialize a sorted set using the distances as the sorting key
-        # NOTE: this handles inserts into the set using some pre-defined sorting
-        # parameters using the ``bisect`` library more optimally than if I did it myself
-        best_stores = SortedSet(key=lambda store: store.distance)
+        if snapshot is None:
+            snapshot = self.snapshot
+        spatial_index = snapshot.spatial_index
+        if spatial_index is None:
+            raise ValueError("the catalog has no spatial index to search")
+        catalog = snapshot.catalog
+        radius = constants.EARTH_RADIUS
+        if not metric:
+            radius = radius * constants.IMPERIAL_RATIO
+
+        tolerance = constants.ELLIPSOID_TOLERANCE if actual else 0.0
+        if isinstance(spatial_index, StoreDatabase):
+            # database candidates are read along with their locations
+            return spatial_index.nearest(
+                origin,
+                functools.partial(
+                    self.get_distance, origin, metric=metric, actual=actual
+                ),
+                radius=radius,
+                results=results,
+                tolerance=tolerance,
+                excluded=snapshot.tombstones,
+            )
+
+        def _distance(index: int) -> float:
+            return self.get_distance(
+                origin, catalog.location(index), metric=metric, actual=actual
+            )
+
+        return spatial_index.nearest(
+            origin,
+            _distance,
+            radius=radius,
+            results=results,
+            tolerance=tolerance,
+            excluded=snapshot.tombstones,
+        )
+
+    def _find_streaming(
+        self,
+        origin: GeoLocation,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        deadline: Optional[Deadline] = None,
+    ) -> StoreResults:
+        """Get closest stores in a single pass over the store locations file.
+
+        The file is read in chunks of ``chunk_size`` rows and only the best
+        ``results`` rows seen so far are kept in a heap. The planar bounds of every
+        row in a chunk are compared against the worst distance in the heap so exact
+        distances are only calculated for rows that could still be among the results,
+        and ``Store`` instances are only built for the rows left in the heap.
+
+        :param GeoLocation origin: The starting location
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return,
+            optional, defaults to 1
+        :param Optional[Deadline] deadline: The deadline the scan must finish by, the
+            best of the rows scanned so far are returned as ``partial`` results once
+            it is hit, optional, defaults to None
+        :raises ValueError: When the ``filepath`` is a SQLite database
+        :return: A list of ``StoreResult`` instances
+        :rtype: StoreResults
+        """
+
+        if is_database(self.filepath):
+            raise ValueError("streaming scans require a store locations file")
+
+        radius = constants.EARTH_RADIUS
+        if not metric:
+            radius = radius * constants.IMPERIAL_RATIO
+        # the relative difference allowed between exact and spherical distances
+        tolerance = constants.ELLIPSOID_TOLERANCE if actual else 0.0
+
+        origin_phi = radians(origin.latitude)
+        origin_lambda = radians(origin.longitude)
+        origin_cos = cos(origin_phi)
+
+        # a max-heap of negated (distance, row) pairs along with the row values
+        heap: List[Tuple[float, int, GeoLocation, Tuple[str, ...]]] = []
+        threshold = 1.0
+        offset = 0
+        partial = False
+        report = IngestReport(filepath=self.filepath)
+        with open_store_locations(self.filepath) as fp:
+            for chunk in read_store_chunks(fp, chunk_size=self.chunk_size):
+                if deadline is not None and deadline.expired:
+                    partial = True
+                    break
+
+                for (line, reason) in chunk.malformed:
+                    report.add_malformed(line, reason)
+                report.rows += len(chunk) + len(chunk.malformed)
+
+                lower_bounds = [
+                    estimate - error
+                    for (estimate, error) in (
+                        _planar_haversine(
+                            phi - origin_phi,
+                            _wrap_longitude(radians(longitude) - origin_lambda),
+                            origin_cos * cos(phi),
+                        )
+                        for (phi, longitude) in zip(
+                            map(radians, chunk.latitudes), chunk.longitudes
+                        )
+                    )
+                ]
+
+                for (index, lower_bound) in enumerate(lower_bounds):
+                    if lower_bound > threshold:
+                        continue
+
+                    location = chunk.location(index)
+                    entry = (
+                        -self.get_distance(
+                            origin, location, metric=metric, actual=actual
+                        ),
+                        -(offset + index),
+                    )
+                    if len(heap) < results:
+                        heapq.heappush(heap, (*entry, location, chunk.columns(index)))
+                    elif entry > heap[0][:2]:
+                        heapq.heapreplace(
+                            heap, (*entry, location, chunk.columns(index))
+                        )
+                    else:
+                        continue
+
+                    if len(heap) >= results:
+                        # the largest central angle a row could still be closer at
+                        angle = (
+                            -heap[0][0]
+                            / (radius * (1.0 - tolerance))
+                            * (1.0 + PLANAR_ROUNDING_SLACK)
+                        )
+                        threshold = 1.0 if angle >= pi else sin(angle / 2.0) ** 2
+
+                offset += len(chunk)
+
+        if len(report.malformed) > 0:
+            # NOTE: malformed rows are skipped like they are when loading the catalog
+            warnings.warn(report.to_text())
+
+        return StoreResults(
+            (
+                StoreResult(
+                    store=build_store(location, columns),
+                    metric=metric,
+                    distance=-distance,
+                )
+                for (distance, _, location, columns) in sorted(heap, reverse=True)
+            ),
+            partial=partial,
+        )
+
+    def get_distance(
+        self,
+        origin: GeoLocation,
+        target: GeoLocation,
+        metric: bool = False,
+        actual: bool = False,
+        method: Optional[str] = None,
+    ) -> float:
+        """Get the distance between two locations.
+
+        :param GeoLocation origin: The starting location
+        :param GeoLocation target: The ending location
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param str method: The name of the distance method to use (one of
+            ``constants.DISTANCE_METHODS``), takes precedence over ``actual``,
+            optional, defaults to None
+        :raises ValueError: When the given ``method`` is not a known distance method
+        :return: The distance between the given coordinates
+        :rtype: float
+        """
+
+        if method is None:
+            method = "vincenty" if actual else "haversine"
+        elif method not in constants.DISTANCE_METHODS:
+            raise ValueError(
+                f"unknown distance method {method!r}, "
+                f"expected one of {constants.DISTANCE_METHODS!r}"
+            )
+        return getattr(self, f"_{method}_distance")(origin, target, metric=metric)
+
+    def _geocode_query(
+        self, query: str, deadline: Optional[Deadline] = None
+    ) -> GeoLocation:
+        """Send a geocoding request for a normalized query and measure it.
+
+        The location is stored in the ``geocode_cache`` (if there is one).
+
+        :param str query: The normalized location query
+        :param Optional[Deadline] deadline: The deadline bounding the time waited for
+            the geocoding service to respond, optional, defaults to the timeout of
+            Geocoder
+        :raises DeadlineExceeded: When the request does not finish before the deadline
+        :return: The location of the query
+        :rtype: GeoLocation
+        """
+
+        options: Dict[str, Any] = {}
+        if deadline is not None:
+            if deadline.expired:
+                raise DeadlineExceeded(
+                    f"geocoding {query!r} was started past the deadline"
+                )
+            options["timeout"] = deadline.remaining()
+        if self.geocoder_url is not None:
+            options["url"] = self.geocoder_url
+        try:
+            with measure(self._geocode_seconds, self._geocode_errors):
+                location = geocode(query, session=self.session, **options)
+        except Exception as exc:
+            # NOTE: Geocoder reports timed out requests as locations without
+            # coordinates, so any failure past the deadline is taken as a timeout
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded(
+                    f"geocoding {query!r} did not finish before the deadline"
+                ) from exc
+            raise
+
+        cache = self.geocode_cache
+        if cache is not None:
+            cache.put(query, location)
+        return location
+
+    def _geocode_shared(
+        self, query: str, deadline: Optional[Deadline] = None
+    ) -> GeoLocation:
+        """Geocode a location query, sharing the geocode of equivalent queries.
+
+        The request of a shared geocode is bounded by the deadline of the caller that
+        started it. Callers whose own deadline has not passed when a shared geocode
+        is cut short by the deadline of another caller start a geocode of their own.
+
+        :param str query: The location query
+        :param Optional[Deadline] deadline: The deadline the geocode must finish by,
+            optional, defaults to None
+        :raises DeadlineExceeded: When the geocode does not finish before the deadline
+        :return: The location of the query
+        :rtype: GeoLocation
+        """
+
+        cache = self.geocode_cache
+        if cache is not None:
+            location = cache.get(query)
+            if location is not None:
+                return location
+
+        (key, normalized) = (query_key(query), normalize_query(query))
+        while True:
+            try:
+                return self._geocode_flight.do(
+                    key, self._geocode_query, normalized, deadline
+                )
+            except DeadlineExceeded:
+                if deadline is not None and deadline.expired:
+                    raise
+
+    def _geocode(self, query: str, deadline: Optional[Deadline] = None) -> GeoLocation:
+        """Geocode a location query, waiting for it until a deadline.
+
+        :param str query: The location query
+        :param Optional[Deadline] deadline: The deadline the geocode must finish by,
+            optional, defaults to None
+        :raises DeadlineExceeded: When the geocode does not finish before the deadline
+        :return: The location of the query
+        :rtype: GeoLocation
+        """
+
+        if deadline is None:
+            return self._geocode_shared(query)
+
+        # NOTE: cached locations are returned even past the deadline (without waiting
+        # on the ``io_executor``)
+        cache = self.geocode_cache
+        if cache is not None:
+            location = cache.get(query)
+            if location is not None:
+                return location
+        if deadline.expired:
+            raise DeadlineExceeded(f"geocoding {query!r} was started past the deadline")
+        # NOTE: the (possibly shared) geocode runs on the ``io_executor`` so a caller
+        # joining the geocode of a caller with a later deadline (or none at all) only
+        # waits for it until its own deadline
+        shared = self.io_executor.submit(self._geocode_shared, query, deadline)
+        try:
+            return shared.result(timeout=deadline.remaining())
+        except concurrent.futures.TimeoutError as exc:
+            raise DeadlineExceeded(
+                f"geocoding {query!r} did not finish before the deadline"
+            ) from exc
+
+    def warm_geocode_cache(
+        self,
+        queries: Iterable[str],
+        rate: Optional[float] = constants.WARM_RATE,
+        workers: int = constants.WARM_WORKERS,
+    ) -> WarmReport:
+        """Geocode queries into the ``geocode_cache`` before any search asks for them.
+
+        Queries are geocoded by ``workers`` threads sending at most ``rate`` requests
+        per second. Equivalent queries are only geocoded once and queries the cache
+        already holds a fresh location for are skipped.
+
+        :param Iterable[str] queries: The location queries (blank queries are skipped)
+        :param Optional[float] rate: The amount of geocoding requests sent per second,
+            optional, defaults to ``constants.WARM_RATE`` (None sends them unlimited)
+        :param int workers: The amount of geocoding requests sent at once,
+            optional, defaults to ``constants.WARM_WORKERS``
+        :raises ValueError: When the finder has no ``geocode_cache_path`` or the
+            ``rate`` or ``workers`` are not positive
+        :return: The counts of the added, fresh and failed queries
+        :rtype: WarmReport
+        """
+
+        cache = self.geocode_cache
+        if cache is None:
+            raise ValueError("finder has no geocode cache to warm (geocode_cache_path)")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, received {workers!r}")
+        limiter = None if rate is None else RateLimiter(rate)
+
+        unique: Dict[str, str] = {}
+        for query in queries:
+            if len(query.strip()) > 0:
+                unique.setdefault(query_key(query), normalize_query(query))
+
+        def _warm(query: str) -> Tuple[str, Optional[str]]:
+            if cache.is_fresh(query):
+                return ("fresh", None)
+            if limiter is not None:
+                limiter.wait()
+            try:
+                self._geocode_query(query)
+            except Exception as exc:
+                return ("failed", type(exc).__name__)
+            return ("added", None)
+
+        report = WarmReport()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for (outcome, error) in executor.map(_warm, unique.values()):
+                if outcome == "added":
+                    report.added += 1
+                    self._geocode_warmed.inc()
+                elif outcome == "fresh":
+                    report.fresh += 1
+                else:
+                    report.errors[error] = report.errors.get(error, 0) + 1
+        return report
+
+    def find_stores(
+        self,
+        query: str,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        planar: bool = False,
+        streaming: bool = False,
+        timeout: Optional[float] = None,
+        partial: bool = False,
+    ) -> StoreResults:
+        """Get closest stores to a given location ``query``.
+
+        .. note:: The given ``query`` goes through the Google Geocoding API using the
+            Geocoder package. This can handle various types of addresses such as
+            "The White House" and raw zip codes 12345-123.
+
+        :param str query: The location query
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return,
+            optional, defaults to 1
+        :param bool planar: Rank stores using the planar approximation and only
+            calculate exact distances for stores that could be among the results,
+            optional, defaults to False
+        :param bool streaming: Scan the store locations file in a single pass rather
+            than loading it into the ``catalog``, optional, defaults to False
+        :param Optional[float] timeout: The amount of seconds the geocode and search
+            must finish within, optional, defaults to None
+        :param bool partial: Return the best of the stores measured so far (flagged as
+            ``partial``) rather than raising when the search hits the ``timeout``,
+            optional, defaults to False
+        :raises ValueError: When fewer than 1 ``results`` are requested
+        :raises DeadlineExceeded: When the geocode (or search, unless ``partial`` is
+            requested) does not finish within the ``timeout``
+        :return: A list of ``StoreResult`` instances
+        :rtype: StoreResults
+        """
+
+        if results < 1:
+            raise ValueError(f"results must be at least 1, received {results!r}")
+        with measure(self._query_seconds, self._query_errors):
+            deadline = Deadline.from_timeout(timeout)
+            origin = self._geocode(query, deadline=deadline)
+
+            return self.find_nearest(
+                origin,
+                metric=metric,
+                actual=actual,
+                results=results,
+                planar=planar,
+                streaming=streaming,
+                timeout=(None if deadline is None else deadline.remaining()),
+                partial=partial,
+            )
+
+    async def _geocode_executor(
+        self, query: str, deadline: Optional[Deadline] = None
+    ) -> GeoLocation:
+        """Geocode a location query on the ``io_executor``.
+
+        :param str query: The location query
+        :param Optional[Deadline] deadline: The deadline the geocode must finish by,
+            optional, defaults to None
+        :return: The location of the query
+        :rtype: GeoLocation
+        """
+
+        # NOTE: inside coroutines this is the running loop (``get_running_loop`` is
+        # only available from Python 3.7)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.io_executor, self._geocode_shared, query, deadline
+        )
+
+    async def _geocode_async(
+        self, query: str, deadline: Optional[Deadline] = None
+    ) -> GeoLocation:
+        """Geocode a location query without blocking the running event loop.
+
+        Equivalent queries awaited concurrently on the same event loop share one
+        geocode, which is retried by callers whose own deadline has not passed when
+        it is cut short by the deadline of the caller that started it.
+
+        :param str query: The location query
+        :param Optional[Deadline] deadline: The deadline the geocode must finish by,
+            optional, defaults to None
+        :raises DeadlineExceeded: When the geocode does not finish before the deadline
+        :return: The location of the query
+        :rtype: GeoLocation
+        """
+
+        while True:
+            try:
+                return await self._async_geocode_flight.do(
+                    query_key(query), self._geocode_executor, query, deadline
+                )
+            except DeadlineExceeded:
+                if deadline is not None and deadline.expired:
+                    raise
+
+    async def find_stores_async(
+        self,
+        query: str,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        planar: bool = False,
+        streaming: bool = False,
+        timeout: Optional[float] = None,
+        partial: bool = False,
+    ) -> StoreResults:
+        """Get closest stores to a given location ``query`` from an event loop.
+
+        The geocoding request runs on the ``io_executor`` (over the pooled
+        connections of the ``session``) and the search runs on the ``cpu_executor``,
+        so the event loop is never blocked. Equivalent queries awaited concurrently
+        on the same event loop share one geocode.
+
+        :param str query: The location query
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return,
+            optional, defaults to 1
+        :param bool planar: Rank stores using the planar approximation,
+            optional, defaults to False
+        :param bool streaming: Scan the store locations file in a single pass rather
+            than loading it into the ``catalog``, optional, defaults to False
+        :param Optional[float] timeout: The amount of seconds the geocode and search
+            must finish within, optional, defaults to None
+        :param bool partial: Return the best of the stores measured so far rather than
+            raising when the search hits the ``timeout``, optional, defaults to False
+        :raises ValueError: When fewer than 1 ``results`` are requested
+        :raises DeadlineExceeded: When the geocode (or search, unless ``partial`` is
+            requested) does not finish within the ``timeout``
+        :return: A list of ``StoreResult`` instances
+        :rtype: StoreResults
+        """
+
+        if results < 1:
+            raise ValueError(f"results must be at least 1, received {results!r}")
+        with measure(self._query_seconds, self._query_errors):
+            deadline = Deadline.from_timeout(timeout)
+            # NOTE: every caller only awaits the (possibly shared) geocode until its
+            # own deadline
+            geocoding = self._geocode_async(query, deadline=deadline)
+            if deadline is None:
+                origin = await geocoding
+            else:
+                try:
+                    origin = await asyncio.wait_for(geocoding, deadline.remaining())
+                except asyncio.TimeoutError as exc:
+                    raise DeadlineExceeded(
+                        f"geocoding {query!r} did not finish before the deadline"
+                    ) from exc
+
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                self.cpu_executor,
+                functools.partial(
+                    self.find_nearest,
+                    origin,
+                    metric=metric,
+                    actual=actual,
+                    results=results,
+                    planar=planar,
+                    streaming=streaming,
+                    timeout=(None if deadline is None else deadline.remaining()),
+                    partial=partial,
+                ),
+            )
+
+    async def find_stores_batch_async(
+        self,
+        queries: Sequence[str],
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        planar: bool = False,
+        streaming: bool = False,
+        timeout: Optional[float] = None,
+        partial: bool = False,
+    ) -> List[StoreResults]:
+        """Get closest stores to many location queries concurrently.
+
+        :param Sequence[str] queries: The location queries
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return per query,
+            optional, defaults to 1
+        :param bool planar: Rank stores using the planar approximation,
+            optional, defaults to False
+        :param bool streaming: Scan the store locations file in a single pass rather
+            than loading it into the ``catalog``, optional, defaults to False
+        :param Optional[float] timeout: The amount of seconds every query of the batch
+            must finish within, optional, defaults to None
+        :param bool partial: Return the best of the stores measured so far rather than
+            raising when a search hits the ``timeout``, optional, defaults to False
+        :raises DeadlineExceeded: When any geocode (or search, unless ``partial`` is
+            requested) does not finish within the ``timeout``
+        :return: A list of ``StoreResult`` lists in the same order as ``queries``
+        :rtype: List[StoreResults]
+        """
+
+        return list(
+            await asyncio.gather(
+                *(
+                    self.find_stores_async(
+                        query,
+                        metric=metric,
+                        actual=actual,
+                        results=results,
+                        planar=planar,
+                        streaming=streaming,
+                        timeout=timeout,
+                        partial=partial,
+                    )
+                    for query in queries
+                )
+            )
+        )
+
+    def _grid_index(self, snapshot: CatalogSnapshot) -> GridIndex:
+        """Get a grid index of the catalog rows of a snapshot.
+
+        :param CatalogSnapshot snapshot: The snapshot to get a grid index of
+        :raises ValueError: When the catalog is a SQLite database
+        :return: The grid index of the snapshot or a newly built grid index
+        :rtype: GridIndex
+        """
+
+        if isinstance(snapshot.spatial_index, GridIndex):
+            return snapshot.spatial_index
+        if not isinstance(snapshot.catalog, StoreCatalog):
+            raise ValueError("grid indexes require a store locations file")
+        return GridIndex.from_catalog(snapshot.catalog, resolution=self.resolution)
+
+    def find_stores_for_points(
+        self,
+        origins: Iterable[Tuple[float, float]],
+        results: int = 1,
+        metric: bool = False,
+        actual: bool = False,
+    ) -> PointResults:
+        """Get closest stores to many already geocoded origins at once.
+
+        Origins are searched together in cells of ``constants.BATCH_CELL_SIZE``
+        degrees which share a single lookup of candidate stores in the grid index (see
+        ``nearest_for_points``), so no origin is ever geocoded or turned into
+        ``StoreResult`` instances.
+
+        .. note:: The grid index of the ``snapshot`` is used if an ``index`` of
+            "grid" was requested, otherwise a grid index is built for every call.
+
+        :param Iterable[Tuple[float, float]] origins: The latitudes and longitudes (in
+            degrees) of the origins
+        :param int results: The number of closest stores to find per origin,
+            optional, defaults to 1
+        :param bool metric: Return distances in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :raises ValueError: When the catalog is a SQLite database
+        :return: A tuple of arrays of origin indexes, store ids (see
+            ``CatalogSnapshot.store``) and distances, where every origin gets
+            ``results`` consecutive rows ordered by distance (fewer only if the
+            catalog has fewer stores)
+        :rtype: Tuple[array, array, array]
+        """
+
+        snapshot = self.snapshot
+        if isinstance(snapshot.catalog, StoreDatabase):
+            raise ValueError("batched searches require a store locations file")
+
+        radius = constants.EARTH_RADIUS
+        if not metric:
+            radius = radius * constants.IMPERIAL_RATIO
+        return nearest_for_points(
+            snapshot,
+            self._grid_index(snapshot),
+            origins,
+            results=results,
+            radius=radius,
+            cell_size=constants.BATCH_CELL_SIZE,
+            exact=(
+                functools.partial(self.get_distance, metric=metric, actual=True)
+                if actual
+                else None
+            ),
+            tolerance=(constants.ELLIPSOID_TOLERANCE if actual else 0.0),
+        )
+
+    def assign_points(
+        self,
+        points: Iterable[CoveragePoint],
+        metric: bool = False,
+        assignments: Optional[IO[str]] = None,
+        workers: Optional[int] = None,
+    ) -> CoverageReport:
+        """Assign many labeled points to their nearest stores.
+
+        Points are streamed through the batched search (see ``assign_points`` of
+        ``coverage``) by a pool of processes in chunks, only the aggregates of the
+        distances of every store are kept in memory.
+
+        .. note:: The grid index of the ``snapshot`` is used if an ``index`` of
+            "grid" was requested, otherwise a grid index is built for every call.
+
+        :param Iterable[CoveragePoint] points: The labels, latitudes and longitudes
+            (in degrees) of the points
+        :param bool metric: Use distances in kilometers rather than miles,
+            optional, defaults to False
+        :param IO[str] assignments: An opened file the nearest store of every point
+            is written to as CSV, optional, defaults to None
+        :param int workers: The amount of processes assigning points,
+            optional, defaults to the amount of CPUs
+        :raises ValueError: When the catalog is a SQLite database
+        :return: The aggregates of the distances of the points by store id
+        :rtype: CoverageReport
+        """
+
+        snapshot = self.snapshot
+        if isinstance(snapshot.catalog, StoreDatabase):
+            raise ValueError("coverage reports require a store locations file")
+
+        radius = constants.EARTH_RADIUS
+        if not metric:
+            radius = radius * constants.IMPERIAL_RATIO
+        return assign_points(
+            snapshot,
+            self._grid_index(snapshot),
+            points,
+            radius=radius,
+            assignments=assignments,
+            workers=workers,
+        )
+
+    def build_store_graph(
+        self, k: int = constants.GRAPH_NEIGHBORS, metric: bool = False
+    ) -> StoreGraph:
+        """Build the graph of the ``k`` nearest sibling stores of every store.
+
+        .. note:: The grid index of the ``snapshot`` is used if an ``index`` of
+            "grid" was requested, otherwise a grid index is built for every call.
+
+        :param int k: The amount of nearest sibling stores to find per store,
+            optional, defaults to ``constants.GRAPH_NEIGHBORS``
+        :param bool metric: Use distances in kilometers rather than miles,
+            optional, defaults to False
+        :raises ValueError: When the catalog is a SQLite database
+        :return: A graph of the nearest sibling stores keyed by store ids (see
+            ``CatalogSnapshot.store``)
+        :rtype: StoreGraph
+        """
+
+        snapshot = self.snapshot
+        if isinstance(snapshot.catalog, StoreDatabase):
+            raise ValueError("store graphs require a store locations file")
+
+        radius = constants.EARTH_RADIUS
+        if not metric:
+            radius = radius * constants.IMPERIAL_RATIO
+        return StoreGraph.build(
+            snapshot,
+            self._grid_index(snapshot),
+            k,
+            radius=radius,
+            metric=metric,
+        )
+
+    def _search(
+        self,
+        key: Tuple,
+        search: Callable[..., StoreResults],
+        *args,
+        deadline: Optional[Deadline] = None,
+        **kwargs,
+    ) -> StoreResults:
+        """Run a search, sharing it with concurrent callers running the same search.
+
+        :param Tuple key: The key identifying the search
+        :param Callable[..., StoreResults] search: The search method to run
+        :param Optional[Deadline] deadline: The deadline the search must finish by,
+            optional, defaults to None
+        :return: The results of the (possibly shared) search
+        :rtype: StoreResults
+        """
+
+        # NOTE: searches bound by a deadline are never shared as the deadline of one
+        # caller must not cut short the search of another
+        if deadline is None:
+            return self._search_flight.do(key, search, *args, **kwargs)
+        return search(*args, deadline=deadline, **kwargs)
+
+    def find_nearest(
+        self,
+        origin: GeoLocation,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        planar: bool = False,
+        streaming: bool = False,
+        timeout: Optional[float] = None,
+        partial: bool = False,
+    ) -> StoreResults:
+        """Get closest stores to an already geocoded ``origin``.
+
+        :param GeoLocation origin: The starting location
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return,
+            optional, defaults to 1
+        :param bool planar: Rank stores using the planar approximation and only
+            calculate exact distances for stores that could be among the results,
+            optional, defaults to False
+        :param bool streaming: Scan the store locations file in a single pass rather
+            than loading it into the ``catalog``, optional, defaults to False
+        :param Optional[float] timeout: The amount of seconds the search must finish
+            within, optional, defaults to None
+        :param bool partial: Return the best of the stores measured so far (flagged as
+            ``partial``) rather than raising when the search hits the ``timeout``,
+            optional, defaults to False
+        :raises ValueError: When fewer than 1 ``results`` are requested
+        :raises DeadlineExceeded: When the search does not finish within the
+            ``timeout`` (unless ``partial`` is requested)
+        :return: A list of ``StoreResult`` instances
+        :rtype: StoreResults
+        """
+
+        if results < 1:
+            raise ValueError(f"results must be at least 1, received {results!r}")
+        with measure(self._search_seconds, self._search_errors):
+            deadline = Deadline.from_timeout(timeout)
+            # NOTE: streaming scans must be checked first as they never load the catalog
+            # NOTE: concurrent callers running identical searches share one search
+            if streaming:
+                store_results = self._search(
+                    (origin.latitude, origin.longitude, results, metric, actual),
+                    self._find_streaming,
+                    origin,
+                    metric=metric,
+                    actual=actual,
+                    results=results,
+                    deadline=deadline,
+                )
+                return self._finish(store_results, partial=partial)
+
+            # the snapshot is read once so the whole search runs on the same catalog
+            # even if a reloaded catalog is swapped in while searching
+            snapshot = self.snapshot
+            cache = self.result_cache
+            if cache is None:
+                store_results = self._search(
+                    (
+                        snapshot.version,
+                        origin.latitude,
+                        origin.longitude,
+                        results,
+                        metric,
+                        actual,
+                        planar,
+                    ),
+                    self._find_snapshot,
+                    snapshot,
+                    origin,
+                    metric=metric,
+                    actual=actual,
+                    results=results,
+                    planar=planar,
+                    deadline=deadline,
+                )
+                return self._finish(store_results, partial=partial)
+
+            # NOTE: cached searches are run from the quantized origin so every origin
+            # sharing a key gets the same results
+            origin = quantize(origin, self.cache_precision)
+            key = (origin.latitude, origin.longitude, results, metric, actual, planar)
+            store_results = cache.get(key, version=snapshot.version)
+            if store_results is None:
+                store_results = self._search(
+                    (snapshot.version, *key),
+                    self._find_snapshot,
+                    snapshot,
+                    origin,
+                    metric=metric,
+                    actual=actual,
+                    results=results,
+                    planar=planar,
+                    deadline=deadline,
+                )
+                # NOTE: partial results are never cached
+                if not store_results.partial:
+                    cache.put(key, store_results, version=snapshot.version)
+            return self._finish(store_results, partial=partial)
+
+    def _finish(
+        self, store_results: StoreResults, partial: bool = False
+    ) -> StoreResults:
+        """Copy the results of a (possibly shared) search for a single caller.
+
+        :param StoreResults store_results: The results of the search
+        :param bool partial: Whether partial results may be returned,
+            optional, defaults to False
+        :raises DeadlineExceeded: When the results are partial and ``partial`` is
+            not requested
+        :return: A copy of the results
+        :rtype: StoreResults
+        """
+
+        if store_results.partial:
+            self._partial_results.inc()
+            if not partial:
+                raise DeadlineExceeded("search did not finish before the deadline")
+        return StoreResults(store_results, partial=store_results.partial)
+
+    def _find_snapshot(
+        self,
+        snapshot: CatalogSnapshot,
+        origin: GeoLocation,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        planar: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> StoreResults:
+        """Get closest stores to an ``origin`` within a snapshot of the catalog.
+
+        :param CatalogSnapshot snapshot: The snapshot to search
+        :param GeoLocation origin: The starting location
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return,
+            optional, defaults to 1
+        :param bool planar: Rank stores using the planar approximation,
+            optional, defaults to False
+        :param Optional[Deadline] deadline: The deadline the search must finish by,
+            optional, defaults to None
+        :return: A list of ``StoreResult`` instances
+        :rtype: StoreResults
+        """
+
+        table = self.voronoi_table
+        if (
+            table is not None
+            and results == 1
+            and not planar
+            and snapshot.mutations == 0
+            and snapshot.fingerprint.digest == table.digest
+        ):
+            candidates = table.lookup(origin.latitude, origin.longitude)
+            if candidates is not None:
+                if deadline is not None and deadline.expired:
+                    return StoreResults(partial=True)
+                return self._find_table(
+                    snapshot, origin, candidates, metric=metric, actual=actual
+                )
+
+        if snapshot.shards is not None:
+            return self._find_shards(
+                snapshot,
+                origin,
+                metric=metric,
+                actual=actual,
+                results=results,
+                planar=planar,
+                deadline=deadline,
+            )
+
+        if snapshot.spatial_index is None and not planar:
+            return self._find_exhaustive(
+                origin,
+                metric=metric,
+                actual=actual,
+                results=results,
+                snapshot=snapshot,
+                deadline=deadline,
+            )
+
+        # NOTE: index and planar searches only measure a few candidates, so they are
+        # only checked against the deadline before they start
+        if deadline is not None and deadline.expired:
+            return StoreResults(partial=True)
+
+        ranked = self._rank_snapshot(
+            snapshot,
+            origin,
+            metric=metric,
+            actual=actual,
+            results=results,
+            planar=planar,
+        )
+        return StoreResults(
+            StoreResult(
+                store=snapshot.store(store_id), metric=metric, distance=distance
+            )
+            for (distance, store_id) in ranked
+        )
+
+    def _rank_snapshot(
+        self,
+        snapshot: CatalogSnapshot,
+        origin: GeoLocation,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        planar: bool = False,
+    ) -> List[Tuple[float, int]]:
+        """Rank the closest stores of a snapshot with an index or the planar ranking.
+
+        :param CatalogSnapshot snapshot: The snapshot to rank the stores of
+        :param GeoLocation origin: The starting location
+        :param bool metric: Return distances in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of closest stores to rank,
+            optional, defaults to 1
+        :param bool planar: Rank stores using the planar approximation,
+            optional, defaults to False
+        :return: A list of tuples of distances and store ids
+        :rtype: List[Tuple[float, int]]
+        """
+
+        if snapshot.spatial_index is not None:
+            ranked = self._rank_index(
+                origin,
+                results=results,
+                metric=metric,
+                actual=actual,
+                snapshot=snapshot,
+            )
+        else:
+            ranked = self._rank_planar(
+                origin,
+                results=results,
+                metric=metric,
+                actual=actual,
+                snapshot=snapshot,
+            )
+
+        # added and updated stores are few enough to always be measured
+        return heapq.nsmallest(
+            results,
+            [(distance, snapshot.ids[index]) for (distance, index) in ranked]
+            + [
+                (
+                    self.get_distance(
+                        origin, store.geolocation, metric=metric, actual=actual
+                    ),
+                    store_id,
+                )
+                for (store_id, store) in snapshot.delta.items()
+            ],
+        )
+
+    def _find_shards(
+        self,
+        snapshot: CatalogSnapshot,
+        origin: GeoLocation,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        planar: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> StoreResults:
+        """Get closest stores to an ``origin`` from the shards of a snapshot.
+
+        Shards are ordered by a lower bound of their distance to the origin. The
+        closest shard is searched first, then only the shards whose bound is within
+        the ``results``-th best distance found so far are searched (in parallel on the
+        ``shard_executor``) and their rankings are merged into the results.
+
+        :param CatalogSnapshot snapshot: The sharded snapshot to search
+        :param GeoLocation origin: The starting location
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return,
+            optional, defaults to 1
+        :param bool planar: Rank stores using the planar approximation,
+            optional, defaults to False
+        :param Optional[Deadline] deadline: The deadline the search must finish by,
+            optional, defaults to None
+        :raises ValueError: When the snapshot has no ``shards``
+        :return: A list of ``StoreResult`` instances
+        :rtype: StoreResults
+        """
+
+        shards = snapshot.shards
+        if shards is None:
+            raise ValueError("the catalog is not sharded")
+        if deadline is not None and deadline.expired:
+            return StoreResults(partial=True)
+
+        radius = constants.EARTH_RADIUS
+        if not metric:
+            radius = radius * constants.IMPERIAL_RATIO
+        if actual:
+            # the bounds of spherical distances are loosened to bound exact distances
+            radius = radius * (1.0 - constants.ELLIPSOID_TOLERANCE)
+
+        ordered = shards.ordered(origin)
+        if len(ordered) < 1:
+            return StoreResults()
+        rank = functools.partial(
+            self._rank_snapshot,
+            origin=origin,
+            metric=metric,
+            actual=actual,
+            results=results,
+            planar=planar,
+        )
+        ranked = rank(ordered[0][1].snapshot)
+        pending = [
+            shard
+            for (angle, shard) in ordered[1:]
+            if len(ranked) < results or angle * radius <= ranked[-1][0]
+        ]
+
+        partial = False
+        if len(pending) > 0:
+            # NOTE: the calling thread searches one of the shards itself rather than
+            # idly waiting on the executor
+            executor = self.shard_executor
+            shard_futures = [
+                executor.submit(rank, shard.snapshot) for shard in pending[1:]
+            ]
+            ranked = heapq.nsmallest(results, ranked + rank(pending[0].snapshot))
+            try:
+                for future in concurrent.futures.as_completed(
+                    shard_futures,
+                    timeout=(None if deadline is None else deadline.remaining()),
+                ):
+                    ranked = heapq.nsmallest(results, ranked + future.result())
+            except concurrent.futures.TimeoutError:
+                for future in shard_futures:
+                    future.cancel()
+                partial = True
+
+        return StoreResults(
+            (
+                StoreResult(
+                    store=snapshot.store(store_id), metric=metric, distance=distance
+                )
+                for (distance, store_id) in ranked
+            ),
+            partial=partial,
+        )
+
+    def _find_table(
+        self,
+        snapshot: CatalogSnapshot,
+        origin: GeoLocation,
+        candidates: Sequence[int],
+        metric: bool = False,
+        actual: bool = False,
+    ) -> StoreResults:
+        """Get the closest store to an ``origin`` from the candidates of its cell.
+
+        :param CatalogSnapshot snapshot: The snapshot the ``voronoi_table`` is for
+        :param GeoLocation origin: The starting location
+        :param Sequence[int] candidates: The ids of the stores that can be nearest to
+            the origin (see ``VoronoiTable.lookup``)
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :return: A list of the single closest ``StoreResult``
+        :rtype: StoreResults
+        """
+
+        # NOTE: tables are only used for snapshots without mutations, where every
+        # store id is the index of its row in the catalog
+        catalog = snapshot.catalog
+        (distance, store_id) = min(
+            (
+                self.get_distance(
+                    origin, catalog.location(store_id), metric=metric, actual=actual
+                ),
+                store_id,
+            )
+            for store_id in candidates
+        )
+        return StoreResults(
+            [
+                StoreResult(
+                    store=snapshot.store(store_id), metric=metric, distance=distance
+                )
+            ]
+        )
+
+    def _find_exhaustive(
+        self,
+        origin: GeoLocation,
+        metric: bool = False,
+        actual: bool = False,
+        results: int = 1,
+        snapshot: Optional[CatalogSnapshot] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> StoreResults:
+        """Get closest stores by calculating the distance to every store.
+
+        When the ``deadline`` is hit, distances that have not been calculated yet are
+        cancelled and the best of the stores measured so far are returned as
+        ``partial`` results.
+
+        :param GeoLocation origin: The starting location
+        :param bool metric: Return results in kilometers rather than miles,
+            optional, defaults to False
+        :param bool actual: Use Vincenty distance rather than Haversine distance,
+            optional, defaults to False
+        :param int results: The number of discovered results to return,
+            optional, defaults to 1
+        :param CatalogSnapshot snapshot: The snapshot to measure the stores of,
+            optional, defaults to the current ``snapshot``
+        :param Optional[Deadline] deadline: The deadline the search must finish by,
+            optional, defaults to None
+        :return: A list of ``StoreResult`` instances
+        :rtype: StoreResults
+        """
+
+        if snapshot is None:
+            snapshot = self.snapshot
+        partial = False
+        # NOTE: distances finished before they are waited on never time out, so
+        # searches started past the deadline are never submitted
+        if deadline is not None and deadline.expired:
+            return StoreResults(partial=True)
+
+        # initialize a sorted set using the distances as the sorting key
+        # NOTE: this handles inserts into the set using some pre-defined sorting
+        # parameters using the ``bisect`` library more optimally than if I did it myself
+        best_stores = SortedSet(key=lambda store: store.distance)
+
+        # the distances are calculated by the thread pool shared by every search
+        executor = self.executor
+        distance_futures = {
+            executor.submit(
+                self.get_distance,
+                *(origin, store.geolocation),
+                **{"metric": metric, "actual": actual},
+            ): store
+            for (_, store) in snapshot.stores()
+        }
 
-        # building a thread pool to maximize how many distance calculations we can do
-        # at a time is just a nicety for a code-challenge
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=self.max_workers
-        ) as executor:
-            distance_futures = {
-                executor.submit(
-                    self.get_distance,
-                    *(origin, store.geolocation),
-                    **{"metric": metric, "actual": actual},
-                ): store
-                for store in self.stores
-            }
-
-            for future in concurrent.futures.as_completed(distance_futures):
+        try:
+            for future in concurrent.futures.as_completed(
+                distance_futures,
+                timeout=(None if deadline is None else deadline.remaining()),
+            ):
                 future_store: Store = distance_futures[future]
                 try:
                     result = StoreResult(
@@ -200,5 +2272,11 @@ class StoreFinder(object):
                     )
                 else:
                     best_stores.add(result)
+        except concurrent.futures.TimeoutError:
+            # NOTE: cancelling the pending distances frees the shared executor for
+            # other searches as soon as the distances that are already running finish
+            for future in distance_futures:
+                future.cancel()
+            partial = True
 
-        return best_stores[:results]
+        return StoreResults(best_stores[:results], partial=partial)
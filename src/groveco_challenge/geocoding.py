@@ -0,0 +1,120 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains helpers for turning location queries into ``GeoLocation`` instances."""
+
+import time
+import threading
+from typing import Any, Dict, Callable, Optional
+
+import attr
+import geocoder
+import requests
+from requests.adapters import HTTPAdapter
+
+from .models import GeoLocation
+
+
+def normalize_query(query: str) -> str:
+    """Normalize the whitespace of a location query.
+
+    :param str query: The location query
+    :return: The query with surrounding whitespace removed and inner whitespace
+        collapsed into single spaces
+    :rtype: str
+    """
+
+    return " ".join(query.split())
+
+
+def query_key(query: str) -> str:
+    """Build the key identifying equivalent location queries.
+
+    :param str query: The location query
+    :return: The normalized and case-folded query
+    :rtype: str
+    """
+
+    return normalize_query(query).casefold()
+
+
+@attr.s
+class RateLimiter(object):
+    """Spaces out the calls of many threads to at most ``rate`` calls per second.
+
+    Every call to ``wait`` reserves the next free slot of the schedule and sleeps
+    until it comes up, so callers are released evenly rather than in bursts.
+    """
+
+    rate = attr.ib(type=float)
+    clock = attr.ib(type=Callable[[], float], default=time.monotonic, repr=False)
+    sleep = attr.ib(type=Callable[[float], Any], default=time.sleep, repr=False)
+
+    def __attrs_post_init__(self):
+        if self.rate <= 0.0:
+            raise ValueError(f"rate must be greater than 0, received {self.rate!r}")
+        self._lock = threading.Lock()
+        self._next = float("-inf")
+
+    def wait(self):
+        """Block until the calling thread may make its call."""
+
+        with self._lock:
+            now = self.clock()
+            scheduled = max(now, self._next)
+            self._next = scheduled + 1.0 / self.rate
+        if scheduled > now:
+            self.sleep(scheduled - now)
+
+
+def build_session(pool_size: int = 10) -> requests.Session:
+    """Build a session keeping a pool of connections open to geocoding services.
+
+    :param int pool_size: The amount of connections kept open per host,
+        optional, defaults to 10
+    :return: A new session
+    :rtype: requests.Session
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def geocode(
+    query: str,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+    url: Optional[str] = None,
+) -> GeoLocation:
+    """Geocode a location query.
+
+    .. note:: The given ``query`` goes through the Google Geocoding API using the
+        Geocoder package. This can handle various types of addresses such as
+        "The White House" and raw zip codes 12345-123.
+
+    :param str query: The location query
+    :param requests.Session session: The session to send the request with (see
+        ``build_session``), optional, defaults to a new session for every query
+    :param Optional[float] timeout: The amount of seconds to wait for the geocoding
+        service to respond, optional, defaults to the timeout of Geocoder
+    :param Optional[str] url: The URL of a service answering like the Google
+        Geocoding API (such as a ``MockGeocoder``) to send the request to instead,
+        optional, defaults to None
+    :return: The location of the query
+    :rtype: GeoLocation
+    """
+
+    options: Dict[str, Any] = {}
+    if session is not None:
+        options["session"] = session
+    if timeout is not None:
+        options["timeout"] = timeout
+    if url is not None:
+        # NOTE: the client-side rate limits of Geocoder only guard Google's quotas
+        options["url"] = url
+        options["rate_limit"] = False
+    return GeoLocation(*geocoder.google(query, **options).latlng)
@@ -0,0 +1,240 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``StoreGraph`` of the nearest sibling stores of every store."""
+
+import sys
+import heapq
+import struct
+import pathlib
+from math import cos, radians
+from array import array
+from typing import List, Tuple
+
+import attr
+
+from .batch import central_angle
+from .index import GridIndex
+from .catalog import StoreCatalog
+from .snapshot import CatalogSnapshot
+
+# the header of saved graphs as the magic bytes, format version, metric flag, amount
+# of neighbors per store and amount of store ids
+GRAPH_HEADER = struct.Struct("<4sBBqq")
+GRAPH_MAGIC = b"GCSG"
+GRAPH_VERSION = 1
+
+
+def graph_path(filepath: pathlib.Path) -> pathlib.Path:
+    """Get the path a graph of a store locations file is saved to by default.
+
+    :param pathlib.Path filepath: The path to the store locations file
+    :return: The path of the graph next to the store locations file
+    :rtype: pathlib.Path
+    """
+
+    return filepath.with_name(f"{filepath.name}.graph")
+
+
+@attr.s(frozen=True)
+class StoreGraph(object):
+    """The nearest sibling stores of every store in a compact (CSR) adjacency layout.
+
+    The neighbors of the store with id ``store_id`` are the store ids
+    ``neighbors[offsets[store_id]:offsets[store_id + 1]]`` (ordered by distance) along
+    with their ``distances``, so looking up the neighbors of a store never searches.
+    Ids of removed stores simply have no neighbors.
+    """
+
+    offsets = attr.ib(type=array, repr=False)
+    neighbors = attr.ib(type=array, repr=False)
+    distances = attr.ib(type=array, repr=False)
+    metric = attr.ib(type=bool, default=False)
+    k = attr.ib(type=int, default=0)
+
+    @classmethod
+    def build(
+        cls,
+        snapshot: CatalogSnapshot,
+        spatial_index: GridIndex,
+        k: int,
+        radius: float = 1.0,
+        metric: bool = False,
+    ) -> "StoreGraph":
+        """Build the graph of the ``k`` nearest sibling stores of every store.
+
+        :param CatalogSnapshot snapshot: The snapshot of the stores to connect
+        :param GridIndex spatial_index: An index of the catalog rows of the snapshot
+        :param int k: The amount of nearest sibling stores to find per store
+        :param float radius: The radius of the earth in the units of the distances,
+            optional, defaults to 1.0 (central angles)
+        :param bool metric: Whether the ``radius`` is in kilometers rather than miles,
+            optional, defaults to False
+        :raises ValueError: When ``k`` is less than 1 or the catalog is a SQLite
+            database
+        :return: A new graph
+        :rtype: StoreGraph
+        """
+
+        if k < 1:
+            raise ValueError(f"k must be at least 1, received {k!r}")
+
+        catalog = snapshot.catalog
+        if not isinstance(catalog, StoreCatalog):
+            raise ValueError("store graphs require a store locations file")
+        # added and updated stores are few enough to be measured from every store
+        delta = []
+        for (store_id, store) in sorted(snapshot.delta.items()):
+            phi = radians(store.geolocation.latitude)
+            delta.append(
+                (store_id, phi, radians(store.geolocation.longitude), cos(phi))
+            )
+        nodes = [
+            (
+                snapshot.ids[index],
+                catalog.location(index),
+                (catalog.phis[index], catalog.lambdas[index], catalog.cos_phis[index]),
+            )
+            for index in range(len(catalog))
+            if index not in snapshot.tombstones
+        ] + [
+            (store_id, snapshot.delta[store_id].geolocation, (phi, lambda_, cos_phi))
+            for (store_id, phi, lambda_, cos_phi) in delta
+        ]
+        nodes.sort(key=lambda node: node[0])
+
+        offsets = array("q", [0]) * (snapshot.next_id + 1)
+        neighbors = array("q")
+        distances = array("d")
+        next_id = 0
+        for (store_id, location, (phi, lambda_, cos_phi)) in nodes:
+            # ids without a store (removed stores) are left with empty ranges
+            for empty_id in range(next_id, store_id + 1):
+                offsets[empty_id] = len(neighbors)
+            next_id = store_id + 1
+
+            def _angle(index: int) -> float:
+                return central_angle(
+                    phi,
+                    lambda_,
+                    cos_phi,
+                    catalog.phis[index],
+                    catalog.lambdas[index],
+                    catalog.cos_phis[index],
+                )
+
+            # NOTE: one more store is found as the store itself is usually among them
+            ranked = heapq.nsmallest(
+                k + 1,
+                [
+                    (angle, snapshot.ids[index])
+                    for (angle, index) in spatial_index.nearest(
+                        location,
+                        _angle,
+                        radius=1.0,
+                        results=k + 1,
+                        excluded=snapshot.tombstones,
+                    )
+                ]
+                + [
+                    (
+                        central_angle(
+                            phi, lambda_, cos_phi, delta_phi, delta_lambda, delta_cos
+                        ),
+                        delta_id,
+                    )
+                    for (delta_id, delta_phi, delta_lambda, delta_cos) in delta
+                ],
+            )
+            for (angle, neighbor_id) in [
+                entry for entry in ranked if entry[1] != store_id
+            ][:k]:
+                neighbors.append(neighbor_id)
+                distances.append(radius * angle)
+
+        for empty_id in range(next_id, len(offsets)):
+            offsets[empty_id] = len(neighbors)
+
+        return cls(
+            offsets=offsets,
+            neighbors=neighbors,
+            distances=distances,
+            metric=metric,
+            k=k,
+        )
+
+    @classmethod
+    def load(cls, filepath: pathlib.Path) -> "StoreGraph":
+        """Load a graph saved by ``StoreGraph.save``.
+
+        :param pathlib.Path filepath: The path to the saved graph
+        :raises ValueError: When the file is not a saved graph
+        :return: The loaded graph
+        :rtype: StoreGraph
+        """
+
+        with filepath.open("rb") as fp:
+            header = fp.read(GRAPH_HEADER.size)
+            if len(header) < GRAPH_HEADER.size:
+                raise ValueError(f"{filepath!s} is not a store graph")
+            (magic, version, metric, k, count) = GRAPH_HEADER.unpack(header)
+            if magic != GRAPH_MAGIC or version != GRAPH_VERSION:
+                raise ValueError(f"{filepath!s} is not a store graph")
+
+            # NOTE: arrays are always saved little-endian regardless of the platform
+            (offsets, neighbors, distances) = (array("q"), array("q"), array("d"))
+            try:
+                for (values, length) in (
+                    (offsets, count + 1),
+                    (neighbors, None),
+                    (distances, None),
+                ):
+                    values.fromfile(fp, offsets[-1] if length is None else length)
+                    if sys.byteorder == "big":
+                        values.byteswap()
+            except EOFError as exc:
+                raise ValueError(f"{filepath!s} is a truncated store graph") from exc
+
+        return cls(
+            offsets=offsets,
+            neighbors=neighbors,
+            distances=distances,
+            metric=bool(metric),
+            k=k,
+        )
+
+    def save(self, filepath: pathlib.Path):
+        """Save the graph to a file.
+
+        :param pathlib.Path filepath: The path to save the graph to
+        """
+
+        with filepath.open("wb") as fp:
+            fp.write(
+                GRAPH_HEADER.pack(
+                    GRAPH_MAGIC, GRAPH_VERSION, self.metric, self.k, len(self)
+                )
+            )
+            for values in (self.offsets, self.neighbors, self.distances):
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                values.tofile(fp)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def neighbors_of(self, store_id: int) -> List[Tuple[int, float]]:
+        """Get the nearest sibling stores of a store.
+
+        :param int store_id: The id of the store
+        :raises KeyError: When the store id is outside of the graph
+        :return: A list of tuples of store ids and distances ordered by distance
+        :rtype: List[Tuple[int, float]]
+        """
+
+        if not 0 <= store_id < len(self):
+            raise KeyError(f"no store with id {store_id!r}")
+        (start, stop) = (self.offsets[store_id], self.offsets[store_id + 1])
+        return list(zip(self.neighbors[start:stop], self.distances[start:stop]))
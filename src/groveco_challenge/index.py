@@ -0,0 +1,286 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``GridIndex`` used to speed up nearest store searches."""
+
+import heapq
+from math import pi, cos, sin, asin, ceil, floor, radians
+from typing import Dict, List, Tuple, Callable, Iterator, AbstractSet
+
+import attr
+
+from .models import GeoLocation
+from .catalog import StoreCatalog
+
+
+def boundary_angle(
+    origin: GeoLocation, south: float, north: float, west: float, east: float
+) -> float:
+    """Get the smallest central angle from an origin to any location outside a box.
+
+    The box is given in degrees and must contain the origin. Edges beyond the poles
+    (``south <= -90`` or ``north >= 90``) or boxes spanning every longitude
+    (``east - west >= 360``) are considered to be unbounded in that direction.
+
+    :param GeoLocation origin: The origin contained in the box
+    :param float south: The southern edge of the box in degrees
+    :param float north: The northern edge of the box in degrees
+    :param float west: The western edge of the box in degrees (may be < -180)
+    :param float east: The eastern edge of the box in degrees (may be > 180)
+    :return: The smallest central angle in radians (``pi`` if nothing is outside)
+    :rtype: float
+    """
+
+    angles = [pi]
+    if south > -90.0:
+        angles.append(radians(origin.latitude - south))
+    if north < 90.0:
+        angles.append(radians(north - origin.latitude))
+    if east - west < 360.0:
+        cos_phi = cos(radians(origin.latitude))
+        for delta_lambda in (origin.longitude - west, east - origin.longitude):
+            if delta_lambda <= 90.0:
+                # the perpendicular from the origin to the meridian lands on it
+                angles.append(asin(min(cos_phi * sin(radians(delta_lambda)), 1.0)))
+            else:
+                # the closest location of the meridian is the nearest pole
+                angles.append(radians(90.0 - abs(origin.latitude)))
+    return max(min(angles), 0.0)
+
+
+@attr.s
+class GridIndex(object):
+    """Buckets stores into fixed latitude/longitude cells for nearest store searches.
+
+    The requested ``resolution`` (in degrees) is adjusted so that cells evenly divide
+    the globe. Searches start at the cell of the origin and expand outwards in rings
+    of cells until the worst of the best distances is closer than anything outside of
+    the searched rings could be (or until rings become larger than the amount of
+    occupied cells, at which point the remaining occupied cells are measured).
+
+    Since cells are plain buckets of catalog indexes, stores can be added and removed
+    without rebuilding the index.
+    """
+
+    resolution = attr.ib(type=float, default=1.0)
+    cells = attr.ib(type=dict, factory=dict, repr=False)
+
+    def __attrs_post_init__(self):
+        if not self.resolution > 0.0:
+            raise ValueError(f"grid resolution must be positive, got {self.resolution}")
+        self.rows = max(int(ceil(180.0 / self.resolution)), 1)
+        self.columns = max(int(ceil(360.0 / self.resolution)), 1)
+        self.row_height = 180.0 / self.rows
+        self.column_width = 360.0 / self.columns
+
+    @classmethod
+    def from_catalog(
+        cls, catalog: StoreCatalog, resolution: float = 1.0
+    ) -> "GridIndex":
+        """Create a new index containing every store of a catalog.
+
+        :param StoreCatalog catalog: The catalog to index
+        :param float resolution: The size of the cells in degrees,
+            optional, defaults to 1.0
+        :return: A new grid index
+        :rtype: GridIndex
+        """
+
+        index = cls(resolution=resolution)
+        for (store_index, (latitude, longitude)) in enumerate(
+            zip(catalog.latitudes, catalog.longitudes)
+        ):
+            index.add(store_index, latitude, longitude)
+        return index
+
+    def cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Get the cell containing the given coordinates.
+
+        :param float latitude: The latitude in degrees
+        :param float longitude: The longitude in degrees
+        :return: A tuple of the row and column of the cell
+        :rtype: Tuple[int, int]
+        """
+
+        row = min(
+            max(int(floor((latitude + 90.0) / self.row_height)), 0), self.rows - 1
+        )
+        column = int(floor((longitude + 180.0) / self.column_width)) % self.columns
+        return (row, column)
+
+    def add(self, store_index: int, latitude: float, longitude: float):
+        """Add a store to the index.
+
+        :param int store_index: The catalog index of the store
+        :param float latitude: The latitude of the store in degrees
+        :param float longitude: The longitude of the store in degrees
+        """
+
+        self.cells.setdefault(self.cell(latitude, longitude), []).append(store_index)
+
+    def remove(self, store_index: int, latitude: float, longitude: float):
+        """Remove a store from the index.
+
+        :param int store_index: The catalog index of the store
+        :param float latitude: The latitude the store was indexed at in degrees
+        :param float longitude: The longitude the store was indexed at in degrees
+        :raises KeyError: When the store is not in the index
+        """
+
+        cell = self.cell(latitude, longitude)
+        try:
+            self.cells[cell].remove(store_index)
+        except (KeyError, ValueError):
+            raise KeyError(f"store {store_index!r} is not indexed in cell {cell!r}")
+        if len(self.cells[cell]) < 1:
+            del self.cells[cell]
+
+    def _ring(self, row: int, column: int, radius: int) -> Iterator[Tuple[int, int]]:
+        """Generate the cells (unwrapped) that are ``radius`` cells away from a cell.
+
+        :param int row: The row of the center cell
+        :param int column: The column of the center cell
+        :param int radius: The distance in cells of the ring from the center cell
+        :return: Yields tuples of rows and (unwrapped) columns
+        :rtype: Iterator[Tuple[int, int]]
+        """
+
+        if radius == 0:
+            yield (row, column)
+            return
+        for offset in range(-radius, radius + 1):
+            yield (row - radius, column + offset)
+            yield (row + radius, column + offset)
+        for offset in range(-radius + 1, radius):
+            yield (row + offset, column - radius)
+            yield (row + offset, column + radius)
+
+    def _expand(
+        self, origin: GeoLocation
+    ) -> Iterator[Tuple[List[Tuple[int, int]], float]]:
+        """Generate the occupied cells around an origin in rings of growing size.
+
+        Each ring is generated along with the smallest central angle from the origin
+        to any location outside of the rings generated so far. Once rings have more
+        cells than there are occupied cells, every remaining occupied cell is
+        generated at once (with an angle of ``pi``) as that is cheaper than walking
+        the rings.
+
+        :param GeoLocation origin: The location to expand from
+        :return: Yields tuples of occupied cells and central angles in radians
+        :rtype: Iterator[Tuple[List[Tuple[int, int]], float]]
+        """
+
+        (row, column) = self.cell(origin.latitude, origin.longitude)
+        # ring boundaries are measured from the origin with a longitude in [-180, 180)
+        bounded_origin = GeoLocation(
+            latitude=origin.latitude,
+            longitude=(origin.longitude + 180.0) % 360.0 - 180.0,
+        )
+        visited = set()
+        max_radius = max(self.rows, self.columns)
+
+        for ring_radius in range(max_radius + 1):
+            if 8 * ring_radius > len(self.cells):
+                yield ([cell for cell in self.cells if cell not in visited], pi)
+                return
+
+            ring = []
+            for (ring_row, ring_column) in self._ring(row, column, ring_radius):
+                if not 0 <= ring_row < self.rows:
+                    continue
+                cell = (ring_row, ring_column % self.columns)
+                if cell in visited:
+                    continue
+                visited.add(cell)
+                if cell in self.cells:
+                    ring.append(cell)
+
+            yield (
+                ring,
+                boundary_angle(
+                    bounded_origin,
+                    south=-90.0 + (row - ring_radius) * self.row_height,
+                    north=-90.0 + (row + ring_radius + 1) * self.row_height,
+                    west=-180.0 + (column - ring_radius) * self.column_width,
+                    east=-180.0 + (column + ring_radius + 1) * self.column_width,
+                ),
+            )
+
+    def nearest(
+        self,
+        origin: GeoLocation,
+        distance: Callable[[int], float],
+        radius: float,
+        results: int = 1,
+        tolerance: float = 0.0,
+        excluded: AbstractSet[int] = frozenset(),
+    ) -> List[Tuple[float, int]]:
+        """Find the closest stores to an origin.
+
+        :param GeoLocation origin: The location to search from
+        :param Callable[[int], float] distance: A callable returning the distance
+            from the origin to the store of a given catalog index
+        :param float radius: The radius of the earth in the units returned by the
+            ``distance`` callable, used to convert ring boundaries into distances
+        :param int results: The number of closest stores to find,
+            optional, defaults to 1
+        :param float tolerance: The relative difference allowed between the values of
+            ``distance`` and spherical distances, optional, defaults to 0.0
+        :param AbstractSet[int] excluded: The indexes of stores to skip,
+            optional, defaults to an empty set
+        :return: A list of tuples of distances and catalog indexes
+        :rtype: List[Tuple[float, int]]
+        """
+
+        best: List[Tuple[float, int]] = []
+        for (cells, angle) in self._expand(origin):
+            best.extend(
+                (distance(store_index), store_index)
+                for cell in cells
+                for store_index in self.cells[cell]
+                if store_index not in excluded
+            )
+            best = heapq.nsmallest(results, best)
+            if len(best) >= results and best[-1][0] <= angle * radius * (
+                1.0 - tolerance
+            ):
+                break
+
+        return best
+
+    def within(
+        self,
+        origin: GeoLocation,
+        distance: Callable[[int], float],
+        radius: float,
+        limit: float,
+        excluded: AbstractSet[int] = frozenset(),
+    ) -> List[Tuple[float, int]]:
+        """Find every store within a distance of an origin.
+
+        :param GeoLocation origin: The location to search from
+        :param Callable[[int], float] distance: A callable returning the spherical
+            distance from the origin to the store of a given catalog index
+        :param float radius: The radius of the earth in the units returned by the
+            ``distance`` callable, used to convert ring boundaries into distances
+        :param float limit: The largest distance of the stores to find
+        :param AbstractSet[int] excluded: The indexes of stores to skip,
+            optional, defaults to an empty set
+        :return: A list of tuples of distances and catalog indexes (in no order)
+        :rtype: List[Tuple[float, int]]
+        """
+
+        found: List[Tuple[float, int]] = []
+        for (cells, angle) in self._expand(origin):
+            for cell in cells:
+                for store_index in self.cells[cell]:
+                    if store_index not in excluded:
+                        store_distance = distance(store_index)
+                        if store_distance <= limit:
+                            found.append((store_distance, store_index))
+            if angle * radius > limit:
+                break
+
+        return found
@@ -0,0 +1,308 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the parallel ingest of store locations files into a ``StoreCatalog``."""
+
+import io
+import os
+import csv
+import pathlib
+import itertools
+import collections
+import concurrent.futures
+from array import array
+from typing import IO, Dict, List, Deque, Tuple, Callable, Iterable, Optional, Generator
+
+import attr
+
+from .catalog import (
+    CSV_HEADERS,
+    STORE_COLUMNS,
+    StoreCatalog,
+    detect_compression,
+    open_store_locations,
+)
+
+# the default amount of bytes of the store locations file parsed by each worker task
+INGEST_CHUNK_BYTES = 16 * 1024 * 1024
+
+# the amount of malformed rows kept as examples in the ``IngestReport``
+MALFORMED_SAMPLE_SIZE = 10
+
+# the parsed columns and malformed rows (by line within the chunk) of a single chunk
+ParsedChunk = Tuple[array, array, Dict[str, List[str]], int, List[Tuple[int, str]]]
+
+
+@attr.s
+class IngestReport(object):
+    """Describes the rows read while ingesting a store locations file.
+
+    Malformed rows are skipped rather than aborting the ingest. They are counted by
+    the reason they were skipped for, and the first few are kept (by line number) as
+    examples in ``samples``.
+    """
+
+    filepath = attr.ib(type=pathlib.Path)
+    rows = attr.ib(type=int, default=0)
+    malformed = attr.ib(type=dict, factory=dict)
+    samples = attr.ib(type=list, factory=list)
+
+    @property
+    def ingested(self) -> int:
+        """The amount of rows that were ingested into the catalog.
+
+        :return: The amount of well-formed rows
+        :rtype: int
+        """
+
+        return self.rows - sum(self.malformed.values())
+
+    def add_malformed(self, line: int, reason: str):
+        """Count a malformed row that was skipped.
+
+        :param int line: The (one-based) line the row ends on
+        :param str reason: The reason the row was skipped for
+        """
+
+        self.malformed[reason] = self.malformed.get(reason, 0) + 1
+        if len(self.samples) < MALFORMED_SAMPLE_SIZE:
+            self.samples.append((line, reason))
+
+    def to_text(self) -> str:
+        """Build a human readable representation of the report.
+
+        :return: A human readable representation of the report
+        :rtype: str
+        """
+
+        skipped = sum(self.malformed.values())
+        text = f"ingested {self.ingested} of {self.rows} rows from {self.filepath!s}"
+        if skipped > 0:
+            reasons = ", ".join(
+                f"{count} {reason}"
+                for (reason, count) in sorted(self.malformed.items())
+            )
+            lines = ", ".join(str(line) for (line, _) in self.samples)
+            text += f", skipped {skipped} malformed rows ({reasons}) at lines {lines}"
+        return text
+
+
+def _parse_chunk(
+    filepath: pathlib.Path, start: int, end: int, positions: Dict[str, int]
+) -> ParsedChunk:
+    """Parse the rows between two byte offsets of a store locations file.
+
+    :param pathlib.Path filepath: The path to the store locations file
+    :param int start: The byte offset of the first row of the chunk
+    :param int end: The byte offset following the last row of the chunk
+    :param Dict[str, int] positions: The positions of the fields in a row keyed by
+        ``Store`` attribute names (see ``CSV_HEADERS``)
+    :return: A tuple of the latitudes, longitudes and string columns of the
+        well-formed rows, the amount of lines read, and the (zero-based) lines and
+        reasons of the malformed rows
+    :rtype: Tuple[array, array, Dict[str, List[str]], int, List[Tuple[int, str]]]
+    """
+
+    with filepath.open("rb") as fp:
+        fp.seek(start)
+        return _parse_block(fp.read(end - start), positions)
+
+
+def _parse_block(block: bytes, positions: Dict[str, int]) -> ParsedChunk:
+    """Parse the rows of a block of bytes of a store locations file.
+
+    :param bytes block: The (decompressed) bytes of whole rows of the file
+    :param Dict[str, int] positions: The positions of the fields in a row keyed by
+        ``Store`` attribute names (see ``CSV_HEADERS``)
+    :return: A tuple of the latitudes, longitudes and string columns of the
+        well-formed rows, the amount of lines read, and the (zero-based) lines and
+        reasons of the malformed rows
+    :rtype: Tuple[array, array, Dict[str, List[str]], int, List[Tuple[int, str]]]
+    """
+
+    content = block.decode("utf-8")
+    latitudes = array("d")
+    longitudes = array("d")
+    columns: Dict[str, List[str]] = {column: [] for column in STORE_COLUMNS}
+    malformed: List[Tuple[int, str]] = []
+    field_count = max(positions.values()) + 1
+    (latitude_position, longitude_position) = (
+        positions["latitude"],
+        positions["longitude"],
+    )
+
+    reader = csv.reader(io.StringIO(content, newline=""))
+    for row in reader:
+        # the zero-based line (within the chunk) the row ends on
+        line = reader.line_num - 1
+        if len(row) < 1:
+            # blank lines are skipped (as done by ``csv.DictReader``)
+            continue
+        elif len(row) < field_count:
+            malformed.append((line, "missing fields"))
+            continue
+        try:
+            latitude = float(row[latitude_position])
+            longitude = float(row[longitude_position])
+        except ValueError:
+            malformed.append((line, "unparsable coordinates"))
+            continue
+        if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+            # NOTE: this comparison also rejects NaN coordinates
+            malformed.append((line, "out of range coordinates"))
+            continue
+
+        latitudes.append(latitude)
+        longitudes.append(longitude)
+        for column in STORE_COLUMNS:
+            columns[column].append(row[positions[column]])
+
+    return (latitudes, longitudes, columns, reader.line_num, malformed)
+
+
+def _chunk_offsets(
+    filepath: pathlib.Path, start: int, chunk_bytes: int
+) -> List[Tuple[int, int]]:
+    """Split a file into ranges of bytes that end on row boundaries.
+
+    .. important:: Rows are split on newlines, so quoted fields of the store
+        locations file must not contain newlines.
+
+    :param pathlib.Path filepath: The path to the file to split
+    :param int start: The byte offset to start splitting from
+    :param int chunk_bytes: The approximate amount of bytes in each range
+    :return: A list of tuples of start and end byte offsets
+    :rtype: List[Tuple[int, int]]
+    """
+
+    size = filepath.stat().st_size
+    offsets = [start]
+    with filepath.open("rb") as fp:
+        while offsets[-1] + chunk_bytes < size:
+            fp.seek(offsets[-1] + chunk_bytes)
+            fp.readline()
+            if fp.tell() >= size:
+                break
+            offsets.append(fp.tell())
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _read_blocks(fp: IO[bytes], block_bytes: int) -> Generator[bytes, None, None]:
+    """Read a stream in blocks of bytes that end on row boundaries.
+
+    .. important:: Rows are split on newlines, so quoted fields of the store
+        locations file must not contain newlines.
+
+    :param IO[bytes] fp: The opened stream to read
+    :param int block_bytes: The approximate amount of bytes in each block
+    :return: Yields blocks of whole rows
+    :rtype: Generator[bytes, None, None]
+    """
+
+    while True:
+        block = fp.read(block_bytes)
+        if len(block) < 1:
+            break
+        yield block + fp.readline()
+
+
+def ingest_catalog(
+    filepath: pathlib.Path,
+    workers: Optional[int] = None,
+    chunk_bytes: int = INGEST_CHUNK_BYTES,
+    compact: bool = False,
+) -> Tuple[StoreCatalog, IngestReport]:
+    """Ingest a store locations file into a ``StoreCatalog``.
+
+    The file is split on row boundaries into chunks of about ``chunk_bytes`` bytes
+    which are parsed by a pool of processes straight into columns. Files with a
+    single chunk are parsed in the current process. Compressed files (see
+    ``detect_compression``) are decoded in a single stream whose blocks of rows are
+    parsed by the pool as they are decoded.
+
+    :param pathlib.Path filepath: The path to the (optionally compressed) store
+        locations file
+    :param int workers: The amount of processes parsing chunks,
+        optional, defaults to the amount of CPUs
+    :param int chunk_bytes: The approximate amount of bytes parsed by each task,
+        optional, defaults to ``INGEST_CHUNK_BYTES``
+    :param bool compact: Build a compact catalog (see ``StoreCatalog``),
+        optional, defaults to False
+    :raises ValueError: When the file is missing any of the ``CSV_HEADERS``
+    :return: A tuple of the ingested catalog and the report of the ingest
+    :rtype: Tuple[StoreCatalog, IngestReport]
+    """
+
+    with open_store_locations(filepath, binary=True) as fp:
+        header_line = fp.readline()
+        header_end = fp.tell()
+        header = next(csv.reader([header_line.decode("utf-8-sig")]), [])
+        missing = [name for name in CSV_HEADERS.values() if name not in header]
+        if len(missing) > 0:
+            raise ValueError(
+                f"store locations file {filepath!s} is missing {missing!r}"
+            )
+        positions = {
+            column: header.index(name) for (column, name) in CSV_HEADERS.items()
+        }
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        tasks: Iterable[Tuple[Callable[..., ParsedChunk], Tuple]]
+        if detect_compression(filepath) is None:
+            offsets = _chunk_offsets(filepath, header_end, max(chunk_bytes, 1))
+            workers = min(workers, len(offsets))
+            tasks = (
+                (_parse_chunk, (filepath, start, end, positions))
+                for (start, end) in offsets
+            )
+        else:
+            # compressed files cannot be seeked into, so they are decoded in a single
+            # stream and blocks of the decoded rows are handed to the workers
+            blocks = _read_blocks(fp, max(chunk_bytes, 1))
+            leading = list(itertools.islice(blocks, 2))
+            workers = min(workers, len(leading))
+            tasks = (
+                (_parse_block, (block, positions))
+                for block in itertools.chain(leading, blocks)
+            )
+
+        if workers > 1:
+            chunks = []
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers
+            ) as executor:
+                # only a few chunks are pending at a time so the decoded blocks of
+                # compressed files are never all held in memory
+                pending: Deque[concurrent.futures.Future] = collections.deque()
+                for (parse, arguments) in tasks:
+                    pending.append(executor.submit(parse, *arguments))
+                    if len(pending) > workers * 2:
+                        chunks.append(pending.popleft().result())
+                chunks.extend(future.result() for future in pending)
+        else:
+            chunks = [parse(*arguments) for (parse, arguments) in tasks]
+
+    latitudes = array("d")
+    longitudes = array("d")
+    columns: Dict[str, List[str]] = {column: [] for column in STORE_COLUMNS}
+    report = IngestReport(filepath=filepath)
+    # the amount of lines (including the header) preceding the current chunk
+    line_offset = 1
+    for (chunk_latitudes, chunk_longitudes, chunk_columns, lines, malformed) in chunks:
+        latitudes.extend(chunk_latitudes)
+        longitudes.extend(chunk_longitudes)
+        for column in STORE_COLUMNS:
+            columns[column].extend(chunk_columns[column])
+        for (line, reason) in malformed:
+            # NOTE: line numbers are one-based like those shown by editors
+            report.add_malformed(line_offset + line + 1, reason)
+        report.rows += len(chunk_latitudes) + len(malformed)
+        line_offset += lines
+
+    return (
+        StoreCatalog.from_columns(latitudes, longitudes, columns, compact=compact),
+        report,
+    )
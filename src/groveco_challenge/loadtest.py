@@ -0,0 +1,507 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the load generator replaying queries and the local ``MockGeocoder``."""
+
+import sys
+import json
+import time
+import random
+import hashlib
+import pathlib
+import threading
+import contextlib
+import subprocess
+import http.server
+import urllib.parse
+import urllib.request
+import concurrent.futures
+from typing import IO, Any, Dict, List, Tuple, Callable, Optional, Sequence, Generator
+
+import attr
+
+from . import constants
+from .finder import StoreFinder
+from .models import Store, GeoLocation
+from .service import StoreService, ThreadedHTTPServer
+from .geocoding import query_key
+
+# a target of a load test which handles a single query, raising on failure
+LoadTarget = Callable[[str], Any]
+
+
+def mock_location(
+    query: str,
+    bounds: Tuple[float, float, float, float] = constants.MOCK_GEOCODER_BOUNDS,
+) -> GeoLocation:
+    """Get the deterministic location the ``MockGeocoder`` returns for a query.
+
+    Equivalent queries (see ``query_key``) always get the same location, which is
+    spread over the ``bounds`` by the digest of the query.
+
+    :param str query: The location query
+    :param Tuple[float, float, float, float] bounds: The southern, western, northern
+        and eastern bounds (in degrees) of the returned locations,
+        optional, defaults to ``constants.MOCK_GEOCODER_BOUNDS``
+    :return: The location of the query
+    :rtype: GeoLocation
+    """
+
+    (south, west, north, east) = bounds
+    digest = hashlib.sha256(query_key(query).encode("utf-8")).digest()
+    return GeoLocation(
+        latitude=south + int.from_bytes(digest[:4], "big") / 2**32 * (north - south),
+        longitude=west + int.from_bytes(digest[4:8], "big") / 2**32 * (east - west),
+    )
+
+
+@attr.s
+class MockGeocoder(object):
+    """A local stand-in for the Google Geocoding API returning deterministic locations.
+
+    Requests to ``/maps/api/geocode/json?address=<query>`` respond like the Google
+    Geocoding API with the location of ``mock_location``, so finders given the
+    ``url`` of a started geocoder (as their ``geocoder_url``) never reach Google.
+    Every response is delayed by ``latency`` seconds to mimic a remote service.
+    """
+
+    host = attr.ib(type=str, default=constants.SERVICE_HOST)
+    port = attr.ib(type=int, default=0)
+    latency = attr.ib(type=float, default=0.0)
+    bounds = attr.ib(
+        type=Tuple[float, float, float, float],
+        default=constants.MOCK_GEOCODER_BOUNDS,
+    )
+
+    def __attrs_post_init__(self):
+        self._server: Optional[ThreadedHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """The URL geocoding requests are sent to (once the geocoder is started).
+
+        :return: The URL of the geocoding endpoint
+        :rtype: str
+        """
+
+        port = self.port if self._server is None else self._server.server_address[1]
+        return f"http://{self.host}:{port}/maps/api/geocode/json"
+
+    def respond(self, path: str) -> Tuple[int, Dict[str, Any]]:
+        """Build the response to a geocoding request.
+
+        :param str path: The requested path (including the query string)
+        :return: A tuple of the status code and the JSON body of the response
+        :rtype: Tuple[int, Dict[str, Any]]
+        """
+
+        url = urllib.parse.urlsplit(path)
+        if url.path != "/maps/api/geocode/json":
+            return (404, {"results": [], "status": "NOT_FOUND"})
+
+        address = urllib.parse.parse_qs(url.query).get("address", [""])[-1]
+        if len(address.strip()) < 1:
+            return (200, {"results": [], "status": "ZERO_RESULTS"})
+
+        location = mock_location(address, bounds=self.bounds)
+        point = {"lat": location.latitude, "lng": location.longitude}
+        return (
+            200,
+            {
+                "results": [
+                    {
+                        "address_components": [],
+                        "formatted_address": address,
+                        "geometry": {
+                            "location": point,
+                            "location_type": "APPROXIMATE",
+                            "viewport": {"northeast": point, "southwest": point},
+                        },
+                        "place_id": hashlib.sha256(
+                            query_key(address).encode("utf-8")
+                        ).hexdigest()[:27],
+                        "types": ["postal_code"],
+                    }
+                ],
+                "status": "OK",
+            },
+        )
+
+    def make_server(self) -> ThreadedHTTPServer:
+        """Create a (not yet started) server handling every request in a new thread.
+
+        :return: The created server
+        :rtype: ThreadedHTTPServer
+        """
+
+        geocoder = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if geocoder.latency > 0.0:
+                    time.sleep(geocoder.latency)
+                (status, body) = geocoder.respond(self.path)
+                content = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args: Any):
+                # NOTE: load tests send far too many requests to log every one
+                pass
+
+        return ThreadedHTTPServer((self.host, self.port), _Handler)
+
+    def start(self) -> "MockGeocoder":
+        """Start serving requests on a background thread.
+
+        :return: The started geocoder
+        :rtype: MockGeocoder
+        """
+
+        if self._server is None:
+            self._server = self.make_server()
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests started by ``start``."""
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> "MockGeocoder":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any):
+        self.stop()
+
+    def serve(self):
+        """Serve requests until interrupted."""
+
+        server = self.make_server()
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+@attr.s
+class LoadTestReport(object):
+    """Describes the throughput, latency and errors of a load test.
+
+    The ``latencies`` (in seconds) of paced load tests are measured from the time
+    every request was scheduled to be sent, so requests delayed by a saturated
+    target count the time they spent waiting.
+    """
+
+    target = attr.ib(type=str)
+    requests = attr.ib(type=int)
+    seconds = attr.ib(type=float)
+    latencies = attr.ib(type=list, factory=list, repr=False)
+    errors = attr.ib(type=dict, factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """The amount of requests completed per second.
+
+        :return: The amount of requests completed per second
+        :rtype: float
+        """
+
+        if self.seconds <= 0.0:
+            return float("inf")
+        return self.requests / self.seconds
+
+    @property
+    def error_rate(self) -> float:
+        """The fraction of requests that failed.
+
+        :return: The fraction of failed requests (0.0 if nothing was requested)
+        :rtype: float
+        """
+
+        if self.requests < 1:
+            return 0.0
+        return sum(self.errors.values()) / self.requests
+
+    def percentile(self, percent: float) -> float:
+        """Get a (nearest-rank) percentile of the latencies.
+
+        :param float percent: The percentile to get (between 0 and 100)
+        :return: The latency in seconds (0.0 if nothing was requested)
+        :rtype: float
+        """
+
+        if len(self.latencies) < 1:
+            return 0.0
+        latencies = sorted(self.latencies)
+        rank = max(int(-(-percent * len(latencies) // 100)), 1)
+        return latencies[min(rank, len(latencies)) - 1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build a dictionary of the report for exporting.
+
+        :return: A dictionary of the counts, throughput, latency percentiles (in
+            seconds) and errors of the load test
+        :rtype: Dict[str, Any]
+        """
+
+        return {
+            "target": self.target,
+            "requests": self.requests,
+            "seconds": self.seconds,
+            "throughput": self.throughput,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "error_rate": self.error_rate,
+            "errors": dict(self.errors),
+        }
+
+    def to_text(self) -> str:
+        """Build a human readable representation of the report.
+
+        :return: A human readable representation of the report
+        :rtype: str
+        """
+
+        text = (
+            f"{self.target:<8} {self.requests} requests in {self.seconds:.2f}s  "
+            f"{self.throughput:>8.1f} requests/s  "
+            f"p50 {self.percentile(50) * 1000:.1f}ms  "
+            f"p95 {self.percentile(95) * 1000:.1f}ms  "
+            f"p99 {self.percentile(99) * 1000:.1f}ms  "
+            f"errors {self.error_rate:.2%}"
+        )
+        if len(self.errors) > 0:
+            text += (
+                " ("
+                + ", ".join(
+                    f"{count} {error}" for (error, count) in sorted(self.errors.items())
+                )
+                + ")"
+            )
+        return text
+
+
+def read_queries(fp: IO[str]) -> List[str]:
+    """Read the queries of a query log with a single query per line.
+
+    :param IO[str] fp: The opened query log, blank lines and lines starting with
+        ``#`` are skipped
+    :return: A list of the queries in the order they were logged
+    :rtype: List[str]
+    """
+
+    return [
+        line.strip()
+        for line in fp
+        if len(line.strip()) > 0 and not line.lstrip().startswith("#")
+    ]
+
+
+def synthetic_queries(
+    stores: Sequence[Store], count: int, seed: int = 0, addresses: float = 0.5
+) -> List[str]:
+    """Build a synthetic workload of ZIP code and address queries.
+
+    Queries are built from the ZIP codes and addresses of the given stores, which
+    are picked with a Zipf-like popularity so popular queries repeat like they do in
+    real traffic.
+
+    :param Sequence[Store] stores: The stores the queries are built from
+    :param int count: The amount of queries to build
+    :param int seed: The seed of the random generator, optional, defaults to 0
+    :param float addresses: The fraction of queries that are addresses rather than
+        ZIP codes, optional, defaults to 0.5
+    :return: A list of queries
+    :rtype: List[str]
+    """
+
+    generator = random.Random(seed)
+    ranked = list(stores)
+    generator.shuffle(ranked)
+    weights = [1.0 / (rank + 1) for rank in range(len(ranked))]
+    return [
+        (
+            f"{store.address}, {store.city}, {store.state} {store.zipcode}"
+            if generator.random() < addresses
+            else store.zipcode
+        )
+        for store in generator.choices(ranked, weights=weights, k=count)
+    ]
+
+
+def library_target(finder: StoreFinder, **options: Any) -> LoadTarget:
+    """Build a target searching stores with a finder.
+
+    :param StoreFinder finder: The finder to search with
+    :param Any options: The keyword arguments given to ``StoreFinder.find_stores``
+    :return: The target
+    :rtype: LoadTarget
+    """
+
+    def _target(query: str) -> Any:
+        return finder.find_stores(query, **options)
+
+    return _target
+
+
+def service_target(url: str, timeout: float = constants.SERVICE_TIMEOUT) -> LoadTarget:
+    """Build a target requesting searches from a running ``StoreService``.
+
+    :param str url: The base URL of the service (such as ``http://127.0.0.1:8080``)
+    :param float timeout: The amount of seconds to wait for every response,
+        optional, defaults to ``constants.SERVICE_TIMEOUT``
+    :return: The target (raising ``urllib.error.HTTPError`` for failed requests)
+    :rtype: LoadTarget
+    """
+
+    def _target(query: str) -> Any:
+        with urllib.request.urlopen(
+            f"{url.rstrip('/')}/stores?{urllib.parse.urlencode({'query': query})}",
+            timeout=timeout,
+        ) as response:
+            return response.read()
+
+    return _target
+
+
+def cli_target(
+    catalog: Optional[pathlib.Path] = None,
+    geocoder_url: Optional[str] = None,
+    arguments: Sequence[str] = (),
+) -> LoadTarget:
+    """Build a target running the command-line in a new process for every query.
+
+    :param pathlib.Path catalog: The store locations file (or database) to search,
+        optional, defaults to the bundled store locations file
+    :param Optional[str] geocoder_url: The URL geocoding requests are sent to,
+        optional, defaults to None
+    :param Sequence[str] arguments: Any other arguments given to the command-line,
+        optional, defaults to ()
+    :return: The target (raising ``subprocess.CalledProcessError`` for failed runs)
+    :rtype: LoadTarget
+    """
+
+    command = [sys.executable, "-c", "from groveco_challenge import cli; cli()"]
+    command.extend(arguments)
+    if catalog is not None:
+        command.extend(["--catalog", str(catalog)])
+    if geocoder_url is not None:
+        command.extend(["--geocoder-url", geocoder_url])
+
+    def _target(query: str) -> Any:
+        # NOTE: ``capture_output`` is only available from Python 3.7
+        return subprocess.run(
+            [*command, "--address", query],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ).stdout
+
+    return _target
+
+
+@contextlib.contextmanager
+def local_service(
+    finder: StoreFinder, timeout: Optional[float] = constants.SERVICE_TIMEOUT
+) -> Generator[str, None, None]:
+    """Serve the searches of a finder on a free local port while in the context.
+
+    :param StoreFinder finder: The finder to serve
+    :param Optional[float] timeout: The amount of seconds every request must finish
+        within, optional, defaults to ``constants.SERVICE_TIMEOUT``
+    :return: A context manager giving the base URL of the service
+    :rtype: Generator[str, None, None]
+    """
+
+    server = StoreService(finder, timeout=timeout, log_requests=False).make_server(
+        port=0
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{constants.SERVICE_HOST}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def run_load(
+    name: str,
+    target: LoadTarget,
+    queries: Sequence[str],
+    rate: Optional[float] = None,
+    concurrency: int = 8,
+) -> LoadTestReport:
+    """Replay queries against a target and measure how it copes.
+
+    With a ``rate`` the queries are sent at a fixed pace (an open loop, as real
+    traffic arrives regardless of how fast it is answered), otherwise every query is
+    sent as soon as one of the ``concurrency`` workers is free.
+
+    :param str name: The name of the target used in the report
+    :param LoadTarget target: The target handling every query
+    :param Sequence[str] queries: The queries to send (in order)
+    :param Optional[float] rate: The amount of queries to send per second,
+        optional, defaults to sending queries as fast as they are answered
+    :param int concurrency: The amount of queries in flight at once,
+        optional, defaults to 8
+    :raises ValueError: When the ``rate`` or ``concurrency`` is not positive
+    :return: The report of the load test
+    :rtype: LoadTestReport
+    """
+
+    if rate is not None and rate <= 0.0:
+        raise ValueError(f"rate must be greater than 0, received {rate!r}")
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, received {concurrency!r}")
+
+    def _send(query: str, scheduled: Optional[float]) -> Tuple[float, Optional[str]]:
+        started = time.perf_counter() if scheduled is None else scheduled
+        error = None
+        try:
+            target(query)
+        except Exception as exc:
+            error = type(exc).__name__
+        return (time.perf_counter() - started, error)
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = []
+        for (position, query) in enumerate(queries):
+            scheduled = None
+            if rate is not None:
+                scheduled = started + position / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0.0:
+                    time.sleep(delay)
+            futures.append(executor.submit(_send, query, scheduled))
+        outcomes = [future.result() for future in futures]
+    seconds = time.perf_counter() - started
+
+    errors: Dict[str, int] = {}
+    for (_, error) in outcomes:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    return LoadTestReport(
+        target=name,
+        requests=len(outcomes),
+        seconds=seconds,
+        latencies=[latency for (latency, _) in outcomes],
+        errors=errors,
+    )
@@ -0,0 +1,605 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``MetricsRegistry`` of counters, gauges and latency histograms."""
+
+import abc
+import time
+import bisect
+import weakref
+import threading
+import contextlib
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+    TypeVar,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Generator,
+)
+
+import attr
+
+from . import constants
+
+# a sample of a metric as the name of the sample, its labels and its value
+Sample = Tuple[str, Dict[str, str], float]
+
+M = TypeVar("M", bound="Metric")
+
+
+class _Token(object):
+    """An object held by a single thread whose collection marks the thread as done."""
+
+
+class ThreadCells(object):
+    """Values that every thread updates in its own cell without taking a lock.
+
+    Each thread only ever writes to its own cell, so updates never contend. Reading
+    the values sums the cells of every thread, and the cells of finished threads are
+    folded into a single retired cell so they are not kept around forever.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cells: Dict[int, List[float]] = {}
+        self._retired = [0.0] * size
+
+    def get(self) -> List[float]:
+        """Get the cell of the current thread.
+
+        :return: The values of the current thread
+        :rtype: List[float]
+        """
+
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._size
+            token = _Token()
+            # NOTE: the token is only referenced by the thread local storage, so it
+            # is collected (retiring the cell) once the thread finishes
+            weakref.finalize(token, self._retire, cell)
+            with self._lock:
+                self._cells[id(cell)] = cell
+            self._local.cell = cell
+            self._local.token = token
+            return cell
+
+    def _retire(self, cell: List[float]):
+        """Fold the cell of a finished thread into the retired cell.
+
+        :param List[float] cell: The cell of the finished thread
+        """
+
+        with self._lock:
+            for (position, value) in enumerate(cell):
+                self._retired[position] += value
+            self._cells.pop(id(cell), None)
+
+    def values(self) -> List[float]:
+        """Sum the cells of every thread.
+
+        :return: The summed values
+        :rtype: List[float]
+        """
+
+        with self._lock:
+            cells = [self._retired, *self._cells.values()]
+        return [sum(values) for values in zip(*cells)]
+
+
+def _format_value(value: float) -> str:
+    """Format the value of a sample for the Prometheus text format.
+
+    :param float value: The value to format
+    :return: The formatted value
+    :rtype: str
+    """
+
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    elif value == float("-inf"):
+        return "-Inf"
+    elif value.is_integer() and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Format the labels of a sample for the Prometheus text format.
+
+    :param Dict[str, str] labels: The labels to format
+    :return: The formatted labels (an empty string if there are no labels)
+    :rtype: str
+    """
+
+    if len(labels) < 1:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for (name, value) in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for (name, value) in escaped) + "}"
+
+
+def _to_labelnames(labelnames: Iterable[str]) -> Tuple[str, ...]:
+    """Convert the names of the labels of a metric to a tuple.
+
+    :param Iterable[str] labelnames: The names of the labels
+    :return: A tuple of the names of the labels
+    :rtype: Tuple[str, ...]
+    """
+
+    return tuple(labelnames)
+
+
+@attr.s
+class Metric(abc.ABC):
+    """The base of the metrics kept by a ``MetricsRegistry``.
+
+    Metrics with ``labelnames`` are never updated themselves, instead ``labels``
+    gives the child metric of every combination of label values.
+    """
+
+    name = attr.ib(type=str)
+    documentation = attr.ib(type=str)
+    labelnames = attr.ib(type=Tuple[str, ...], default=(), converter=_to_labelnames)
+
+    kind = "untyped"
+
+    def __attrs_post_init__(self):
+        # NOTE: children are evolved from (and thus of the same type as) the metric
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._children_lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        """Get the child metric of a combination of label values.
+
+        :param str values: The values of the ``labelnames`` (in order)
+        :raises ValueError: When the amount of values does not match the labelnames
+        :return: The child metric
+        :rtype: Metric
+        """
+
+        child = self._children.get(values)
+        if child is not None:
+            return child
+
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"metric {self.name!r} expects values for {self.labelnames!r}, "
+                f"received {values!r}"
+            )
+        with self._children_lock:
+            child = self._children.get(values)
+            if child is None:
+                child = attr.evolve(self, labelnames=())
+                self._children[values] = child
+            return child
+
+    def children(self: M) -> Iterator[Tuple[Dict[str, str], M]]:
+        """Iterate over the metrics holding values along with their labels.
+
+        :return: An iterator of tuples of labels and metrics
+        :rtype: Iterator[Tuple[Dict[str, str], Metric]]
+        """
+
+        if len(self.labelnames) < 1:
+            yield ({}, self)
+            return
+        with self._children_lock:
+            children = sorted(self._children.items())
+        for (values, child) in children:
+            yield (dict(zip(self.labelnames, values)), child)
+
+    @abc.abstractmethod
+    def samples(self) -> List[Sample]:
+        """Get the samples of the metric.
+
+        :return: A list of the samples of the metric
+        :rtype: List[Sample]
+        """
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build a dictionary of the metric for exporting.
+
+        :return: A dictionary of the type, help and values of the metric
+        :rtype: Dict[str, Any]
+        """
+
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "values": [
+                {"labels": labels, "value": value}
+                for (_, labels, value) in self.samples()
+            ],
+        }
+
+
+@attr.s
+class Counter(Metric):
+    """A value that only ever goes up, such as the amount of handled requests.
+
+    Counters given a ``function`` report the value returned by it instead (for
+    counts kept elsewhere) and are skipped while the function returns None.
+    """
+
+    function = attr.ib(
+        type=Optional[Callable[[], Optional[float]]], default=None, repr=False
+    )
+
+    kind = "counter"
+
+    def __attrs_post_init__(self):
+        super().__attrs_post_init__()
+        self._cells = ThreadCells(1)
+
+    def inc(self, amount: float = 1.0):
+        """Increment the counter.
+
+        :param float amount: The amount to increment by, optional, defaults to 1.0
+        """
+
+        self._cells.get()[0] += amount
+
+    @property
+    def value(self) -> Optional[float]:
+        """The current value of the counter.
+
+        :return: The current value or None if the ``function`` has no value
+        :rtype: Optional[float]
+        """
+
+        if self.function is not None:
+            return self.function()
+        return self._cells.values()[0]
+
+    def samples(self) -> List[Sample]:
+        samples = ((labels, child.value) for (labels, child) in self.children())
+        return [
+            (self.name, labels, value)
+            for (labels, value) in samples
+            if value is not None
+        ]
+
+
+@attr.s
+class Gauge(Metric):
+    """A value that can go up and down, such as the size of a catalog.
+
+    Gauges given a ``function`` report the value returned by it when collected and
+    are skipped while the function returns None.
+    """
+
+    function = attr.ib(
+        type=Optional[Callable[[], Optional[float]]], default=None, repr=False
+    )
+
+    kind = "gauge"
+
+    def __attrs_post_init__(self):
+        super().__attrs_post_init__()
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        """Set the gauge to a value.
+
+        :param float value: The new value
+        """
+
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        """Increment (or decrement with a negative amount) the gauge.
+
+        :param float amount: The amount to increment by, optional, defaults to 1.0
+        """
+
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> Optional[float]:
+        """The current value of the gauge.
+
+        :return: The current value or None if the ``function`` has no value
+        :rtype: Optional[float]
+        """
+
+        if self.function is not None:
+            return self.function()
+        return self._value
+
+    def samples(self) -> List[Sample]:
+        samples = ((labels, child.value) for (labels, child) in self.children())
+        return [
+            (self.name, labels, value)
+            for (labels, value) in samples
+            if value is not None
+        ]
+
+
+@attr.s
+class Histogram(Metric):
+    """Counts observed values (such as latencies) in fixed buckets.
+
+    Every bucket counts the observations less than or equal to its upper bound, the
+    last bucket (``+Inf``) counts every observation.
+    """
+
+    buckets = attr.ib(
+        type=Tuple[float, ...],
+        default=constants.LATENCY_BUCKETS,
+        converter=lambda buckets: tuple(sorted(buckets)),
+    )
+
+    kind = "histogram"
+
+    def __attrs_post_init__(self):
+        super().__attrs_post_init__()
+        # NOTE: the cells hold the count of every bucket (plus the implicit +Inf
+        # bucket) followed by the sum of the observations
+        self._cells = ThreadCells(len(self.buckets) + 2)
+
+    def observe(self, value: float):
+        """Observe a value.
+
+        :param float value: The observed value
+        """
+
+        cell = self._cells.get()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextlib.contextmanager
+    def time(self) -> Generator[None, None, None]:
+        """Observe the amount of seconds a block takes to run.
+
+        :return: A context manager timing the block
+        :rtype: Generator[None, None, None]
+        """
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Tuple[List[Tuple[float, float]], float, float]:
+        """Get the cumulative bucket counts, sum and count of the observations.
+
+        :return: A tuple of the (upper bound, cumulative count) of every bucket, the
+            sum and the count of the observations
+        :rtype: Tuple[List[Tuple[float, float]], float, float]
+        """
+
+        values = self._cells.values()
+        (counts, total) = (values[:-1], values[-1])
+        cumulative = []
+        count = 0.0
+        for (bound, bucket_count) in zip((*self.buckets, float("inf")), counts):
+            count += bucket_count
+            cumulative.append((bound, count))
+        return (cumulative, total, count)
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        for (labels, child) in self.children():
+            (cumulative, total, count) = child.snapshot()
+            samples.extend(
+                (f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, value)
+                for (bound, value) in cumulative
+            )
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = []
+        for (labels, child) in self.children():
+            (cumulative, total, count) = child.snapshot()
+            values.append(
+                {
+                    "labels": labels,
+                    "buckets": {
+                        _format_value(bound): value for (bound, value) in cumulative
+                    },
+                    "sum": total,
+                    "count": count,
+                }
+            )
+        return {"type": self.kind, "help": self.documentation, "values": values}
+
+
+@contextlib.contextmanager
+def measure(
+    seconds: Histogram, errors: Optional[Counter] = None
+) -> Generator[None, None, None]:
+    """Observe the amount of seconds a block takes and count the errors it raises.
+
+    :param Histogram seconds: The histogram observing the seconds taken
+    :param Counter errors: The counter of errors, labeled by the name of the type of
+        the raised exceptions, optional, defaults to None
+    :return: A context manager measuring the block
+    :rtype: Generator[None, None, None]
+    """
+
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        if errors is not None:
+            errors.labels(type(exc).__name__).inc()
+        raise
+    finally:
+        seconds.observe(time.perf_counter() - started)
+
+
+@attr.s
+class MetricsRegistry(object):
+    """Keeps the metrics reported by finders, caches and services by their names.
+
+    Registering a metric under a name that is already registered returns the
+    registered metric (replacing its ``function`` if a new one is given), so
+    components can register their metrics without checking if they already are.
+    """
+
+    def __attrs_post_init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[Metric]:
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        for (_, metric) in metrics:
+            yield metric
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Get a registered metric.
+
+        :param str name: The name of the metric
+        :return: The metric or None if no metric is registered with the name
+        :rtype: Optional[Metric]
+        """
+
+        return self._metrics.get(name)
+
+    def register(self, metric: Metric) -> Any:
+        """Register a metric unless a metric with the same name is registered.
+
+        :param Metric metric: The metric to register
+        :raises ValueError: When a metric of another type or with other labels is
+            registered with the same name
+        :return: The registered metric
+        :rtype: Metric
+        """
+
+        with self._lock:
+            registered = self._metrics.get(metric.name)
+            if registered is None:
+                self._metrics[metric.name] = metric
+                return metric
+            if (
+                type(registered) is not type(metric)
+                or registered.labelnames != metric.labelnames
+            ):
+                raise ValueError(
+                    f"metric {metric.name!r} is already registered as "
+                    f"{registered!r}"
+                )
+            function = getattr(metric, "function", None)
+            if function is not None:
+                setattr(registered, "function", function)
+            return registered
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        function: Optional[Callable[[], Optional[float]]] = None,
+    ) -> Counter:
+        """Register a counter.
+
+        :param str name: The name of the counter
+        :param str documentation: The description of the counter
+        :param Tuple[str, ...] labelnames: The names of the labels of the counter,
+            optional, defaults to ()
+        :param Callable[[], Optional[float]] function: The function returning the
+            value of the counter, optional, defaults to None
+        :return: The registered counter
+        :rtype: Counter
+        """
+
+        return self.register(
+            Counter(name, documentation, labelnames=labelnames, function=function)
+        )
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        function: Optional[Callable[[], Optional[float]]] = None,
+    ) -> Gauge:
+        """Register a gauge.
+
+        :param str name: The name of the gauge
+        :param str documentation: The description of the gauge
+        :param Tuple[str, ...] labelnames: The names of the labels of the gauge,
+            optional, defaults to ()
+        :param Callable[[], Optional[float]] function: The function returning the
+            value of the gauge, optional, defaults to None
+        :return: The registered gauge
+        :rtype: Gauge
+        """
+
+        return self.register(
+            Gauge(name, documentation, labelnames=labelnames, function=function)
+        )
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = constants.LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram.
+
+        :param str name: The name of the histogram
+        :param str documentation: The description of the histogram
+        :param Tuple[str, ...] labelnames: The names of the labels of the histogram,
+            optional, defaults to ()
+        :param Tuple[float, ...] buckets: The upper bounds of the buckets,
+            optional, defaults to ``constants.LATENCY_BUCKETS``
+        :return: The registered histogram
+        :rtype: Histogram
+        """
+
+        return self.register(
+            Histogram(name, documentation, labelnames=labelnames, buckets=buckets)
+        )
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Build a dictionary of every metric for exporting (as JSON).
+
+        :return: A dictionary of the exported metrics keyed by their names
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+
+        return {metric.name: metric.to_dict() for metric in self}
+
+    def to_prometheus(self) -> str:
+        """Build the Prometheus text exposition of every metric.
+
+        :return: The metrics in the Prometheus text format (version 0.0.4)
+        :rtype: str
+        """
+
+        lines = []
+        for metric in self:
+            documentation = metric.documentation.replace("\\", "\\\\").replace(
+                "\n", "\\n"
+            )
+            lines.append(f"# HELP {metric.name} {documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+                for (name, labels, value) in metric.samples()
+            )
+        return "\n".join(lines) + "\n"
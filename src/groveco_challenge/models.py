@@ -5,6 +5,7 @@
 """Basic models used throughout the module."""
 
 import json
+from typing import Iterable
 
 from file_config import config, var
 
@@ -55,3 +56,15 @@ class StoreResult(object):
 {self.store.location}
 {self.store.address}, {self.store.city}, {self.store.state} {self.store.zipcode}
         """
+
+
+class StoreResults(list):
+    """A list of ``StoreResult`` instances returned by a search.
+
+    ``partial`` is True when the search hit its deadline before every store could be
+    measured, in which case the results are the best of the stores measured so far.
+    """
+
+    def __init__(self, results: Iterable[StoreResult] = (), partial: bool = False):
+        super().__init__(results)
+        self.partial = partial
@@ -0,0 +1,197 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``Capture`` profiling searches with cProfile and tracemalloc."""
+
+import pstats
+import pathlib
+import cProfile
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import attr
+
+from . import constants
+
+# allocations made by the profilers themselves (and by the import machinery) are
+# never interesting to the captured block
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# tracing is shared by every thread, so it is only stopped once the last capture
+# that needed it is done (and never if something else started it)
+_tracing_lock = threading.Lock()
+_tracing_captures = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    """Start tracing allocations for a capture (unless already tracing)."""
+
+    global _tracing_captures, _tracing_started
+    with _tracing_lock:
+        if _tracing_captures == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_captures += 1
+
+
+def _stop_tracing():
+    """Stop tracing allocations once no capture needs it anymore."""
+
+    global _tracing_captures, _tracing_started
+    with _tracing_lock:
+        _tracing_captures -= 1
+        if _tracing_captures == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+@attr.s
+class Capture(object):
+    """Captures a cProfile profile and the traced allocations of a block of code.
+
+    A capture with neither ``profile`` nor ``trace_memory`` enabled does nothing, so
+    a block can always be wrapped in a capture without slowing it down.
+    Once the block is done the ``stats`` hold the profile and the ``allocations``
+    hold the memory allocated (and not yet freed) by every source line.
+
+    .. note:: cProfile only profiles the thread running the block (not executors
+        working on behalf of it) while tracemalloc traces the allocations of every
+        thread, including those of any concurrent search.
+    """
+
+    profile = attr.ib(type=bool, default=False)
+    trace_memory = attr.ib(type=bool, default=False)
+
+    def __attrs_post_init__(self):
+        self.stats: Optional[pstats.Stats] = None
+        self.allocations: List[tracemalloc.StatisticDiff] = []
+        self._profiler: Optional[cProfile.Profile] = None
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the capture profiles or traces anything.
+
+        :return: True if either ``profile`` or ``trace_memory`` is enabled
+        :rtype: bool
+        """
+
+        return self.profile or self.trace_memory
+
+    def __enter__(self) -> "Capture":
+        if self.trace_memory:
+            _start_tracing()
+            self._baseline = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._baseline is not None:
+            snapshot = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+            _stop_tracing()
+            self.allocations = [
+                statistic
+                for statistic in snapshot.compare_to(self._baseline, "lineno")
+                if statistic.size_diff > 0
+            ]
+            self._baseline = None
+        if self._profiler is not None:
+            self.stats = pstats.Stats(self._profiler)
+            self._profiler = None
+
+    def dump_stats(self, filepath: pathlib.Path):
+        """Write the captured profile to a file readable by ``pstats``.
+
+        :param pathlib.Path filepath: The file to write the profile to
+        :raises ValueError: When no profile was captured
+        """
+
+        if self.stats is None:
+            raise ValueError("no profile was captured")
+        self.stats.dump_stats(str(filepath))
+
+    def top_functions(
+        self, limit: int = constants.CAPTURE_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """Get the functions of the captured profile with the most cumulative time.
+
+        :param int limit: The amount of functions to get,
+            optional, defaults to ``constants.CAPTURE_LIMIT``
+        :return: A list of the location, calls, own seconds and cumulative seconds
+            of the functions (empty if no profile was captured)
+        :rtype: List[Dict[str, Any]]
+        """
+
+        if self.stats is None:
+            return []
+        # NOTE: the stats are keyed by ``(filename, line, name)`` and hold the
+        # primitive calls, total calls, own time, cumulative time and callers
+        functions = sorted(
+            self.stats.stats.items(),  # type: ignore
+            key=lambda item: item[1][3],
+            reverse=True,
+        )
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "seconds": seconds,
+                "cumulative_seconds": cumulative,
+            }
+            for ((filename, line, name), (_, calls, seconds, cumulative, _)) in (
+                functions[:limit]
+            )
+        ]
+
+    def top_allocations(
+        self, limit: int = constants.CAPTURE_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """Get the source lines that allocated the most memory.
+
+        :param int limit: The amount of source lines to get,
+            optional, defaults to ``constants.CAPTURE_LIMIT``
+        :return: A list of the location, bytes and blocks allocated by the source
+            lines (empty if no allocations were traced)
+        :rtype: List[Dict[str, Any]]
+        """
+
+        return [
+            {
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size": statistic.size_diff,
+                "count": statistic.count_diff,
+            }
+            for statistic in self.allocations[:limit]
+            for frame in statistic.traceback[:1]
+        ]
+
+    def allocations_text(self, limit: int = constants.CAPTURE_LIMIT) -> str:
+        """Build a human readable listing of the source lines allocating the most.
+
+        :param int limit: The amount of source lines to list,
+            optional, defaults to ``constants.CAPTURE_LIMIT``
+        :return: A human readable listing of the allocations
+        :rtype: str
+        """
+
+        return "\n".join(
+            (
+                f"{allocation['size'] / 2 ** 10:>10.1f} KiB "
+                f"{allocation['count']:>8} blocks  {allocation['location']}"
+            )
+            for allocation in self.top_allocations(limit=limit)
+        )
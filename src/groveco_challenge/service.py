@@ -0,0 +1,241 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``StoreService`` used to serve store searches over HTTP."""
+
+import json
+import time
+import http.server
+import socketserver
+import urllib.parse
+from typing import Any, Dict, List, Tuple, Union, Optional
+
+import attr
+from file_config import to_dict
+
+from . import constants
+from .finder import StoreFinder
+from .metrics import Histogram
+from .deadline import DeadlineExceeded
+from .profiling import Capture
+
+# the values of boolean query parameters that are considered to be true
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+class ThreadedHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """An HTTP server handling every request in a new (daemon) thread.
+
+    .. note:: This is the ``http.server.ThreadingHTTPServer`` of Python 3.7+ which
+        is not available on Python 3.6.
+    """
+
+    daemon_threads = True
+
+
+@attr.s
+class StoreService(object):
+    """Serves the searches of a ``StoreFinder`` as JSON over HTTP.
+
+    ``GET /stores?query=<query>`` responds with ``{"results": [...], "partial": ...}``
+    where the ``results``, ``units`` (``mi`` or ``km``), ``actual``, ``planar``,
+    ``timeout`` and ``partial`` parameters mirror the options of the command-line.
+    Every request must finish within the ``timeout`` of the service (or the
+    ``timeout`` parameter if it asks for less), requests that do not respond with a
+    ``504`` unless they ask for ``partial`` results.
+
+    ``GET /metrics`` responds with the ``metrics`` registry of the finder (which the
+    service reports the latency and status of every search into) in the Prometheus
+    text format.
+
+    Services that ``allow_profiling`` respond to searches asking for ``profile`` or
+    ``trace_memory`` with the ``profile`` (the functions with the most cumulative
+    time) or the ``allocations`` (the source lines allocating the most memory) of
+    finding and serializing the stores of that request.
+
+    Every request is logged to stderr unless ``log_requests`` is disabled.
+    """
+
+    finder = attr.ib(type=StoreFinder)
+    timeout = attr.ib(type=Optional[float], default=constants.SERVICE_TIMEOUT)
+    log_requests = attr.ib(type=bool, default=True)
+    allow_profiling = attr.ib(type=bool, default=False)
+
+    def __attrs_post_init__(self):
+        self._request_seconds: Histogram = self.finder.metrics.histogram(
+            "service_request_seconds",
+            "Seconds taken to respond to search requests by status.",
+            ("status",),
+        )
+
+    def _parse_stores(self, parameters: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Parse the query parameters of a search into ``find_stores`` arguments.
+
+        :param Dict[str, List[str]] parameters: The parsed query parameters
+        :raises ValueError: When a parameter is missing or invalid
+        :return: The keyword arguments of ``StoreFinder.find_stores``
+        :rtype: Dict[str, Any]
+        """
+
+        # NOTE: blank parameters are dropped while parsing, so missing parameters
+        # are given as an empty string
+        def _get(name: str, default: str = "") -> str:
+            return parameters.get(name, [default])[-1]
+
+        query = _get("query")
+        if len(query.strip()) < 1:
+            raise ValueError("missing the 'query' parameter")
+        results = int(_get("results", "1"))
+        if results < 1:
+            raise ValueError("'results' must be at least 1")
+        units = _get("units", "mi")
+        if units not in ("mi", "km"):
+            raise ValueError("'units' must be one of 'mi' or 'km'")
+
+        timeout = self.timeout
+        requested = _get("timeout")
+        if len(requested) > 0:
+            timeout = (
+                float(requested) if timeout is None else min(float(requested), timeout)
+            )
+
+        return dict(
+            query=query,
+            metric=(units == "km"),
+            actual=(_get("actual").lower() in TRUE_VALUES),
+            results=results,
+            planar=(_get("planar").lower() in TRUE_VALUES),
+            timeout=timeout,
+            partial=(_get("partial").lower() in TRUE_VALUES),
+        )
+
+    def _parse_capture(self, parameters: Dict[str, List[str]]) -> Capture:
+        """Parse the query parameters of a search into the capture of the search.
+
+        :param Dict[str, List[str]] parameters: The parsed query parameters
+        :raises ValueError: When the search asks to be captured but the service does
+            not ``allow_profiling``
+        :return: The (possibly disabled) capture of the search
+        :rtype: Capture
+        """
+
+        capture = Capture(
+            profile=(parameters.get("profile", [""])[-1].lower() in TRUE_VALUES),
+            trace_memory=(
+                parameters.get("trace_memory", [""])[-1].lower() in TRUE_VALUES
+            ),
+        )
+        if capture.enabled and not self.allow_profiling:
+            raise ValueError("profiling is not allowed by the service")
+        return capture
+
+    def handle(self, path: str) -> Tuple[int, Union[Dict[str, Any], str]]:
+        """Handle a ``GET`` request.
+
+        :param str path: The requested path (including the query string)
+        :return: A tuple of the status code and the body of the response (JSON
+            content or the text of the metrics)
+        :rtype: Tuple[int, Union[Dict[str, Any], str]]
+        """
+
+        url = urllib.parse.urlsplit(path)
+        if url.path == "/metrics":
+            return (200, self.finder.metrics.to_prometheus())
+        elif url.path != "/stores":
+            return (404, {"error": f"no such resource {url.path!r}"})
+
+        started = time.perf_counter()
+        (status, body) = self._handle_stores(url.query)
+        self._request_seconds.labels(str(status)).observe(time.perf_counter() - started)
+        return (status, body)
+
+    def _handle_stores(self, query: str) -> Tuple[int, Dict[str, Any]]:
+        """Handle a search request.
+
+        :param str query: The query string of the request
+        :return: A tuple of the status code and the JSON body of the response
+        :rtype: Tuple[int, Dict[str, Any]]
+        """
+
+        parameters = urllib.parse.parse_qs(query)
+        try:
+            arguments = self._parse_stores(parameters)
+            capture = self._parse_capture(parameters)
+        except ValueError as exc:
+            return (400, {"error": str(exc)})
+
+        try:
+            with capture:
+                store_results = self.finder.find_stores(**arguments)
+                body: Dict[str, Any] = {
+                    "results": [
+                        to_dict(store_result) for store_result in store_results
+                    ],
+                    "partial": store_results.partial,
+                }
+        except DeadlineExceeded as exc:
+            return (504, {"error": str(exc)})
+        except Exception as exc:
+            return (500, {"error": f"failed to find stores, {exc!s}"})
+
+        if capture.profile:
+            body["profile"] = capture.top_functions()
+        if capture.trace_memory:
+            body["allocations"] = capture.top_allocations()
+        return (200, body)
+
+    def make_server(
+        self, host: str = constants.SERVICE_HOST, port: int = constants.SERVICE_PORT
+    ) -> ThreadedHTTPServer:
+        """Create a (not yet started) server handling every request in a new thread.
+
+        :param str host: The address to listen on,
+            optional, defaults to ``constants.SERVICE_HOST``
+        :param int port: The port to listen on (0 picks any free port),
+            optional, defaults to ``constants.SERVICE_PORT``
+        :return: The created server
+        :rtype: ThreadedHTTPServer
+        """
+
+        service = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                (status, body) = service.handle(self.path)
+                if isinstance(body, str):
+                    content = body.encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    content = json.dumps(body).encode("utf-8")
+                    content_type = "application/json"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args: Any):
+                if service.log_requests:
+                    super().log_message(*args)
+
+        return ThreadedHTTPServer((host, port), _Handler)
+
+    def serve(
+        self, host: str = constants.SERVICE_HOST, port: int = constants.SERVICE_PORT
+    ):
+        """Serve requests until interrupted.
+
+        :param str host: The address to listen on,
+            optional, defaults to ``constants.SERVICE_HOST``
+        :param int port: The port to listen on,
+            optional, defaults to ``constants.SERVICE_PORT``
+        """
+
+        server = self.make_server(host=host, port=port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
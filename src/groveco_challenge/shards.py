@@ -0,0 +1,385 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``ShardedCatalog`` partitioning stores into indexed shards."""
+
+from math import cos, sin, asin, floor, radians
+from array import array
+from typing import Dict, List, Tuple, Iterable, Optional
+
+import attr
+
+from .index import GridIndex
+from .models import Store, GeoLocation
+from .catalog import STORE_COLUMNS, StoreCatalog
+from .snapshot import CatalogSnapshot, CatalogFingerprint
+
+
+def shard_key(
+    latitude: float, longitude: float, state: str, shard_by: str, resolution: float
+) -> str:
+    """Get the key of the shard a store belongs to.
+
+    :param float latitude: The latitude of the store in degrees
+    :param float longitude: The longitude of the store in degrees
+    :param str state: The state of the store
+    :param str shard_by: How stores are partitioned (see ``constants.SHARD_TYPES``)
+    :param float resolution: The size (in degrees) of the cells of ``grid`` shards
+    :return: The key of the shard
+    :rtype: str
+    """
+
+    if shard_by == "state":
+        return state
+    return (
+        f"{int(floor((latitude + 90.0) / resolution))}:"
+        f"{int(floor((longitude + 180.0) / resolution))}"
+    )
+
+
+def box_angle(
+    origin: GeoLocation, south: float, west: float, north: float, east: float
+) -> float:
+    """Get a lower bound of the central angle from an origin to any location in a box.
+
+    Both the difference of latitudes and the angle to the closest meridian of the box
+    bound the central angle to every location within the box, so the larger of them
+    is used.
+
+    :param GeoLocation origin: The origin to measure from
+    :param float south: The southern edge of the box in degrees
+    :param float west: The western edge of the box in degrees
+    :param float north: The northern edge of the box in degrees
+    :param float east: The eastern edge of the box in degrees
+    :return: The lower bound of the central angle in radians (0.0 within the box)
+    :rtype: float
+    """
+
+    latitude_angle = radians(max(south - origin.latitude, origin.latitude - north, 0.0))
+    if west <= origin.longitude <= east:
+        return latitude_angle
+
+    delta_lambda = min(
+        (west - origin.longitude) % 360.0, (origin.longitude - east) % 360.0
+    )
+    if delta_lambda <= 90.0:
+        # the perpendicular from the origin to the closest meridian lands on it
+        meridian_angle = asin(
+            min(cos(radians(origin.latitude)) * sin(radians(delta_lambda)), 1.0)
+        )
+    else:
+        # the closest location of the meridians is the nearest pole
+        meridian_angle = radians(90.0 - abs(origin.latitude))
+    return max(latitude_angle, meridian_angle, 0.0)
+
+
+@attr.s(frozen=True)
+class CatalogShard(object):
+    """A partition of the stores of a catalog with its own catalog and index.
+
+    The ``snapshot`` of a shard identifies its stores with the store ids of the whole
+    catalog and takes mutations like any other snapshot. The bounding box of a shard
+    covers every store the shard has ever held, so it always bounds the distance to
+    the stores of the shard.
+    """
+
+    key = attr.ib(type=str)
+    snapshot = attr.ib(type=CatalogSnapshot, repr=False)
+    south = attr.ib(type=float)
+    west = attr.ib(type=float)
+    north = attr.ib(type=float)
+    east = attr.ib(type=float)
+
+    @classmethod
+    def from_catalog(
+        cls,
+        key: str,
+        catalog: StoreCatalog,
+        ids: Iterable[int],
+        fingerprint: CatalogFingerprint,
+        next_id: int,
+        resolution: float = 1.0,
+    ) -> "CatalogShard":
+        """Create a new shard (and index) from the stores of a catalog.
+
+        :param str key: The key of the shard
+        :param StoreCatalog catalog: The catalog of the stores of the shard
+        :param Iterable[int] ids: The store ids of the rows of the ``catalog`` in
+            ascending order
+        :param CatalogFingerprint fingerprint: The fingerprint of the catalog file
+        :param int next_id: The next unused store id of the whole catalog
+        :param float resolution: The size (in degrees) of the cells of the grid index
+            of the shard, optional, defaults to 1.0
+        :return: A new shard
+        :rtype: CatalogShard
+        """
+
+        return cls(
+            key=key,
+            snapshot=CatalogSnapshot(
+                catalog=catalog,
+                spatial_index=GridIndex.from_catalog(catalog, resolution=resolution),
+                fingerprint=fingerprint,
+                ids=array("q", ids),
+                next_id=next_id,
+            ),
+            south=min(catalog.latitudes),
+            west=min(catalog.longitudes),
+            north=max(catalog.latitudes),
+            east=max(catalog.longitudes),
+        )
+
+    def bound(self, origin: GeoLocation) -> float:
+        """Get a lower bound of the central angle from an origin to the stores.
+
+        :param GeoLocation origin: The origin to measure from
+        :return: The lower bound of the central angle in radians
+        :rtype: float
+        """
+
+        return box_angle(origin, self.south, self.west, self.north, self.east)
+
+    def with_store(self, store_id: int, store: Store) -> "CatalogShard":
+        """Build a new shard where the given store id is (re)placed by a store.
+
+        :param int store_id: The id of the store
+        :param Store store: The new store
+        :return: A new shard
+        :rtype: CatalogShard
+        """
+
+        location = store.geolocation
+        return attr.evolve(
+            self,
+            snapshot=self.snapshot.with_store(store_id, store),
+            south=min(self.south, location.latitude),
+            west=min(self.west, location.longitude),
+            north=max(self.north, location.latitude),
+            east=max(self.east, location.longitude),
+        )
+
+    def without_store(self, store_id: int) -> "CatalogShard":
+        """Build a new shard where the store with the given store id is removed.
+
+        :param int store_id: The id of the store
+        :raises KeyError: When there is no (or an already removed) store with the id
+        :return: A new shard
+        :rtype: CatalogShard
+        """
+
+        return attr.evolve(self, snapshot=self.snapshot.without_store(store_id))
+
+
+@attr.s(frozen=True)
+class ShardedCatalog(object):
+    """The stores of a catalog partitioned into shards by state or by grid cell.
+
+    Every shard has its own catalog and index, so a shard can be rebuilt (compacting
+    the mutations of its stores) without touching any of the other shards.
+    """
+
+    shards = attr.ib(type=dict, repr=False)
+    shard_by = attr.ib(type=str, default="state")
+    shard_resolution = attr.ib(type=float, default=10.0)
+    resolution = attr.ib(type=float, default=1.0)
+    compact = attr.ib(type=bool, default=False)
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: CatalogSnapshot,
+        shard_by: str = "state",
+        shard_resolution: float = 10.0,
+        resolution: float = 1.0,
+    ) -> "ShardedCatalog":
+        """Partition the stores of a snapshot into shards.
+
+        :param CatalogSnapshot snapshot: The snapshot to partition
+        :param str shard_by: How stores are partitioned (see ``constants.SHARD_TYPES``),
+            optional, defaults to "state"
+        :param float shard_resolution: The size (in degrees) of the cells of ``grid``
+            shards, optional, defaults to 10.0
+        :param float resolution: The size (in degrees) of the cells of the grid index
+            of every shard, optional, defaults to 1.0
+        :raises ValueError: When the catalog is a SQLite database
+        :return: A new sharded catalog
+        :rtype: ShardedCatalog
+        """
+
+        catalog = snapshot.catalog
+        if not isinstance(catalog, StoreCatalog):
+            raise ValueError("only store locations files can be sharded")
+        states = catalog.columns["state"]
+        partitions: Dict[str, List[int]] = {}
+        for (index, (latitude, longitude)) in enumerate(
+            zip(catalog.latitudes, catalog.longitudes)
+        ):
+            if index not in snapshot.tombstones:
+                partitions.setdefault(
+                    shard_key(
+                        latitude, longitude, states[index], shard_by, shard_resolution
+                    ),
+                    [],
+                ).append(index)
+
+        shards = {}
+        for (key, indexes) in partitions.items():
+            shards[key] = CatalogShard.from_catalog(
+                key,
+                StoreCatalog.from_columns(
+                    [catalog.latitudes[index] for index in indexes],
+                    [catalog.longitudes[index] for index in indexes],
+                    {
+                        column: [catalog.columns[column][index] for index in indexes]
+                        for column in STORE_COLUMNS
+                    },
+                    compact=catalog.compact,
+                ),
+                [snapshot.ids[index] for index in indexes],
+                snapshot.fingerprint,
+                snapshot.next_id,
+                resolution=resolution,
+            )
+
+        sharded = cls(
+            shards=shards,
+            shard_by=shard_by,
+            shard_resolution=shard_resolution,
+            resolution=resolution,
+            compact=catalog.compact,
+        )
+        for (store_id, store) in snapshot.delta.items():
+            sharded = sharded.with_store(store_id, store, snapshot.fingerprint)
+        return sharded
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def key(self, store: Store) -> str:
+        """Get the key of the shard a store belongs to.
+
+        :param Store store: The store
+        :return: The key of the shard
+        :rtype: str
+        """
+
+        return shard_key(
+            store.geolocation.latitude,
+            store.geolocation.longitude,
+            store.state,
+            self.shard_by,
+            self.shard_resolution,
+        )
+
+    def with_store(
+        self,
+        store_id: int,
+        store: Store,
+        fingerprint: CatalogFingerprint,
+        previous: Optional[Store] = None,
+    ) -> "ShardedCatalog":
+        """Build a new sharded catalog where a store id is (re)placed by a store.
+
+        :param int store_id: The id of the store
+        :param Store store: The new store
+        :param CatalogFingerprint fingerprint: The fingerprint of the catalog file
+        :param Store previous: The store currently with the store id,
+            optional, defaults to None
+        :return: A new sharded catalog
+        :rtype: ShardedCatalog
+        """
+
+        key = self.key(store)
+        shards = dict(self.shards)
+        if previous is not None and self.key(previous) != key:
+            # stores moved to another shard are removed from their previous shard
+            previous_key = self.key(previous)
+            shards[previous_key] = shards[previous_key].without_store(store_id)
+        if key in shards:
+            shards[key] = shards[key].with_store(store_id, store)
+        else:
+            shards[key] = CatalogShard.from_catalog(
+                key,
+                StoreCatalog.from_stores([store], compact=self.compact),
+                [store_id],
+                fingerprint,
+                store_id + 1,
+                resolution=self.resolution,
+            )
+        return attr.evolve(self, shards=shards)
+
+    def without_store(self, store_id: int, previous: Store) -> "ShardedCatalog":
+        """Build a new sharded catalog where the store with a store id is removed.
+
+        :param int store_id: The id of the store
+        :param Store previous: The store currently with the store id
+        :return: A new sharded catalog
+        :rtype: ShardedCatalog
+        """
+
+        key = self.key(previous)
+        return attr.evolve(
+            self, shards={**self.shards, key: self.shards[key].without_store(store_id)}
+        )
+
+    def rebuild(self, key: str) -> "ShardedCatalog":
+        """Build a new sharded catalog with a single shard rebuilt.
+
+        The pending mutations of the shard are compacted into a new catalog and index,
+        shards without any stores left are dropped.
+
+        :param str key: The key of the shard to rebuild
+        :raises KeyError: When there is no shard with the given key
+        :return: A new sharded catalog
+        :rtype: ShardedCatalog
+        """
+
+        shard = self.shards[key]
+        stores = sorted(shard.snapshot.stores(), key=lambda item: item[0])
+        shards = dict(self.shards)
+        if len(stores) < 1:
+            del shards[key]
+        else:
+            shards[key] = CatalogShard.from_catalog(
+                key,
+                StoreCatalog.from_stores(
+                    (store for (_, store) in stores), compact=self.compact
+                ),
+                [store_id for (store_id, _) in stores],
+                shard.snapshot.fingerprint,
+                shard.snapshot.next_id,
+                resolution=self.resolution,
+            )
+        return attr.evolve(self, shards=shards)
+
+    def compacted(self, threshold: int) -> "ShardedCatalog":
+        """Rebuild every shard with more than a given amount of pending mutations.
+
+        :param int threshold: The largest amount of pending mutations of a shard that
+            is not rebuilt
+        :return: A new sharded catalog (or the same if no shard is rebuilt)
+        :rtype: ShardedCatalog
+        """
+
+        sharded = self
+        for (key, shard) in self.shards.items():
+            if shard.snapshot.mutations > threshold:
+                sharded = sharded.rebuild(key)
+        return sharded
+
+    def ordered(self, origin: GeoLocation) -> List[Tuple[float, CatalogShard]]:
+        """Get the shards ordered by the lower bound of their distance to an origin.
+
+        :param GeoLocation origin: The origin to measure from
+        :return: A list of tuples of lower bounds (central angles in radians) and
+            shards, ordered by the lower bounds (and keys)
+        :rtype: List[Tuple[float, CatalogShard]]
+        """
+
+        return [
+            (angle, self.shards[key])
+            for (angle, key) in sorted(
+                (shard.bound(origin), key) for (key, shard) in self.shards.items()
+            )
+        ]
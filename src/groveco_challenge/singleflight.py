@@ -0,0 +1,119 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains helpers that coalesce concurrent calls sharing the same key."""
+
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Dict, Tuple, Callable, Hashable, Optional, Coroutine
+
+import attr
+
+
+@attr.s
+class SingleFlight(object):
+    """Coalesces concurrent calls (from any thread) sharing the same key.
+
+    The first caller of a key runs the call while every caller arriving before it
+    finishes waits for and receives the same result (or exception). Calls are
+    forgotten as soon as they finish, so nothing is cached.
+    """
+
+    executed = attr.ib(type=int, default=0, init=False)
+    shared = attr.ib(type=int, default=0, init=False)
+
+    def __attrs_post_init__(self):
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(
+        self,
+        key: Hashable,
+        function: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Any:
+        """Call a function unless a call with the same key is already in flight.
+
+        :param Hashable key: The key identifying the call
+        :param Callable[..., Any] function: The function to call
+        :param Optional[float] timeout: The amount of seconds to wait for a call that
+            is already in flight (calls made by the caller itself are never
+            interrupted), optional, defaults to waiting indefinitely
+        :raises concurrent.futures.TimeoutError: When the shared call does not finish
+            within the ``timeout``
+        :return: The result of the (possibly shared) call
+        :rtype: Any
+        """
+
+        with self._lock:
+            shared = self._calls.get(key)
+            if shared is None:
+                future: concurrent.futures.Future = concurrent.futures.Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if shared is not None:
+            return shared.result(timeout=timeout)
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+@attr.s
+class AsyncSingleFlight(object):
+    """Coalesces concurrent coroutine calls (on the same event loop) sharing a key.
+
+    The first caller of a key starts the call as a task which every caller awaits.
+    Cancelling one of the callers does not cancel the shared task.
+    """
+
+    executed = attr.ib(type=int, default=0, init=False)
+    shared = attr.ib(type=int, default=0, init=False)
+
+    def __attrs_post_init__(self):
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        function: Callable[..., Coroutine[Any, Any, Any]],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Await a coroutine function unless a call with the same key is in flight.
+
+        :param Hashable key: The key identifying the call
+        :param Callable[..., Coroutine[Any, Any, Any]] function: The coroutine
+            function to call
+        :return: The result of the (possibly shared) call
+        :rtype: Any
+        """
+
+        # NOTE: ``asyncio.get_running_loop`` requires Python 3.7
+        loop = asyncio.get_event_loop()
+        task_key = (loop, key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = loop.create_task(function(*args, **kwargs))
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+            self.executed += 1
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
@@ -0,0 +1,214 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``CatalogSnapshot`` used to swap reloaded catalogs into a finder."""
+
+import bisect
+import hashlib
+import pathlib
+from array import array
+from typing import Any, Tuple, Union, Iterator, Optional
+
+import attr
+
+from .index import GridIndex
+from .models import Store
+from .catalog import StoreCatalog
+from .database import StoreDatabase
+
+# the amount of bytes read at a time while hashing a catalog file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+@attr.s(frozen=True)
+class CatalogFingerprint(object):
+    """Identifies the content of a catalog file.
+
+    The modification time and size are cheap to check and are compared first, the
+    ``digest`` of the content is only calculated when either of them change.
+    """
+
+    mtime_ns = attr.ib(type=int)
+    size = attr.ib(type=int)
+    digest = attr.ib(type=str)
+
+    @classmethod
+    def from_file(
+        cls, filepath: pathlib.Path, previous: Optional["CatalogFingerprint"] = None
+    ) -> "CatalogFingerprint":
+        """Create a new fingerprint of a catalog file.
+
+        :param pathlib.Path filepath: The path to the catalog file
+        :param CatalogFingerprint previous: The last fingerprint of the same file, its
+            digest is reused if the modification time and size have not changed,
+            optional, defaults to None
+        :return: A new fingerprint
+        :rtype: CatalogFingerprint
+        """
+
+        stat = filepath.stat()
+        if (
+            previous is not None
+            and previous.mtime_ns == stat.st_mtime_ns
+            and previous.size == stat.st_size
+        ):
+            return previous
+
+        digest = hashlib.sha256()
+        with filepath.open("rb") as fp:
+            for block in iter(lambda: fp.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return cls(
+            mtime_ns=stat.st_mtime_ns, size=stat.st_size, digest=digest.hexdigest()
+        )
+
+
+@attr.s(frozen=True)
+class CatalogSnapshot(object):
+    """An immutable pairing of a loaded catalog and the spatial index built over it.
+
+    Searches read the snapshot of a finder once and use it until they finish, so a
+    reloaded snapshot can be swapped in (by a single assignment) while searches are
+    still running on the previous one.
+
+    Stores are identified by a stable store id. Stores loaded from the catalog file
+    get the (zero-based) row they were loaded from as their id and added stores get
+    the next unused id. Mutations never touch the ``catalog`` or ``spatial_index``,
+    added and updated stores are kept in a small ``delta`` of stores while removed
+    and updated rows of the catalog are hidden by ``tombstones`` (of catalog
+    indexes). Each mutation builds a new snapshot, copying only the delta and the
+    tombstones, until they are compacted into a new catalog.
+
+    Snapshots of sharded catalogs also keep their stores partitioned into the
+    ``shards`` of a ``ShardedCatalog``, which take the same mutations.
+    """
+
+    catalog = attr.ib(type=Union[StoreCatalog, StoreDatabase], repr=False)
+    spatial_index = attr.ib(type=Optional[Union[GridIndex, StoreDatabase]], repr=False)
+    fingerprint = attr.ib(type=CatalogFingerprint)
+    version = attr.ib(type=int, default=0)
+    ids = attr.ib(type=array, repr=False)
+    delta = attr.ib(type=dict, factory=dict, repr=False)
+    tombstones = attr.ib(type=frozenset, factory=frozenset, repr=False)
+    next_id = attr.ib(type=int)
+    shards = attr.ib(type=Optional[Any], default=None, repr=False)
+
+    @ids.default
+    def _ids_default(self) -> array:
+        return array("q", range(len(self.catalog)))
+
+    @next_id.default
+    def _next_id_default(self) -> int:
+        return (self.ids[-1] + 1) if len(self.ids) > 0 else 0
+
+    @property
+    def mutations(self) -> int:
+        """The amount of pending mutations that have not been compacted.
+
+        :return: The amount of stores in the delta and rows hidden by tombstones
+        :rtype: int
+        """
+
+        return len(self.delta) + len(self.tombstones)
+
+    def index_of(self, store_id: int) -> Optional[int]:
+        """Get the catalog index of the row with the given store id.
+
+        :param int store_id: The id of the store
+        :return: The catalog index or None if the store is not a row of the catalog
+        :rtype: Optional[int]
+        """
+
+        # NOTE: store ids of catalog rows are always in ascending order
+        index = bisect.bisect_left(self.ids, store_id)
+        if index < len(self.ids) and self.ids[index] == store_id:
+            return index
+        return None
+
+    def store(self, store_id: int) -> Store:
+        """Get the current store with the given store id.
+
+        :param int store_id: The id of the store
+        :raises KeyError: When there is no (or a removed) store with the given id
+        :return: The store
+        :rtype: Store
+        """
+
+        if store_id in self.delta:
+            return self.delta[store_id]
+        index = self.index_of(store_id)
+        if index is None or index in self.tombstones:
+            raise KeyError(f"no store with id {store_id!r}")
+        return self.catalog[index]
+
+    def stores(self) -> Iterator[Tuple[int, Store]]:
+        """Generate the current stores along with their store ids.
+
+        :return: Yields tuples of store ids and stores
+        :rtype: Iterator[Tuple[int, Store]]
+        """
+
+        for (index, store) in enumerate(self.catalog):
+            if index not in self.tombstones:
+                yield (self.ids[index], store)
+        yield from self.delta.items()
+
+    def with_store(self, store_id: int, store: Store) -> "CatalogSnapshot":
+        """Build a new snapshot where the given store id is (re)placed by a store.
+
+        :param int store_id: The id of the store
+        :param Store store: The new store
+        :return: A new snapshot
+        :rtype: CatalogSnapshot
+        """
+
+        tombstones = self.tombstones
+        index = self.index_of(store_id)
+        shards = self.shards
+        if shards is not None:
+            previous = self.delta.get(store_id)
+            if previous is None and index is not None and index not in tombstones:
+                previous = self.catalog[index]
+            shards = shards.with_store(
+                store_id, store, self.fingerprint, previous=previous
+            )
+        if index is not None:
+            tombstones = tombstones | {index}
+        return attr.evolve(
+            self,
+            version=self.version + 1,
+            delta={**self.delta, store_id: store},
+            tombstones=tombstones,
+            next_id=max(self.next_id, store_id + 1),
+            shards=shards,
+        )
+
+    def without_store(self, store_id: int) -> "CatalogSnapshot":
+        """Build a new snapshot where the store with the given store id is removed.
+
+        :param int store_id: The id of the store
+        :raises KeyError: When there is no (or an already removed) store with the id
+        :return: A new snapshot
+        :rtype: CatalogSnapshot
+        """
+
+        # NOTE: checks that the store currently exists
+        previous = self.store(store_id)
+        tombstones = self.tombstones
+        index = self.index_of(store_id)
+        if index is not None:
+            tombstones = tombstones | {index}
+        return attr.evolve(
+            self,
+            version=self.version + 1,
+            delta={
+                key: value for (key, value) in self.delta.items() if key != store_id
+            },
+            tombstones=tombstones,
+            shards=(
+                None
+                if self.shards is None
+                else self.shards.without_store(store_id, previous)
+            ),
+        )
@@ -0,0 +1,261 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""Contains the ``VoronoiTable`` of the stores that may be nearest in raster cells."""
+
+import sys
+import mmap
+import struct
+import pathlib
+from math import ceil, floor
+from array import array
+from typing import Any, Optional, Sequence
+
+import attr
+
+from .batch import cell_candidates, delta_candidates
+from .index import GridIndex
+from .snapshot import CatalogSnapshot
+
+# the header of saved tables as the magic bytes, format version, the southern and
+# western bounds and resolution (in degrees) of the raster, the amount of rows,
+# columns and candidates, and the digest of the catalog file the table was built for
+# NOTE: the header is padded to a multiple of 8 bytes so the arrays following it can
+# be memory mapped as 8 byte integers
+TABLE_HEADER = struct.Struct("<4sB3xdddqqq64s")
+TABLE_HEADER_SIZE = 128
+TABLE_MAGIC = b"GCVT"
+TABLE_VERSION = 1
+
+
+def table_path(filepath: pathlib.Path) -> pathlib.Path:
+    """Get the path a table of a store locations file is saved to by default.
+
+    :param pathlib.Path filepath: The path to the store locations file
+    :return: The path of the table next to the store locations file
+    :rtype: pathlib.Path
+    """
+
+    return filepath.with_name(f"{filepath.name}.voronoi")
+
+
+@attr.s
+class VoronoiTable(object):
+    """A raster of the stores that can be the nearest store anywhere within a cell.
+
+    Every cell of ``resolution`` degrees covering the stores (plus a margin) lists
+    the ids of the stores that can be nearest to some location within the cell (a
+    discretized Voronoi diagram of the stores), so the nearest store to any location
+    within the raster is found by measuring only the few candidates of its cell.
+
+    The candidates of the cell at ``row`` and ``column`` are the store ids
+    ``candidates[offsets[cell]:offsets[cell + 1]]`` where ``cell`` is
+    ``row * columns + column``. Loaded tables are memory mapped rather than read.
+    """
+
+    south = attr.ib(type=float)
+    west = attr.ib(type=float)
+    resolution = attr.ib(type=float)
+    rows = attr.ib(type=int)
+    columns = attr.ib(type=int)
+    digest = attr.ib(type=str)
+    offsets = attr.ib(type=Sequence[int], repr=False)
+    candidates = attr.ib(type=Sequence[int], repr=False)
+    mapping = attr.ib(type=Optional[mmap.mmap], default=None, repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        snapshot: CatalogSnapshot,
+        spatial_index: GridIndex,
+        resolution: float,
+        margin: float = 0.0,
+        tolerance: float = 0.0,
+    ) -> "VoronoiTable":
+        """Build the table of the stores of a snapshot.
+
+        :param CatalogSnapshot snapshot: The snapshot of the stores
+        :param GridIndex spatial_index: An index of the catalog rows of the snapshot
+        :param float resolution: The size (in degrees) of the cells of the raster
+        :param float margin: The distance (in degrees) the raster extends past the
+            outermost stores, optional, defaults to 0.0
+        :param float tolerance: The relative difference allowed between exact and
+            spherical distances (see ``constants.ELLIPSOID_TOLERANCE``) that
+            candidates must account for, optional, defaults to 0.0
+        :raises ValueError: When the ``resolution`` is not positive or the snapshot
+            has no stores
+        :return: A new table
+        :rtype: VoronoiTable
+        """
+
+        if resolution <= 0.0:
+            raise ValueError(
+                f"resolution must be greater than 0, received {resolution!r}"
+            )
+
+        delta = delta_candidates(snapshot)
+        locations = [
+            snapshot.catalog.location(index)
+            for index in range(len(snapshot.catalog))
+            if index not in snapshot.tombstones
+        ] + [store.geolocation for store in snapshot.delta.values()]
+        if len(locations) < 1:
+            raise ValueError("tables can only be built for catalogs with stores")
+
+        south = max(
+            floor(
+                (min(location.latitude for location in locations) - margin) / resolution
+            )
+            * resolution,
+            -90.0,
+        )
+        west = max(
+            floor(
+                (min(location.longitude for location in locations) - margin)
+                / resolution
+            )
+            * resolution,
+            -180.0,
+        )
+        north = min(max(location.latitude for location in locations) + margin, 90.0)
+        east = min(max(location.longitude for location in locations) + margin, 180.0)
+        rows = max(ceil((north - south) / resolution), 1)
+        columns = max(ceil((east - west) / resolution), 1)
+
+        widening = (1.0 + tolerance) / (1.0 - tolerance)
+        offsets = array("q", [0])
+        candidates = array("q")
+        for row in range(rows):
+            for column in range(columns):
+                candidates.extend(
+                    candidate[0]
+                    for candidate in cell_candidates(
+                        snapshot,
+                        spatial_index,
+                        south + row * resolution,
+                        west + column * resolution,
+                        resolution,
+                        resolution,
+                        widening=widening,
+                        delta=delta,
+                    )
+                )
+                offsets.append(len(candidates))
+
+        return cls(
+            south=south,
+            west=west,
+            resolution=resolution,
+            rows=rows,
+            columns=columns,
+            digest=snapshot.fingerprint.digest,
+            offsets=offsets,
+            candidates=candidates,
+        )
+
+    @classmethod
+    def load(cls, filepath: pathlib.Path) -> "VoronoiTable":
+        """Memory map a table saved by ``VoronoiTable.save``.
+
+        :param pathlib.Path filepath: The path to the saved table
+        :raises ValueError: When the file is not a saved table
+        :return: The loaded table (backed by the memory mapped file)
+        :rtype: VoronoiTable
+        """
+
+        if sys.byteorder != "little":
+            raise ValueError("tables can only be memory mapped on little-endian hosts")
+
+        with filepath.open("rb") as fp:
+            header = fp.read(TABLE_HEADER_SIZE)
+            if len(header) < TABLE_HEADER_SIZE:
+                raise ValueError(f"{filepath!s} is not a nearest store table")
+            (
+                magic,
+                version,
+                south,
+                west,
+                resolution,
+                rows,
+                columns,
+                entries,
+                digest,
+            ) = TABLE_HEADER.unpack(header[: TABLE_HEADER.size])
+            if magic != TABLE_MAGIC or version != TABLE_VERSION:
+                raise ValueError(f"{filepath!s} is not a nearest store table")
+            size = TABLE_HEADER_SIZE + (rows * columns + 1 + entries) * 8
+            if filepath.stat().st_size < size:
+                raise ValueError(f"{filepath!s} is a truncated nearest store table")
+            mapping = mmap.mmap(fp.fileno(), size, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapping)[TABLE_HEADER_SIZE:size].cast("q")
+        return cls(
+            south=south,
+            west=west,
+            resolution=resolution,
+            rows=rows,
+            columns=columns,
+            digest=digest.decode("ascii"),
+            offsets=view[: rows * columns + 1],
+            candidates=view[rows * columns + 1 :],
+            mapping=mapping,
+        )
+
+    def save(self, filepath: pathlib.Path):
+        """Save the table to a file.
+
+        :param pathlib.Path filepath: The path to save the table to
+        """
+
+        with filepath.open("wb") as fp:
+            fp.write(
+                TABLE_HEADER.pack(
+                    TABLE_MAGIC,
+                    TABLE_VERSION,
+                    self.south,
+                    self.west,
+                    self.resolution,
+                    self.rows,
+                    self.columns,
+                    len(self.candidates),
+                    self.digest.encode("ascii"),
+                ).ljust(TABLE_HEADER_SIZE, b"\0")
+            )
+            for values in (self.offsets, self.candidates):
+                values = array("q", values)
+                if sys.byteorder != "little":
+                    values.byteswap()
+                values.tofile(fp)
+
+    def close(self):
+        """Release the memory mapped file of a loaded table."""
+
+        if self.mapping is not None:
+            self.offsets.release()
+            self.candidates.release()
+            self.mapping.close()
+            self.mapping = None
+
+    def __enter__(self) -> "VoronoiTable":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+    def lookup(self, latitude: float, longitude: float) -> Optional[Sequence[int]]:
+        """Get the ids of the stores that can be nearest to a location.
+
+        :param float latitude: The latitude of the location in degrees
+        :param float longitude: The longitude of the location in degrees
+        :return: The store ids of the candidates of the cell of the location or None
+            if the location is outside of the raster
+        :rtype: Optional[Sequence[int]]
+        """
+
+        row = floor((latitude - self.south) / self.resolution)
+        column = floor((longitude - self.west) / self.resolution)
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            return None
+        cell = row * self.columns + column
+        return self.candidates[self.offsets[cell] : self.offsets[cell + 1]]
@@ -0,0 +1,19 @@
+# Stubs for groveco_challenge.batch (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+from .catalog import StoreCatalog
+from .index import GridIndex
+from .models import GeoLocation
+from .snapshot import CatalogSnapshot
+from array import array
+from typing import Callable, Iterable, List, Optional, Tuple
+
+PointResults = Tuple[array, array, array]
+Candidate = Tuple[int, int | GeoLocation, float, float, float]
+LIMIT_SLACK: float
+
+def central_angle(phi: float, lambda_: float, cos_phi: float, target_phi: float, target_lambda: float, target_cos_phi: float) -> float: ...
+def delta_candidates(snapshot: CatalogSnapshot) -> List[Candidate]: ...
+def cell_candidates(snapshot: CatalogSnapshot, spatial_index: GridIndex, south: float, west: float, height: float, width: float, count: int=..., widening: float=..., delta: Optional[List[Candidate]]=...) -> List[Candidate]: ...
+def nearest_for_points(snapshot: CatalogSnapshot, spatial_index: GridIndex, origins: Iterable[Tuple[float, float]], results: int=..., radius: float=..., cell_size: float=..., exact: Optional[Callable[[GeoLocation, GeoLocation], float]]=..., tolerance: float=...) -> PointResults: ...
@@ -0,0 +1,89 @@
+# Stubs for groveco_challenge.benchmark (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import pathlib
+from . import constants
+from .catalog import COMPRESSION_OPENERS, CSV_HEADERS, STORE_COLUMNS, StoreCatalog
+from .finder import StoreFinder
+from .ingest import ingest_catalog
+from .models import GeoLocation, Store
+from typing import Any, Generator, List, Optional, Sequence, Tuple
+
+class DistanceMethodReport:
+    method: Any = ...
+    reference: Any = ...
+    pairs: Any = ...
+    seconds: Any = ...
+    max_error: Any = ...
+    mean_error: Any = ...
+    max_relative_error: Any = ...
+    rank_disagreement: Any = ...
+    @property
+    def throughput(self) -> float: ...
+    def to_text(self) -> str: ...
+    def __init__(self, method: Any, reference: Any, pairs: Any, seconds: Any, max_error: Any, mean_error: Any, max_relative_error: Any, rank_disagreement: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class SearchReport:
+    name: Any = ...
+    queries: Any = ...
+    seconds: Any = ...
+    mismatches: Any = ...
+    @property
+    def throughput(self) -> float: ...
+    def to_text(self) -> str: ...
+    def __init__(self, name: Any, queries: Any, seconds: Any, mismatches: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class MemoryReport:
+    layout: Any = ...
+    stores: Any = ...
+    size: Any = ...
+    max_error: Any = ...
+    @property
+    def bytes_per_store(self) -> float: ...
+    def to_text(self) -> str: ...
+    def __init__(self, layout: Any, stores: Any, size: Any, max_error: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class LoadReport:
+    compression: Any = ...
+    stores: Any = ...
+    size: Any = ...
+    seconds: Any = ...
+    peak: Any = ...
+    @property
+    def throughput(self) -> float: ...
+    def to_text(self) -> str: ...
+    def __init__(self, compression: Any, stores: Any, size: Any, seconds: Any, peak: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+def random_origins(stores: Sequence[Store], count: int, seed: int=..., margin: float=...) -> List[GeoLocation]: ...
+def _measure_method(finder: StoreFinder, method: str, stores: Sequence[Store], origins: Sequence[GeoLocation], metric: bool) -> Tuple[float, List[List[float]]]: ...
+def _top_stores(distances: Sequence[float], results: int) -> List[int]: ...
+def compare_distance_methods(finder: StoreFinder, stores: Sequence[Store], origins: Sequence[GeoLocation], methods: Optional[Sequence[str]]=..., reference: str=..., results: int=..., metric: bool=...) -> List[DistanceMethodReport]: ...
+def compare_search_strategies(filepath: pathlib.Path, origins: Sequence[GeoLocation], results: int=..., resolutions: Sequence[float]=..., metric: bool=..., actual: bool=...) -> List[SearchReport]: ...
+def synthetic_rows(stores: Sequence[Store], count: int, seed: int=...) -> Generator[Tuple[float, float, Tuple[str, ...]], None, None]: ...
+def compare_catalog_memory(stores: Sequence[Store], count: int, seed: int=...) -> List[MemoryReport]: ...
+def compare_compressed_loads(stores: Sequence[Store], count: int, seed: int=..., compressions: Optional[Sequence[str]]=...) -> List[LoadReport]: ...
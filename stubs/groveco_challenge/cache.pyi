@@ -0,0 +1,90 @@
+# Stubs for groveco_challenge.cache (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import collections
+from . import constants
+from .geocoding import query_key
+from .models import GeoLocation
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+CREATE_GEOCODES_STATEMENT: str
+SELECT_GEOCODE_STATEMENT: str
+INSERT_GEOCODE_STATEMENT: str
+
+def quantize(origin: GeoLocation, precision: int) -> GeoLocation: ...
+
+class CacheStats:
+    hits: Any = ...
+    misses: Any = ...
+    evictions: Any = ...
+    expirations: Any = ...
+    invalidations: Any = ...
+    @property
+    def hit_rate(self) -> float: ...
+    def to_dict(self) -> Dict[str, float]: ...
+    def __init__(self, hits: Any, misses: Any, evictions: Any, expirations: Any, invalidations: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class ResultCache:
+    maxsize: Any = ...
+    ttl: Any = ...
+    clock: Any = ...
+    stats: Any = ...
+    _entries: collections.OrderedDict[Hashable, Tuple[float, Any]] = ...
+    _version: int = ...
+    _lock: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def __len__(self) -> int: ...
+    def _check_version(self, version: int) -> bool: ...
+    def get(self, key: Hashable, version: int=...) ->  Optional[Any]: ...
+    def put(self, key: Hashable, value: Any, version: int=...) -> Any: ...
+    def clear(self) -> None: ...
+    def __init__(self, maxsize: Any, ttl: Any, clock: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class WarmReport:
+    added: Any = ...
+    fresh: Any = ...
+    errors: Any = ...
+    @property
+    def failed(self) -> int: ...
+    def __init__(self, added: Any, fresh: Any, errors: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class GeocodeCache:
+    filepath: Any = ...
+    ttl: Any = ...
+    clock: Any = ...
+    stats: Any = ...
+    _lock: Any = ...
+    _connection: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def __len__(self) -> int: ...
+    def _lookup(self, query: str) -> Tuple[ Optional[GeoLocation], bool]: ...
+    def get(self, query: str) ->  Optional[GeoLocation]: ...
+    def is_fresh(self, query: str) -> bool: ...
+    def put(self, query: str, location: GeoLocation) -> Any: ...
+    def close(self) -> None: ...
+    def __init__(self, filepath: Any, ttl: Any, clock: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
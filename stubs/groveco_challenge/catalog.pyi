@@ -0,0 +1,96 @@
+# Stubs for groveco_challenge.catalog (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import pathlib
+from .models import GeoLocation, Store
+from typing import Any, Callable, Dict, Generator, IO, Iterable, Iterator, List, Optional, Tuple
+
+STORE_COLUMNS: Any
+CSV_HEADERS: Any
+CHUNK_SIZE: int
+CATEGORICAL_COLUMNS: Any
+COMPACT_PRECISION: Any
+COMPRESSION_MAGIC: Any
+COMPRESSION_OPENERS: Dict[str, Callable[..., IO[Any]]]
+
+def detect_compression(filepath: pathlib.Path) ->  Optional[str]: ...
+def open_store_locations(filepath: pathlib.Path, binary: bool=...) -> IO[Any]: ...
+def read_stores(fp: IO[str]) -> Generator[Store, None, None]: ...
+
+class StoreChunk:
+    latitudes: Any = ...
+    longitudes: Any = ...
+    rows: Any = ...
+    getter: Any = ...
+    malformed: Any = ...
+    def __len__(self) -> int: ...
+    def location(self, index: int) -> GeoLocation: ...
+    def columns(self, index: int) -> Tuple[str, ...]: ...
+    def __init__(self, latitudes: Any, longitudes: Any, rows: Any, getter: Any, malformed: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+def build_store(location: GeoLocation, columns: Tuple[str, ...]) -> Store: ...
+def read_store_chunks(fp: IO[str], chunk_size: int=...) -> Generator[StoreChunk, None, None]: ...
+def _smallest_typecode(maximum: int) -> str: ...
+
+class DictionaryColumn:
+    codes: Any = ...
+    values: Any = ...
+    @classmethod
+    def encode(cls, strings: Iterable[str]) -> DictionaryColumn: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, index: int) -> str: ...
+    def __init__(self, codes: Any, values: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class TextColumn:
+    blob: Any = ...
+    offsets: Any = ...
+    @classmethod
+    def encode(cls, strings: Iterable[str]) -> TextColumn: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, index: int) -> str: ...
+    def __init__(self, blob: Any, offsets: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class StoreCatalog:
+    latitudes: Any = ...
+    longitudes: Any = ...
+    columns: Any = ...
+    phis: Any = ...
+    lambdas: Any = ...
+    cos_phis: Any = ...
+    compact: Any = ...
+    @classmethod
+    def from_columns(cls, latitudes: Iterable[float], longitudes: Iterable[float], columns: Dict[str, List[str]], compact: bool=...) -> StoreCatalog: ...
+    @classmethod
+    def from_stores(cls, stores: Iterable[Store], compact: bool=...) -> StoreCatalog: ...
+    @classmethod
+    def load(cls, filepath: pathlib.Path, compact: bool=...) -> StoreCatalog: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[Store]: ...
+    def __getitem__(self, index: int) -> Store: ...
+    def location(self, index: int) -> GeoLocation: ...
+    def __init__(self, latitudes: Any, longitudes: Any, columns: Any, phis: Any, lambdas: Any, cos_phis: Any, compact: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -2,9 +2,29 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
+import click
+from . import constants
+from .coverage import lattice_points, read_points
+from .database import StoreDatabase, is_database
+from .deadline import DeadlineExceeded
 from .finder import StoreFinder
-from typing import Any, Optional
+from .graph import graph_path
+from .ingest import IngestReport
+from .loadtest import MockGeocoder, cli_target, library_target, local_service, read_queries, run_load, service_target, synthetic_queries
+from .profiling import Capture
+from .service import StoreService
+from .voronoi import table_path
+from typing import Any, Optional, TextIO, Tuple
 
 CONTEXT_SETTINGS: Any
 
-def cli(zipcode: Optional[str], address: Optional[str], units: str, output: str, results: int, max_workers: int, actual: bool) -> Any: ...
+@click.pass_context
+def cli(ctx: click.Context, zipcode: Optional[str], address: Optional[str], units: str, output: str, results: int, max_workers: Optional[int], actual: bool, planar: bool, streaming: bool, index: Optional[str], resolution: float, catalog: Optional[str], shard_by: Optional[str], compact_catalog: bool, voronoi: Optional[str], timeout: Optional[float], partial: bool, metrics_out: Optional[str], geocoder_url: Optional[str], geocode_cache: Optional[str], profile_out: Optional[str], trace_memory: bool) -> Any: ...
+def import_catalog(source: str, database: str) -> Any: ...
+def store_graph(neighbors: int, units: str, resolution: float, catalog: Optional[str], output: Optional[str]) -> Any: ...
+def voronoi_table(resolution: float, catalog: Optional[str], output: Optional[str]) -> Any: ...
+def coverage(points: Optional[str], lattice: Optional[Tuple[float, float, float, float]], step: float, units: str, workers: Optional[int], assignments: Optional[str], output: str, resolution: float, catalog: Optional[str]) -> Any: ...
+def serve(host: str, port: int, timeout: float, index: Optional[str], resolution: float, cache_size: int, catalog: Optional[str], shard_by: Optional[str], compact_catalog: bool, voronoi: Optional[str], geocoder_url: Optional[str], geocode_cache: Optional[str], allow_profiling: bool, watch: bool, reload_interval: float) -> Any: ...
+def load_test(target: str, queries: Optional[TextIO], requests: Optional[int], rate: Optional[float], concurrency: int, seed: int, service_url: Optional[str], mock_geocoder: bool, geocoder_latency: float, catalog: Optional[str], output: str) -> Any: ...
+def mock_geocoder(host: str, port: int, latency: float) -> Any: ...
+def warm_cache(queries: TextIO, geocode_cache: str, ttl: float, rate: float, workers: int, geocoder_url: Optional[str]) -> Any: ...
@@ -6,3 +6,32 @@ from typing import Any
 
 DATA_DIR: Any
 STORE_LOCATIONS_PATH: Any
+DISTANCE_METHODS: Any
+EARTH_RADIUS: float
+IMPERIAL_RATIO: float
+ELLIPSOID_TOLERANCE: float
+INDEX_TYPES: Any
+RELOAD_INTERVAL: float
+COMPACTION_THRESHOLD: int
+CACHE_TTL: float
+CACHE_PRECISION: int
+GEOCODE_CACHE_TTL: Any
+WARM_RATE: float
+WARM_WORKERS: int
+IO_WORKERS: int
+SERVICE_HOST: str
+SERVICE_PORT: int
+SERVICE_TIMEOUT: float
+BATCH_CELL_SIZE: float
+GRAPH_NEIGHBORS: int
+VORONOI_RESOLUTION: float
+VORONOI_MARGIN: float
+SHARD_TYPES: Any
+SHARD_RESOLUTION: float
+SHARD_COMPACTION_THRESHOLD: int
+LATENCY_BUCKETS: Any
+LOAD_TARGETS: Any
+LOAD_TEST_REQUESTS: int
+MOCK_GEOCODER_BOUNDS: Any
+MOCK_GEOCODER_PORT: int
+CAPTURE_LIMIT: int
@@ -0,0 +1,59 @@
+# Stubs for groveco_challenge.coverage (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+from .batch import nearest_for_points
+from .index import GridIndex
+from .snapshot import CatalogSnapshot
+from array import array
+from typing import Any, Dict, Generator, IO, Iterable, Optional, Tuple
+
+COVERAGE_CHUNK_SIZE: int
+HISTOGRAM_PRECISION: float
+COVERAGE_PERCENTILES: Any
+LATITUDE_HEADERS: Any
+LONGITUDE_HEADERS: Any
+CoveragePoint = Tuple[str, float, float]
+_worker_state: Optional[Tuple[CatalogSnapshot, GridIndex]]
+
+def read_points(fp: IO[str], malformed: Optional[Dict[str, int]]=...) -> Generator[CoveragePoint, None, None]: ...
+def lattice_points(south: float, west: float, north: float, east: float, step: float) -> Generator[CoveragePoint, None, None]: ...
+
+class DistanceHistogram:
+    precision: Any = ...
+    buckets: Any = ...
+    zeros: Any = ...
+    count: Any = ...
+    total: Any = ...
+    maximum: Any = ...
+    _base: Any = ...
+    _log_base: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def add(self, distance: float) -> Any: ...
+    @property
+    def mean(self) -> float: ...
+    def percentile(self, percent: float) -> float: ...
+    def __init__(self, precision: Any, buckets: Any, zeros: Any, count: Any, total: Any, maximum: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class CoverageReport:
+    points: Any = ...
+    stores: Any = ...
+    def histogram(self, store_id: int) -> DistanceHistogram: ...
+    def write(self, fp: IO[str], snapshot: CatalogSnapshot, percentiles: Iterable[float]=...) -> Any: ...
+    def __init__(self, points: Any, stores: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+def _init_worker(snapshot: CatalogSnapshot, spatial_index: GridIndex) -> Any: ...
+def _assign_chunk(latitudes: array, longitudes: array, radius: float) -> Tuple[array, array]: ...
+def assign_points(snapshot: CatalogSnapshot, spatial_index: GridIndex, points: Iterable[CoveragePoint], radius: float, assignments: Optional[IO[str]]=..., workers: Optional[int]=..., chunk_size: int=...) -> CoverageReport: ...
@@ -0,0 +1,49 @@
+# Stubs for groveco_challenge.database (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import pathlib
+import sqlite3
+from .catalog import CSV_HEADERS, STORE_COLUMNS, open_store_locations
+from .index import boundary_angle
+from .ingest import IngestReport
+from .models import GeoLocation, Store
+from typing import AbstractSet, Any, Callable, IO, Iterator, List, Optional, Tuple
+
+SQLITE_HEADER: bytes
+IMPORT_BATCH_SIZE: int
+CREATE_STATEMENTS: Any
+INSERT_STORE_STATEMENT: Any
+INSERT_LOCATION_STATEMENT: str
+SELECT_STORE_STATEMENT: Any
+SELECT_CANDIDATES_STATEMENT: str
+
+def is_database(filepath: pathlib.Path) -> bool: ...
+
+class StoreDatabase:
+    filepath: Any = ...
+    span: Any = ...
+    _local: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    @classmethod
+    def create(cls, filepath: pathlib.Path, source: pathlib.Path, span: float=..., report: Optional[IngestReport]=...) -> StoreDatabase: ...
+    @classmethod
+    def _import(cls, connection: sqlite3.Connection, fp: IO[str], source: pathlib.Path, report: IngestReport) -> Any: ...
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, batch: List[tuple]) -> Any: ...
+    @property
+    def connection(self) -> sqlite3.Connection: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[Store]: ...
+    def __getitem__(self, index: int) -> Store: ...
+    def _build_store(self, row: tuple) -> Store: ...
+    def location(self, index: int) -> GeoLocation: ...
+    def _candidates(self, south: float, north: float, west: float, east: float) -> Iterator[Tuple[int, float, float]]: ...
+    def nearest(self, origin: GeoLocation, distance: Callable[[GeoLocation], float], radius: float, results: int=..., tolerance: float=..., excluded: AbstractSet[int]=...) -> List[Tuple[float, int]]: ...
+    def __init__(self, filepath: Any, span: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
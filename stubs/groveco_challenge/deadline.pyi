@@ -0,0 +1,23 @@
+# Stubs for groveco_challenge.deadline (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+from typing import Any, Callable, Optional
+
+class DeadlineExceeded(TimeoutError): ...
+
+class Deadline:
+    expires: Any = ...
+    clock: Any = ...
+    @classmethod
+    def from_timeout(cls, timeout: Optional[float], clock: Callable[[], float]=...) ->  Optional[Deadline]: ...
+    @property
+    def expired(self) -> bool: ...
+    def remaining(self) -> float: ...
+    def __init__(self, expires: Any, clock: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -2,18 +2,143 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
-from .models import GeoLocation, Store, StoreResult
-from typing import Any, Generator, List
+import concurrent.futures
+import requests
+import threading
+import types
+from . import constants
+from .batch import PointResults, nearest_for_points
+from .cache import CacheStats, GeocodeCache, ResultCache, WarmReport, quantize
+from .catalog import CHUNK_SIZE, StoreCatalog, build_store, open_store_locations, read_store_chunks
+from .coverage import CoveragePoint, CoverageReport, assign_points
+from .database import StoreDatabase, is_database
+from .deadline import Deadline, DeadlineExceeded
+from .geocoding import RateLimiter, build_session, geocode, normalize_query, query_key
+from .graph import StoreGraph
+from .index import GridIndex
+from .ingest import IngestReport, ingest_catalog
+from .metrics import MetricsRegistry, measure
+from .models import GeoLocation, Store, StoreResult, StoreResults
+from .shards import ShardedCatalog
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .snapshot import CatalogFingerprint, CatalogSnapshot
+from .voronoi import VoronoiTable
+from typing import Any, Callable, IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+PLANAR_ROUNDING_SLACK: float
+
+def _wrap_longitude(delta_lambda: float) -> float: ...
+def _planar_haversine(delta_phi: float, delta_lambda: float, cos_product: float) -> Tuple[float, float]: ...
 
 class StoreFinder:
     filepath: Any = ...
     max_workers: Any = ...
-    def stores(self) -> Generator[Store, None, None]: ...
+    index: Any = ...
+    resolution: Any = ...
+    chunk_size: Any = ...
+    cache_size: Any = ...
+    cache_ttl: Any = ...
+    cache_precision: Any = ...
+    io_workers: Any = ...
+    cpu_workers: Any = ...
+    voronoi: Any = ...
+    compact_catalog: Any = ...
+    shard_by: Any = ...
+    geocoder_url: Any = ...
+    geocode_cache_path: Any = ...
+    geocode_cache_ttl: Any = ...
+    metrics: Any = ...
+    _snapshot: Optional[CatalogSnapshot] = ...
+    _snapshot_lock: Any = ...
+    _watch_thread: Optional[threading.Thread] = ...
+    _watch_lock: Any = ...
+    _watch_stop: Any = ...
+    _geocode_flight: Any = ...
+    _search_flight: Any = ...
+    _async_geocode_flight: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    _query_seconds: Any = ...
+    _query_errors: Any = ...
+    _search_seconds: Any = ...
+    _search_errors: Any = ...
+    _partial_results: Any = ...
+    _geocode_seconds: Any = ...
+    _geocode_errors: Any = ...
+    _geocode_warmed: Any = ...
+    def _register_metrics(self) -> Any: ...
+    def _build_snapshot(self, fingerprint: CatalogFingerprint, version: int=...) -> CatalogSnapshot: ...
+    @property
+    def snapshot(self) -> CatalogSnapshot: ...
+    @property
+    def catalog(self) -> StoreCatalog | StoreDatabase: ...
+    @property
+    def spatial_index(self) -> GridIndex |  Optional[StoreDatabase]: ...
+    def reload(self) -> bool: ...
+    def watch(self, interval: float=...) -> Any: ...
+    def unwatch(self) -> None: ...
+    def close(self) -> None: ...
+    def __enter__(self) -> StoreFinder: ...
+    def __exit__(self, *exc_info: Any) -> None: ...
+    def _compact(self, snapshot: CatalogSnapshot) -> CatalogSnapshot: ...
+    def _mutate(self, mutation: Callable[[CatalogSnapshot], CatalogSnapshot]) -> CatalogSnapshot: ...
+    def add_store(self, store: Store) -> int: ...
+    def update_store(self, store_id: int, store: Store) -> Any: ...
+    def remove_store(self, store_id: int) -> Any: ...
+    def compact(self) -> Any: ...
+    def rebuild_shard(self, key: str) -> Any: ...
+    @threaded_cached_property
+    def result_cache(self) ->  Optional[ResultCache]: ...
+    @property
+    def cache_stats(self) ->  Optional[CacheStats]: ...
+    @threaded_cached_property
+    def geocode_cache(self) ->  Optional[GeocodeCache]: ...
+    @property
+    def geocode_cache_stats(self) ->  Optional[CacheStats]: ...
+    @threaded_cached_property
+    def session(self) -> requests.Session: ...
+    @threaded_cached_property
+    def voronoi_table(self) ->  Optional[VoronoiTable]: ...
+    def build_voronoi_table(self, resolution: float=...) -> VoronoiTable: ...
+    @threaded_cached_property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor: ...
+    @threaded_cached_property
+    def io_executor(self) -> concurrent.futures.ThreadPoolExecutor: ...
+    @threaded_cached_property
+    def shard_executor(self) -> concurrent.futures.ThreadPoolExecutor: ...
+    @threaded_cached_property
+    def cpu_executor(self) -> concurrent.futures.ThreadPoolExecutor: ...
+    @property
+    def stores(self) -> Iterator[Store]: ...
     def _vincenty_distance(self, origin: GeoLocation, target: GeoLocation, metric: bool=...) -> float: ...
     def _haversine_distance(self, origin: GeoLocation, target: GeoLocation, metric: bool=...) -> float: ...
-    def get_distance(self, origin: GeoLocation, target: GeoLocation, metric: bool=..., actual: bool=...) -> float: ...
-    def find_stores(self, query: str, metric: bool=..., actual: bool=..., results: int=...) -> List[StoreResult]: ...
-    def __init__(self, filepath: Any, max_workers: Any) -> None: ...
+    def _equirectangular_distance(self, origin: GeoLocation, target: GeoLocation, metric: bool=...) -> float: ...
+    def _equirectangular_bounds(self, origin: GeoLocation, target: GeoLocation, metric: bool=...) -> Tuple[float, float]: ...
+    def _rank_planar(self, origin: GeoLocation, results: int=..., metric: bool=..., actual: bool=..., snapshot: Optional[CatalogSnapshot]=...) -> List[Tuple[float, int]]: ...
+    def _rank_index(self, origin: GeoLocation, results: int=..., metric: bool=..., actual: bool=..., snapshot: Optional[CatalogSnapshot]=...) -> List[Tuple[float, int]]: ...
+    def _find_streaming(self, origin: GeoLocation, metric: bool=..., actual: bool=..., results: int=..., deadline: Optional[Deadline]=...) -> StoreResults: ...
+    def get_distance(self, origin: GeoLocation, target: GeoLocation, metric: bool=..., actual: bool=..., method: Optional[str]=...) -> float: ...
+    def _geocode_query(self, query: str, deadline: Optional[Deadline]=...) -> GeoLocation: ...
+    def _geocode_shared(self, query: str, deadline: Optional[Deadline]=...) -> GeoLocation: ...
+    def _geocode(self, query: str, deadline: Optional[Deadline]=...) -> GeoLocation: ...
+    def warm_geocode_cache(self, queries: Iterable[str], rate: Optional[float]=..., workers: int=...) -> WarmReport: ...
+    def find_stores(self, query: str, metric: bool=..., actual: bool=..., results: int=..., planar: bool=..., streaming: bool=..., timeout: Optional[float]=..., partial: bool=...) -> StoreResults: ...
+    async def _geocode_executor(self, query: str, deadline: Optional[Deadline]=...) -> GeoLocation: ...
+    async def _geocode_async(self, query: str, deadline: Optional[Deadline]=...) -> GeoLocation: ...
+    async def find_stores_async(self, query: str, metric: bool=..., actual: bool=..., results: int=..., planar: bool=..., streaming: bool=..., timeout: Optional[float]=..., partial: bool=...) -> StoreResults: ...
+    async def find_stores_batch_async(self, queries: Sequence[str], metric: bool=..., actual: bool=..., results: int=..., planar: bool=..., streaming: bool=..., timeout: Optional[float]=..., partial: bool=...) -> List[StoreResults]: ...
+    def _grid_index(self, snapshot: CatalogSnapshot) -> GridIndex: ...
+    def find_stores_for_points(self, origins: Iterable[Tuple[float, float]], results: int=..., metric: bool=..., actual: bool=...) -> PointResults: ...
+    def assign_points(self, points: Iterable[CoveragePoint], metric: bool=..., assignments: Optional[IO[str]]=..., workers: Optional[int]=...) -> CoverageReport: ...
+    def build_store_graph(self, k: int=..., metric: bool=...) -> StoreGraph: ...
+    def _search(self, key: tuple, search: Callable[..., StoreResults], *args: Any, deadline: Optional[Deadline]=..., **kwargs: Any) -> StoreResults: ...
+    def find_nearest(self, origin: GeoLocation, metric: bool=..., actual: bool=..., results: int=..., planar: bool=..., streaming: bool=..., timeout: Optional[float]=..., partial: bool=...) -> StoreResults: ...
+    def _finish(self, store_results: StoreResults, partial: bool=...) -> StoreResults: ...
+    def _find_snapshot(self, snapshot: CatalogSnapshot, origin: GeoLocation, metric: bool=..., actual: bool=..., results: int=..., planar: bool=..., deadline: Optional[Deadline]=...) -> StoreResults: ...
+    def _rank_snapshot(self, snapshot: CatalogSnapshot, origin: GeoLocation, metric: bool=..., actual: bool=..., results: int=..., planar: bool=...) -> List[Tuple[float, int]]: ...
+    def _find_shards(self, snapshot: CatalogSnapshot, origin: GeoLocation, metric: bool=..., actual: bool=..., results: int=..., planar: bool=..., deadline: Optional[Deadline]=...) -> StoreResults: ...
+    def _find_table(self, snapshot: CatalogSnapshot, origin: GeoLocation, candidates: Sequence[int], metric: bool=..., actual: bool=...) -> StoreResults: ...
+    def _find_exhaustive(self, origin: GeoLocation, metric: bool=..., actual: bool=..., results: int=..., snapshot: Optional[CatalogSnapshot]=..., deadline: Optional[Deadline]=...) -> StoreResults: ...
+    def __init__(self, filepath: Any, max_workers: Any, index: Any, resolution: Any, chunk_size: Any, cache_size: Any, cache_ttl: Any, cache_precision: Any, io_workers: Any, cpu_workers: Any, voronoi: Any, compact_catalog: Any, shard_by: Any, geocoder_url: Any, geocode_cache_path: Any, geocode_cache_ttl: Any, metrics: Any) -> None: ...
     def __ne__(self, other: Any) -> None: ...
     def __eq__(self, other: Any) -> None: ...
     def __lt__(self, other: Any) -> None: ...
@@ -0,0 +1,29 @@
+# Stubs for groveco_challenge.geocoding (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import requests
+from .models import GeoLocation
+from typing import Any, Optional
+
+def normalize_query(query: str) -> str: ...
+def query_key(query: str) -> str: ...
+
+class RateLimiter:
+    rate: Any = ...
+    clock: Any = ...
+    sleep: Any = ...
+    _lock: Any = ...
+    _next: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def wait(self) -> None: ...
+    def __init__(self, rate: Any, clock: Any, sleep: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+def build_session(pool_size: int=...) -> requests.Session: ...
+def geocode(query: str, session: Optional[requests.Session]=..., timeout: Optional[float]=..., url: Optional[str]=...) -> GeoLocation: ...
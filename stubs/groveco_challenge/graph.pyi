@@ -0,0 +1,37 @@
+# Stubs for groveco_challenge.graph (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import pathlib
+from .batch import central_angle
+from .catalog import StoreCatalog
+from .index import GridIndex
+from .snapshot import CatalogSnapshot
+from typing import Any, List, Tuple
+
+GRAPH_HEADER: Any
+GRAPH_MAGIC: bytes
+GRAPH_VERSION: int
+
+def graph_path(filepath: pathlib.Path) -> pathlib.Path: ...
+
+class StoreGraph:
+    offsets: Any = ...
+    neighbors: Any = ...
+    distances: Any = ...
+    metric: Any = ...
+    k: Any = ...
+    @classmethod
+    def build(cls, snapshot: CatalogSnapshot, spatial_index: GridIndex, k: int, radius: float=..., metric: bool=...) -> StoreGraph: ...
+    @classmethod
+    def load(cls, filepath: pathlib.Path) -> StoreGraph: ...
+    def save(self, filepath: pathlib.Path) -> Any: ...
+    def __len__(self) -> int: ...
+    def neighbors_of(self, store_id: int) -> List[Tuple[int, float]]: ...
+    def __init__(self, offsets: Any, neighbors: Any, distances: Any, metric: Any, k: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
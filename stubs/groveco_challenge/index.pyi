@@ -0,0 +1,34 @@
+# Stubs for groveco_challenge.index (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+from .catalog import StoreCatalog
+from .models import GeoLocation
+from typing import AbstractSet, Any, Callable, Iterator, List, Tuple
+
+def boundary_angle(origin: GeoLocation, south: float, north: float, west: float, east: float) -> float: ...
+
+class GridIndex:
+    resolution: Any = ...
+    cells: Any = ...
+    rows: Any = ...
+    columns: Any = ...
+    row_height: Any = ...
+    column_width: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    @classmethod
+    def from_catalog(cls, catalog: StoreCatalog, resolution: float=...) -> GridIndex: ...
+    def cell(self, latitude: float, longitude: float) -> Tuple[int, int]: ...
+    def add(self, store_index: int, latitude: float, longitude: float) -> Any: ...
+    def remove(self, store_index: int, latitude: float, longitude: float) -> Any: ...
+    def _ring(self, row: int, column: int, radius: int) -> Iterator[Tuple[int, int]]: ...
+    def _expand(self, origin: GeoLocation) -> Iterator[Tuple[List[Tuple[int, int]], float]]: ...
+    def nearest(self, origin: GeoLocation, distance: Callable[[int], float], radius: float, results: int=..., tolerance: float=..., excluded: AbstractSet[int]=...) -> List[Tuple[float, int]]: ...
+    def within(self, origin: GeoLocation, distance: Callable[[int], float], radius: float, limit: float, excluded: AbstractSet[int]=...) -> List[Tuple[float, int]]: ...
+    def __init__(self, resolution: Any, cells: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -0,0 +1,35 @@
+# Stubs for groveco_challenge.ingest (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import pathlib
+from .catalog import CSV_HEADERS, STORE_COLUMNS, StoreCatalog, detect_compression, open_store_locations
+from array import array
+from typing import Any, Dict, Generator, IO, List, Optional, Tuple
+
+INGEST_CHUNK_BYTES: Any
+MALFORMED_SAMPLE_SIZE: int
+ParsedChunk = Tuple[array, array, Dict[str, List[str]], int, List[Tuple[int, str]]]
+
+class IngestReport:
+    filepath: Any = ...
+    rows: Any = ...
+    malformed: Any = ...
+    samples: Any = ...
+    @property
+    def ingested(self) -> int: ...
+    def add_malformed(self, line: int, reason: str) -> Any: ...
+    def to_text(self) -> str: ...
+    def __init__(self, filepath: Any, rows: Any, malformed: Any, samples: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+def _parse_chunk(filepath: pathlib.Path, start: int, end: int, positions: Dict[str, int]) -> ParsedChunk: ...
+def _parse_block(block: bytes, positions: Dict[str, int]) -> ParsedChunk: ...
+def _chunk_offsets(filepath: pathlib.Path, start: int, chunk_bytes: int) -> List[Tuple[int, int]]: ...
+def _read_blocks(fp: IO[bytes], block_bytes: int) -> Generator[bytes, None, None]: ...
+def ingest_catalog(filepath: pathlib.Path, workers: Optional[int]=..., chunk_bytes: int=..., compact: bool=...) -> Tuple[StoreCatalog, IngestReport]: ...
@@ -0,0 +1,72 @@
+# Stubs for groveco_challenge.loadtest (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import contextlib
+import pathlib
+import threading
+from . import constants
+from .finder import StoreFinder
+from .geocoding import query_key
+from .models import GeoLocation, Store
+from .service import StoreService, ThreadedHTTPServer
+from typing import Any, Callable, Dict, Generator, IO, List, Optional, Sequence, Tuple
+
+LoadTarget = Callable[[str], Any]
+
+def mock_location(query: str, bounds: Tuple[float, float, float, float]=...) -> GeoLocation: ...
+
+class MockGeocoder:
+    host: Any = ...
+    port: Any = ...
+    latency: Any = ...
+    bounds: Any = ...
+    _server: Optional[ThreadedHTTPServer] = ...
+    _thread: Optional[threading.Thread] = ...
+    def __attrs_post_init__(self) -> None: ...
+    @property
+    def url(self) -> str: ...
+    def respond(self, path: str) -> Tuple[int, Dict[str, Any]]: ...
+    def make_server(self) -> ThreadedHTTPServer: ...
+    def start(self) -> MockGeocoder: ...
+    def stop(self) -> None: ...
+    def __enter__(self) -> MockGeocoder: ...
+    def __exit__(self, *exc_info: Any) -> Any: ...
+    def serve(self) -> None: ...
+    def __init__(self, host: Any, port: Any, latency: Any, bounds: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class LoadTestReport:
+    target: Any = ...
+    requests: Any = ...
+    seconds: Any = ...
+    latencies: Any = ...
+    errors: Any = ...
+    @property
+    def throughput(self) -> float: ...
+    @property
+    def error_rate(self) -> float: ...
+    def percentile(self, percent: float) -> float: ...
+    def to_dict(self) -> Dict[str, Any]: ...
+    def to_text(self) -> str: ...
+    def __init__(self, target: Any, requests: Any, seconds: Any, latencies: Any, errors: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+def read_queries(fp: IO[str]) -> List[str]: ...
+def synthetic_queries(stores: Sequence[Store], count: int, seed: int=..., addresses: float=...) -> List[str]: ...
+def library_target(finder: StoreFinder, **options: Any) -> LoadTarget: ...
+def service_target(url: str, timeout: float=...) -> LoadTarget: ...
+def cli_target(catalog: Optional[pathlib.Path]=..., geocoder_url: Optional[str]=..., arguments: Sequence[str]=...) -> LoadTarget: ...
+@contextlib.contextmanager
+def local_service(finder: StoreFinder, timeout: Optional[float]=...) -> Generator[str, None, None]: ...
+def run_load(name: str, target: LoadTarget, queries: Sequence[str], rate: Optional[float]=..., concurrency: int=...) -> LoadTestReport: ...
@@ -0,0 +1,127 @@
+# Stubs for groveco_challenge.metrics (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import abc
+import contextlib
+from . import constants
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+Sample = Tuple[str, Dict[str, str], float]
+M = TypeVar('M', bound='Metric')
+
+class _Token: ...
+
+class ThreadCells:
+    _size: Any = ...
+    _local: Any = ...
+    _lock: Any = ...
+    _cells: Dict[int, List[float]] = ...
+    _retired: Any = ...
+    def __init__(self, size: int) -> None: ...
+    def get(self) -> List[float]: ...
+    def _retire(self, cell: List[float]) -> Any: ...
+    def values(self) -> List[float]: ...
+
+def _format_value(value: float) -> str: ...
+def _format_labels(labels: Dict[str, str]) -> str: ...
+def _to_labelnames(labelnames: Iterable[str]) -> Tuple[str, ...]: ...
+
+class Metric(abc.ABC, metaclass=abc.ABCMeta):
+    name: Any = ...
+    documentation: Any = ...
+    labelnames: Any = ...
+    kind: str = ...
+    _children: Dict[Tuple[str, ...], Any] = ...
+    _children_lock: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def labels(self, *values: str) -> Any: ...
+    def children(self) -> Iterator[Tuple[Dict[str, str], M]]: ...
+    @abc.abstractmethod
+    def samples(self) -> List[Sample]: ...
+    def to_dict(self) -> Dict[str, Any]: ...
+    def __init__(self, name: Any, documentation: Any, labelnames: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class Counter(Metric):
+    function: Any = ...
+    kind: str = ...
+    _cells: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def inc(self, amount: float=...) -> Any: ...
+    @property
+    def value(self) ->  Optional[float]: ...
+    def samples(self) -> List[Sample]: ...
+    def __init__(self, name: Any, documentation: Any, labelnames: Any, function: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class Gauge(Metric):
+    function: Any = ...
+    kind: str = ...
+    _value: float = ...
+    _lock: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def set(self, value: float) -> Any: ...
+    def inc(self, amount: float=...) -> Any: ...
+    @property
+    def value(self) ->  Optional[float]: ...
+    def samples(self) -> List[Sample]: ...
+    def __init__(self, name: Any, documentation: Any, labelnames: Any, function: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class Histogram(Metric):
+    buckets: Any = ...
+    kind: str = ...
+    _cells: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def observe(self, value: float) -> Any: ...
+    def time(self) -> Generator[None, None, None]: ...
+    def snapshot(self) -> Tuple[List[Tuple[float, float]], float, float]: ...
+    def samples(self) -> List[Sample]: ...
+    def to_dict(self) -> Dict[str, Any]: ...
+    def __init__(self, name: Any, documentation: Any, labelnames: Any, buckets: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+@contextlib.contextmanager
+def measure(seconds: Histogram, errors: Optional[Counter]=...) -> Generator[None, None, None]: ...
+
+class MetricsRegistry:
+    _metrics: Dict[str, Metric] = ...
+    _lock: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def __iter__(self) -> Iterator[Metric]: ...
+    def __len__(self) -> int: ...
+    def get(self, name: str) ->  Optional[Metric]: ...
+    def register(self, metric: Metric) -> Any: ...
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...]=..., function: Callable[[], Optional[float]] | None=...) -> Counter: ...
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...]=..., function: Callable[[], Optional[float]] | None=...) -> Gauge: ...
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...]=..., buckets: Tuple[float, ...]=...) -> Histogram: ...
+    def to_dict(self) -> Dict[str, Dict[str, Any]]: ...
+    def to_prometheus(self) -> str: ...
+    def __init__(self) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -2,7 +2,7 @@
 #
 # NOTE: This dynamically typed stub was automatically generated by stubgen.
 
-from typing import Any
+from typing import Any, Iterable
 
 class GeoLocation:
     latitude: Any = ...
@@ -23,3 +23,7 @@ class StoreResult:
     metric: Any = ...
     distance: Any = ...
     def to_text(self) -> str: ...
+
+class StoreResults(list):
+    partial: Any = ...
+    def __init__(self, results: Iterable[StoreResult]=..., partial: bool=...) -> None: ...
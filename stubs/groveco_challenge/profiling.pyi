@@ -0,0 +1,42 @@
+# Stubs for groveco_challenge.profiling (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import cProfile
+import pathlib
+import pstats
+import tracemalloc
+from . import constants
+from typing import Any, Dict, List, Optional
+
+TRACE_FILTERS: Any
+_tracing_lock: Any
+_tracing_captures: int
+_tracing_started: bool
+
+def _start_tracing() -> None: ...
+def _stop_tracing() -> None: ...
+
+class Capture:
+    profile: Any = ...
+    trace_memory: Any = ...
+    stats: Optional[pstats.Stats] = ...
+    allocations: List[tracemalloc.StatisticDiff] = ...
+    _profiler: Optional[cProfile.Profile] = ...
+    _baseline: Optional[tracemalloc.Snapshot] = ...
+    def __attrs_post_init__(self) -> None: ...
+    @property
+    def enabled(self) -> bool: ...
+    def __enter__(self) -> Capture: ...
+    def __exit__(self, *exc_info: Any) -> Any: ...
+    def dump_stats(self, filepath: pathlib.Path) -> Any: ...
+    def top_functions(self, limit: int=...) -> List[Dict[str, Any]]: ...
+    def top_allocations(self, limit: int=...) -> List[Dict[str, Any]]: ...
+    def allocations_text(self, limit: int=...) -> str: ...
+    def __init__(self, profile: Any, trace_memory: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -0,0 +1,38 @@
+# Stubs for groveco_challenge.service (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import http.server
+import socketserver
+from . import constants
+from .deadline import DeadlineExceeded
+from .finder import StoreFinder
+from .metrics import Histogram
+from .profiling import Capture
+from typing import Any, Dict, List, Tuple
+
+TRUE_VALUES: Any
+
+class ThreadedHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads: bool = ...
+
+class StoreService:
+    finder: Any = ...
+    timeout: Any = ...
+    log_requests: Any = ...
+    allow_profiling: Any = ...
+    _request_seconds: Histogram = ...
+    def __attrs_post_init__(self) -> None: ...
+    def _parse_stores(self, parameters: Dict[str, List[str]]) -> Dict[str, Any]: ...
+    def _parse_capture(self, parameters: Dict[str, List[str]]) -> Capture: ...
+    def handle(self, path: str) -> Tuple[int, Dict[str, Any] | str]: ...
+    def _handle_stores(self, query: str) -> Tuple[int, Dict[str, Any]]: ...
+    def make_server(self, host: str=..., port: int=...) -> ThreadedHTTPServer: ...
+    def serve(self, host: str=..., port: int=...) -> Any: ...
+    def __init__(self, finder: Any, timeout: Any, log_requests: Any, allow_profiling: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
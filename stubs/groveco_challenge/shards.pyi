@@ -0,0 +1,55 @@
+# Stubs for groveco_challenge.shards (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+from .catalog import STORE_COLUMNS, StoreCatalog
+from .index import GridIndex
+from .models import GeoLocation, Store
+from .snapshot import CatalogFingerprint, CatalogSnapshot
+from typing import Any, Iterable, List, Optional, Tuple
+
+def shard_key(latitude: float, longitude: float, state: str, shard_by: str, resolution: float) -> str: ...
+def box_angle(origin: GeoLocation, south: float, west: float, north: float, east: float) -> float: ...
+
+class CatalogShard:
+    key: Any = ...
+    snapshot: Any = ...
+    south: Any = ...
+    west: Any = ...
+    north: Any = ...
+    east: Any = ...
+    @classmethod
+    def from_catalog(cls, key: str, catalog: StoreCatalog, ids: Iterable[int], fingerprint: CatalogFingerprint, next_id: int, resolution: float=...) -> CatalogShard: ...
+    def bound(self, origin: GeoLocation) -> float: ...
+    def with_store(self, store_id: int, store: Store) -> CatalogShard: ...
+    def without_store(self, store_id: int) -> CatalogShard: ...
+    def __init__(self, key: Any, snapshot: Any, south: Any, west: Any, north: Any, east: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class ShardedCatalog:
+    shards: Any = ...
+    shard_by: Any = ...
+    shard_resolution: Any = ...
+    resolution: Any = ...
+    compact: Any = ...
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot, shard_by: str=..., shard_resolution: float=..., resolution: float=...) -> ShardedCatalog: ...
+    def __len__(self) -> int: ...
+    def key(self, store: Store) -> str: ...
+    def with_store(self, store_id: int, store: Store, fingerprint: CatalogFingerprint, previous: Optional[Store]=...) -> ShardedCatalog: ...
+    def without_store(self, store_id: int, previous: Store) -> ShardedCatalog: ...
+    def rebuild(self, key: str) -> ShardedCatalog: ...
+    def compacted(self, threshold: int) -> ShardedCatalog: ...
+    def ordered(self, origin: GeoLocation) -> List[Tuple[float, CatalogShard]]: ...
+    def __init__(self, shards: Any, shard_by: Any, shard_resolution: Any, resolution: Any, compact: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -0,0 +1,36 @@
+# Stubs for groveco_challenge.singleflight (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import asyncio
+import concurrent.futures
+from typing import Any, Callable, Coroutine, Dict, Hashable, Optional, Tuple
+
+class SingleFlight:
+    executed: Any = ...
+    shared: Any = ...
+    _calls: Dict[Hashable, concurrent.futures.Future] = ...
+    _lock: Any = ...
+    def __attrs_post_init__(self) -> None: ...
+    def do(self, key: Hashable, function: Callable[..., Any], *args: Any, timeout: Optional[float]=..., **kwargs: Any) -> Any: ...
+    def __init__(self, executed: Any, shared: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class AsyncSingleFlight:
+    executed: Any = ...
+    shared: Any = ...
+    _tasks: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = ...
+    def __attrs_post_init__(self) -> None: ...
+    async def do(self, key: Hashable, function: Callable[..., Coroutine[Any, Any, Any]], *args: Any, **kwargs: Any) -> Any: ...
+    def __init__(self, executed: Any, shared: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -0,0 +1,56 @@
+# Stubs for groveco_challenge.snapshot (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import pathlib
+from .catalog import StoreCatalog
+from .database import StoreDatabase
+from .index import GridIndex
+from .models import Store
+from array import array
+from typing import Any, Iterator, Optional, Tuple
+
+HASH_BLOCK_SIZE: Any
+
+class CatalogFingerprint:
+    mtime_ns: Any = ...
+    size: Any = ...
+    digest: Any = ...
+    @classmethod
+    def from_file(cls, filepath: pathlib.Path, previous: Optional[CatalogFingerprint]=...) -> CatalogFingerprint: ...
+    def __init__(self, mtime_ns: Any, size: Any, digest: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
+
+class CatalogSnapshot:
+    catalog: Any = ...
+    spatial_index: Any = ...
+    fingerprint: Any = ...
+    version: Any = ...
+    ids: Any = ...
+    delta: Any = ...
+    tombstones: Any = ...
+    next_id: Any = ...
+    shards: Any = ...
+    @ids.default
+    def _ids_default(self) -> array: ...
+    @next_id.default
+    def _next_id_default(self) -> int: ...
+    @property
+    def mutations(self) -> int: ...
+    def index_of(self, store_id: int) ->  Optional[int]: ...
+    def store(self, store_id: int) -> Store: ...
+    def stores(self) -> Iterator[Tuple[int, Store]]: ...
+    def with_store(self, store_id: int, store: Store) -> CatalogSnapshot: ...
+    def without_store(self, store_id: int) -> CatalogSnapshot: ...
+    def __init__(self, catalog: Any, spatial_index: Any, fingerprint: Any, version: Any, ids: Any, delta: Any, tombstones: Any, next_id: Any, shards: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
@@ -0,0 +1,43 @@
+# Stubs for groveco_challenge.voronoi (Python 3)
+#
+# NOTE: This dynamically typed stub was automatically generated by stubgen.
+
+import pathlib
+from .batch import cell_candidates, delta_candidates
+from .index import GridIndex
+from .snapshot import CatalogSnapshot
+from typing import Any, Optional, Sequence
+
+TABLE_HEADER: Any
+TABLE_HEADER_SIZE: int
+TABLE_MAGIC: bytes
+TABLE_VERSION: int
+
+def table_path(filepath: pathlib.Path) -> pathlib.Path: ...
+
+class VoronoiTable:
+    south: Any = ...
+    west: Any = ...
+    resolution: Any = ...
+    rows: Any = ...
+    columns: Any = ...
+    digest: Any = ...
+    offsets: Any = ...
+    candidates: Any = ...
+    mapping: Any = ...
+    @classmethod
+    def build(cls, snapshot: CatalogSnapshot, spatial_index: GridIndex, resolution: float, margin: float=..., tolerance: float=...) -> VoronoiTable: ...
+    @classmethod
+    def load(cls, filepath: pathlib.Path) -> VoronoiTable: ...
+    def save(self, filepath: pathlib.Path) -> Any: ...
+    def close(self) -> None: ...
+    def __enter__(self) -> VoronoiTable: ...
+    def __exit__(self, *exc_info: Any) -> Any: ...
+    def lookup(self, latitude: float, longitude: float) ->  Optional[Sequence[int]]: ...
+    def __init__(self, south: Any, west: Any, resolution: Any, rows: Any, columns: Any, digest: Any, offsets: Any, candidates: Any, mapping: Any) -> None: ...
+    def __ne__(self, other: Any) -> None: ...
+    def __eq__(self, other: Any) -> None: ...
+    def __lt__(self, other: Any) -> None: ...
+    def __le__(self, other: Any) -> None: ...
+    def __gt__(self, other: Any) -> None: ...
+    def __ge__(self, other: Any) -> None: ...
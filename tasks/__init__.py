@@ -8,7 +8,7 @@ import configparser
 import invoke
 import parver
 
-from . import docs, package
+from . import docs, package, benchmark
 from .utils import (
     report,
     get_tag_content,
@@ -169,7 +169,9 @@ def publish(ctx, test=False, force=False, draft=False):
             ctx.run(git_reset_command)
 
 
-namespace = invoke.Collection(build, clean, publish, docs, package, profile)
+namespace = invoke.Collection(
+    build, clean, publish, docs, package, benchmark, profile
+)
 namespace.configure(
     {
         "metadata": metadata,
@@ -0,0 +1,132 @@
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+import pathlib
+
+import invoke
+
+from .utils import report
+
+
+@invoke.task
+def distance(ctx, origins=200, results=5, seed=0, metric=False, catalog=None):
+    """Compare the speed and accuracy of the available distance methods.
+
+    :param int origins: The amount of random origins to measure from (defaults to 200)
+    :param int results: The amount of top results compared for ranking (defaults to 5)
+    :param int seed: The seed used to place random origins (defaults to 0)
+    :param bool metric: Compare distances in kilometers (defaults to False)
+    :param str catalog: The store catalog to measure against (defaults to bundled)
+    """
+
+    from groveco_challenge import constants
+    from groveco_challenge.finder import StoreFinder
+    from groveco_challenge.benchmark import random_origins, compare_distance_methods
+
+    catalog_path = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    finder = StoreFinder(catalog_path)
+    stores = list(finder.stores)
+    sample = random_origins(stores, int(origins), seed=int(seed))
+
+    report.info(
+        ctx,
+        "benchmark.distance",
+        f"measuring {len(sample) * len(stores)} pairs from {catalog_path!s}",
+    )
+    for method_report in compare_distance_methods(
+        finder, stores, sample, results=int(results), metric=metric
+    ):
+        report.success(ctx, "benchmark.distance", method_report.to_text())
+
+
+@invoke.task
+def search(
+    ctx, origins=200, results=5, seed=0, metric=False, actual=False, catalog=None
+):
+    """Compare the speed of the nearest store search strategies.
+
+    :param int origins: The amount of random origins to search from (defaults to 200)
+    :param int results: The amount of closest stores to search for (defaults to 5)
+    :param int seed: The seed used to place random origins (defaults to 0)
+    :param bool metric: Search with distances in kilometers (defaults to False)
+    :param bool actual: Search with Vincenty distances (defaults to False)
+    :param str catalog: The store catalog to search (defaults to bundled)
+    """
+
+    from groveco_challenge import constants
+    from groveco_challenge.finder import StoreFinder
+    from groveco_challenge.benchmark import random_origins, compare_search_strategies
+
+    catalog_path = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    sample = random_origins(
+        list(StoreFinder(catalog_path).stores), int(origins), seed=int(seed)
+    )
+
+    report.info(
+        ctx, "benchmark.search", f"searching {len(sample)} origins in {catalog_path!s}"
+    )
+    for search_report in compare_search_strategies(
+        catalog_path, sample, results=int(results), metric=metric, actual=actual
+    ):
+        report.success(ctx, "benchmark.search", search_report.to_text())
+
+
+@invoke.task
+def memory(ctx, stores=1000000, seed=0, catalog=None):
+    """Compare the memory retained per store by the layouts of a large catalog.
+
+    :param int stores: The amount of stores of the synthetic catalog (defaults to 1M)
+    :param int seed: The seed used to build the synthetic stores (defaults to 0)
+    :param str catalog: The store catalog the synthetic stores are modeled after
+        (defaults to bundled)
+    """
+
+    from groveco_challenge import constants
+    from groveco_challenge.finder import StoreFinder
+    from groveco_challenge.benchmark import compare_catalog_memory
+
+    catalog_path = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    report.info(
+        ctx,
+        "benchmark.memory",
+        f"measuring {int(stores)} stores modeled after {catalog_path!s}",
+    )
+    for memory_report in compare_catalog_memory(
+        list(StoreFinder(catalog_path).stores), int(stores), seed=int(seed)
+    ):
+        report.success(ctx, "benchmark.memory", memory_report.to_text())
+
+
+@invoke.task
+def compression(ctx, stores=200000, seed=0, catalog=None):
+    """Compare loading a large catalog from compressed and uncompressed files.
+
+    :param int stores: The amount of stores of the synthetic catalog
+        (defaults to 200K)
+    :param int seed: The seed used to build the synthetic stores (defaults to 0)
+    :param str catalog: The store catalog the synthetic stores are modeled after
+        (defaults to bundled)
+    """
+
+    from groveco_challenge import constants
+    from groveco_challenge.finder import StoreFinder
+    from groveco_challenge.benchmark import compare_compressed_loads
+
+    catalog_path = (
+        constants.STORE_LOCATIONS_PATH if catalog is None else pathlib.Path(catalog)
+    )
+    report.info(
+        ctx,
+        "benchmark.compression",
+        f"loading {int(stores)} stores modeled after {catalog_path!s}",
+    )
+    for load_report in compare_compressed_loads(
+        list(StoreFinder(catalog_path).stores), int(stores), seed=int(seed)
+    ):
+        report.success(ctx, "benchmark.compression", load_report.to_text())
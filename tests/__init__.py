@@ -4,7 +4,9 @@
 
 """GroveCo Challenge testing module."""
 
+import asyncio
 import pathlib
+from typing import Any, Awaitable
 
 from hypothesis import HealthCheck, settings
 
@@ -17,6 +19,23 @@ settings.load_profile("default")
 TEST_STORE_LOCATIONS_PATH = (
     pathlib.Path(__file__).parent / "data" / "store-locations.csv"
 )
+
+
+def run_until_complete(coroutine: Awaitable[Any]) -> Any:
+    """Run a coroutine on a new event loop (as ``asyncio.run`` requires Python 3.7).
+
+    :param Awaitable[Any] coroutine: The coroutine to run
+    :return: The result of the coroutine
+    :rtype: Any
+    """
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
 API_MOCK_RESPONSE = """{
    "results" : [
       {
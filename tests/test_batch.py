@@ -0,0 +1,107 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+from typing import List
+
+import attr
+import pytest
+from hypothesis import given
+from hypothesis.strategies import lists, booleans, integers, sampled_from
+
+from groveco_challenge import constants
+from groveco_challenge.batch import nearest_for_points
+from groveco_challenge.index import GridIndex
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.models import GeoLocation
+
+from . import TEST_STORE_LOCATIONS_PATH
+from .strategies import geo_location
+
+
+@given(
+    lists(geo_location(), min_size=1, max_size=8),
+    sampled_from([0.1, 1.0, 10.0]),
+    integers(min_value=1, max_value=40),
+)
+def test_nearest_for_points(
+    store_finder: StoreFinder,
+    origins: List[GeoLocation],
+    cell_size: float,
+    results: int,
+):
+    radius = constants.EARTH_RADIUS * constants.IMPERIAL_RATIO
+    snapshot = store_finder.snapshot
+    spatial_index = GridIndex.from_catalog(snapshot.catalog)
+    (origin_indexes, store_ids, distances) = nearest_for_points(
+        snapshot,
+        spatial_index,
+        [(origin.latitude, origin.longitude) for origin in origins],
+        results=results,
+        radius=radius,
+        cell_size=cell_size,
+    )
+
+    count = min(results, len(snapshot.catalog))
+    assert len(origin_indexes) == len(store_ids) == len(distances)
+    assert len(distances) == len(origins) * count
+    for (origin_index, origin) in enumerate(origins):
+        rows = range(origin_index * count, (origin_index + 1) * count)
+        expected = store_finder.find_nearest(origin, results=results)
+        assert [origin_indexes[row] for row in rows] == [origin_index] * count
+        assert [distances[row] for row in rows] == pytest.approx(
+            [result.distance for result in expected]
+        )
+        for row in rows:
+            assert store_finder.get_distance(
+                origin, snapshot.store(store_ids[row]).geolocation
+            ) == pytest.approx(distances[row])
+
+
+@given(geo_location(), booleans(), booleans(), integers(min_value=1, max_value=8))
+def test_find_stores_for_points(
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    metric: bool,
+    actual: bool,
+    results: int,
+):
+    (origin_indexes, store_ids, distances) = store_finder.find_stores_for_points(
+        [(origin.latitude, origin.longitude)],
+        results=results,
+        metric=metric,
+        actual=actual,
+    )
+    expected = store_finder.find_nearest(
+        origin, metric=metric, actual=actual, results=results
+    )
+    assert list(origin_indexes) == [0] * results
+    assert list(distances) == pytest.approx([result.distance for result in expected])
+
+
+def test_find_stores_for_points_mutations():
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, index="grid")
+    closed = finder.catalog[0]
+    origin = (closed.geolocation.latitude, closed.geolocation.longitude)
+
+    finder.remove_store(0)
+    (_, store_ids, _) = finder.find_stores_for_points([origin], results=40)
+    assert len(store_ids) == 31
+    assert 0 not in store_ids
+
+    store_id = finder.add_store(attr.evolve(closed, name="Reopened"))
+    (_, store_ids, distances) = finder.find_stores_for_points([origin, origin])
+    assert list(store_ids) == [store_id, store_id]
+    assert list(distances) == [0.0, 0.0]
+
+    (_, store_ids, _) = finder.find_stores_for_points([origin], results=40)
+    for store_id in store_ids:
+        finder.remove_store(store_id)
+    assert [list(column) for column in finder.find_stores_for_points([origin])] == [
+        [],
+        [],
+        [],
+    ]
@@ -0,0 +1,118 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+from typing import List
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import integers
+
+from groveco_challenge import constants
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.models import Store
+from groveco_challenge.catalog import COMPACT_PRECISION, COMPRESSION_OPENERS
+from groveco_challenge.benchmark import (
+    random_origins,
+    synthetic_rows,
+    compare_catalog_memory,
+    compare_compressed_loads,
+    compare_distance_methods,
+    compare_search_strategies,
+)
+
+from . import TEST_STORE_LOCATIONS_PATH
+
+
+@pytest.fixture(scope="module")
+def test_stores() -> List[Store]:
+    yield list(StoreFinder(TEST_STORE_LOCATIONS_PATH).stores)
+
+
+@given(integers(min_value=0, max_value=50), integers())
+def test_random_origins(test_stores: List[Store], count: int, seed: int):
+    origins = random_origins(test_stores, count, seed=seed)
+    assert len(origins) == count
+    assert origins == random_origins(test_stores, count, seed=seed)
+    for origin in origins:
+        assert -90.0 <= origin.latitude <= 90.0
+        assert -180.0 <= origin.longitude <= 180.0
+
+
+def test_compare_distance_methods(test_stores: List[Store]):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH)
+    origins = random_origins(test_stores, 20)
+    reports = {
+        report.method: report
+        for report in compare_distance_methods(finder, test_stores, origins)
+    }
+
+    assert set(reports.keys()) == set(constants.DISTANCE_METHODS)
+    for report in reports.values():
+        assert report.pairs == len(origins) * len(test_stores)
+        assert report.throughput > 0.0
+        assert 0.0 <= report.rank_disagreement <= 1.0
+        assert report.mean_error <= report.max_error
+        assert isinstance(report.to_text(), str)
+
+    reference = reports["vincenty"]
+    assert reference.max_error == 0.0
+    assert reference.rank_disagreement == 0.0
+
+    # NOTE: guards the documented ~0.5% discrepancy of the spherical approximation
+    # (which currently also carries the error of its imperial conversion ratio)
+    assert reports["haversine"].max_relative_error < 0.01
+
+
+def test_compare_search_strategies(test_stores: List[Store]):
+    origins = random_origins(test_stores, 10)
+    reports = compare_search_strategies(
+        TEST_STORE_LOCATIONS_PATH, origins, results=3, resolutions=(1.0, 10.0)
+    )
+
+    assert [report.name for report in reports][:3] == [
+        "exhaustive",
+        "planar",
+        "streaming",
+    ]
+    assert len(reports) == 5
+    for report in reports:
+        assert report.queries == len(origins)
+        assert report.mismatches == 0
+        assert report.throughput > 0.0
+        assert isinstance(report.to_text(), str)
+
+
+def test_compare_catalog_memory(test_stores: List[Store]):
+    rows = list(synthetic_rows(test_stores, 50))
+    assert len(rows) == 50
+    assert len({columns[0] for (_, _, columns) in rows}) == 50
+
+    reports = {
+        report.layout: report for report in compare_catalog_memory(test_stores, 500)
+    }
+    assert list(reports.keys()) == ["objects", "columns", "compact"]
+    for report in reports.values():
+        assert report.stores == 500
+        assert report.bytes_per_store > 0.0
+        assert isinstance(report.to_text(), str)
+    assert reports["compact"].size < reports["columns"].size < reports["objects"].size
+    assert reports["columns"].max_error == 0.0
+    assert 0.0 < reports["compact"].max_error <= COMPACT_PRECISION
+
+
+def test_compare_compressed_loads(test_stores: List[Store]):
+    reports = compare_compressed_loads(test_stores, 500)
+    assert [report.compression for report in reports] == [
+        "none",
+        *COMPRESSION_OPENERS.keys(),
+    ]
+    for report in reports:
+        assert report.stores == 500
+        assert report.throughput > 0.0
+        assert report.peak > 0
+        assert isinstance(report.to_text(), str)
+        assert report.size < reports[0].size or report.compression == "none"
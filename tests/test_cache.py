@@ -0,0 +1,95 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+from hypothesis import given
+from hypothesis.strategies import integers
+
+from groveco_challenge.cache import ResultCache, GeocodeCache, quantize
+from groveco_challenge.models import GeoLocation
+
+from .strategies import geo_location
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@given(geo_location(), integers(min_value=0, max_value=8))
+def test_quantize(origin: GeoLocation, precision: int):
+    quantized = quantize(origin, precision)
+    assert abs(quantized.latitude - origin.latitude) <= 0.5 * 10**-precision + 1e-9
+    assert abs(quantized.longitude - origin.longitude) <= 0.5 * 10**-precision + 1e-9
+    assert quantize(quantized, precision) == quantized
+
+
+def test_lru_eviction():
+    cache = ResultCache(maxsize=2, ttl=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    assert (cache.stats.hits, cache.stats.misses) == (3, 1)
+    assert cache.stats.hit_rate == 0.75
+
+
+def test_ttl_expiration():
+    clock = FakeClock()
+    cache = ResultCache(maxsize=2, ttl=10.0, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.0
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+
+def test_version_invalidation():
+    cache = ResultCache()
+    cache.put("a", 1, version=1)
+    assert cache.get("a", version=1) == 1
+    assert cache.get("a", version=2) is None
+    assert cache.stats.invalidations == 1
+
+    # results built from outdated catalogs are never cached
+    cache.put("a", 1, version=1)
+    assert cache.get("a", version=2) is None
+    assert cache.get("a", version=1) is None
+    assert cache.stats.to_dict()["misses"] == 3
+
+
+def test_geocode_cache(tmp_path):
+    clock = FakeClock()
+    filepath = tmp_path / "geocodes.db"
+    cache = GeocodeCache(filepath, ttl=10.0, clock=clock)
+    location = GeoLocation(37.4224764, -122.0842499)
+    assert cache.get("94043") is None
+    cache.put("  94043 ", location)
+    assert cache.get("94043") == location
+    assert cache.is_fresh("94043")
+    cache.close()
+
+    # entries outlive the cache and expire by the time they were stored
+    cache = GeocodeCache(filepath, ttl=None, clock=clock)
+    assert len(cache) == 1
+    clock.now = 10.0
+    assert not cache.is_fresh("94043")
+    assert cache.get("94043") is None
+    cache.put("94043", location)
+    clock.now = float("inf")
+    assert cache.get("94043") == location
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.expirations) == (1, 1, 1)
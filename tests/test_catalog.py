@@ -0,0 +1,168 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+from math import cos, radians
+from typing import List
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import text, lists, integers
+
+from groveco_challenge.models import Store
+from groveco_challenge.catalog import (
+    STORE_COLUMNS,
+    COMPACT_PRECISION,
+    CATEGORICAL_COLUMNS,
+    COMPRESSION_OPENERS,
+    TextColumn,
+    StoreCatalog,
+    DictionaryColumn,
+    build_store,
+    read_stores,
+    read_store_chunks,
+    detect_compression,
+    open_store_locations,
+)
+
+from . import TEST_STORE_LOCATIONS_PATH
+from .strategies import store
+
+
+def test_load():
+    catalog = StoreCatalog.load(TEST_STORE_LOCATIONS_PATH)
+    with TEST_STORE_LOCATIONS_PATH.open("r") as fp:
+        expected = list(read_stores(fp))
+
+    # NOTE: we are hard-pinning this value as the count of our test stores
+    assert len(catalog) == 32
+    assert list(catalog) == expected
+
+
+@pytest.mark.parametrize("compression", COMPRESSION_OPENERS.keys())
+def test_load_compressed(tmp_path, compression: str):
+    filepath = tmp_path / f"store-locations.csv.{compression}"
+    with COMPRESSION_OPENERS[compression](filepath, "wb") as fp:
+        fp.write(TEST_STORE_LOCATIONS_PATH.read_bytes())
+
+    assert detect_compression(filepath) == compression
+    assert detect_compression(TEST_STORE_LOCATIONS_PATH) is None
+    with open_store_locations(filepath) as fp:
+        assert fp.read() == TEST_STORE_LOCATIONS_PATH.read_text()
+    assert list(StoreCatalog.load(filepath)) == list(
+        StoreCatalog.load(TEST_STORE_LOCATIONS_PATH)
+    )
+
+
+@given(lists(store(), max_size=20))
+def test_from_stores(stores: List[Store]):
+    catalog = StoreCatalog.from_stores(stores)
+    assert len(catalog) == len(stores)
+    assert list(catalog) == stores
+    for (index, store) in enumerate(stores):
+        assert catalog.location(index) == store.geolocation
+        assert catalog.phis[index] == radians(store.geolocation.latitude)
+        assert catalog.cos_phis[index] == cos(radians(store.geolocation.latitude))
+
+
+@given(lists(store(), max_size=20))
+def test_from_stores_compact(stores: List[Store]):
+    catalog = StoreCatalog.from_stores(stores, compact=True)
+    assert catalog.compact
+    assert len(catalog) == len(stores)
+    for (index, store) in enumerate(stores):
+        compacted = catalog[index]
+        for column in STORE_COLUMNS:
+            assert getattr(compacted, column) == getattr(store, column)
+        location = catalog.location(index)
+        assert compacted.geolocation == location
+        assert abs(location.latitude - store.geolocation.latitude) <= COMPACT_PRECISION
+        assert (
+            abs(location.longitude - store.geolocation.longitude) <= COMPACT_PRECISION
+        )
+        assert catalog.phis[index] == radians(location.latitude)
+
+    for column in STORE_COLUMNS:
+        assert isinstance(
+            catalog.columns[column],
+            DictionaryColumn if column in CATEGORICAL_COLUMNS else TextColumn,
+        )
+
+
+@given(lists(text(), max_size=50))
+def test_encoded_columns(values: List[str]):
+    for column in (DictionaryColumn.encode(values), TextColumn.encode(values)):
+        assert len(column) == len(values)
+        assert [column[index] for index in range(len(values))] == values
+    if len(values) > 0:
+        assert TextColumn.encode(values)[-1] == values[-1]
+
+
+def test_dictionary_codes():
+    assert DictionaryColumn.encode(["a", "b", "a"]).codes.typecode == "B"
+    column = DictionaryColumn.encode(str(value % 300) for value in range(600))
+    assert column.codes.typecode == "H"
+    assert len(column.values) == 300
+    assert column[599] == "299"
+
+
+def test_from_columns_mismatched():
+    catalog = StoreCatalog.load(TEST_STORE_LOCATIONS_PATH)
+    with pytest.raises(ValueError):
+        StoreCatalog.from_columns(
+            catalog.latitudes, catalog.longitudes[:-1], catalog.columns
+        )
+
+
+@given(integers(min_value=1, max_value=40))
+def test_read_store_chunks(chunk_size: int):
+    with TEST_STORE_LOCATIONS_PATH.open("r") as fp:
+        expected = list(read_stores(fp))
+    with TEST_STORE_LOCATIONS_PATH.open("r") as fp:
+        chunks = list(read_store_chunks(fp, chunk_size=chunk_size))
+
+    assert all(len(chunk) <= chunk_size for chunk in chunks)
+    assert [
+        build_store(chunk.location(index), chunk.columns(index))
+        for chunk in chunks
+        for index in range(len(chunk))
+    ] == expected
+
+
+@given(integers(min_value=1, max_value=40))
+def test_read_store_chunks_malformed(tmp_path_factory, chunk_size: int):
+    lines = TEST_STORE_LOCATIONS_PATH.read_text().splitlines()
+    malformed = [
+        "Broken,Row",
+        "Bad,Coordinates,1 Main St,City,ST,12345,north,-93.0,County",
+        "Far,Away,1 Main St,City,ST,12345,91.0,-93.0,County",
+    ]
+    filepath = tmp_path_factory.mktemp("chunks") / "store-locations.csv"
+    # NOTE: spreadsheet applications write a byte order mark before the header
+    filepath.write_text(
+        "\ufeff" + "\n".join(lines[:3] + malformed + [""] + lines[3:]) + "\n",
+        encoding="utf-8",
+    )
+
+    with open_store_locations(filepath) as fp:
+        chunks = list(read_store_chunks(fp, chunk_size=chunk_size))
+    with TEST_STORE_LOCATIONS_PATH.open("r") as fp:
+        expected = list(read_stores(fp))
+    assert [
+        build_store(chunk.location(index), chunk.columns(index))
+        for chunk in chunks
+        for index in range(len(chunk))
+    ] == expected
+    assert [entry for chunk in chunks for entry in chunk.malformed] == [
+        (4, "missing fields"),
+        (5, "unparsable coordinates"),
+        (6, "out of range coordinates"),
+    ]
+
+    filepath.write_text("Store Name,Latitude\nCrystal,45.0\n")
+    with pytest.raises(ValueError):
+        with open_store_locations(filepath) as fp:
+            list(read_store_chunks(fp))
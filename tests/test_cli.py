@@ -6,6 +6,7 @@
 """
 
 import json
+import pstats
 from typing import Any
 
 import pytest
@@ -14,7 +15,11 @@ from click.testing import CliRunner
 from hypothesis.strategies import text, integers
 
 from groveco_challenge.cli import cli
+from groveco_challenge.service import StoreService
+from groveco_challenge.graph import StoreGraph
+from groveco_challenge.voronoi import VoronoiTable
 
+from . import TEST_STORE_LOCATIONS_PATH
 from .strategies import ZIPCODE_STRATEGY
 
 
@@ -61,6 +66,26 @@ def test_zipcode_input(cli_runner: CliRunner, api_mocker: Any, zipcode: str):
     assert result.exit_code == 0
 
 
+@given(text())
+def test_planar_input(cli_runner: CliRunner, api_mocker: Any, address: str):
+    result = cli_runner.invoke(cli, ["--address", address, "--planar"])
+    assert result.exit_code == 0
+
+
+@given(text())
+def test_streaming_input(cli_runner: CliRunner, api_mocker: Any, address: str):
+    result = cli_runner.invoke(cli, ["--address", address, "--streaming"])
+    assert result.exit_code == 0
+
+
+@given(text())
+def test_index_input(cli_runner: CliRunner, api_mocker: Any, address: str):
+    result = cli_runner.invoke(
+        cli, ["--address", address, "--index", "grid", "--resolution", "2.5"]
+    )
+    assert result.exit_code == 0
+
+
 @given(text())
 def test_json_output(cli_runner: CliRunner, api_mocker: Any, address: str):
     result = cli_runner.invoke(cli, ["--address", address, "--output", "json"])
@@ -71,3 +96,242 @@ def test_json_output(cli_runner: CliRunner, api_mocker: Any, address: str):
     assert isinstance(parsed["metric"], bool)
     assert isinstance(parsed["distance"], float)
     assert parsed["distance"] >= 0.0
+
+
+def test_import_catalog(cli_runner: CliRunner, api_mocker: Any, tmp_path):
+    database = tmp_path / "stores.sqlite"
+    result = cli_runner.invoke(
+        cli, ["import-catalog", str(TEST_STORE_LOCATIONS_PATH), str(database)]
+    )
+    assert result.exit_code == 0
+    assert database.is_file()
+
+    result = cli_runner.invoke(
+        cli, ["import-catalog", str(TEST_STORE_LOCATIONS_PATH), str(database)]
+    )
+    assert result.exit_code == 1
+
+    result = cli_runner.invoke(
+        cli, ["--zip", "94043", "--catalog", str(database), "--output", "json"]
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output)["distance"] >= 0.0
+
+
+def test_timeout_input(cli_runner: CliRunner, api_mocker: Any, tmp_path):
+    result = cli_runner.invoke(cli, ["--zip", "94043", "--timeout", "0"])
+    assert result.exit_code == 1
+
+    # NOTE: geocodes are never partial, so only a cached geocode beats the deadline
+    cache = str(tmp_path / "geocodes.db")
+    cli_runner.invoke(cli, ["warm-cache", "--geocode-cache", cache], input="94043\n")
+    result = cli_runner.invoke(
+        cli,
+        [
+            *("--zip", "94043", "--timeout", "0", "--partial", "--results", "2"),
+            *("--geocode-cache", cache),
+        ],
+    )
+    assert result.exit_code == 0
+    assert "--timeout" in result.output
+
+
+def test_metrics_out(cli_runner: CliRunner, api_mocker: Any, tmp_path):
+    output = tmp_path / "metrics.json"
+    result = cli_runner.invoke(cli, ["--zip", "94043", "--metrics-out", str(output)])
+    assert result.exit_code == 0
+    metrics = json.loads(output.read_text())
+    assert metrics["finder_query_seconds"]["values"][0]["count"] == 1
+    assert metrics["catalog_stores"]["values"] == [{"labels": {}, "value": 32}]
+
+
+def test_profile_out(cli_runner: CliRunner, api_mocker: Any, tmp_path):
+    output = tmp_path / "search.prof"
+    result = cli_runner.invoke(
+        cli, ["--zip", "94043", "--profile-out", str(output), "--trace-memory"]
+    )
+    assert result.exit_code == 0
+    # the allocations are listed (on stderr) before the stores
+    assert result.output.endswith(cli_runner.invoke(cli, ["--zip", "94043"]).output)
+    assert pstats.Stats(str(output)).total_calls > 0
+
+
+def test_store_graph(cli_runner: CliRunner, tmp_path, monkeypatch):
+    output = tmp_path / "stores.graph"
+    result = cli_runner.invoke(
+        cli, ["store-graph", "--neighbors", "3", "--output", str(output)]
+    )
+    assert result.exit_code == 0
+    assert len(StoreGraph.load(output)) == 32
+
+    # NOTE: graphs are saved to the working directory rather than the package
+    monkeypatch.chdir(tmp_path)
+    result = cli_runner.invoke(cli, ["store-graph", "--neighbors", "3"])
+    assert result.exit_code == 0
+    assert len(StoreGraph.load(tmp_path / "store-locations.csv.graph")) == 32
+
+    result = cli_runner.invoke(
+        cli, ["store-graph", "--neighbors", "0", "--output", str(output)]
+    )
+    assert result.exit_code == 1
+
+
+def test_compact_catalog(cli_runner: CliRunner, api_mocker: Any, tmp_path):
+    result = cli_runner.invoke(cli, ["--zip", "94043", "--compact-catalog"])
+    assert result.exit_code == 0
+
+    database = tmp_path / "stores.db"
+    cli_runner.invoke(
+        cli, ["import-catalog", str(TEST_STORE_LOCATIONS_PATH), str(database)]
+    )
+    result = cli_runner.invoke(
+        cli, ["--zip", "94043", "--compact-catalog", "--catalog", str(database)]
+    )
+    assert result.exit_code == 1
+
+
+def test_shard_by(cli_runner: CliRunner, api_mocker: Any, tmp_path):
+    for shard_by in ("state", "grid"):
+        result = cli_runner.invoke(
+            cli, ["--zip", "94043", "--shard-by", shard_by, "--results", "3"]
+        )
+        assert result.exit_code == 0
+
+    database = tmp_path / "stores.db"
+    cli_runner.invoke(
+        cli, ["import-catalog", str(TEST_STORE_LOCATIONS_PATH), str(database)]
+    )
+    result = cli_runner.invoke(
+        cli, ["--zip", "94043", "--shard-by", "state", "--catalog", str(database)]
+    )
+    assert result.exit_code == 1
+
+
+def test_voronoi_table(cli_runner: CliRunner, tmp_path, api_mocker, monkeypatch):
+    output = tmp_path / "stores.voronoi"
+    result = cli_runner.invoke(
+        cli, ["voronoi-table", "--resolution", "0.5", "--output", str(output)]
+    )
+    assert result.exit_code == 0
+    with VoronoiTable.load(output) as table:
+        assert table.resolution == 0.5
+
+    result = cli_runner.invoke(cli, ["--zip", "94043", "--voronoi", str(output)])
+    assert result.exit_code == 0
+
+    # NOTE: tables are saved to the working directory rather than the package
+    monkeypatch.chdir(tmp_path)
+    result = cli_runner.invoke(cli, ["voronoi-table", "--resolution", "0.5"])
+    assert result.exit_code == 0
+    assert (tmp_path / "store-locations.csv.voronoi").is_file()
+
+    result = cli_runner.invoke(
+        cli, ["voronoi-table", "--resolution", "0", "--output", str(output)]
+    )
+    assert result.exit_code == 1
+
+
+def test_coverage(cli_runner: CliRunner, tmp_path):
+    (points, assignments, output) = (
+        tmp_path / "points.csv",
+        tmp_path / "assignments.csv",
+        tmp_path / "coverage.csv",
+    )
+    points.write_text("zip,latitude,longitude\n94043,37.42,-122.08\n")
+    result = cli_runner.invoke(
+        cli,
+        [
+            "coverage",
+            "--points",
+            str(points),
+            "--assignments",
+            str(assignments),
+            "--output",
+            str(output),
+        ],
+    )
+    assert result.exit_code == 0
+    assert assignments.read_text().splitlines()[1].startswith("94043,")
+    assert len(output.read_text().splitlines()) == 33
+
+    points.write_text("zip,latitude,longitude\n94043,37.42,-122.08\n10001,,\n")
+    result = cli_runner.invoke(
+        cli, ["coverage", "--points", str(points), "--output", str(output)]
+    )
+    assert result.exit_code == 0
+    assert "Skipped 1 malformed points (1 unparsable coordinates)" in result.output
+
+    result = cli_runner.invoke(
+        cli, ["coverage", "--lattice", "30", "-120", "40", "-110", "--workers", "1"]
+    )
+    assert result.exit_code == 0
+    assert "store_id,name,city,state,points" in result.output
+
+    for arguments in ([], ["--points", str(points), "--lattice", "0", "0", "1", "1"]):
+        result = cli_runner.invoke(cli, ["coverage"] + arguments)
+        assert result.exit_code == 1
+
+
+def test_load_test(cli_runner: CliRunner, tmp_path):
+    result = cli_runner.invoke(
+        cli, ["load-test", "--requests", "20", "--output", "json"]
+    )
+    assert result.exit_code == 0
+    report = json.loads(result.output)
+    assert (report["requests"], report["errors"]) == (20, {})
+
+    queries = tmp_path / "queries.log"
+    queries.write_text("94043\n# skipped\n10001\n")
+    result = cli_runner.invoke(
+        cli,
+        ["load-test", "--target", "service", "--queries", str(queries), "--rate", "50"],
+    )
+    assert result.exit_code == 0
+    assert result.output.startswith("service  2 requests")
+
+    result = cli_runner.invoke(cli, ["load-test", "--requests", "0"])
+    assert result.exit_code == 1
+    queries.write_text("# nothing\n")
+    result = cli_runner.invoke(cli, ["load-test", "--queries", str(queries)])
+    assert result.exit_code == 1
+
+
+def test_warm_cache(cli_runner: CliRunner, api_mocker: Any, tmp_path):
+    cache = tmp_path / "geocodes.db"
+    arguments = ["warm-cache", "--geocode-cache", str(cache), "--rate", "1000"]
+    result = cli_runner.invoke(cli, arguments, input="94043\n# skipped\n10001\n")
+    assert result.exit_code == 0
+    assert result.output.startswith(f"Added 2 locations to {cache!s}")
+
+    result = cli_runner.invoke(cli, arguments, input="94043\n")
+    assert "(1 still fresh, 0 failed)" in result.output
+    result = cli_runner.invoke(cli, ["--zip", "94043", "--geocode-cache", str(cache)])
+    assert result.exit_code == 0
+    assert cli_runner.invoke(cli, [*arguments, "--rate", "0"]).exit_code == 1
+
+
+def test_serve_watch(cli_runner: CliRunner, monkeypatch: Any, tmp_path):
+    watching = []
+    finders = []
+
+    def _serve(self: StoreService, host: str, port: int):
+        watch_thread = self.finder._watch_thread
+        watching.append(watch_thread is not None and watch_thread.is_alive())
+        finders.append(self.finder)
+
+    monkeypatch.setattr(StoreService, "serve", _serve)
+    result = cli_runner.invoke(cli, ["serve", "--watch", "--reload-interval", "0.1"])
+    assert result.exit_code == 0
+    result = cli_runner.invoke(cli, ["serve"])
+    assert result.exit_code == 0
+    assert watching == [True, False]
+    # NOTE: the finder stops watching once the service shuts down
+    assert all(finder._watch_thread is None for finder in finders)
+
+    assert cli_runner.invoke(cli, ["serve", "--reload-interval", "0"]).exit_code == 1
+    database = tmp_path / "stores.sqlite"
+    cli_runner.invoke(
+        cli, ["import-catalog", str(TEST_STORE_LOCATIONS_PATH), str(database)]
+    )
+    result = cli_runner.invoke(cli, ["serve", "--catalog", str(database), "--watch"])
+    assert result.exit_code == 1
@@ -0,0 +1,129 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import io
+import csv
+from typing import Dict, List
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import lists, floats
+
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.models import GeoLocation
+from groveco_challenge.coverage import (
+    HISTOGRAM_PRECISION,
+    DistanceHistogram,
+    read_points,
+    lattice_points,
+)
+
+from .strategies import geo_location
+
+
+def test_read_points():
+    points = list(
+        read_points(
+            io.StringIO("ZIP,Lat,Lng\n94043,37.42,-122.08\n\n55401,44.98,-93.27\n")
+        )
+    )
+    assert points == [("94043", 37.42, -122.08), ("55401", 44.98, -93.27)]
+    assert list(read_points(io.StringIO("longitude,latitude\n1.0,2.0\n"))) == [
+        ("", 2.0, 1.0)
+    ]
+    with pytest.raises(ValueError):
+        list(read_points(io.StringIO("zip,latitude\n94043,37.42\n")))
+
+
+def test_read_points_malformed():
+    malformed: Dict[str, int] = {}
+    points = list(
+        read_points(
+            io.StringIO(
+                "zip,lat,lng\n"
+                "94043,37.42,-122.08\n"
+                "10001,40.75\n"
+                "60601,north,-87.62\n"
+                "99999,91.0,0.0\n"
+                "55401,44.98,-93.27\n"
+            ),
+            malformed=malformed,
+        )
+    )
+    assert points == [("94043", 37.42, -122.08), ("55401", 44.98, -93.27)]
+    assert malformed == {
+        "missing fields": 1,
+        "unparsable coordinates": 1,
+        "out of range coordinates": 1,
+    }
+    assert len(list(read_points(io.StringIO("lat,lng\nnan,0.0\n")))) == 0
+
+
+def test_lattice_points():
+    points = list(lattice_points(0.0, 10.0, 1.0, 10.3, 0.1))
+    assert len(points) == 11 * 4
+    assert points[0] == ("", 0.0, 10.0)
+    assert points[-1] == ("", pytest.approx(1.0), pytest.approx(10.3))
+    with pytest.raises(ValueError):
+        list(lattice_points(0.0, 0.0, 1.0, 1.0, 0.0))
+    with pytest.raises(ValueError):
+        list(lattice_points(1.0, 0.0, 0.0, 1.0, 0.1))
+
+
+@given(lists(floats(min_value=0.0, max_value=20000.0), min_size=1, max_size=200))
+def test_distance_histogram(distances: List[float]):
+    histogram = DistanceHistogram()
+    for distance in distances:
+        histogram.add(distance)
+
+    assert histogram.count == len(distances)
+    assert histogram.maximum == max(distances)
+    assert histogram.mean == pytest.approx(sum(distances) / len(distances))
+    ordered = sorted(distances)
+    for percent in (0.0, 50.0, 90.0, 99.0, 100.0):
+        expected = ordered[max(-(-len(ordered) * int(percent) // 100) - 1, 0)]
+        assert histogram.percentile(percent) == pytest.approx(
+            expected, rel=HISTOGRAM_PRECISION, abs=1e-9
+        )
+
+
+@given(lists(geo_location(), min_size=1, max_size=20))
+def test_assign_points(store_finder: StoreFinder, origins: List[GeoLocation]):
+    assignments = io.StringIO()
+    report = store_finder.assign_points(
+        [
+            (str(index), origin.latitude, origin.longitude)
+            for (index, origin) in enumerate(origins)
+        ],
+        assignments=assignments,
+        workers=1,
+    )
+    assert report.points == len(origins)
+    assert sum(histogram.count for histogram in report.stores.values()) == len(origins)
+
+    rows = list(csv.DictReader(io.StringIO(assignments.getvalue())))
+    assert [row["label"] for row in rows] == [str(index) for index in range(len(rows))]
+    for (row, origin) in zip(rows, origins):
+        (expected,) = store_finder.find_nearest(origin)
+        assert float(row["distance"]) == pytest.approx(expected.distance, abs=1e-6)
+
+
+def test_assign_points_workers(store_finder: StoreFinder):
+    points = list(lattice_points(25.0, -125.0, 49.0, -67.0, 1.0))
+    outputs = []
+    for workers in (1, 2):
+        (assignments, output) = (io.StringIO(), io.StringIO())
+        report = store_finder.assign_points(
+            points, metric=True, assignments=assignments, workers=workers
+        )
+        report.write(output, store_finder.snapshot)
+        outputs.append((assignments.getvalue(), output.getvalue()))
+
+    assert outputs[0] == outputs[1]
+    rows = list(csv.DictReader(io.StringIO(outputs[0][1])))
+    assert len(rows) == len(store_finder.catalog)
+    assert sum(int(row["points"]) for row in rows) == len(points)
@@ -0,0 +1,125 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import heapq
+import pathlib
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import booleans, integers
+
+from groveco_challenge import constants
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.ingest import IngestReport
+from groveco_challenge.models import GeoLocation
+from groveco_challenge.database import StoreDatabase, is_database
+
+from . import TEST_STORE_LOCATIONS_PATH
+from .strategies import geo_location
+
+
+@pytest.fixture(scope="module")
+def store_database(tmp_path_factory) -> StoreDatabase:
+    yield StoreDatabase.create(
+        tmp_path_factory.mktemp("database") / "stores.sqlite",
+        TEST_STORE_LOCATIONS_PATH,
+    )
+
+
+def test_create(store_database: StoreDatabase, store_finder: StoreFinder):
+    assert is_database(store_database.filepath)
+    assert not is_database(TEST_STORE_LOCATIONS_PATH)
+    # NOTE: we are hard-pinning this value as the count of our test stores
+    assert len(store_database) == 32
+    assert list(store_database) == list(store_finder.catalog)
+    for index in range(len(store_database)):
+        assert store_database[index] == store_finder.catalog[index]
+        assert store_database.location(index) == store_finder.catalog.location(index)
+
+    with pytest.raises(IndexError):
+        store_database[len(store_database)]
+    with pytest.raises(FileExistsError):
+        StoreDatabase.create(store_database.filepath, TEST_STORE_LOCATIONS_PATH)
+
+
+def test_create_malformed(tmp_path):
+    (source, filepath) = (tmp_path / "stores.csv", tmp_path / "stores.sqlite")
+    lines = TEST_STORE_LOCATIONS_PATH.read_text(encoding="utf-8-sig").splitlines()
+    source.write_text(
+        "\n".join(
+            [lines[0], lines[1], "Broken Store", lines[2].replace("46.808614", "north")]
+        )
+        + "\n"
+    )
+    report = IngestReport(filepath=source)
+    store_database = StoreDatabase.create(filepath, source, report=report)
+    assert len(store_database) == 1
+    assert (report.rows, report.ingested) == (3, 1)
+    assert report.samples == [(3, "missing fields"), (4, "unparsable coordinates")]
+
+    # failed imports leave nothing behind so they can be retried
+    (broken, filepath) = (tmp_path / "broken.csv", tmp_path / "broken.sqlite")
+    broken.write_text("Store Name,City\nBroken Store,Nowhere\n")
+    with pytest.raises(ValueError):
+        StoreDatabase.create(filepath, broken)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "broken.csv",
+        "stores.csv",
+        "stores.sqlite",
+    ]
+    StoreDatabase.create(filepath, source)
+
+
+@given(geo_location(), integers(min_value=1, max_value=40))
+def test_nearest(
+    store_database: StoreDatabase,
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    results: int,
+):
+    def distance(location: GeoLocation) -> float:
+        return store_finder.get_distance(origin, location)
+
+    expected = heapq.nsmallest(
+        results,
+        [
+            (distance(location), index)
+            for (index, location) in enumerate(
+                store.geolocation for store in store_finder.catalog
+            )
+        ],
+    )
+    found = store_database.nearest(
+        origin,
+        distance,
+        radius=constants.EARTH_RADIUS * constants.IMPERIAL_RATIO,
+        results=results,
+    )
+    assert found == expected
+
+
+@given(geo_location(), booleans(), integers(min_value=1, max_value=8))
+def test_find_nearest(
+    store_database: StoreDatabase,
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    actual: bool,
+    results: int,
+):
+    database_finder = StoreFinder(store_database.filepath)
+    expected = store_finder.find_nearest(
+        origin, actual=actual, results=results, planar=True
+    )
+    assert database_finder.find_nearest(origin, actual=actual, results=results) == (
+        expected
+    )
+
+
+def test_find_stores_for_points(store_database: StoreDatabase):
+    database_finder = StoreFinder(store_database.filepath)
+    with pytest.raises(ValueError):
+        database_finder.find_stores_for_points([(0.0, 0.0)])
@@ -0,0 +1,27 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+from hypothesis import given
+from hypothesis.strategies import floats
+
+from groveco_challenge.deadline import Deadline
+
+
+@given(floats(min_value=-10.0, max_value=10.0))
+def test_deadline(timeout: float):
+    now = [0.0]
+    deadline = Deadline.from_timeout(timeout, clock=lambda: now[0])
+    assert deadline.remaining() == max(timeout, 0.0)
+    assert deadline.expired == (timeout <= 0.0)
+
+    now[0] += max(timeout, 0.0)
+    assert deadline.expired
+    assert deadline.remaining() == 0.0
+
+
+def test_no_deadline():
+    assert Deadline.from_timeout(None) is None
@@ -5,16 +5,26 @@
 """
 """
 
+import os
+import gzip
+import time
+import asyncio
+import threading
 import collections
+import concurrent.futures
 from typing import Any, List
 
+import attr
+import pytest
 from hypothesis import given
 from hypothesis.strategies import text, booleans, integers
 
+from groveco_challenge import constants
 from groveco_challenge.finder import StoreFinder
 from groveco_challenge.models import Store, GeoLocation, StoreResult
+from groveco_challenge.deadline import DeadlineExceeded
 
-from . import TEST_STORE_LOCATIONS_PATH
+from . import TEST_STORE_LOCATIONS_PATH, run_until_complete
 from .strategies import store, geo_location, store_result
 
 
@@ -41,7 +51,43 @@ def test_get_distance(
     assert distance >= 0.0
 
 
-@given(text(), booleans(), booleans(), integers(min_value=1, max_value=4))
+@given(geo_location(), geo_location())
+def test_get_distance_unknown_method(
+    store_finder: StoreFinder, origin: GeoLocation, target: GeoLocation
+):
+    with pytest.raises(ValueError):
+        store_finder.get_distance(origin, target, method="unknown")
+
+
+@given(geo_location(), geo_location(), booleans())
+def test_equirectangular_bounds(
+    store_finder: StoreFinder, origin: GeoLocation, target: GeoLocation, metric: bool
+):
+    (lower, upper) = store_finder._equirectangular_bounds(origin, target, metric=metric)
+    distance = store_finder.get_distance(origin, target, metric=metric)
+    assert 0.0 <= lower <= upper
+    assert lower - 1e-9 <= distance <= upper + 1e-9
+
+
+@given(geo_location(), booleans(), booleans(), integers(min_value=1, max_value=8))
+def test_rank_planar(
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    metric: bool,
+    actual: bool,
+    results: int,
+):
+    expected = sorted(
+        store_finder.get_distance(origin, store.geolocation, metric, actual)
+        for store in store_finder.catalog
+    )[:results]
+    ranked = store_finder._rank_planar(
+        origin, results=results, metric=metric, actual=actual
+    )
+    assert [distance for (distance, _) in ranked] == expected
+
+
+@given(text(), booleans(), booleans(), integers(min_value=1, max_value=4), booleans())
 def test_find_stores(
     store_finder: StoreFinder,
     api_mocker: Any,
@@ -49,9 +95,537 @@ def test_find_stores(
     metric: bool,
     actual: bool,
     results: int,
+    planar: bool,
 ):
-    for store_result in store_finder.find_stores(
-        query, metric=metric, actual=actual, results=results
-    ):
+    store_results = store_finder.find_stores(
+        query, metric=metric, actual=actual, results=results, planar=planar
+    )
+    assert len(store_results) == results
+    for store_result in store_results:
         assert isinstance(store_result, StoreResult)
         assert store_result.distance >= 0
+
+
+@pytest.mark.parametrize("planar", [False, True])
+def test_find_stores_no_results(store_finder: StoreFinder, planar: bool):
+    origin = GeoLocation(37.4224764, -122.0842499)
+    with pytest.raises(ValueError):
+        store_finder.find_nearest(origin, results=0, planar=planar)
+    with pytest.raises(ValueError):
+        store_finder.find_nearest(origin, results=-1, streaming=planar)
+    # NOTE: the results are checked before the query is geocoded
+    with pytest.raises(ValueError):
+        store_finder.find_stores("94043", results=0, planar=planar)
+    with pytest.raises(ValueError):
+        run_until_complete(store_finder.find_stores_async("94043", results=0))
+
+
+def test_find_stores_metrics(api_mocker: Any):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, cache_size=8)
+    metrics = finder.metrics
+    assert metrics.get("catalog_stores").value is None
+
+    finder.find_stores("94043", results=2)
+    finder.find_stores("94043", results=2)
+    with pytest.raises(DeadlineExceeded):
+        finder.find_stores("94043", timeout=0.0)
+    finder.find_nearest(
+        GeoLocation(37.4224764, -122.0842499), timeout=0.0, partial=True
+    )
+
+    assert metrics.get("finder_query_seconds").snapshot()[2] == 3
+    assert (
+        metrics.get("finder_query_errors_total").labels("DeadlineExceeded").value == 1
+    )
+    assert metrics.get("finder_search_seconds").snapshot()[2] == 3
+    assert metrics.get("finder_partial_results_total").value == 1
+    # NOTE: queries past their deadline are never geocoded
+    assert metrics.get("geocode_request_seconds").snapshot()[2] == 2
+    assert metrics.get("result_cache_hits_total").value == 1
+    assert metrics.get("result_cache_entries").value == 1
+    assert metrics.get("catalog_stores").value == 32
+    assert metrics.get("catalog_version").value == 0
+
+    finder.remove_store(0)
+    assert metrics.get("catalog_stores").value == 31
+    assert metrics.get("catalog_mutations").value == 1
+    assert "catalog_stores 31" in metrics.to_prometheus()
+
+
+@given(geo_location(), booleans(), booleans(), integers(min_value=1, max_value=8))
+def test_find_nearest_index(
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    metric: bool,
+    actual: bool,
+    results: int,
+):
+    indexed_finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, index="grid")
+    expected = store_finder.find_nearest(
+        origin, metric=metric, actual=actual, results=results, planar=True
+    )
+    found = indexed_finder.find_nearest(
+        origin, metric=metric, actual=actual, results=results
+    )
+    assert [result.distance for result in found] == [
+        result.distance for result in expected
+    ]
+
+
+@given(geo_location(), booleans(), booleans(), integers(min_value=1, max_value=8))
+def test_find_nearest_compact(
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    metric: bool,
+    actual: bool,
+    results: int,
+):
+    compact_finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, compact_catalog=True)
+    assert compact_finder.catalog.compact
+    expected = store_finder.find_nearest(
+        origin, metric=metric, actual=actual, results=results
+    )
+    found = compact_finder.find_nearest(
+        origin, metric=metric, actual=actual, results=results
+    )
+    # NOTE: moving stores by less than a meter never changes their distance by more
+    # than a thousandth of a mile
+    assert [result.distance for result in found] == pytest.approx(
+        [result.distance for result in expected], abs=1e-3
+    )
+
+
+@given(
+    geo_location(),
+    booleans(),
+    booleans(),
+    integers(min_value=1, max_value=40),
+    integers(min_value=1, max_value=40),
+)
+def test_find_nearest_streaming(
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    metric: bool,
+    actual: bool,
+    results: int,
+    chunk_size: int,
+):
+    streaming_finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, chunk_size=chunk_size)
+    expected = store_finder.find_nearest(
+        origin, metric=metric, actual=actual, results=results, planar=True
+    )
+    found = streaming_finder.find_nearest(
+        origin, metric=metric, actual=actual, results=results, streaming=True
+    )
+    assert found == expected
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_find_nearest_compressed(store_finder: StoreFinder, tmp_path, streaming: bool):
+    filepath = tmp_path / "store-locations.csv.gz"
+    filepath.write_bytes(gzip.compress(TEST_STORE_LOCATIONS_PATH.read_bytes()))
+
+    finder = StoreFinder(filepath)
+    assert list(finder.stores) == list(store_finder.stores)
+    for origin in (
+        GeoLocation(latitude=37.42, longitude=-122.08),
+        GeoLocation(latitude=44.98, longitude=-93.27),
+    ):
+        assert finder.find_nearest(
+            origin, results=3, streaming=streaming
+        ) == store_finder.find_nearest(origin, results=3)
+
+
+def test_find_nearest_streaming_malformed(store_finder: StoreFinder, tmp_path):
+    lines = TEST_STORE_LOCATIONS_PATH.read_text().splitlines()
+    filepath = tmp_path / "store-locations.csv"
+    filepath.write_text(
+        "\ufeff"
+        + "\n".join(lines[:3] + ["Bad,Coordinates,1 Main St,City,ST,1,north,0,C"])
+        + "\n"
+        + "\n".join(lines[3:])
+        + "\n",
+        encoding="utf-8",
+    )
+
+    finder = StoreFinder(filepath, chunk_size=8)
+    origin = GeoLocation(latitude=44.98, longitude=-93.27)
+    with pytest.warns(UserWarning, match="skipped 1 malformed rows"):
+        found = finder.find_nearest(origin, results=3, streaming=True)
+    assert found == store_finder.find_nearest(origin, results=3)
+
+
+def test_reload(tmp_path):
+    lines = TEST_STORE_LOCATIONS_PATH.read_text().splitlines()
+    filepath = tmp_path / "store-locations.csv"
+    filepath.write_text("\n".join(lines) + "\n")
+
+    finder = StoreFinder(filepath, index="grid")
+    snapshot = finder.snapshot
+    assert snapshot.version == 0
+    assert len(snapshot.catalog) == 32
+    assert not finder.reload()
+
+    # rewriting the same content only refreshes the fingerprint
+    filepath.write_text("\n".join(lines) + "\n")
+    os.utime(filepath, ns=(0, 0))
+    assert not finder.reload()
+    assert finder.snapshot.fingerprint.mtime_ns == 0
+    assert finder.snapshot.catalog is snapshot.catalog
+
+    filepath.write_text("\n".join(lines[:11]) + "\n")
+    assert finder.reload()
+    assert finder.snapshot.version == 1
+    assert len(finder.catalog) == 10
+    assert finder.spatial_index is not snapshot.spatial_index
+    # searches that already read the previous snapshot keep their catalog
+    assert len(snapshot.catalog) == 32
+
+    origin = snapshot.catalog.location(31)
+    assert len(finder.find_nearest(origin, results=32)) == 10
+
+
+def test_watch(tmp_path):
+    lines = TEST_STORE_LOCATIONS_PATH.read_text().splitlines()
+    filepath = tmp_path / "store-locations.csv"
+    filepath.write_text("\n".join(lines) + "\n")
+
+    finder = StoreFinder(filepath)
+    assert len(finder.catalog) == 32
+    finder.watch(interval=0.01)
+    try:
+        replacement = tmp_path / "store-locations.csv.new"
+        replacement.write_text("\n".join(lines[:6]) + "\n")
+        replacement.replace(filepath)
+
+        deadline = time.monotonic() + 10.0
+        while finder.snapshot.version < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        finder.unwatch()
+
+    assert finder.snapshot.version == 1
+    assert len(finder.catalog) == 5
+
+
+@pytest.mark.parametrize("index,planar", [(None, False), (None, True), ("grid", False)])
+def test_mutations(monkeypatch, index: str, planar: bool):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, index=index)
+    closed = finder.catalog[0]
+    origin = closed.geolocation
+
+    def nearest(results: int = 1) -> List[Store]:
+        return [
+            result.store
+            for result in finder.find_nearest(origin, results=results, planar=planar)
+        ]
+
+    assert nearest() == [closed]
+    finder.remove_store(0)
+    assert closed not in nearest(results=32)
+    assert len(nearest(results=40)) == 31
+    with pytest.raises(KeyError):
+        finder.remove_store(0)
+    with pytest.raises(KeyError):
+        finder.update_store(0, closed)
+
+    opened = attr.evolve(closed, name="Reopened")
+    store_id = finder.add_store(opened)
+    assert store_id == 32
+    assert nearest() == [opened]
+    assert finder.snapshot.store(store_id) == opened
+
+    moved = attr.evolve(
+        finder.catalog[1], geolocation=GeoLocation(origin.latitude, origin.longitude)
+    )
+    finder.update_store(1, moved)
+    assert set(nearest(results=2)) == {opened, moved}
+    assert finder.snapshot.mutations == 4
+
+    # compacting keeps the store ids of every remaining store
+    monkeypatch.setattr(constants, "COMPACTION_THRESHOLD", 2)
+    finder.remove_store(store_id)
+    snapshot = finder.snapshot
+    assert snapshot.mutations == 0
+    assert len(snapshot.catalog) == 31
+    assert list(snapshot.ids) == list(range(1, 32))
+    assert snapshot.next_id == 33
+    assert nearest() == [moved]
+    assert finder.add_store(opened) == 33
+
+
+def test_mutations_compact(monkeypatch):
+    monkeypatch.setattr(constants, "COMPACTION_THRESHOLD", 0)
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, compact_catalog=True)
+    expected = finder.catalog[1]
+    finder.remove_store(0)
+    assert finder.snapshot.mutations == 0
+    assert finder.catalog.compact
+    assert finder.catalog[0] == expected
+
+
+def test_result_cache():
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, cache_size=8)
+    origin = finder.catalog.location(0)
+    nearby = GeoLocation(origin.latitude + 1e-6, origin.longitude - 1e-6)
+
+    first = finder.find_nearest(origin, results=2)
+    assert finder.find_nearest(nearby, results=2) == first
+    assert finder.find_nearest(origin, results=2, metric=True) != first
+    assert (finder.cache_stats.hits, finder.cache_stats.misses) == (1, 2)
+
+    # mutating the catalog invalidates every cached result
+    finder.remove_store(0)
+    assert finder.find_nearest(origin, results=2) != first
+    assert finder.cache_stats.invalidations == 1
+    assert StoreFinder(TEST_STORE_LOCATIONS_PATH).cache_stats is None
+
+
+def test_geocode_cache(monkeypatch, tmp_path):
+    geocoded: List[str] = []
+
+    def geocode(query: str, session: Any = None) -> GeoLocation:
+        if query == "nowhere":
+            raise TypeError(query)
+        geocoded.append(query)
+        return GeoLocation(latitude=float(len(query)), longitude=0.0)
+
+    monkeypatch.setattr("groveco_challenge.finder.geocode", geocode)
+    filepath = tmp_path / "geocodes.db"
+    with StoreFinder(TEST_STORE_LOCATIONS_PATH, geocode_cache_path=filepath) as finder:
+        report = finder.warm_geocode_cache(
+            ["94043", " 94043", "Chicago,  IL", "nowhere", ""], rate=1000.0
+        )
+        assert (report.added, report.fresh, report.errors) == (2, 0, {"TypeError": 1})
+        assert sorted(geocoded) == ["94043", "Chicago, IL"]
+        metrics = finder.metrics.to_dict()
+        assert metrics["geocode_cache_warmed_total"]["values"][0]["value"] == 2
+        assert metrics["geocode_cache_entries"]["values"][0]["value"] == 2
+
+    # a new finder sharing the cache starts with the warmed locations
+    with StoreFinder(TEST_STORE_LOCATIONS_PATH, geocode_cache_path=filepath) as finder:
+        assert finder.warm_geocode_cache(["94043", "10001"], rate=None).fresh == 1
+        finder.find_stores("chicago, il")
+        assert sorted(geocoded) == ["10001", "94043", "Chicago, IL"]
+        assert finder.geocode_cache_stats.hits == 1
+
+    with pytest.raises(ValueError):
+        StoreFinder(TEST_STORE_LOCATIONS_PATH).warm_geocode_cache(["94043"])
+
+
+def test_find_stores_coalescing(monkeypatch):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH)
+    release = threading.Event()
+    queries: List[str] = []
+
+    def geocode(query: str, session: Any = None) -> GeoLocation:
+        queries.append(query)
+        release.wait()
+        return finder.catalog.location(0)
+
+    monkeypatch.setattr("groveco_challenge.finder.geocode", geocode)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(finder.find_stores, query, results=2)
+            for query in ("94043", " 94043", "94043\t", "94043  ")
+        ]
+        deadline = time.monotonic() + 10.0
+        while finder._geocode_flight.shared < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        store_results = [future.result() for future in futures]
+
+    assert queries == ["94043"]
+    assert all(found == store_results[0] for found in store_results)
+    assert finder._search_flight.executed + finder._search_flight.shared == 4
+
+
+@pytest.mark.parametrize("index,cache_size", [(None, 0), ("grid", 0), ("grid", 64)])
+def test_concurrent_find_stores(monkeypatch, index: str, cache_size: int):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, index=index, cache_size=cache_size)
+    builds: List[int] = []
+    build_snapshot = finder._build_snapshot
+
+    def counted_build_snapshot(*args, **kwargs):
+        builds.append(threading.get_ident())
+        # NOTE: widens the window for racing threads to build the snapshot twice
+        time.sleep(0.05)
+        return build_snapshot(*args, **kwargs)
+
+    def geocode(query: str, session: Any = None) -> GeoLocation:
+        (latitude, longitude) = query.split(",")
+        return GeoLocation(latitude=float(latitude), longitude=float(longitude))
+
+    monkeypatch.setattr(finder, "_build_snapshot", counted_build_snapshot)
+    monkeypatch.setattr("groveco_challenge.finder.geocode", geocode)
+    queries = [
+        f"{25.0 + (index % 20) * 1.2},{-124.0 + (index // 20) * 2.9}"
+        for index in range(160)
+    ]
+    start = threading.Barrier(16)
+
+    def hammer(offset: int) -> List[List[StoreResult]]:
+        start.wait()
+        # every thread also iterates the stores while the others search
+        assert len(list(finder.stores)) == 32
+        return [
+            finder.find_stores(query, results=3)
+            for query in queries[offset:] + queries[:offset]
+        ]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(hammer, range(0, 160, 10)))
+
+    assert len(builds) == 1
+    serial = StoreFinder(TEST_STORE_LOCATIONS_PATH, index=index, cache_size=cache_size)
+    expected = [serial.find_stores(query, results=3) for query in queries]
+    for (offset, found) in zip(range(0, 160, 10), results):
+        assert found == expected[offset:] + expected[:offset]
+    assert finder.result_cache is finder.result_cache
+
+
+def test_close():
+    origin = GeoLocation(37.4224764, -122.0842499)
+    with StoreFinder(TEST_STORE_LOCATIONS_PATH) as finder:
+        executor = finder.executor
+        assert executor._max_workers == (os.cpu_count() or 1)
+        for results in (1, 3, 5):
+            assert len(finder.find_nearest(origin, results=results)) == results
+            assert finder.executor is executor
+        finder.io_executor
+        finder.session
+
+    with pytest.raises(RuntimeError):
+        executor.submit(time.sleep, 0)
+    assert "executor" not in finder.__dict__
+    assert "io_executor" not in finder.__dict__
+    assert "session" not in finder.__dict__
+
+    # closed finders create new executors when they are used again
+    assert len(finder.find_nearest(origin)) == 1
+    assert finder.executor is not executor
+    finder.close()
+
+
+def test_find_stores_async(api_mocker: Any):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, cpu_workers=2)
+    queries = ["94043", "the white house", "12345-123"]
+    expected = [finder.find_stores(query, results=3) for query in queries]
+
+    assert (
+        run_until_complete(finder.find_stores_async(queries[0], results=3))
+        == expected[0]
+    )
+    assert (
+        run_until_complete(finder.find_stores_batch_async(queries, results=3))
+        == expected
+    )
+    assert finder.cpu_executor._max_workers == 2
+
+
+def test_find_stores_async_coalescing(monkeypatch):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH)
+    queries: List[str] = []
+
+    def geocode(query: str, session: Any = None) -> GeoLocation:
+        queries.append(query)
+        return finder.catalog.location(0)
+
+    monkeypatch.setattr("groveco_challenge.finder.geocode", geocode)
+    store_results = run_until_complete(
+        finder.find_stores_batch_async(["94043", " 94043", "94043\t"], results=2)
+    )
+
+    assert queries == ["94043"]
+    assert finder._async_geocode_flight.shared == 2
+    assert all(found == store_results[0] for found in store_results)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_find_nearest_deadline(streaming: bool):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, chunk_size=16, cache_size=8)
+    origin = GeoLocation(37.4224764, -122.0842499)
+
+    with pytest.raises(DeadlineExceeded):
+        finder.find_nearest(origin, results=2, streaming=streaming, timeout=0.0)
+    store_results = finder.find_nearest(
+        origin, results=2, streaming=streaming, timeout=0.0, partial=True
+    )
+    assert store_results.partial
+    assert len(store_results) <= 2
+
+    # partial results are never cached
+    store_results = finder.find_nearest(
+        origin, results=2, streaming=streaming, timeout=60.0
+    )
+    assert not store_results.partial
+    assert store_results == finder.find_nearest(origin, results=2, streaming=streaming)
+
+
+def test_find_stores_deadline(monkeypatch):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH)
+    timeouts: List[float] = []
+
+    def geocode(query: str, session: Any = None, timeout: float = None) -> GeoLocation:
+        timeouts.append(timeout)
+        time.sleep(0.05)
+        raise TypeError("not found")
+
+    monkeypatch.setattr("groveco_challenge.finder.geocode", geocode)
+    with pytest.raises(DeadlineExceeded):
+        finder.find_stores("94043", timeout=0.01)
+    with pytest.raises(DeadlineExceeded):
+        run_until_complete(finder.find_stores_async("94043", timeout=0.01))
+    # failures before the deadline are raised as they are
+    with pytest.raises(TypeError):
+        finder.find_stores("94043", timeout=60.0)
+    # geocoding requests are bounded by the deadline of the caller sending them
+    finder.close()
+    assert 0.0 < timeouts[-1] <= 60.0
+    assert all(timeout <= 0.01 for timeout in timeouts[:-1])
+
+
+def test_find_stores_deadline_coalescing(monkeypatch):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH)
+    started = threading.Event()
+    queries: List[str] = []
+
+    def geocode(query: str, session: Any = None, timeout: float = None) -> GeoLocation:
+        queries.append(query)
+        started.set()
+        # NOTE: requests bounded by a deadline give up before the geocode finishes
+        time.sleep(0.3 if timeout is None else min(timeout, 0.3))
+        if timeout is not None and timeout < 0.3:
+            raise TypeError("timed out")
+        return finder.catalog.location(0)
+
+    monkeypatch.setattr("groveco_challenge.finder.geocode", geocode)
+    expected = finder.find_nearest(finder.catalog.location(0))
+
+    # an untimed caller joining the geocode started by a timed caller geocodes again
+    # once the deadline of the timed caller cuts the shared geocode short
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        timed = executor.submit(finder.find_stores, "94043", timeout=0.1)
+        started.wait()
+        untimed = executor.submit(finder.find_stores, "94043")
+        with pytest.raises(DeadlineExceeded):
+            timed.result()
+        assert untimed.result() == expected
+    assert queries == ["94043", "94043"]
+
+    async def _find_stores_untimed():
+        # NOTE: the untimed caller joins the geocode started by the timed caller
+        await asyncio.sleep(0.05)
+        return await finder.find_stores_async("10001")
+
+    async def _find_stores():
+        return await asyncio.gather(
+            finder.find_stores_async("10001", timeout=0.1),
+            _find_stores_untimed(),
+            return_exceptions=True,
+        )
+
+    (timed_result, untimed_result) = run_until_complete(_find_stores())
+    assert isinstance(timed_result, DeadlineExceeded)
+    assert untimed_result == expected
+    assert queries == ["94043", "94043", "10001", "10001"]
@@ -0,0 +1,60 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+from typing import Any
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import text, floats, integers
+
+from groveco_challenge.models import GeoLocation
+from groveco_challenge.geocoding import (
+    RateLimiter,
+    geocode,
+    query_key,
+    build_session,
+    normalize_query,
+)
+
+
+@given(text())
+def test_normalize_query(query: str):
+    normalized = normalize_query(query)
+    assert normalized == normalized.strip()
+    assert "  " not in normalized
+    assert normalize_query(f"  {query}\t") == normalized
+    assert query_key(normalized) == query_key(query)
+
+
+def test_query_key():
+    assert query_key("  1600 Amphitheatre\tParkway ") == query_key(
+        "1600 AMPHITHEATRE PARKWAY"
+    )
+
+
+def test_geocode(api_mocker: Any):
+    assert geocode("94043") == GeoLocation(37.4224764, -122.0842499)
+    session = build_session(pool_size=2)
+    assert session.get_adapter("https://maps.googleapis.com")._pool_maxsize == 2
+    assert geocode("94043", session=session) == GeoLocation(37.4224764, -122.0842499)
+
+
+@given(floats(min_value=0.1, max_value=1000.0), integers(min_value=1, max_value=50))
+def test_rate_limiter(rate: float, calls: int):
+    now = [0.0]
+
+    def _sleep(seconds: float):
+        now[0] += seconds
+
+    limiter = RateLimiter(rate, clock=lambda: now[0], sleep=_sleep)
+    for _ in range(calls):
+        limiter.wait()
+    # the first call is released at once and every following call a slot later
+    assert now[0] == pytest.approx((calls - 1) / rate)
+
+    with pytest.raises(ValueError):
+        RateLimiter(0.0)
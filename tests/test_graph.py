@@ -0,0 +1,81 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import attr
+import pytest
+from hypothesis import given
+from hypothesis.strategies import booleans, integers
+
+from groveco_challenge.graph import StoreGraph, graph_path
+from groveco_challenge.finder import StoreFinder
+
+from . import TEST_STORE_LOCATIONS_PATH
+
+
+@given(integers(min_value=1, max_value=40), booleans())
+def test_build_store_graph(store_finder: StoreFinder, k: int, metric: bool):
+    graph = store_finder.build_store_graph(k=k, metric=metric)
+    stores = list(store_finder.catalog)
+    assert len(graph) == len(stores)
+    assert graph.k == k
+    assert graph.metric == metric
+
+    for (store_id, store) in enumerate(stores):
+        expected = sorted(
+            (
+                store_finder.get_distance(
+                    store.geolocation, other.geolocation, metric=metric
+                ),
+                other_id,
+            )
+            for (other_id, other) in enumerate(stores)
+            if other_id != store_id
+        )[:k]
+        found = graph.neighbors_of(store_id)
+        assert len(found) == min(k, len(stores) - 1)
+        assert [distance for (_, distance) in found] == pytest.approx(
+            [distance for (distance, _) in expected]
+        )
+        for (neighbor_id, distance) in found:
+            assert neighbor_id != store_id
+            assert store_finder.get_distance(
+                store.geolocation, stores[neighbor_id].geolocation, metric=metric
+            ) == pytest.approx(distance)
+
+
+def test_store_graph_mutations():
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, index="grid")
+    (closest_id, _) = finder.build_store_graph(k=1).neighbors_of(0)[0]
+    finder.remove_store(closest_id)
+    store_id = finder.add_store(attr.evolve(finder.catalog[0], name="Twin"))
+
+    graph = finder.build_store_graph(k=2)
+    assert len(graph) == store_id + 1
+    assert graph.neighbors_of(closest_id) == []
+    assert graph.neighbors_of(0)[0] == (store_id, 0.0)
+    assert graph.neighbors_of(store_id)[0] == (0, 0.0)
+    with pytest.raises(KeyError):
+        graph.neighbors_of(store_id + 1)
+    with pytest.raises(ValueError):
+        finder.build_store_graph(k=0)
+
+
+def test_save_load(store_finder: StoreFinder, tmp_path):
+    graph = store_finder.build_store_graph(k=3, metric=True)
+    filepath = graph_path(tmp_path / "store-locations.csv")
+    assert filepath.name == "store-locations.csv.graph"
+    graph.save(filepath)
+
+    loaded = StoreGraph.load(filepath)
+    assert loaded == graph
+    assert loaded.neighbors_of(7) == graph.neighbors_of(7)
+
+    filepath.write_bytes(filepath.read_bytes()[:-8])
+    with pytest.raises(ValueError):
+        StoreGraph.load(filepath)
+    with pytest.raises(ValueError):
+        StoreGraph.load(TEST_STORE_LOCATIONS_PATH)
@@ -0,0 +1,103 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import heapq
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import floats, integers, sampled_from
+
+from groveco_challenge import constants
+from groveco_challenge.index import GridIndex, boundary_angle
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.models import GeoLocation
+
+from .strategies import geo_location
+
+RESOLUTION_STRATEGY = sampled_from([0.1, 0.7, 1.0, 5.0, 45.0, 200.0])
+
+
+@given(geo_location(), RESOLUTION_STRATEGY, integers(min_value=1, max_value=40))
+def test_nearest(
+    store_finder: StoreFinder, origin: GeoLocation, resolution: float, results: int
+):
+    catalog = store_finder.catalog
+    index = GridIndex.from_catalog(catalog, resolution=resolution)
+
+    def distance(store_index: int) -> float:
+        return store_finder.get_distance(origin, catalog.location(store_index))
+
+    expected = heapq.nsmallest(
+        results, [(distance(store_index), store_index) for store_index in range(32)]
+    )
+    found = index.nearest(
+        origin,
+        distance,
+        radius=constants.EARTH_RADIUS * constants.IMPERIAL_RATIO,
+        results=results,
+    )
+    assert found == expected
+
+
+@given(geo_location(), RESOLUTION_STRATEGY, floats(min_value=0.0, max_value=15000.0))
+def test_within(
+    store_finder: StoreFinder, origin: GeoLocation, resolution: float, limit: float
+):
+    catalog = store_finder.catalog
+    index = GridIndex.from_catalog(catalog, resolution=resolution)
+
+    def distance(store_index: int) -> float:
+        return store_finder.get_distance(origin, catalog.location(store_index))
+
+    expected = [
+        (distance(store_index), store_index)
+        for store_index in range(32)
+        if distance(store_index) <= limit
+    ]
+    found = index.within(
+        origin,
+        distance,
+        radius=constants.EARTH_RADIUS * constants.IMPERIAL_RATIO,
+        limit=limit,
+        excluded={0},
+    )
+    assert sorted(found) == sorted(
+        (store_distance, store_index)
+        for (store_distance, store_index) in expected
+        if store_index != 0
+    )
+
+
+@given(geo_location(), RESOLUTION_STRATEGY)
+def test_add_remove(origin: GeoLocation, resolution: float):
+    index = GridIndex(resolution=resolution)
+    index.add(0, origin.latitude, origin.longitude)
+    assert index.cells == {index.cell(origin.latitude, origin.longitude): [0]}
+
+    index.remove(0, origin.latitude, origin.longitude)
+    assert index.cells == {}
+    with pytest.raises(KeyError):
+        index.remove(0, origin.latitude, origin.longitude)
+
+
+@given(floats(max_value=0.0))
+def test_invalid_resolution(resolution: float):
+    with pytest.raises(ValueError):
+        GridIndex(resolution=resolution)
+
+
+def test_boundary_angle():
+    origin = GeoLocation(latitude=0.0, longitude=0.0)
+    assert boundary_angle(origin, -90.0, 90.0, -180.0, 180.0) == pytest.approx(
+        3.141592653589793
+    )
+    assert boundary_angle(origin, -1.0, 1.0, -180.0, 180.0) == pytest.approx(
+        0.017453292519943295
+    )
+    assert boundary_angle(origin, -90.0, 90.0, -2.0, 1.0) == pytest.approx(
+        0.017453292519943295
+    )
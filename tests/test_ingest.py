@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import pytest
+
+from groveco_challenge.ingest import ingest_catalog
+from groveco_challenge.catalog import COMPRESSION_OPENERS, StoreCatalog
+
+from . import TEST_STORE_LOCATIONS_PATH
+
+
+@pytest.mark.parametrize(
+    "workers,chunk_bytes", [(1, 16 * 1024 * 1024), (1, 100), (2, 500)]
+)
+def test_ingest_catalog(workers: int, chunk_bytes: int):
+    (catalog, report) = ingest_catalog(
+        TEST_STORE_LOCATIONS_PATH, workers=workers, chunk_bytes=chunk_bytes
+    )
+    expected = StoreCatalog.load(TEST_STORE_LOCATIONS_PATH)
+
+    # NOTE: we are hard-pinning this value as the count of our test stores
+    assert report.rows == report.ingested == 32
+    assert report.malformed == {}
+    assert list(catalog) == list(expected)
+    assert catalog.cos_phis == expected.cos_phis
+
+
+@pytest.mark.parametrize("compression", COMPRESSION_OPENERS.keys())
+@pytest.mark.parametrize("workers,chunk_bytes", [(1, 16 * 1024 * 1024), (2, 500)])
+def test_ingest_catalog_compressed(
+    tmp_path, compression: str, workers: int, chunk_bytes: int
+):
+    filepath = tmp_path / f"store-locations.csv.{compression}"
+    with COMPRESSION_OPENERS[compression](filepath, "wb") as fp:
+        fp.write(TEST_STORE_LOCATIONS_PATH.read_bytes())
+
+    (catalog, report) = ingest_catalog(
+        filepath, workers=workers, chunk_bytes=chunk_bytes
+    )
+    assert report.rows == report.ingested == 32
+    assert list(catalog) == list(StoreCatalog.load(TEST_STORE_LOCATIONS_PATH))
+
+
+def test_ingest_catalog_malformed(tmp_path):
+    lines = TEST_STORE_LOCATIONS_PATH.read_text().splitlines()
+    malformed = [
+        "Broken,Row",
+        "Bad,Coordinates,1 Main St,City,ST,12345,north,-93.0,County",
+        "Far,Away,1 Main St,City,ST,12345,91.0,-93.0,County",
+        "Not,Numbers,1 Main St,City,ST,12345,nan,-93.0,County",
+    ]
+    filepath = tmp_path / "store-locations.csv"
+    filepath.write_text("\n".join(lines[:3] + malformed + [""] + lines[3:]) + "\n")
+
+    (catalog, report) = ingest_catalog(filepath, workers=2, chunk_bytes=200)
+    assert len(catalog) == report.ingested == 32
+    assert report.rows == 36
+    assert report.malformed == {
+        "missing fields": 1,
+        "unparsable coordinates": 1,
+        "out of range coordinates": 2,
+    }
+    assert [line for (line, _) in report.samples] == [4, 5, 6, 7]
+    assert "skipped 4 malformed rows" in report.to_text()
+
+
+def test_ingest_catalog_missing_headers(tmp_path):
+    filepath = tmp_path / "store-locations.csv"
+    filepath.write_text("Store Name,Latitude\nCrystal,45.0\n")
+    with pytest.raises(ValueError):
+        ingest_catalog(filepath)
@@ -0,0 +1,132 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import io
+import json
+import urllib.request
+from typing import List
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import text, lists, floats, integers
+
+from groveco_challenge import constants
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.loadtest import (
+    MockGeocoder,
+    LoadTestReport,
+    run_load,
+    read_queries,
+    local_service,
+    mock_location,
+    library_target,
+    service_target,
+    synthetic_queries,
+)
+
+from . import TEST_STORE_LOCATIONS_PATH
+
+
+@given(text(min_size=1))
+def test_mock_location(query: str):
+    location = mock_location(query)
+    assert location == mock_location(f"  {query.upper()} ")
+    (south, west, north, east) = constants.MOCK_GEOCODER_BOUNDS
+    assert south <= location.latitude <= north
+    assert west <= location.longitude <= east
+
+
+def test_mock_geocoder():
+    with MockGeocoder() as geocoder:
+        with urllib.request.urlopen(f"{geocoder.url}?address=94043") as response:
+            body = json.loads(response.read())
+        assert body["status"] == "OK"
+        assert body["results"][0]["geometry"]["location"] == {
+            "lat": mock_location("94043").latitude,
+            "lng": mock_location("94043").longitude,
+        }
+        assert geocoder.respond("/maps/api/geocode/json?address=")[1] == {
+            "results": [],
+            "status": "ZERO_RESULTS",
+        }
+        assert geocoder.respond("/missing")[0] == 404
+
+        finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, geocoder_url=geocoder.url)
+        store_results = finder.find_stores("94043", results=3)
+        assert list(store_results) == finder.find_nearest(
+            mock_location("94043"), results=3
+        )
+
+
+@given(
+    lists(floats(min_value=0.0, max_value=10.0), min_size=1, max_size=100),
+    integers(min_value=1, max_value=100),
+)
+def test_percentile(latencies: List[float], percent: int):
+    report = LoadTestReport("library", len(latencies), 1.0, latencies=latencies)
+    latency = report.percentile(percent)
+    assert latency in latencies
+    assert sum(value <= latency for value in latencies) >= (
+        percent * len(latencies) / 100.0
+    )
+    assert sum(value < latency for value in latencies) < (
+        percent * len(latencies) / 100.0
+    )
+    assert report.percentile(100) == max(latencies)
+
+
+def test_read_queries():
+    assert read_queries(io.StringIO("94043\n\n# comment\n  Mountain View, CA \n")) == [
+        "94043",
+        "Mountain View, CA",
+    ]
+
+
+def test_synthetic_queries(store_finder: StoreFinder):
+    stores = list(store_finder.stores)
+    queries = synthetic_queries(stores, 200, seed=1)
+    assert queries == synthetic_queries(stores, 200, seed=1)
+    assert len(queries) == 200
+    # popular stores are queried repeatedly
+    assert len(set(queries)) < len(queries)
+    zipcodes = {store.zipcode for store in stores}
+    assert all(
+        query in zipcodes or query.endswith(tuple(zipcodes)) for query in queries
+    )
+
+
+def test_run_load():
+    def _target(query: str):
+        if query == "fail":
+            raise KeyError(query)
+
+    report = run_load("library", _target, ["ok", "fail", "ok", "fail"], rate=200.0)
+    assert report.requests == 4
+    assert report.errors == {"KeyError": 2}
+    assert report.error_rate == 0.5
+    # paced queries take at least as long as their schedule
+    assert report.seconds >= 3 / 200.0
+    assert "errors 50.00% (2 KeyError)" in report.to_text()
+    assert report.to_dict()["p99"] == report.percentile(99)
+
+    with pytest.raises(ValueError):
+        run_load("library", _target, ["ok"], rate=0.0)
+    with pytest.raises(ValueError):
+        run_load("library", _target, ["ok"], concurrency=0)
+
+
+def test_targets(store_finder: StoreFinder):
+    queries = synthetic_queries(list(store_finder.stores), 20)
+    with MockGeocoder() as geocoder:
+        finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, geocoder_url=geocoder.url)
+        report = run_load("library", library_target(finder), queries)
+        assert (report.requests, report.errors) == (20, {})
+
+        with local_service(finder) as url:
+            report = run_load("service", service_target(url), queries + [""])
+        assert report.requests == 21
+        assert report.errors == {"HTTPError": 1}
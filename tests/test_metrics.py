@@ -0,0 +1,150 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import gc
+import threading
+from typing import List
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import lists, floats, integers
+
+from groveco_challenge.metrics import (
+    Gauge,
+    Metric,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    measure,
+)
+
+
+@given(integers(min_value=1, max_value=8), integers(min_value=0, max_value=200))
+def test_counter_threads(threads: int, increments: int):
+    counter = Counter("requests_total", "Requests.")
+
+    def _increment():
+        for _ in range(increments):
+            counter.inc()
+
+    workers = [threading.Thread(target=_increment) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    counter.inc(0.5)
+    gc.collect()
+
+    # NOTE: the cells of finished threads are folded into a single retired cell
+    assert counter.value == threads * increments + 0.5
+    assert len(counter._cells._cells) <= 1
+
+
+@given(lists(floats(min_value=0.0, max_value=100.0), max_size=50))
+def test_histogram(values: List[float]):
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(1.0, 0.1, 10.0))
+    for value in values:
+        histogram.observe(value)
+
+    (cumulative, total, count) = histogram.snapshot()
+    assert [bound for (bound, _) in cumulative] == [0.1, 1.0, 10.0, float("inf")]
+    for (bound, bucket_count) in cumulative:
+        assert bucket_count == sum(value <= bound for value in values)
+    assert total == pytest.approx(sum(values))
+    assert count == len(values)
+
+
+def test_labels():
+    counter = Counter("errors_total", "Errors.", labelnames=("error",))
+    counter.labels("ValueError").inc()
+    counter.labels("ValueError").inc()
+    counter.labels("KeyError").inc()
+    assert counter.labels("ValueError") is counter.labels("ValueError")
+    assert counter.samples() == [
+        ("errors_total", {"error": "KeyError"}, 1.0),
+        ("errors_total", {"error": "ValueError"}, 2.0),
+    ]
+    with pytest.raises(ValueError):
+        counter.labels("ValueError", "extra")
+    # NOTE: only the kinds of metrics that know their samples can be created
+    with pytest.raises(TypeError):
+        Metric("untyped", "Untyped.")  # type: ignore
+
+
+def test_functions():
+    values = [None]
+    gauge = Gauge("stores", "Stores.", function=lambda: values[0])
+    assert gauge.samples() == []
+    values[0] = 32
+    assert gauge.samples() == [("stores", {}, 32)]
+
+    gauge = Gauge("entries", "Entries.")
+    gauge.set(4)
+    gauge.inc(-1)
+    assert gauge.value == 3.0
+
+
+def test_measure():
+    histogram = Histogram("seconds", "Seconds.")
+    errors = Counter("errors_total", "Errors.", labelnames=("error",))
+    with measure(histogram, errors):
+        pass
+    with pytest.raises(KeyError):
+        with measure(histogram, errors):
+            raise KeyError("missing")
+
+    assert histogram.snapshot()[2] == 2
+    assert errors.labels("KeyError").value == 1
+
+
+def test_registry():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.")
+    assert registry.counter("requests_total", "Requests.") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Requests.")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requests.", labelnames=("status",))
+
+    counter.inc(3)
+    histogram = registry.histogram(
+        "latency_seconds", "Latency.", labelnames=("status",), buckets=(0.5,)
+    )
+    histogram.labels("200").observe(0.25)
+    registry.gauge("stores", "Stores.", function=lambda: None)
+
+    assert [metric.name for metric in registry] == [
+        "latency_seconds",
+        "requests_total",
+        "stores",
+    ]
+    assert registry.to_prometheus() == (
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{status="200",le="0.5"} 1\n'
+        'latency_seconds_bucket{status="200",le="+Inf"} 1\n'
+        'latency_seconds_sum{status="200"} 0.25\n'
+        'latency_seconds_count{status="200"} 1\n'
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        "requests_total 3\n"
+        "# HELP stores Stores.\n"
+        "# TYPE stores gauge\n"
+    )
+    assert registry.to_dict()["latency_seconds"]["values"] == [
+        {
+            "labels": {"status": "200"},
+            "buckets": {"0.5": 1.0, "+Inf": 1.0},
+            "sum": 0.25,
+            "count": 1.0,
+        }
+    ]
+    assert registry.to_dict()["requests_total"] == {
+        "type": "counter",
+        "help": "Requests.",
+        "values": [{"labels": {}, "value": 3.0}],
+    }
@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import pstats
+import threading
+import tracemalloc
+
+import pytest
+
+from groveco_challenge.profiling import Capture
+
+
+def _allocate(count: int) -> list:
+    return [str(value) * 8 for value in range(count)]
+
+
+def test_capture(tmp_path):
+    with Capture() as capture:
+        _allocate(100)
+    assert not capture.enabled
+    assert (capture.stats, capture.allocations) == (None, [])
+    assert capture.top_functions() == []
+    with pytest.raises(ValueError):
+        capture.dump_stats(tmp_path / "search.prof")
+
+    with Capture(profile=True, trace_memory=True) as capture:
+        allocated = _allocate(10000)
+    assert not tracemalloc.is_tracing()
+    assert any(
+        function["function"].endswith("(_allocate)")
+        for function in capture.top_functions()
+    )
+    assert capture.top_allocations(limit=1)[0]["location"].startswith(__file__)
+    assert capture.top_allocations(limit=1)[0]["size"] > 0
+    assert __file__ in capture.allocations_text()
+    del allocated
+
+    capture.dump_stats(tmp_path / "search.prof")
+    assert pstats.Stats(str(tmp_path / "search.prof")).total_calls > 0
+
+
+def test_capture_threads():
+    # tracing is only stopped once the last of concurrent captures is done
+    started = threading.Event()
+    release = threading.Event()
+
+    def _capture():
+        with Capture(trace_memory=True):
+            started.set()
+            release.wait()
+
+    worker = threading.Thread(target=_capture)
+    worker.start()
+    started.wait()
+    with Capture(trace_memory=True) as capture:
+        allocated = _allocate(1000)
+    assert tracemalloc.is_tracing()
+    release.set()
+    worker.join()
+    assert not tracemalloc.is_tracing()
+    assert len(capture.allocations) > 0
+    del allocated
+
+    # tracing started elsewhere is never stopped by a capture
+    tracemalloc.start()
+    try:
+        with Capture(trace_memory=True):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
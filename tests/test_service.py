@@ -0,0 +1,108 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from typing import Any
+
+import pytest
+
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.service import StoreService
+
+from . import TEST_STORE_LOCATIONS_PATH
+
+
+@pytest.fixture()
+def store_service():
+    yield StoreService(StoreFinder(TEST_STORE_LOCATIONS_PATH))
+
+
+def test_handle(store_service: StoreService, api_mocker: Any):
+    (status, body) = store_service.handle("/stores?query=94043&results=3&units=km")
+    assert status == 200
+    assert not body["partial"]
+    assert len(body["results"]) == 3
+    assert all(result["metric"] for result in body["results"])
+    assert body["results"] == [
+        json.loads(store_result.dumps_json())
+        for store_result in store_service.finder.find_stores(
+            "94043", metric=True, results=3
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "path,status",
+    [
+        ("/", 404),
+        ("/stores", 400),
+        ("/stores?query=94043&results=0", 400),
+        ("/stores?query=94043&units=ft", 400),
+        ("/stores?query=94043&timeout=0", 504),
+    ],
+)
+def test_handle_errors(
+    store_service: StoreService, api_mocker: Any, path: str, status: int
+):
+    assert store_service.handle(path)[0] == status
+
+
+def test_handle_partial(api_mocker: Any, tmp_path):
+    # NOTE: geocodes are never partial, so only a cached geocode beats the deadline
+    finder = StoreFinder(
+        TEST_STORE_LOCATIONS_PATH, geocode_cache_path=(tmp_path / "geocodes.db")
+    )
+    finder.warm_geocode_cache(["94043"], rate=None)
+    store_service = StoreService(finder)
+    (status, body) = store_service.handle("/stores?query=94043&timeout=0&partial=1")
+    assert status == 200
+    assert body["partial"]
+    assert store_service.handle("/stores?query=10001&timeout=0&partial=1")[0] == 504
+
+
+def test_handle_metrics(store_service: StoreService, api_mocker: Any):
+    store_service.handle("/stores?query=94043")
+    store_service.handle("/stores?query=94043&results=0")
+    (status, body) = store_service.handle("/metrics")
+    assert status == 200
+    assert 'service_request_seconds_count{status="200"} 1' in body
+    assert 'service_request_seconds_count{status="400"} 1' in body
+    assert "finder_query_seconds_count 1" in body
+
+
+def test_serve(store_service: StoreService, api_mocker: Any):
+    server = store_service.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/stores?query=94043") as response:
+            assert len(json.loads(response.read())["results"]) == 1
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/stores")
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_handle_profile(store_service: StoreService, api_mocker: Any):
+    path = "/stores?query=94043&profile=1&trace_memory=true"
+    assert store_service.handle(path)[0] == 400
+
+    store_service.allow_profiling = True
+    (status, body) = store_service.handle(path)
+    assert status == 200
+    assert len(body["results"]) == 1
+    assert any(
+        function["function"].endswith("(find_stores)") for function in body["profile"]
+    )
+    assert isinstance(body["allocations"], list)
+    assert "profile" not in store_service.handle("/stores?query=94043")[1]
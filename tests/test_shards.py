@@ -0,0 +1,143 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import attr
+import pytest
+from hypothesis import given, settings
+from hypothesis.strategies import floats, booleans, integers, sampled_from
+
+from groveco_challenge import constants
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.models import GeoLocation
+from groveco_challenge.shards import box_angle, shard_key
+
+from . import TEST_STORE_LOCATIONS_PATH
+from .strategies import geo_location
+
+
+@given(
+    geo_location(),
+    floats(min_value=-90.0, max_value=90.0),
+    floats(min_value=-180.0, max_value=180.0),
+    floats(min_value=0.0, max_value=1.0),
+    floats(min_value=0.0, max_value=1.0),
+)
+def test_box_angle(
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    latitude: float,
+    longitude: float,
+    height: float,
+    width: float,
+):
+    (south, north) = sorted((latitude, latitude + height * (90.0 - latitude) * 0.5))
+    (west, east) = (longitude, longitude + width * (180.0 - longitude))
+    radius = constants.EARTH_RADIUS * constants.IMPERIAL_RATIO
+    bound = box_angle(origin, south, west, north, east) * radius
+    for target_latitude in (south, (south + north) / 2.0, north):
+        for target_longitude in (west, (west + east) / 2.0, east):
+            target = GeoLocation(latitude=target_latitude, longitude=target_longitude)
+            assert bound <= store_finder.get_distance(origin, target) * (1.0 + 1e-9)
+    if south <= origin.latitude <= north and west <= origin.longitude <= east:
+        assert bound == 0.0
+
+
+def test_shard_key():
+    assert shard_key(37.42, -122.08, "CA", "state", 10.0) == "CA"
+    assert shard_key(37.42, -122.08, "CA", "grid", 10.0) == "12:5"
+    assert shard_key(-90.0, -180.0, "", "grid", 10.0) == "0:0"
+
+
+@pytest.mark.parametrize("shard_by", constants.SHARD_TYPES)
+def test_sharded_snapshot(shard_by: str):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, shard_by=shard_by)
+    snapshot = finder.snapshot
+    assert snapshot.spatial_index is None
+
+    shards = snapshot.shards
+    stores = dict(snapshot.stores())
+    sharded = {}
+    for (key, shard) in shards.shards.items():
+        for (store_id, store) in shard.snapshot.stores():
+            assert shards.key(store) == key
+            location = store.geolocation
+            assert shard.south <= location.latitude <= shard.north
+            assert shard.west <= location.longitude <= shard.east
+            sharded[store_id] = store
+    assert sharded == stores
+
+
+@settings(deadline=None)
+@given(
+    geo_location(),
+    booleans(),
+    booleans(),
+    integers(min_value=1, max_value=8),
+    sampled_from(constants.SHARD_TYPES),
+)
+def test_find_nearest_sharded(
+    store_finder: StoreFinder,
+    origin: GeoLocation,
+    metric: bool,
+    actual: bool,
+    results: int,
+    shard_by: str,
+):
+    with StoreFinder(TEST_STORE_LOCATIONS_PATH, shard_by=shard_by) as finder:
+        expected = store_finder.find_nearest(
+            origin, metric=metric, actual=actual, results=results, planar=True
+        )
+        found = finder.find_nearest(
+            origin, metric=metric, actual=actual, results=results
+        )
+        assert [result.distance for result in found] == [
+            result.distance for result in expected
+        ]
+
+
+def test_sharded_mutations(monkeypatch):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, shard_by="state")
+    store = finder.catalog[0]
+    shards = finder.snapshot.shards.shards
+    other = next(key for key in shards if key != store.state)
+
+    # moving a store to another state moves it to the shard of that state
+    moved = attr.evolve(store, state=other, name="Moved")
+    finder.update_store(0, moved)
+    updated = finder.snapshot.shards.shards
+    assert 0 not in dict(updated[store.state].snapshot.stores())
+    assert dict(updated[other].snapshot.stores())[0] == moved
+    assert finder.find_nearest(store.geolocation)[0].store == moved
+
+    store_id = finder.add_store(attr.evolve(store, state="ZZ"))
+    assert list(finder.snapshot.shards.shards["ZZ"].snapshot.ids) == [store_id]
+    finder.remove_store(store_id)
+    assert finder.find_nearest(store.geolocation)[0].store == moved
+
+    # rebuilding a shard compacts it without touching any other shard
+    finder.rebuild_shard(other)
+    rebuilt = finder.snapshot.shards.shards
+    assert rebuilt[other].snapshot.mutations == 0
+    assert 0 in list(rebuilt[other].snapshot.ids)
+    for key in rebuilt:
+        if key != other:
+            assert rebuilt[key] is finder.snapshot.shards.shards[key]
+    finder.rebuild_shard("ZZ")
+    assert "ZZ" not in finder.snapshot.shards.shards
+    with pytest.raises(KeyError):
+        finder.rebuild_shard("ZZ")
+    with pytest.raises(ValueError):
+        StoreFinder(TEST_STORE_LOCATIONS_PATH).rebuild_shard(other)
+
+    # shards with too many pending mutations are rebuilt on their own
+    monkeypatch.setattr(constants, "SHARD_COMPACTION_THRESHOLD", 0)
+    finder.remove_store(1)
+    assert all(
+        shard.snapshot.mutations == 0
+        for shard in finder.snapshot.shards.shards.values()
+    )
+    assert finder.snapshot.mutations > 0
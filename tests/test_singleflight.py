@@ -0,0 +1,101 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import time
+import asyncio
+import threading
+import concurrent.futures
+
+import pytest
+
+from groveco_challenge.singleflight import SingleFlight, AsyncSingleFlight
+
+from . import run_until_complete
+
+
+def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert condition()
+
+
+def test_single_flight():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute(value: int) -> int:
+        calls.append(value)
+        release.wait()
+        return value * 2
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flight.do, "key", compute, 21) for _ in range(8)]
+        wait_for(lambda: flight.shared == 7)
+        release.set()
+        assert [future.result() for future in futures] == [42] * 8
+
+    assert calls == [21]
+    assert flight.executed == 1
+    # finished calls are forgotten
+    assert flight.do("key", compute, 1) == 2
+    assert flight.executed == 2
+
+
+def test_single_flight_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait()
+        raise ValueError("failed")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, "key", fail) for _ in range(4)]
+        wait_for(lambda: flight.shared == 3)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+    assert flight.executed == 1
+
+
+def test_single_flight_timeout():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(flight.do, "key", release.wait)
+        wait_for(lambda: flight.executed == 1)
+        with pytest.raises(concurrent.futures.TimeoutError):
+            flight.do("key", release.wait, timeout=0.01)
+        release.set()
+        assert leader.result()
+
+
+def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def compute(value: int) -> int:
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def run():
+        cancelled = asyncio.ensure_future(flight.do("key", compute, 21))
+        others = [flight.do("key", compute, 21) for _ in range(4)]
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        results = await asyncio.gather(*others)
+        assert cancelled.cancelled()
+        return results
+
+    assert run_until_complete(run()) == [42] * 4
+    assert calls == [21]
+    assert (flight.executed, flight.shared) == (1, 4)
@@ -0,0 +1,111 @@
+# -*- encoding: utf-8 -*-
+# Copyright (c) 2019 Stephen Bunn <stephen@bunn.io>
+# ISC License <https://opensource.org/licenses/isc>
+
+"""
+"""
+
+import pytest
+from hypothesis import given, settings
+from hypothesis.strategies import floats, booleans
+
+from groveco_challenge.finder import StoreFinder
+from groveco_challenge.models import GeoLocation
+from groveco_challenge.voronoi import VoronoiTable, table_path
+
+from . import TEST_STORE_LOCATIONS_PATH
+
+
+@pytest.fixture(scope="module")
+def table_finder(tmp_path_factory):
+    filepath = tmp_path_factory.mktemp("voronoi") / "store-locations.csv.voronoi"
+    StoreFinder(TEST_STORE_LOCATIONS_PATH, index="grid").build_voronoi_table(
+        resolution=0.5
+    ).save(filepath)
+    with StoreFinder(TEST_STORE_LOCATIONS_PATH, voronoi=filepath) as finder:
+        yield finder
+
+
+@settings(deadline=None)
+@given(
+    floats(min_value=28.0, max_value=50.0),
+    floats(min_value=-110.0, max_value=-86.0),
+    booleans(),
+    booleans(),
+)
+def test_find_stores_table(
+    table_finder: StoreFinder,
+    store_finder: StoreFinder,
+    latitude: float,
+    longitude: float,
+    metric: bool,
+    actual: bool,
+):
+    origin = GeoLocation(latitude=latitude, longitude=longitude)
+    table = table_finder.voronoi_table
+    assert table.lookup(latitude, longitude) is not None
+
+    (found,) = table_finder._find_snapshot(
+        table_finder.snapshot, origin, metric=metric, actual=actual
+    )
+    expected = min(
+        store_finder.get_distance(
+            origin, store.geolocation, metric=metric, actual=actual
+        )
+        for store in store_finder.catalog
+    )
+    assert found.distance == pytest.approx(expected)
+
+
+def test_table_fallback(table_finder: StoreFinder):
+    table = table_finder.voronoi_table
+    assert table.lookup(table.south - 1.0, table.west) is None
+    assert table.lookup(table.south, table.west + table.columns * table.resolution) is (
+        None
+    )
+
+    # origins outside of the table are searched exhaustively
+    origin = GeoLocation(latitude=-40.0, longitude=150.0)
+    (found,) = table_finder._find_snapshot(table_finder.snapshot, origin)
+    assert found.distance == pytest.approx(
+        min(
+            table_finder.get_distance(origin, store.geolocation)
+            for store in table_finder.catalog
+        )
+    )
+
+
+def test_save_load(tmp_path):
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, index="grid")
+    table = finder.build_voronoi_table(resolution=1.0)
+    filepath = table_path(tmp_path / "store-locations.csv")
+    assert filepath.name == "store-locations.csv.voronoi"
+    table.save(filepath)
+
+    with VoronoiTable.load(filepath) as loaded:
+        assert (loaded.south, loaded.west, loaded.resolution) == (
+            table.south,
+            table.west,
+            table.resolution,
+        )
+        assert (loaded.rows, loaded.columns) == (table.rows, table.columns)
+        assert loaded.digest == finder.snapshot.fingerprint.digest
+        assert list(loaded.offsets) == list(table.offsets)
+        assert list(loaded.candidates) == list(table.candidates)
+        assert list(loaded.lookup(40.0, -100.0)) == list(table.lookup(40.0, -100.0))
+    assert loaded.mapping is None
+
+    filepath.write_bytes(filepath.read_bytes()[:-8])
+    with pytest.raises(ValueError):
+        VoronoiTable.load(filepath)
+    with pytest.raises(ValueError):
+        VoronoiTable.load(TEST_STORE_LOCATIONS_PATH)
+
+
+def test_build_errors():
+    finder = StoreFinder(TEST_STORE_LOCATIONS_PATH, index="grid")
+    with pytest.raises(ValueError):
+        finder.build_voronoi_table(resolution=0.0)
+    finder.remove_store(0)
+    with pytest.raises(ValueError):
+        finder.build_voronoi_table()